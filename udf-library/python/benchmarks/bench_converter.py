@@ -0,0 +1,85 @@
+"""Compares the batch converters with the scalar converters.
+
+Usage:
+    python -m benchmarks.bench_converter [--rows N] [--repeat R]
+"""
+
+import argparse
+import random
+import timeit
+from datetime import date, time, datetime, timedelta, timezone
+from decimal import Decimal
+
+from tsurugidb.udf import (
+    to_pb_decimal, from_pb_decimal, to_pb_decimals, from_pb_decimals,
+    to_pb_date, from_pb_date, to_pb_dates, from_pb_dates,
+    to_pb_local_time, from_pb_local_time, to_pb_local_times, from_pb_local_times,
+    to_pb_local_datetime, from_pb_local_datetime, to_pb_local_datetimes, from_pb_local_datetimes,
+    to_pb_offset_datetime, from_pb_offset_datetime, to_pb_offset_datetimes, from_pb_offset_datetimes,
+)
+
+
+def _columns(rows: int, rng: random.Random) -> dict[str, list]:
+    epoch = datetime(1970, 1, 1)
+    tz = timezone(timedelta(hours=9))
+    datetimes = [epoch + timedelta(seconds=rng.randrange(-10**9, 2 * 10**9), microseconds=rng.randrange(10**6)) for _ in range(rows)]
+    return {
+        "decimal": [Decimal(rng.randrange(-10**12, 10**12)).scaleb(-4) for _ in range(rows)],
+        "date": [d.date() for d in datetimes],
+        "local_time": [d.time() for d in datetimes],
+        "local_datetime": datetimes,
+        "offset_datetime": [d.replace(tzinfo=tz) for d in datetimes],
+    }
+
+
+_CONVERTERS = {
+    "decimal": (to_pb_decimal, from_pb_decimal, to_pb_decimals, from_pb_decimals),
+    "date": (to_pb_date, from_pb_date, to_pb_dates, from_pb_dates),
+    "local_time": (to_pb_local_time, from_pb_local_time, to_pb_local_times, from_pb_local_times),
+    "local_datetime": (to_pb_local_datetime, from_pb_local_datetime, to_pb_local_datetimes, from_pb_local_datetimes),
+    "offset_datetime": (to_pb_offset_datetime, from_pb_offset_datetime, to_pb_offset_datetimes, from_pb_offset_datetimes),
+}
+
+
+def _best(func, repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    columns = _columns(args.rows, random.Random(args.seed))
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
+    print(f"rows={args.rows}, repeat={args.repeat}, numpy={'yes' if numpy else 'no'}")
+    print(f"{'type':<16} {'direction':<9} {'scalar[ms]':>11} {'batch[ms]':>10} {'speedup':>8}")
+    for name, (to_one, from_one, to_many, from_many) in _CONVERTERS.items():
+        values = columns[name]
+        messages = to_many(values)
+        cases = [
+            ("to_pb", lambda: [to_one(v) for v in values], lambda: to_many(values)),
+            ("from_pb", lambda: [from_one(m) for m in messages], lambda: from_many(messages)),
+        ]
+        for direction, scalar, batch in cases:
+            t_scalar = _best(scalar, args.repeat)
+            t_batch = _best(batch, args.repeat)
+            print(f"{name:<16} {direction:<9} {t_scalar * 1e3:>11.2f} {t_batch * 1e3:>10.2f} {t_scalar / t_batch:>7.2f}x")
+
+    if numpy is not None:
+        array = numpy.array(columns["local_datetime"], dtype="datetime64[us]")
+        messages = to_pb_local_datetimes(array)
+        t_to = _best(lambda: to_pb_local_datetimes(array), args.repeat)
+        t_from = _best(lambda: from_pb_local_datetimes(messages, as_numpy=True), args.repeat)
+        print(f"{'datetime64[us]':<16} {'to_pb':<9} {'':>11} {t_to * 1e3:>10.2f}")
+        print(f"{'datetime64[us]':<16} {'from_pb':<9} {'':>11} {t_from * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Measures the decimal codec for small, medium and DECIMAL(38) magnitudes.
+
+The previous digit-loop / context-multiplication codec is kept here as the
+baseline; note that its decoder rounds values beyond 28 digits.
+
+Usage:
+    python -m benchmarks.bench_decimal [--count N] [--repeat R]
+"""
+
+import argparse
+import random
+import timeit
+from decimal import Decimal
+
+from tsurugidb.udf import (
+    Decimal as PbDecimal,
+    to_pb_decimal,
+    from_pb_decimal,
+)
+
+
+def _legacy_to_pb_decimal(value: Decimal) -> PbDecimal:
+    sign, digits, exponent = value.as_tuple()
+    unscaled_int = 0
+    for d in digits:
+        unscaled_int = unscaled_int * 10 + d
+    if sign == 1:
+        unscaled_int = -unscaled_int
+    if unscaled_int == 0:
+        unscaled_bytes = b"\x00"
+    else:
+        byte_length = (unscaled_int.bit_length() + 8) // 8
+        unscaled_bytes = unscaled_int.to_bytes(byte_length, byteorder="big", signed=True)
+    return PbDecimal(unscaled_value=unscaled_bytes, exponent=exponent)
+
+
+def _legacy_from_pb_decimal(message: PbDecimal) -> Decimal:
+    unscaled_int = int.from_bytes(message.unscaled_value, byteorder="big", signed=True)
+    return Decimal(unscaled_int) * (Decimal(10) ** message.exponent)
+
+
+# (name, digits, scale)
+_MAGNITUDES = [
+    ("small", 5, 2),
+    ("medium", 18, 4),
+    ("decimal38", 38, 10),
+]
+
+
+def _values(count: int, digits: int, scale: int, rng: random.Random) -> list[Decimal]:
+    bound = 10 ** digits
+    return [Decimal(f"{rng.randrange(-bound + 1, bound)}E-{scale}") for _ in range(count)]
+
+
+def _best(func, repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"count={args.count}, repeat={args.repeat}")
+    print(f"{'magnitude':<10} {'direction':<9} {'legacy[ms]':>11} {'codec[ms]':>10} {'speedup':>8} {'legacy exact':>13}")
+    for name, digits, scale in _MAGNITUDES:
+        # the legacy encoder is exact, so the same messages feed both decoders
+        largest = Decimal(f"{10 ** digits - 1}E-{scale}")
+        values = _values(args.count, digits, scale, rng)
+        messages = [to_pb_decimal(v) for v in values]
+        exact = _legacy_from_pb_decimal(to_pb_decimal(largest)) == largest
+        cases = [
+            ("to_pb", lambda: [_legacy_to_pb_decimal(v) for v in values], lambda: [to_pb_decimal(v) for v in values]),
+            ("from_pb", lambda: [_legacy_from_pb_decimal(m) for m in messages], lambda: [from_pb_decimal(m) for m in messages]),
+        ]
+        for direction, legacy, codec in cases:
+            t_legacy = _best(legacy, args.repeat)
+            t_codec = _best(codec, args.repeat)
+            print(
+                f"{name:<10} {direction:<9} {t_legacy * 1e3:>11.2f} {t_codec * 1e3:>10.2f} "
+                f"{t_legacy / t_codec:>7.2f}x {'yes' if exact or direction == 'to_pb' else 'no':>13}"
+            )
+
+
+if __name__ == "__main__":
+    main()
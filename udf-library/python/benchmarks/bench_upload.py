@@ -0,0 +1,93 @@
+"""Compares the upload throughput of fixed and adaptive chunk sizes.
+
+This uploads files from 4 KiB up to `--max-size` to a relay stand-in on localhost which discards the chunks.
+The files are sparse, so that large sizes do not need the disk space.
+
+Usage:
+    python -m benchmarks.bench_upload [--max-size 4G] [--repeat R]
+"""
+
+import argparse
+import tempfile
+import time
+from concurrent import futures
+from pathlib import Path
+
+import grpc
+
+from tsurugidb.udf.client.grpc import (
+    blob_relay_streaming_pb2 as pb_message,
+    blob_relay_streaming_pb2_grpc as pb_service,
+    blob_reference_pb2 as pb_model,
+)
+from tsurugidb.udf.client.stream import StreamBlobRelayClient
+
+_UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+class _DiscardServicer(pb_service.BlobRelayStreamingServicer):
+
+    def Put(self, request_iterator, context):
+        for _ in request_iterator:
+            pass
+        return pb_message.PutStreamingResponse(blob=pb_model.BlobReference(object_id=1))
+
+
+def _parse_size(text: str) -> int:
+    unit = _UNITS.get(text[-1:].upper())
+    return int(text[:-1]) * unit if unit else int(text)
+
+
+def _format_size(size: int) -> str:
+    for suffix, unit in (("GiB", 1 << 30), ("MiB", 1 << 20), ("KiB", 1 << 10)):
+        if size >= unit:
+            return f"{size // unit} {suffix}"
+    return f"{size} B"
+
+
+def _best(client: StreamBlobRelayClient, source: Path, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        client.upload_blob(source)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-size", type=_parse_size, default=256 << 20, help="largest file size, e.g. 4G")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    pb_service.add_BlobRelayStreamingServicer_to_server(_DiscardServicer(), server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    channel = grpc.insecure_channel(f"localhost:{port}")
+    stub = pb_service.BlobRelayStreamingStub(channel)
+    clients = {
+        "64 KiB": StreamBlobRelayClient(stub, 1, chunk_size=64 << 10),
+        "1 MiB": StreamBlobRelayClient(stub, 1, chunk_size=1 << 20),
+        "adaptive": StreamBlobRelayClient(stub, 1, chunk_size=64 << 10, adaptive_chunk=True),
+    }
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-upload-") as directory:
+            print(f"{'size':>8}  " + "  ".join(f"{name + ' MiB/s':>16}" for name in clients))
+            size = 4 << 10
+            while size <= args.max_size:
+                source = Path(directory) / "data"
+                with source.open("wb") as fp:
+                    fp.truncate(size)
+                rates = [size / _best(client, source, args.repeat) / (1 << 20) for client in clients.values()]
+                print(f"{_format_size(size):>8}  " + "  ".join(f"{rate:16.1f}" for rate in rates))
+                source.unlink()
+                size *= 4
+    finally:
+        channel.close()
+        server.stop(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+from pytest import raises
+from unittest.mock import Mock
+
+import grpc
+import os
+
+from datetime import timedelta
+
+from tsurugidb.udf.client.grpc import (
+    blob_relay_local_pb2 as pb_message,
+    blob_reference_pb2 as pb_model,
+)
+
+from tsurugidb.udf.client.local import LocalBlobRelayClient
+from tsurugidb.udf import BlobReference, ClobReference, BlobRelayClient, BlobRelayError, BlobRelayTimeoutError
+
+def error_mock(code: grpc.StatusCode) -> grpc.RpcError:
+    error = grpc.RpcError()
+    error.code = Mock(return_value=code)
+    return error
+
+def get_response(path) -> pb_message.GetLocalResponse:
+    return pb_message.GetLocalResponse(data=pb_message.BlobFile(path=str(path)))
+
+def fallback_mock() -> Mock:
+    return Mock(spec=BlobRelayClient)
+
+def test_download_blob(tmp_path):
+    server_file = tmp_path / "server.bin"
+    server_file.write_bytes(b"Hello, BLOB!")
+    stub = Mock() # without spec because gRPC stub has no regular methods
+    stub.Get.return_value = get_response(server_file)
+    fallback = fallback_mock()
+    client = LocalBlobRelayClient(stub, 1, fallback)
+
+    destination = tmp_path / "download.bin"
+    client.download_blob(BlobReference(storage_id=1, object_id=2, tag=3), destination, timeout=timedelta(seconds=3))
+
+    assert destination.read_bytes() == b"Hello, BLOB!"
+    assert not os.path.samefile(server_file, destination)
+    req = stub.Get.call_args[0][0]
+    assert req.session_id == 1
+    assert req.blob == pb_model.BlobReference(storage_id=1, object_id=2, tag=3)
+    assert stub.Get.call_args[1].get("timeout") == 3.0
+    fallback.download_blob.assert_not_called()
+
+def test_download_clob_hardlink(tmp_path):
+    server_file = tmp_path / "server.txt"
+    server_file.write_bytes(b"Hello, CLOB!")
+    stub = Mock()
+    stub.Get.return_value = get_response(server_file)
+    client = LocalBlobRelayClient(stub, 1, fallback_mock(), link_mode="hardlink")
+
+    destination = tmp_path / "download.txt"
+    client.download_clob(ClobReference(object_id=1), destination)
+
+    assert os.path.samefile(server_file, destination)
+
+def test_download_blob_copy(tmp_path):
+    server_file = tmp_path / "server.bin"
+    server_file.write_bytes(bytes(range(256)) * 100)
+    stub = Mock()
+    stub.Get.return_value = get_response(server_file)
+    client = LocalBlobRelayClient(stub, 1, fallback_mock(), link_mode="copy")
+
+    destination = tmp_path / "download.bin"
+    client.download_blob(BlobReference(), destination)
+
+    assert destination.read_bytes() == server_file.read_bytes()
+
+def test_download_blob_existing(tmp_path):
+    stub = Mock()
+    client = LocalBlobRelayClient(stub, 1, fallback_mock())
+
+    destination = tmp_path / "download.bin"
+    destination.write_bytes(b"old")
+    with raises(FileExistsError):
+        client.download_blob(BlobReference(), destination)
+    assert destination.read_bytes() == b"old"
+    stub.Get.assert_not_called()
+
+def test_download_blob_inaccessible_file(tmp_path):
+    stub = Mock()
+    stub.Get.return_value = get_response(tmp_path / "other-host" / "server.bin")
+    fallback = fallback_mock()
+    client = LocalBlobRelayClient(stub, 1, fallback)
+
+    destination = tmp_path / "download.bin"
+    client.download_blob(BlobReference(object_id=1), destination)
+    client.download_blob(BlobReference(object_id=2), destination)
+
+    assert not client.local_available
+    assert fallback.download_blob.call_count == 2
+    fallback.download_blob.assert_called_with(BlobReference(object_id=2), destination, timeout=None)
+    # no more local requests after falling back
+    assert stub.Get.call_count == 1
+
+def test_download_blob_unimplemented(tmp_path):
+    stub = Mock()
+    stub.Get.side_effect = error_mock(grpc.StatusCode.UNIMPLEMENTED)
+    fallback = fallback_mock()
+    client = LocalBlobRelayClient(stub, 1, fallback)
+
+    destination = tmp_path / "download.bin"
+    client.download_blob(BlobReference(), destination)
+
+    fallback.download_blob.assert_called_once_with(BlobReference(), destination, timeout=None)
+
+def test_download_blob_server_error(tmp_path):
+    stub = Mock()
+    stub.Get.side_effect = error_mock(grpc.StatusCode.NOT_FOUND)
+    fallback = fallback_mock()
+    client = LocalBlobRelayClient(stub, 1, fallback)
+
+    with raises(BlobRelayError):
+        client.download_blob(BlobReference(), tmp_path / "download.bin")
+    assert client.local_available
+    fallback.download_blob.assert_not_called()
+
+def test_download_blob_timeout(tmp_path):
+    stub = Mock()
+    stub.Get.side_effect = error_mock(grpc.StatusCode.DEADLINE_EXCEEDED)
+    client = LocalBlobRelayClient(stub, 1, fallback_mock())
+
+    with raises(BlobRelayTimeoutError):
+        client.download_blob(BlobReference(), tmp_path / "download.bin")
+
+def test_download_blob_missing_data(tmp_path):
+    stub = Mock()
+    stub.Get.return_value = pb_message.GetLocalResponse()
+    client = LocalBlobRelayClient(stub, 1, fallback_mock())
+
+    destination = tmp_path / "download.bin"
+    with raises(BlobRelayError):
+        client.download_blob(BlobReference(), destination)
+    assert not destination.exists()
+
+def test_open_blob(tmp_path):
+    server_file = tmp_path / "server.bin"
+    server_file.write_bytes(b"content")
+    stub = Mock()
+    stub.Get.return_value = get_response(server_file)
+    fallback = fallback_mock()
+    client = LocalBlobRelayClient(stub, 1, fallback)
+
+    with client.open_blob(BlobReference()) as fp:
+        assert fp.read() == b"content"
+    fallback.open_blob.assert_not_called()
+
+def test_open_clob_fallback(tmp_path):
+    stub = Mock()
+    stub.Get.side_effect = error_mock(grpc.StatusCode.UNIMPLEMENTED)
+    fallback = fallback_mock()
+    client = LocalBlobRelayClient(stub, 1, fallback)
+
+    fp = client.open_clob(ClobReference(object_id=1))
+
+    assert fp is fallback.open_clob.return_value
+
+def test_upload_blob(tmp_path):
+    source = tmp_path / "upload.bin"
+    source.write_bytes(b"0123456789")
+    stub = Mock()
+    stub.Put.return_value = pb_message.PutLocalResponse(blob=pb_model.BlobReference(storage_id=1, object_id=2, tag=3))
+    client = LocalBlobRelayClient(stub, 7, fallback_mock())
+
+    ref = client.upload_blob(source, timeout=timedelta(seconds=2))
+
+    assert ref == BlobReference(storage_id=1, object_id=2, tag=3)
+    req = stub.Put.call_args[0][0]
+    assert req.session_id == 7
+    assert req.data.path == str(source.resolve())
+    assert stub.Put.call_args[1].get("timeout") == 2.0
+
+def test_upload_clob(tmp_path):
+    source = tmp_path / "upload.txt"
+    source.write_bytes(b"text")
+    stub = Mock()
+    stub.Put.return_value = pb_message.PutLocalResponse(blob=pb_model.BlobReference(object_id=5))
+    client = LocalBlobRelayClient(stub, 1, fallback_mock())
+
+    ref = client.upload_clob(source)
+
+    assert isinstance(ref, ClobReference)
+    assert ref.object_id == 5
+
+def test_upload_blob_missing_source(tmp_path):
+    stub = Mock()
+    client = LocalBlobRelayClient(stub, 1, fallback_mock())
+    with raises(FileNotFoundError):
+        client.upload_blob(tmp_path / "missing.bin")
+    stub.Put.assert_not_called()
+
+def test_upload_blob_fallback(tmp_path):
+    source = tmp_path / "upload.bin"
+    source.write_bytes(b"x")
+    stub = Mock()
+    stub.Put.side_effect = error_mock(grpc.StatusCode.NOT_FOUND)
+    fallback = fallback_mock()
+    fallback.upload_blob.return_value = BlobReference(object_id=9)
+    client = LocalBlobRelayClient(stub, 1, fallback)
+
+    ref = client.upload_blob(source)
+
+    assert ref == BlobReference(object_id=9)
+    assert not client.local_available
+
+def test_upload_blob_server_error(tmp_path):
+    source = tmp_path / "upload.bin"
+    source.write_bytes(b"x")
+    stub = Mock()
+    stub.Put.side_effect = error_mock(grpc.StatusCode.INTERNAL)
+    client = LocalBlobRelayClient(stub, 1, fallback_mock())
+
+    with raises(BlobRelayError):
+        client.upload_blob(source)
+
+def test_upload_blob_from_streams(tmp_path):
+    stub = Mock()
+    fallback = fallback_mock()
+    client = LocalBlobRelayClient(stub, 1, fallback)
+
+    client.upload_blob_from(b"data", size=4)
+
+    fallback.upload_blob_from.assert_called_once_with(b"data", size=4, timeout=None)
+    stub.Put.assert_not_called()
+
+def test_invalid_link_mode():
+    with raises(ValueError):
+        LocalBlobRelayClient(Mock(), 1, fallback_mock(), link_mode="symlink")
@@ -0,0 +1,49 @@
+from pytest import raises
+from unittest.mock import Mock
+
+import grpc
+
+from tsurugidb.udf.client.local import ClientConfig
+
+def test_client_config_parse():
+    context = Mock(spec=grpc.ServicerContext)
+    context.invocation_metadata.return_value = [
+        ("X-TSURUGI-BLOB-SESSION", "123"),
+        ("X-TSURUGI-BLOB-ENDPOINT", "dns:///localhost:50051"),
+    ]
+    config = ClientConfig.parse(context)
+    assert config.session_id == 123
+    assert config.endpoint == "dns:///localhost:50051"
+    assert config.secure is False
+    assert config.chunk_size == 1024 * 1024
+    assert config.link_mode == "reflink"
+
+def test_client_config_parse_options():
+    context = Mock(spec=grpc.ServicerContext)
+    context.invocation_metadata.return_value = [
+        ("X-TSURUGI-BLOB-SESSION", "123"),
+        ("X-TSURUGI-BLOB-ENDPOINT", "dns:///localhost:50051"),
+        ("X-TSURUGI-BLOB-STREAM-CHUNK-SIZE", "4096"),
+        ("X-TSURUGI-BLOB-LOCAL-LINK-MODE", "HardLink"),
+    ]
+    config = ClientConfig.parse(context)
+    assert config.chunk_size == 4096
+    assert config.link_mode == "hardlink"
+
+def test_client_config_parse_invalid_link_mode():
+    context = Mock(spec=grpc.ServicerContext)
+    context.invocation_metadata.return_value = [
+        ("X-TSURUGI-BLOB-SESSION", "123"),
+        ("X-TSURUGI-BLOB-ENDPOINT", "dns:///localhost:50051"),
+        ("X-TSURUGI-BLOB-LOCAL-LINK-MODE", "symlink"),
+    ]
+    with raises(ValueError):
+        ClientConfig.parse(context)
+
+def test_client_config_parse_missing_session():
+    context = Mock(spec=grpc.ServicerContext)
+    context.invocation_metadata.return_value = [
+        ("X-TSURUGI-BLOB-ENDPOINT", "dns:///localhost:50051"),
+    ]
+    with raises(ValueError):
+        ClientConfig.parse(context)
@@ -0,0 +1,190 @@
+from pytest import raises
+from unittest.mock import AsyncMock, Mock
+
+import asyncio
+import grpc
+
+from datetime import timedelta
+
+from tsurugidb.udf.client.grpc import (
+    blob_relay_streaming_pb2 as pb_message,
+    blob_reference_pb2 as pb_model,
+)
+
+from tsurugidb.udf.client.stream import AsyncStreamBlobRelayClient
+from tsurugidb.udf import BlobReference, ClobReference, BlobRelayError, BlobRelayTimeoutError
+
+def error_mock(code: grpc.StatusCode) -> grpc.RpcError:
+    error = grpc.RpcError()
+    error.code = Mock(return_value=code)
+    return error
+
+class FakeStreamCall:
+    """Mimics grpc.aio.UnaryStreamCall."""
+
+    def __init__(self, responses, error: grpc.RpcError | None = None):
+        self.responses = responses
+        self.error = error
+        self.cancel = Mock()
+
+    async def __aiter(self):
+        for resp in self.responses:
+            yield resp
+        if self.error is not None:
+            raise self.error
+
+    def __aiter__(self):
+        return self.__aiter()
+
+def get_responses(data: bytes, *chunks: bytes):
+    return [
+        pb_message.GetStreamingResponse(
+            metadata=pb_message.GetStreamingResponse.Metadata(blob_size=len(data)),
+        ),
+        *(pb_message.GetStreamingResponse(chunk=c) for c in chunks),
+    ]
+
+def test_download_blob(tmp_path):
+    data = "Hello, BLOB!".encode("utf-8")
+    stub = Mock() # without spec because gRPC stub has no regular methods
+    stub.Get.return_value = FakeStreamCall(get_responses(data, data[:5], data[5:]))
+    client = AsyncStreamBlobRelayClient(stub=stub, session_id=1)
+
+    destination = tmp_path / "download.bin"
+    asyncio.run(client.download_blob(BlobReference(storage_id=1, object_id=2), destination))
+
+    assert destination.read_bytes() == data
+    req = stub.Get.call_args[0][0]
+    assert req.session_id == 1
+    assert req.blob == pb_model.BlobReference(storage_id=1, object_id=2)
+    assert stub.Get.call_args[1].get("timeout") is None
+    stub.Get.return_value.cancel.assert_not_called()
+
+def test_download_clob_timeout_option(tmp_path):
+    data = b"Hello, CLOB!"
+    stub = Mock()
+    stub.Get.return_value = FakeStreamCall(get_responses(data, data))
+    client = AsyncStreamBlobRelayClient(stub=stub, session_id=1)
+
+    destination = tmp_path / "download.bin"
+    asyncio.run(client.download_clob(ClobReference(object_id=1), destination, timeout=timedelta(seconds=3)))
+
+    assert destination.read_bytes() == data
+    assert stub.Get.call_args[1].get("timeout") == 3.0
+
+def test_download_blob_inconsistent_blob_size(tmp_path):
+    stub = Mock()
+    stub.Get.return_value = FakeStreamCall(get_responses(b"12345", b"123"))
+    client = AsyncStreamBlobRelayClient(stub=stub, session_id=1)
+
+    destination = tmp_path / "download.bin"
+    with raises(BlobRelayError):
+        asyncio.run(client.download_blob(BlobReference(), destination))
+    assert not destination.exists()
+
+def test_download_blob_missing_metadata(tmp_path):
+    stub = Mock()
+    call = FakeStreamCall([pb_message.GetStreamingResponse(chunk=b"x")])
+    stub.Get.return_value = call
+    client = AsyncStreamBlobRelayClient(stub=stub, session_id=1)
+
+    destination = tmp_path / "download.bin"
+    with raises(BlobRelayError):
+        asyncio.run(client.download_blob(BlobReference(), destination))
+    assert not destination.exists()
+    call.cancel.assert_called_once()
+
+def test_download_blob_existing(tmp_path):
+    stub = Mock()
+    client = AsyncStreamBlobRelayClient(stub=stub, session_id=1)
+
+    destination = tmp_path / "download.bin"
+    destination.write_bytes(b"old")
+    with raises(FileExistsError):
+        asyncio.run(client.download_blob(BlobReference(), destination))
+    assert destination.read_bytes() == b"old"
+    stub.Get.assert_not_called()
+
+def test_download_blob_server_error(tmp_path):
+    stub = Mock()
+    stub.Get.return_value = FakeStreamCall([], error_mock(grpc.StatusCode.NOT_FOUND))
+    client = AsyncStreamBlobRelayClient(stub=stub, session_id=1)
+
+    destination = tmp_path / "download.bin"
+    with raises(BlobRelayError):
+        asyncio.run(client.download_blob(BlobReference(), destination))
+    assert not destination.exists()
+
+def test_download_blob_timeout(tmp_path):
+    stub = Mock()
+    stub.Get.return_value = FakeStreamCall([], error_mock(grpc.StatusCode.DEADLINE_EXCEEDED))
+    client = AsyncStreamBlobRelayClient(stub=stub, session_id=1)
+
+    with raises(BlobRelayTimeoutError):
+        asyncio.run(client.download_blob(BlobReference(), tmp_path / "download.bin"))
+
+def test_upload_blob(tmp_path):
+    data = b"0123456789"
+    source = tmp_path / "upload.bin"
+    source.write_bytes(data)
+    requests = []
+
+    async def put(request_iterator, timeout=None):
+        async for req in request_iterator:
+            requests.append(req)
+        return pb_message.PutStreamingResponse(blob=pb_model.BlobReference(storage_id=1, object_id=2, tag=3))
+
+    stub = Mock()
+    stub.Put = AsyncMock(side_effect=put)
+    client = AsyncStreamBlobRelayClient(stub=stub, session_id=7, chunk_size=4)
+
+    ref = asyncio.run(client.upload_blob(source))
+
+    assert ref == BlobReference(storage_id=1, object_id=2, tag=3)
+    assert requests[0].metadata.session_id == 7
+    assert requests[0].metadata.blob_size == len(data)
+    assert [r.chunk for r in requests[1:]] == [b"0123", b"4567", b"89"]
+
+def test_upload_clob(tmp_path):
+    source = tmp_path / "upload.txt"
+    source.write_bytes(b"text")
+    stub = Mock()
+    stub.Put = AsyncMock(return_value=pb_message.PutStreamingResponse(blob=pb_model.BlobReference(object_id=5)))
+    client = AsyncStreamBlobRelayClient(stub=stub, session_id=1)
+
+    ref = asyncio.run(client.upload_clob(source, timeout=timedelta(seconds=2)))
+
+    assert isinstance(ref, ClobReference)
+    assert ref.object_id == 5
+    assert stub.Put.call_args[1].get("timeout") == 2.0
+
+def test_upload_blob_missing_source(tmp_path):
+    client = AsyncStreamBlobRelayClient(stub=Mock(), session_id=1)
+    with raises(FileNotFoundError):
+        asyncio.run(client.upload_blob(tmp_path / "missing.bin"))
+
+def test_upload_blob_timeout(tmp_path):
+    source = tmp_path / "upload.bin"
+    source.write_bytes(b"x")
+    stub = Mock()
+    stub.Put = AsyncMock(side_effect=error_mock(grpc.StatusCode.DEADLINE_EXCEEDED))
+    client = AsyncStreamBlobRelayClient(stub=stub, session_id=1)
+
+    with raises(BlobRelayTimeoutError):
+        asyncio.run(client.upload_blob(source))
+
+def test_download_many(tmp_path):
+    stub = Mock()
+    stub.Get.side_effect = lambda req, timeout=None: (
+        FakeStreamCall([], error_mock(grpc.StatusCode.NOT_FOUND)) if req.blob.object_id == 2
+        else FakeStreamCall(get_responses(b"data", b"data"))
+    )
+    client = AsyncStreamBlobRelayClient(stub=stub, session_id=1)
+    refs = [BlobReference(object_id=i) for i in range(4)]
+    destinations = [tmp_path / f"{i}.bin" for i in range(4)]
+
+    results = asyncio.run(client.download_many(refs, destinations, max_concurrency=2))
+
+    assert [r.ok for r in results] == [True, True, False, True]
+    assert isinstance(results[2].error, BlobRelayError)
+    assert [d.exists() for d in destinations] == [True, True, False, True]
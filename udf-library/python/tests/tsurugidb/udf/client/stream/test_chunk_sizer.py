@@ -0,0 +1,51 @@
+from tsurugidb.udf.client.stream import AdaptiveChunkSizer
+
+KiB = 1024
+MiB = 1024 * 1024
+
+def feed(sizer: AdaptiveChunkSizer, rate_of, windows: int) -> list[int]:
+    """Feeds `windows` windows of chunks, each sent at `rate_of(size)` bytes/sec, and returns the sizes."""
+    sizes = []
+    for _ in range(windows):
+        sizes.append(sizer.size)
+        for _ in range(4):
+            size = sizer.size
+            sizer.observe(size, size / rate_of(size))
+    return sizes
+
+def test_grow_up_to_max_message_size():
+    sizer = AdaptiveChunkSizer(256 * KiB, max_message_size=4 * MiB)
+
+    sizes = feed(sizer, lambda size: size * 1000, 6)  # larger is always faster
+
+    assert sizes == [256 * KiB, 512 * KiB, 1 * MiB, 2 * MiB, 4 * MiB - 1024, 4 * MiB - 1024]
+
+def test_settle_at_best_size():
+    sizer = AdaptiveChunkSizer(64 * KiB)
+    rates = {64 * KiB: 100e6, 128 * KiB: 200e6, 256 * KiB: 300e6, 512 * KiB: 250e6}
+
+    sizes = feed(sizer, rates.__getitem__, 6)
+
+    assert sizes == [64 * KiB, 128 * KiB, 256 * KiB, 512 * KiB, 256 * KiB, 256 * KiB]
+
+def test_probe_smaller_on_throughput_drop():
+    sizer = AdaptiveChunkSizer(1 * MiB, max_message_size=1 * MiB + 1024)
+    feed(sizer, lambda size: 1e9, 1)
+    assert sizer.size == 1 * MiB
+
+    sizes = feed(sizer, lambda size: 1e14 / size, 3)  # congested: smaller is faster
+
+    assert sizes == [1 * MiB, 512 * KiB, 256 * KiB]
+
+def test_ignore_partial_chunk():
+    sizer = AdaptiveChunkSizer(1 * MiB)
+    for _ in range(8):
+        sizer.observe(10, 1.0)
+
+    assert sizer.size == 1 * MiB
+
+def test_bounds():
+    assert AdaptiveChunkSizer(100 * MiB, max_message_size=4 * MiB).size == 4 * MiB - 1024
+    sizer = AdaptiveChunkSizer(64 * KiB)
+    feed(sizer, lambda size: 1e9 / size, 4)
+    assert sizer.size == 64 * KiB
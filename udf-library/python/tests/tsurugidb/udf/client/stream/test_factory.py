@@ -73,3 +73,38 @@ def test_client_config_parse_invalid_chunk_size():
     ]
     with raises(ValueError):
         ClientConfig.parse(context)
+
+def test_client_config_parse_auto_chunk_size():
+    context = Mock(spec=grpc.ServicerContext)
+    context.invocation_metadata.return_value = [
+        ("X-TSURUGI-BLOB-SESSION", "123"),
+        ("X-TSURUGI-BLOB-ENDPOINT", "dns:///localhost:50051"),
+        ("X-TSURUGI-BLOB-STREAM-CHUNK-SIZE", "auto"),
+    ]
+    config = ClientConfig.parse(context)
+    assert config.adaptive_chunk is True
+    assert config.chunk_size == 64 * 1024
+
+def test_client_config_parse_ranges():
+    context = Mock(spec=grpc.ServicerContext)
+    context.invocation_metadata.return_value = [
+        ("X-TSURUGI-BLOB-SESSION", "123"),
+        ("X-TSURUGI-BLOB-ENDPOINT", "dns:///localhost:50051"),
+        ("X-TSURUGI-BLOB-STREAM-RESUME-ATTEMPTS", "0"),
+        ("X-TSURUGI-BLOB-STREAM-RANGE-PARALLELISM", "4"),
+        ("X-TSURUGI-BLOB-STREAM-RANGE-SIZE", "1048576"),
+    ]
+    config = ClientConfig.parse(context)
+    assert config.resume_attempts == 0
+    assert config.range_parallelism == 4
+    assert config.range_size == 1048576
+
+def test_client_config_parse_invalid_range_parallelism():
+    context = Mock(spec=grpc.ServicerContext)
+    context.invocation_metadata.return_value = [
+        ("X-TSURUGI-BLOB-SESSION", "123"),
+        ("X-TSURUGI-BLOB-ENDPOINT", "dns:///localhost:50051"),
+        ("X-TSURUGI-BLOB-STREAM-RANGE-PARALLELISM", "0"),
+    ]
+    with raises(ValueError):
+        ClientConfig.parse(context)
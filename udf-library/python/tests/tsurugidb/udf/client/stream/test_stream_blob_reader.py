@@ -0,0 +1,157 @@
+from pytest import raises
+from unittest.mock import Mock
+
+import grpc
+import io
+
+from tsurugidb.udf.client.grpc import (
+    blob_relay_streaming_pb2 as pb_message,
+)
+
+from tsurugidb.udf.client.stream import StreamBlobRelayClient, StreamBlobReader
+from tsurugidb.udf import BlobReference, ClobReference, BlobRelayError, BlobRelayTimeoutError
+
+def error_mock(code: grpc.StatusCode) -> grpc.RpcError:
+    error = grpc.RpcError()
+    error.code = Mock(return_value=code)
+    return error
+
+class FakeCall:
+    """Mimics the response iterator of a server streaming call."""
+
+    def __init__(self, responses, error: grpc.RpcError | None = None):
+        self.iterator = iter(responses)
+        self.error = error
+        self.cancel = Mock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.iterator)
+        except StopIteration:
+            if self.error is not None:
+                raise self.error
+            raise
+
+def responses(*chunks: bytes, blob_size: int | None = None):
+    if blob_size is None:
+        blob_size = sum(len(c) for c in chunks)
+    return [
+        pb_message.GetStreamingResponse(
+            metadata=pb_message.GetStreamingResponse.Metadata(blob_size=blob_size),
+        ),
+        *(pb_message.GetStreamingResponse(chunk=c) for c in chunks),
+    ]
+
+def test_open_blob_read():
+    stub = Mock() # without spec because gRPC stub has no regular methods
+    stub.Get.return_value = FakeCall(responses(b"Hello, ", b"BLOB!"))
+    client = StreamBlobRelayClient(stub=stub, session_id=1)
+
+    with client.open_blob(BlobReference(storage_id=1, object_id=2)) as fp:
+        assert fp.size == 12
+        assert fp.read() == b"Hello, BLOB!"
+        assert fp.read() == b""
+
+    req = stub.Get.call_args[0][0]
+    assert req.blob.object_id == 2
+    stub.Get.return_value.cancel.assert_not_called()
+
+def test_open_clob_read_sized():
+    stub = Mock()
+    stub.Get.return_value = FakeCall(responses(b"abc", b"defgh"))
+    client = StreamBlobRelayClient(stub=stub, session_id=1)
+
+    with client.open_clob(ClobReference(object_id=1)) as fp:
+        assert fp.read(2) == b"ab"
+        assert fp.read(5) == b"cdefg"
+        assert fp.read(5) == b"h"
+        assert fp.read(5) == b""
+
+def test_open_blob_readinto_buffered():
+    stub = Mock()
+    stub.Get.return_value = FakeCall(responses(b"0123", b"4567", b"89"))
+    client = StreamBlobRelayClient(stub=stub, session_id=1)
+
+    with io.BufferedReader(client.open_blob(BlobReference()), buffer_size=3) as fp:
+        assert fp.read(5) == b"01234"
+        assert fp.read() == b"56789"
+
+def test_open_blob_iter_chunks():
+    stub = Mock()
+    stub.Get.return_value = FakeCall(responses(b"0123", b"", b"4567"))
+    client = StreamBlobRelayClient(stub=stub, session_id=1)
+
+    with client.open_blob(BlobReference()) as fp:
+        assert fp.read(1) == b"0"
+        assert list(fp.iter_chunks()) == [b"123", b"4567"]
+
+def test_open_blob_size_mismatch():
+    stub = Mock()
+    stub.Get.return_value = FakeCall(responses(b"0123", blob_size=10))
+    client = StreamBlobRelayClient(stub=stub, session_id=1)
+
+    with client.open_blob(BlobReference()) as fp:
+        with raises(BlobRelayError):
+            fp.read()
+
+def test_open_blob_missing_metadata():
+    stub = Mock()
+    call = FakeCall([pb_message.GetStreamingResponse(chunk=b"x")])
+    stub.Get.return_value = call
+    client = StreamBlobRelayClient(stub=stub, session_id=1)
+
+    with raises(BlobRelayError):
+        client.open_blob(BlobReference())
+    call.cancel.assert_called_once()
+
+def test_open_blob_missing_chunk():
+    stub = Mock()
+    stub.Get.return_value = FakeCall(responses(b"x") + responses())
+    client = StreamBlobRelayClient(stub=stub, session_id=1)
+
+    with client.open_blob(BlobReference()) as fp:
+        with raises(BlobRelayError):
+            fp.read()
+        assert fp.closed
+
+def test_open_blob_server_error():
+    stub = Mock()
+    stub.Get.return_value = FakeCall([], error_mock(grpc.StatusCode.NOT_FOUND))
+    client = StreamBlobRelayClient(stub=stub, session_id=1)
+
+    with raises(BlobRelayError):
+        client.open_blob(BlobReference())
+
+def test_open_blob_timeout_while_reading():
+    stub = Mock()
+    stub.Get.return_value = FakeCall(responses(b"0123", blob_size=8), error_mock(grpc.StatusCode.DEADLINE_EXCEEDED))
+    client = StreamBlobRelayClient(stub=stub, session_id=1)
+
+    with client.open_blob(BlobReference()) as fp:
+        assert fp.read(4) == b"0123"
+        with raises(BlobRelayTimeoutError):
+            fp.read(4)
+
+def test_open_blob_close_cancels():
+    stub = Mock()
+    call = FakeCall(responses(b"0123", b"4567"))
+    stub.Get.return_value = call
+    client = StreamBlobRelayClient(stub=stub, session_id=1)
+
+    with client.open_blob(BlobReference()) as fp:
+        fp.read(2)
+    call.cancel.assert_called_once()
+
+    with raises(ValueError):
+        fp.read()
+
+def test_reader_without_size():
+    reader = StreamBlobReader(iter([
+        pb_message.GetStreamingResponse(metadata=pb_message.GetStreamingResponse.Metadata()),
+        pb_message.GetStreamingResponse(chunk=b"abc"),
+    ]))
+    assert reader.size is None
+    assert reader.read() == b"abc"
@@ -511,6 +511,30 @@ def test_upload_blob_multiple_chunks(tmp_path):
     assert blob_ref.object_id == 2
     assert blob_ref.tag == 0
 
+def test_upload_blob_adaptive_chunks(tmp_path):
+    data = bytes(range(200))
+    source = tmp_path / "upload.bin"
+    source.write_bytes(data)
+
+    stub = Mock() # without spec because gRPC stub has no regular methods
+    client = StreamBlobRelayClient(
+        stub=stub,
+        session_id=1,
+        chunk_size=4,
+        adaptive_chunk=True,
+        max_message_size=1024 + 16,
+    )
+    stub.Put.return_value = pb_message.PutStreamingResponse(blob=pb_model.BlobReference(object_id=2))
+
+    client.upload_blob(source=source)
+
+    request = list(stub.Put.call_args[0][0])
+    chunks = [r.chunk for r in request[1:]]
+    assert request[0].metadata.blob_size == len(data)
+    assert b"".join(chunks) == data
+    assert len(chunks[0]) == 4
+    assert max(len(c) for c in chunks) <= 16
+
 def test_upload_blob_missing_source(tmp_path):
     stub = Mock() # without spec because gRPC stub has no regular methods
     client = StreamBlobRelayClient(
@@ -565,3 +589,67 @@ def test_upload_blob_timeout(tmp_path):
     assert stub.Put.call_count == 1
     options = stub.Put.call_args[1]
     assert options.get("timeout") == 5.0
+
+def put_consuming(requests: list, response: pb_message.PutStreamingResponse):
+    def put(request_iterator, timeout=None):
+        requests.extend(request_iterator)
+        return response
+    return put
+
+def test_upload_blob_from_bytes():
+    data = b"0123456789"
+    requests = []
+    stub = Mock() # without spec because gRPC stub has no regular methods
+    stub.Put.side_effect = put_consuming(requests, pb_message.PutStreamingResponse(
+        blob=pb_model.BlobReference(storage_id=1, object_id=2, tag=3),
+    ))
+    client = StreamBlobRelayClient(stub=stub, session_id=1, chunk_size=4)
+
+    blob_ref = client.upload_blob_from(data, timeout=timedelta(seconds=5))
+
+    assert requests[0].metadata.blob_size == len(data)
+    assert [r.chunk for r in requests[1:]] == [b"0123", b"4567", b"89"]
+    assert (blob_ref.storage_id, blob_ref.object_id, blob_ref.tag) == (1, 2, 3)
+    assert stub.Put.call_args[1].get("timeout") == 5.0
+
+def test_upload_clob_from_file_object():
+    import io
+    requests = []
+    stub = Mock()
+    stub.Put.side_effect = put_consuming(requests, pb_message.PutStreamingResponse(
+        blob=pb_model.BlobReference(storage_id=1, object_id=2),
+    ))
+    client = StreamBlobRelayClient(stub=stub, session_id=1, chunk_size=4)
+
+    clob_ref = client.upload_clob_from(io.BytesIO(b"abcdef"))
+
+    assert not requests[0].metadata.HasField("blob_size")
+    assert [r.chunk for r in requests[1:]] == [b"abcd", b"ef"]
+    assert clob_ref.object_id == 2
+
+def test_upload_blob_from_generator():
+    requests = []
+    stub = Mock()
+    stub.Put.side_effect = put_consuming(requests, pb_message.PutStreamingResponse())
+    client = StreamBlobRelayClient(stub=stub, session_id=1, chunk_size=4)
+
+    client.upload_blob_from((c for c in [b"ab", b"", b"cdefghij"]), size=10)
+
+    assert requests[0].metadata.blob_size == 10
+    assert [r.chunk for r in requests[1:]] == [b"ab", b"cdef", b"ghij"]
+
+def test_upload_blob_from_size_mismatch():
+    stub = Mock()
+    stub.Put.side_effect = put_consuming([], pb_message.PutStreamingResponse())
+    client = StreamBlobRelayClient(stub=stub, session_id=1)
+
+    with raises(BlobRelayError):
+        client.upload_blob_from(iter([b"abc"]), size=4)
+
+def test_upload_blob_from_timeout():
+    stub = Mock()
+    stub.Put.side_effect = error_mock(grpc.StatusCode.DEADLINE_EXCEEDED)
+    client = StreamBlobRelayClient(stub=stub, session_id=1)
+
+    with raises(BlobRelayTimeoutError):
+        client.upload_blob_from(b"abc")
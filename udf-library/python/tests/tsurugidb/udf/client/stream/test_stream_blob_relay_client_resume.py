@@ -0,0 +1,140 @@
+from pytest import fixture, raises
+
+import grpc
+import threading
+
+from concurrent import futures
+
+from tsurugidb.udf.client.grpc import (
+    blob_relay_streaming_pb2 as pb_message,
+    blob_relay_streaming_pb2_grpc as pb_service,
+)
+
+from tsurugidb.udf.client.stream import StreamBlobRelayClient
+from tsurugidb.udf import BlobReference, BlobRelayError
+
+class StandInRelay(pb_service.BlobRelayStreamingServicer):
+    """A stand-in of the BLOB relay service, which serves BLOBs from memory.
+
+    Each entry of `faults` breaks one stream after sending that number of bytes.
+    If `ranged` is False, this behaves like a relay service without ranged downloads.
+    """
+
+    def __init__(self, blobs: dict[int, bytes], *, ranged: bool = True, chunk_size: int = 4096):
+        self.blobs = blobs
+        self.ranged = ranged
+        self.chunk_size = chunk_size
+        self.faults: list[int] = []
+        self.requests: list[tuple[int, int | None]] = []
+        self.lock = threading.Lock()
+
+    def Get(self, request, context):
+        with self.lock:
+            self.requests.append((request.offset, request.length if request.HasField("length") else None))
+            fault = self.faults.pop(0) if self.faults else None
+        data = self.blobs.get(request.blob.object_id)
+        if data is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, "missing BLOB")
+        metadata = pb_message.GetStreamingResponse.Metadata(blob_size=len(data))
+        start, end = 0, len(data)
+        if self.ranged:
+            start = min(request.offset, len(data))
+            if request.HasField("length"):
+                end = min(start + request.length, len(data))
+            metadata.offset = start
+        yield pb_message.GetStreamingResponse(metadata=metadata)
+        sent = 0
+        for offset in range(start, end, self.chunk_size):
+            if fault is not None and sent >= fault:
+                context.abort(grpc.StatusCode.UNAVAILABLE, "connection reset")
+            chunk = data[offset:min(offset + self.chunk_size, end)]
+            sent += len(chunk)
+            yield pb_message.GetStreamingResponse(chunk=chunk)
+
+DATA = bytes(i % 251 for i in range(50_000))
+
+def serve(relay: StandInRelay):
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+    pb_service.add_BlobRelayStreamingServicer_to_server(relay, server)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    channel = grpc.insecure_channel(f"localhost:{port}")
+    return server, channel
+
+@fixture
+def relay():
+    relay = StandInRelay({1: DATA})
+    server, channel = serve(relay)
+    relay.stub = pb_service.BlobRelayStreamingStub(channel)
+    yield relay
+    channel.close()
+    server.stop(None)
+
+@fixture
+def legacy_relay():
+    relay = StandInRelay({1: DATA}, ranged=False)
+    server, channel = serve(relay)
+    relay.stub = pb_service.BlobRelayStreamingStub(channel)
+    yield relay
+    channel.close()
+    server.stop(None)
+
+def test_download_blob_resume(relay, tmp_path):
+    relay.faults = [12_000, 20_000]
+    client = StreamBlobRelayClient(relay.stub, 1)
+
+    destination = tmp_path / "download.bin"
+    client.download_blob(BlobReference(object_id=1), destination)
+
+    assert destination.read_bytes() == DATA
+    assert relay.requests == [(0, None), (12_288, None), (32_768, None)]
+
+def test_download_blob_resume_exhausted(relay, tmp_path):
+    relay.faults = [4096] * 3
+    client = StreamBlobRelayClient(relay.stub, 1, resume_attempts=2)
+
+    destination = tmp_path / "download.bin"
+    with raises(BlobRelayError):
+        client.download_blob(BlobReference(object_id=1), destination)
+    assert not destination.exists()
+    assert len(relay.requests) == 3
+
+def test_download_blob_no_resume_without_progress(relay, tmp_path):
+    client = StreamBlobRelayClient(relay.stub, 1)
+
+    with raises(BlobRelayError):
+        client.download_blob(BlobReference(object_id=2), tmp_path / "download.bin")
+    assert len(relay.requests) == 1
+
+def test_download_blob_resume_legacy(legacy_relay, tmp_path):
+    legacy_relay.faults = [12_000]
+    client = StreamBlobRelayClient(legacy_relay.stub, 1)
+
+    destination = tmp_path / "download.bin"
+    client.download_blob(BlobReference(object_id=1), destination)
+
+    # the relay service sent the whole BLOB again
+    assert destination.read_bytes() == DATA
+    assert len(legacy_relay.requests) == 2
+
+def test_download_blob_parallel_ranges(relay, tmp_path):
+    relay.faults = [0, 4096]
+    client = StreamBlobRelayClient(relay.stub, 1, range_parallelism=3, range_size=16_384)
+
+    destination = tmp_path / "download.bin"
+    client.download_blob(BlobReference(object_id=1), destination)
+
+    assert destination.read_bytes() == DATA
+    assert (0, 16_384) in relay.requests
+    assert (16_384, 16_384) in relay.requests
+    assert (32_768, 16_384) in relay.requests
+    assert (49_152, 848) in relay.requests
+
+def test_download_blob_parallel_ranges_legacy(legacy_relay, tmp_path):
+    client = StreamBlobRelayClient(legacy_relay.stub, 1, range_parallelism=3, range_size=16_384)
+
+    destination = tmp_path / "download.bin"
+    client.download_blob(BlobReference(object_id=1), destination)
+
+    assert destination.read_bytes() == DATA
+    assert legacy_relay.requests == [(0, 16_384)]
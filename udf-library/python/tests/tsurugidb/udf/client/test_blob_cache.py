@@ -0,0 +1,247 @@
+import threading
+
+from pathlib import Path
+from pytest import raises
+from unittest.mock import Mock
+
+import grpc
+
+from tsurugidb.udf import (
+    BlobReference,
+    ClobReference,
+    BlobRelayClient,
+    BlobRelayError,
+    BlobCache,
+    BlobCacheStats,
+    CachingBlobRelayClient,
+    create_blob_client,
+)
+
+
+class StoreClient(BlobRelayClient):
+    """Downloads data from memory by object_id, and counts the downloads."""
+
+    def __init__(self, store: dict[int, bytes], gate: threading.Event | None = None):
+        self.store = store
+        self.gate = gate
+        self.downloads = 0
+        self.lock = threading.Lock()
+
+    def download_blob(self, ref, destination, *, timeout=None):
+        with self.lock:
+            self.downloads += 1
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        if ref.object_id not in self.store:
+            raise BlobRelayError(f"missing: {ref.object_id}")
+        destination.write_bytes(self.store[ref.object_id])
+
+    download_clob = download_blob
+
+    def upload_blob(self, source, *, timeout=None):
+        return BlobReference(object_id=len(self.store) + 1)
+
+    def upload_clob(self, source, *, timeout=None):
+        return ClobReference(object_id=len(self.store) + 1)
+
+
+def test_download_blob_hit(tmp_path):
+    client = StoreClient({1: b"image"})
+    cached = CachingBlobRelayClient(client, BlobCache(tmp_path / "cache"))
+
+    cached.download_blob(BlobReference(object_id=1), tmp_path / "a.bin")
+    cached.download_blob(BlobReference(object_id=1), tmp_path / "b.bin")
+
+    assert (tmp_path / "a.bin").read_bytes() == b"image"
+    assert (tmp_path / "b.bin").read_bytes() == b"image"
+    assert client.downloads == 1
+
+
+def test_download_clob_existing(tmp_path):
+    cached = CachingBlobRelayClient(StoreClient({1: b"text"}), BlobCache(tmp_path / "cache"))
+    destination = tmp_path / "a.txt"
+    destination.write_bytes(b"old")
+
+    with raises(FileExistsError):
+        cached.download_clob(ClobReference(object_id=1), destination)
+    assert destination.read_bytes() == b"old"
+
+
+def test_key_includes_tag(tmp_path):
+    client = StoreClient({1: b"v"})
+    cached = CachingBlobRelayClient(client, BlobCache(tmp_path / "cache"))
+
+    cached.open_blob(BlobReference(object_id=1, tag=1)).close()
+    cached.open_blob(BlobReference(object_id=1, tag=2)).close()
+
+    assert client.downloads == 2
+
+
+def test_stats(tmp_path):
+    cache = BlobCache(tmp_path / "cache")
+    cached = CachingBlobRelayClient(StoreClient({1: b"abc", 2: b"de"}), cache)
+
+    for object_id in (1, 2, 1):
+        with cached.open_blob(BlobReference(object_id=object_id)) as fp:
+            fp.read()
+
+    assert cache.stats() == BlobCacheStats(hits=1, misses=2, coalesced=0, evictions=0, entries=2, size=5)
+
+
+def test_lru_eviction(tmp_path):
+    cache = BlobCache(tmp_path / "cache", max_size=10)
+    client = StoreClient({1: b"1" * 4, 2: b"2" * 4, 3: b"3" * 4})
+    cached = CachingBlobRelayClient(client, cache)
+
+    cached.open_blob(BlobReference(object_id=1)).close()
+    cached.open_blob(BlobReference(object_id=2)).close()
+    cached.open_blob(BlobReference(object_id=1)).close()  # 2 is now the least recently used
+    cached.open_blob(BlobReference(object_id=3)).close()
+
+    assert cache.stats().evictions == 1
+    assert sorted(p.name for p in cache.directory.iterdir()) == ["0-1-0", "0-3-0"]
+    cached.open_blob(BlobReference(object_id=1)).close()
+    assert client.downloads == 3
+
+
+def test_oversized_not_cached(tmp_path):
+    cache = BlobCache(tmp_path / "cache", max_size=3)
+    client = StoreClient({1: b"too large"})
+    cached = CachingBlobRelayClient(client, cache)
+
+    with cached.open_blob(BlobReference(object_id=1)) as fp:
+        assert fp.read() == b"too large"
+
+    assert cache.stats().entries == 0
+    assert list(cache.directory.iterdir()) == []
+
+
+def test_evicted_while_reading(tmp_path):
+    cache = BlobCache(tmp_path / "cache", max_size=4)
+    cached = CachingBlobRelayClient(StoreClient({1: b"1111", 2: b"2222"}), cache)
+
+    with cached.open_blob(BlobReference(object_id=1)) as fp:
+        cached.open_blob(BlobReference(object_id=2)).close()
+        assert fp.read() == b"1111"
+
+
+def test_failed_download_not_cached(tmp_path):
+    cache = BlobCache(tmp_path / "cache")
+    cached = CachingBlobRelayClient(StoreClient({}), cache)
+
+    with raises(BlobRelayError):
+        cached.open_blob(BlobReference(object_id=1))
+
+    assert cache.stats().entries == 0
+    assert list(cache.directory.iterdir()) == []
+
+
+def test_failed_install_closes_file(tmp_path, monkeypatch):
+    cache = BlobCache(tmp_path / "cache")
+    cached = CachingBlobRelayClient(StoreClient({1: b"image"}), cache)
+
+    opened = []
+    path_open = Path.open
+
+    def spy_open(self, *args, **kwargs):
+        fp = path_open(self, *args, **kwargs)
+        opened.append(fp)
+        return fp
+
+    def fail_replace(src, dst):
+        raise OSError("replace failed")
+
+    monkeypatch.setattr(Path, "open", spy_open)
+    monkeypatch.setattr("tsurugidb.udf.client.blob_cache.os.replace", fail_replace)
+
+    with raises(OSError):
+        cached.open_blob(BlobReference(object_id=1))
+
+    assert opened
+    assert all(fp.closed for fp in opened)
+    assert cache.stats().entries == 0
+
+
+def test_single_flight(tmp_path):
+    gate = threading.Event()
+    cache = BlobCache(tmp_path / "cache")
+    client = StoreClient({1: b"shared"}, gate)
+    cached = CachingBlobRelayClient(client, cache)
+    refs = [BlobReference(object_id=1)] * 4
+    destinations = [tmp_path / f"{i}.bin" for i in range(4)]
+
+    thread = threading.Thread(target=lambda: (_wait_coalesced(cache, 3), gate.set()))
+    thread.start()
+    results = cached.download_many(refs, destinations, max_concurrency=4)
+    thread.join()
+
+    assert all(r.ok for r in results)
+    assert all(d.read_bytes() == b"shared" for d in destinations)
+    assert client.downloads == 1
+    assert cache.stats().coalesced == 3
+
+
+def _wait_coalesced(cache: BlobCache, count: int) -> None:
+    for _ in range(500):
+        if cache.stats().coalesced >= count:
+            return
+        threading.Event().wait(0.01)
+
+
+def test_reuse_directory(tmp_path):
+    directory = tmp_path / "cache"
+    CachingBlobRelayClient(StoreClient({1: b"kept"}), BlobCache(directory)).open_blob(BlobReference(object_id=1)).close()
+    (directory / ".tmp-interrupted").write_bytes(b"partial")
+
+    cache = BlobCache(directory)
+    client = StoreClient({})
+    with CachingBlobRelayClient(client, cache).open_blob(BlobReference(object_id=1)) as fp:
+        assert fp.read() == b"kept"
+
+    assert client.downloads == 0
+    assert not (directory / ".tmp-interrupted").exists()
+
+
+def test_close_removes_temporary_directory():
+    cache = BlobCache()
+    directory = cache.directory
+    CachingBlobRelayClient(StoreClient({1: b"x"}), cache).open_blob(BlobReference(object_id=1)).close()
+
+    cache.close()
+
+    assert not directory.exists()
+
+
+def test_upload_passthrough(tmp_path):
+    client = Mock(spec=BlobRelayClient)
+    cached = CachingBlobRelayClient(client, BlobCache(tmp_path / "cache"))
+
+    cached.upload_blob(Path("a"))
+    cached.upload_clob_from(b"data", size=4)
+
+    client.upload_blob.assert_called_once_with(Path("a"), timeout=None)
+    client.upload_clob_from.assert_called_once_with(b"data", size=4, timeout=None)
+
+
+def test_create_blob_client_with_cache(tmp_path):
+    context = Mock(spec=grpc.ServicerContext)
+    context.invocation_metadata.return_value = [
+        ("X-TSURUGI-BLOB-SESSION", "1"),
+        ("X-TSURUGI-BLOB-ENDPOINT", "dns:///localhost:50051"),
+        ("X-TSURUGI-BLOB-CACHE", "true"),
+    ]
+    with create_blob_client(context) as client:
+        assert isinstance(client, CachingBlobRelayClient)
+    with create_blob_client(context, cache=False) as client:
+        assert not isinstance(client, CachingBlobRelayClient)
+
+
+def test_create_blob_client_invalid_cache():
+    context = Mock(spec=grpc.ServicerContext)
+    context.invocation_metadata.return_value = [
+        ("X-TSURUGI-BLOB-SESSION", "1"),
+        ("X-TSURUGI-BLOB-ENDPOINT", "dns:///localhost:50051"),
+        ("X-TSURUGI-BLOB-CACHE", "maybe"),
+    ]
+    with raises(ValueError):
+        create_blob_client(context)
@@ -0,0 +1,190 @@
+import grpc
+
+from pytest import raises
+from unittest.mock import Mock
+
+from tsurugidb.udf.client import ChannelPool, ChannelPoolStats
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def new_pool(**kwargs) -> tuple[ChannelPool, Mock, FakeClock]:
+    factory = Mock(side_effect=lambda endpoint, secure, credentials: Mock(name=f"channel({endpoint})"))
+    clock = FakeClock()
+    return ChannelPool(channel_factory=factory, clock=clock, **kwargs), factory, clock
+
+
+def notify(channel: Mock, state: grpc.ChannelConnectivity):
+    callback = channel.subscribe.call_args.args[0]
+    callback(state)
+
+
+def test_acquire_reuses_channel():
+    pool, factory, _ = new_pool()
+
+    with pool.acquire("dns:///localhost:52345") as c1:
+        pass
+    with pool.acquire("dns:///localhost:52345") as c2:
+        pass
+
+    assert c1 is c2
+    factory.assert_called_once_with("dns:///localhost:52345", False, None)
+    c1.close.assert_not_called()
+    assert pool.stats() == ChannelPoolStats(hits=1, misses=1, evictions=0, size=1, leased=0)
+
+
+def test_acquire_concurrent_shares_channel():
+    pool, _, _ = new_pool()
+
+    with pool.acquire("a") as c1, pool.acquire("a") as c2:
+        assert c1 is c2
+        assert pool.stats().leased == 2
+    assert pool.stats().leased == 0
+
+
+def test_acquire_distinct_keys():
+    pool, factory, _ = new_pool()
+    credentials = object()
+
+    with pool.acquire("a") as c1:
+        pass
+    with pool.acquire("a", secure=True) as c2:
+        pass
+    with pool.acquire("a", secure=True, credentials=credentials) as c3:
+        pass
+
+    assert len({id(c1), id(c2), id(c3)}) == 3
+    assert factory.call_count == 3
+    assert pool.stats().size == 3
+
+
+def test_idle_eviction():
+    pool, _, clock = new_pool(idle_timeout=10)
+
+    with pool.acquire("a") as c1:
+        pass
+    clock.now = 10
+    with pool.acquire("a") as c2:
+        pass
+
+    assert c1 is not c2
+    c1.close.assert_called_once()
+    c1.unsubscribe.assert_called_once()
+    assert pool.stats() == ChannelPoolStats(hits=0, misses=2, evictions=1, size=1, leased=0)
+
+
+def test_idle_eviction_keeps_leased():
+    pool, _, clock = new_pool(idle_timeout=10)
+
+    with pool.acquire("a") as c1:
+        clock.now = 100
+        with pool.acquire("b"):
+            pass
+        c1.close.assert_not_called()
+    assert pool.stats().size == 2
+
+
+def test_lru_eviction():
+    pool, _, _ = new_pool(max_size=2)
+
+    with pool.acquire("a") as a:
+        pass
+    with pool.acquire("b") as b:
+        pass
+    with pool.acquire("a"):
+        pass
+    with pool.acquire("c"):
+        pass
+
+    b.close.assert_called_once()
+    a.close.assert_not_called()
+    assert pool.stats() == ChannelPoolStats(hits=1, misses=3, evictions=1, size=2, leased=0)
+
+
+def test_lru_eviction_waits_for_release():
+    pool, _, _ = new_pool(max_size=1)
+
+    with pool.acquire("a") as a:
+        with pool.acquire("b") as b:
+            assert pool.stats().size == 2
+        b.close.assert_called_once()
+    a.close.assert_not_called()
+    assert pool.stats().size == 1
+
+
+def test_max_size_zero_disables_pooling():
+    pool, factory, _ = new_pool(max_size=0)
+
+    with pool.acquire("a") as c1:
+        pass
+    with pool.acquire("a") as c2:
+        pass
+
+    assert c1 is not c2
+    c1.close.assert_called_once()
+    c2.close.assert_called_once()
+    assert factory.call_count == 2
+
+
+def test_unhealthy_channel_replaced():
+    pool, _, _ = new_pool()
+
+    with pool.acquire("a") as c1:
+        pass
+    notify(c1, grpc.ChannelConnectivity.TRANSIENT_FAILURE)
+    with pool.acquire("a") as c2:
+        pass
+
+    assert c1 is not c2
+    c1.close.assert_called_once()
+    assert pool.stats() == ChannelPoolStats(hits=0, misses=2, evictions=1, size=1, leased=0)
+
+
+def test_unhealthy_channel_in_use_closed_on_release():
+    pool, _, _ = new_pool()
+
+    with pool.acquire("a") as c1:
+        notify(c1, grpc.ChannelConnectivity.SHUTDOWN)
+        with pool.acquire("a") as c2:
+            assert c1 is not c2
+        c1.close.assert_not_called()
+    c1.close.assert_called_once()
+
+
+def test_healthy_states_reused():
+    pool, _, _ = new_pool()
+
+    with pool.acquire("a") as c1:
+        pass
+    notify(c1, grpc.ChannelConnectivity.IDLE)
+    with pool.acquire("a") as c2:
+        pass
+
+    assert c1 is c2
+
+
+def test_close():
+    pool, _, _ = new_pool()
+
+    with pool.acquire("a") as a:
+        with pool.acquire("b") as b:
+            pass
+        pool.close()
+        b.close.assert_called_once()
+        a.close.assert_not_called()
+    a.close.assert_called_once()
+    assert pool.stats().size == 0
+
+
+def test_invalid_arguments():
+    with raises(ValueError):
+        ChannelPool(max_size=-1)
+    with raises(ValueError):
+        ChannelPool(idle_timeout=-1)
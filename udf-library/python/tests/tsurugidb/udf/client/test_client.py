@@ -0,0 +1,157 @@
+import threading
+
+from datetime import timedelta
+from pathlib import Path
+from pytest import raises
+
+from tsurugidb.udf import (
+    BlobReference,
+    ClobReference,
+    BlobRelayClient,
+    BlobRelayError,
+    BlobTransferResult,
+)
+
+
+class FakeClient(BlobRelayClient):
+    """Records calls and fails on paths containing "fail"."""
+
+    def __init__(self, barrier: threading.Barrier | None = None):
+        self.calls = []
+        self.lock = threading.Lock()
+        self.barrier = barrier
+
+    def __record(self, *call):
+        with self.lock:
+            self.calls.append(call)
+        if self.barrier is not None:
+            self.barrier.wait(timeout=5)
+        if "fail" in str(call[-2]):
+            raise BlobRelayError(f"failed: {call}")
+
+    def download_blob(self, ref, destination, *, timeout=None):
+        self.__record("download_blob", ref.object_id, destination, timeout)
+
+    def download_clob(self, ref, destination, *, timeout=None):
+        self.__record("download_clob", ref.object_id, destination, timeout)
+
+    def upload_blob(self, source, *, timeout=None):
+        self.__record("upload_blob", source, timeout)
+        return BlobReference(storage_id=1, object_id=len(str(source)))
+
+    def upload_clob(self, source, *, timeout=None):
+        self.__record("upload_clob", source, timeout)
+        return ClobReference(storage_id=1, object_id=len(str(source)))
+
+
+def test_download_many():
+    client = FakeClient()
+    refs = [BlobReference(object_id=1), ClobReference(object_id=2), BlobReference(object_id=3)]
+    destinations = [Path("a"), Path("b"), Path("c")]
+
+    results = client.download_many(refs, destinations, timeout=timedelta(seconds=1))
+
+    assert results == [BlobTransferResult(), BlobTransferResult(), BlobTransferResult()]
+    assert sorted(client.calls) == [
+        ("download_blob", 1, Path("a"), timedelta(seconds=1)),
+        ("download_blob", 3, Path("c"), timedelta(seconds=1)),
+        ("download_clob", 2, Path("b"), timedelta(seconds=1)),
+    ]
+
+
+def test_download_many_concurrent():
+    client = FakeClient(threading.Barrier(3))
+    refs = [BlobReference(object_id=i) for i in range(3)]
+
+    # each download waits until all three are in progress
+    results = client.download_many(refs, [Path(str(i)) for i in range(3)], max_concurrency=3)
+
+    assert all(r.ok for r in results)
+
+
+def test_download_many_errors_per_item():
+    client = FakeClient()
+    refs = [BlobReference(object_id=i) for i in range(3)]
+
+    results = client.download_many(refs, [Path("ok1"), Path("fail"), Path("ok2")], max_concurrency=1)
+
+    assert [r.ok for r in results] == [True, False, True]
+    assert isinstance(results[1].error, BlobRelayError)
+    with raises(BlobRelayError):
+        results[1].result()
+    assert len(client.calls) == 3
+
+
+def test_download_many_length_mismatch():
+    client = FakeClient()
+    with raises(ValueError):
+        client.download_many([BlobReference()], [])
+
+
+def test_download_many_empty():
+    assert FakeClient().download_many([], []) == []
+
+
+def test_upload_many_in_order():
+    client = FakeClient()
+    sources = [Path("x" * n) for n in range(1, 6)]
+
+    results = client.upload_many(sources, max_concurrency=4)
+
+    assert [r.result().object_id for r in results] == [1, 2, 3, 4, 5]
+    assert all(isinstance(r.value, BlobReference) for r in results)
+
+
+def test_upload_many_clob():
+    client = FakeClient()
+
+    results = client.upload_many([Path("a"), Path("fail")], clob=True)
+
+    assert isinstance(results[0].value, ClobReference)
+    assert results[1].value is None
+    assert isinstance(results[1].error, BlobRelayError)
+
+
+def test_upload_many_invalid_concurrency():
+    with raises(ValueError):
+        FakeClient().upload_many([Path("a")], max_concurrency=0)
+
+
+class FileClient(FakeClient):
+    """Stores uploaded files in memory and downloads them by object_id."""
+
+    def __init__(self):
+        super().__init__()
+        self.store = {}
+
+    def download_blob(self, ref, destination, *, timeout=None):
+        destination.write_bytes(self.store[ref.object_id])
+
+    def upload_blob(self, source, *, timeout=None):
+        object_id = len(self.store) + 1
+        self.store[object_id] = source.read_bytes()
+        return BlobReference(object_id=object_id)
+
+
+def test_open_blob_default():
+    client = FileClient()
+    client.store[1] = b"content"
+
+    with client.open_blob(BlobReference(object_id=1)) as fp:
+        assert fp.read() == b"content"
+
+
+def test_upload_blob_from_default():
+    client = FileClient()
+
+    ref = client.upload_blob_from(iter([b"ab", b"cd"]), size=4)
+
+    assert client.store[ref.object_id] == b"abcd"
+
+
+def test_upload_blob_from_default_size_mismatch():
+    client = FileClient()
+
+    with raises(BlobRelayError):
+        client.upload_blob_from(iter([b"ab"]), size=4)
+    assert client.store == {}
@@ -0,0 +1,219 @@
+from pytest import importorskip, raises
+
+from tsurugidb.udf import (
+    Decimal as PbDecimal,
+    Date as PbDate,
+    LocalTime as PbTime,
+    LocalDatetime as PbDatetime,
+    OffsetDatetime as PbOffsetDatetime,
+
+    to_pb_decimal,
+    from_pb_decimal,
+    to_pb_date,
+    from_pb_date,
+    to_pb_local_time,
+    from_pb_local_time,
+    to_pb_local_datetime,
+    from_pb_local_datetime,
+    to_pb_offset_datetime,
+    from_pb_offset_datetime,
+
+    to_pb_decimals,
+    from_pb_decimals,
+    to_pb_dates,
+    from_pb_dates,
+    to_pb_local_times,
+    from_pb_local_times,
+    to_pb_local_datetimes,
+    from_pb_local_datetimes,
+    to_pb_offset_datetimes,
+    from_pb_offset_datetimes,
+)
+from tsurugidb.udf.tsurugi_types_pb2 import DESCRIPTOR
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+from decimal import (
+    Decimal as PyDecimal,
+)
+from datetime import (
+    date as PyDate,
+    time as PyTime,
+    datetime as PyDatetime,
+    timezone,
+    timedelta,
+)
+
+DECIMALS = [PyDecimal("0"), PyDecimal("123"), PyDecimal("-123.45"), PyDecimal("1E+5"), PyDecimal("-0.001")]
+DATES = [PyDate(1970, 1, 1), PyDate(2023, 5, 1), PyDate(1960, 2, 29), PyDate(1, 1, 1), PyDate(9999, 12, 31)]
+TIMES = [PyTime(0, 0), PyTime(12, 34, 56, 789_012), PyTime(23, 59, 59, 999_999)]
+DATETIMES = [
+    PyDatetime(1970, 1, 1),
+    PyDatetime(2023, 1, 1, 12, 34, 56, 789_012),
+    PyDatetime(1960, 1, 1, 12, 34, 56, 789_012),
+    PyDatetime(1960, 1, 1, 12, 34, 56),
+    PyDatetime(9999, 12, 31, 23, 59, 59),
+]
+OFFSET_DATETIMES = [
+    PyDatetime(1970, 1, 1, tzinfo=timezone.utc),
+    PyDatetime(2023, 1, 1, 12, 34, 56, 789_012, tzinfo=timezone(timedelta(hours=9))),
+    PyDatetime(1960, 1, 1, 12, 34, 56, 789_012, tzinfo=timezone(timedelta(hours=-5, minutes=-30))),
+]
+
+def _repeated(field_type):
+    """Returns an empty repeated field of the given tsurugidb.udf message type."""
+    file = descriptor_pb2.FileDescriptorProto()
+    DESCRIPTOR.CopyToProto(file)
+    holder = descriptor_pb2.FileDescriptorProto(
+        name="test_batch_holder.proto",
+        package="test_batch",
+        dependency=[file.name],
+        syntax="proto3",
+    )
+    message = holder.message_type.add(name="Holder")
+    message.field.add(
+        name="values",
+        number=1,
+        label=descriptor_pb2.FieldDescriptorProto.LABEL_REPEATED,
+        type=descriptor_pb2.FieldDescriptorProto.TYPE_MESSAGE,
+        type_name=f".{field_type.DESCRIPTOR.full_name}",
+    )
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file)
+    pool.Add(holder)
+    holder_class = message_factory.GetMessageClass(pool.FindMessageTypeByName("test_batch.Holder"))
+    return holder_class().values
+
+def test_to_pb_decimals():
+    assert to_pb_decimals(DECIMALS) == [to_pb_decimal(v) for v in DECIMALS]
+
+def test_to_pb_decimals_nan():
+    with raises(ValueError):
+        to_pb_decimals([PyDecimal("1"), PyDecimal("NaN")])
+
+def test_from_pb_decimals():
+    messages = [to_pb_decimal(v) for v in DECIMALS]
+    assert from_pb_decimals(messages) == [from_pb_decimal(m) for m in messages]
+
+def test_to_pb_dates():
+    assert to_pb_dates(DATES) == [to_pb_date(v) for v in DATES]
+
+def test_to_pb_dates_empty():
+    assert to_pb_dates([]) == []
+
+def test_to_pb_dates_out():
+    out = _repeated(PbDate)
+    result = to_pb_dates(DATES, out)
+
+    assert result is out
+    assert [m.days for m in out] == [to_pb_date(v).days for v in DATES]
+
+def test_from_pb_dates():
+    messages = [to_pb_date(v) for v in DATES]
+    assert from_pb_dates(messages) == [from_pb_date(m) for m in messages]
+
+def test_from_pb_dates_generator():
+    messages = [to_pb_date(v) for v in DATES]
+    assert from_pb_dates(m for m in messages) == DATES
+
+def test_from_pb_dates_out_of_range():
+    with raises(OverflowError):
+        from_pb_dates([PbDate(days=10**8)])
+
+def test_to_pb_local_times():
+    assert to_pb_local_times(TIMES) == [to_pb_local_time(v) for v in TIMES]
+
+def test_from_pb_local_times():
+    messages = [to_pb_local_time(v) for v in TIMES] + [PbTime(nanos=1_999)]
+    assert from_pb_local_times(messages) == [from_pb_local_time(m) for m in messages]
+
+def test_to_pb_local_datetimes():
+    assert to_pb_local_datetimes(DATETIMES) == [to_pb_local_datetime(v) for v in DATETIMES]
+
+def test_to_pb_local_datetimes_discards_timezone():
+    dt = PyDatetime(2023, 1, 1, 12, 34, 56, 789_012, tzinfo=timezone(timedelta(hours=5)))
+    assert to_pb_local_datetimes([dt]) == [to_pb_local_datetime(dt)]
+
+def test_to_pb_local_datetimes_out():
+    out = _repeated(PbDatetime)
+    to_pb_local_datetimes(DATETIMES, out)
+
+    assert [m.SerializeToString() for m in out] == [to_pb_local_datetime(v).SerializeToString() for v in DATETIMES]
+
+def test_from_pb_local_datetimes():
+    messages = [to_pb_local_datetime(v) for v in DATETIMES] + [PbDatetime(offset_seconds=-1, nano_adjustment=999_999_999)]
+    assert from_pb_local_datetimes(messages) == [from_pb_local_datetime(m) for m in messages]
+
+def test_from_pb_local_datetimes_out_of_range():
+    with raises(OverflowError):
+        from_pb_local_datetimes([PbDatetime(offset_seconds=2**62)])
+
+def test_to_pb_offset_datetimes():
+    assert to_pb_offset_datetimes(OFFSET_DATETIMES) == [to_pb_offset_datetime(v) for v in OFFSET_DATETIMES]
+
+def test_to_pb_offset_datetimes_without_tz():
+    dt = PyDatetime(2023, 1, 1, 12, 34, 56, 789_012)
+    assert to_pb_offset_datetimes([dt]) == [to_pb_offset_datetime(dt)]
+
+def test_from_pb_offset_datetimes():
+    messages = [to_pb_offset_datetime(v) for v in OFFSET_DATETIMES]
+    result = from_pb_offset_datetimes(messages)
+
+    assert result == [from_pb_offset_datetime(m) for m in messages]
+    assert [v.utcoffset() for v in result] == [v.utcoffset() for v in OFFSET_DATETIMES]
+
+def test_to_pb_dates_numpy():
+    np = importorskip("numpy")
+    values = np.array(DATES, dtype="datetime64[D]")
+    assert to_pb_dates(values) == [to_pb_date(v) for v in DATES]
+
+def test_to_pb_dates_numpy_nat():
+    np = importorskip("numpy")
+    with raises(ValueError):
+        to_pb_dates(np.array(["2023-01-01", "NaT"], dtype="datetime64[D]"))
+
+def test_from_pb_dates_numpy():
+    np = importorskip("numpy")
+    result = from_pb_dates([to_pb_date(v) for v in DATES], as_numpy=True)
+
+    assert result.dtype == np.dtype("datetime64[D]")
+    assert result.tolist() == DATES
+
+def test_to_pb_local_times_numpy():
+    np = importorskip("numpy")
+    values = np.array([0, 45_296_789_012_345], dtype="timedelta64[ns]")
+    assert to_pb_local_times(values) == [PbTime(nanos=0), PbTime(nanos=45_296_789_012_345)]
+
+def test_to_pb_local_times_numpy_out_of_range():
+    np = importorskip("numpy")
+    with raises(ValueError):
+        to_pb_local_times(np.array([24 * 3600], dtype="timedelta64[s]"))
+
+def test_from_pb_local_times_numpy():
+    np = importorskip("numpy")
+    result = from_pb_local_times([PbTime(nanos=45_296_789_012_345)], as_numpy=True)
+
+    assert result.dtype == np.dtype("timedelta64[ns]")
+    assert result.view(np.int64).tolist() == [45_296_789_012_345]
+
+def test_to_pb_local_datetimes_numpy():
+    np = importorskip("numpy")
+    values = np.array(DATETIMES[:4], dtype="datetime64[us]")
+    assert to_pb_local_datetimes(values) == [to_pb_local_datetime(v) for v in DATETIMES[:4]]
+
+def test_to_pb_local_datetimes_numpy_nanos():
+    np = importorskip("numpy")
+    values = np.array(["2023-01-01T12:34:56.789012345", "1960-01-01T12:34:56.789012345"], dtype="datetime64[ns]")
+    result = to_pb_local_datetimes(values)
+
+    assert [m.nano_adjustment for m in result] == [789_012_345, 789_012_345]
+    assert [m.offset_seconds for m in result] == [
+        to_pb_local_datetime(PyDatetime(2023, 1, 1, 12, 34, 56, 789_012)).offset_seconds,
+        to_pb_local_datetime(PyDatetime(1960, 1, 1, 12, 34, 56, 789_012)).offset_seconds,
+    ]
+
+def test_from_pb_local_datetimes_numpy():
+    np = importorskip("numpy")
+    messages = [to_pb_local_datetime(v) for v in DATETIMES]
+    result = from_pb_local_datetimes(messages, as_numpy=True)
+
+    assert result.dtype == np.dtype("datetime64[us]")
+    assert result.tolist() == [from_pb_local_datetime(m) for m in messages]
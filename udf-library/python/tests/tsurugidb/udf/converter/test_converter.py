@@ -119,6 +119,33 @@ def test_from_pb_decimal_negative_exponent():
     value = from_pb_decimal(pb_decimal)
     assert value == PyDecimal("12345E+2")
 
+def test_to_pb_decimal_38_digits():
+    value = PyDecimal("-1234567890123456789012345678.9012345678")
+    pb_decimal = to_pb_decimal(value)
+
+    assert pb_decimal.exponent == -10
+    assert pb_decimal.unscaled_value == int.to_bytes(-12345678901234567890123456789012345678, 16, byteorder='big', signed=True)
+
+def test_to_pb_decimal_zero_with_exponent():
+    value = PyDecimal("0.000")
+    pb_decimal = to_pb_decimal(value)
+
+    assert pb_decimal.exponent == -3
+    assert pb_decimal.unscaled_value == b"\x00"
+
+def test_from_pb_decimal_38_digits():
+    pb_decimal = PbDecimal()
+    pb_decimal.exponent = -10
+    pb_decimal.unscaled_value = int.to_bytes(99999999999999999999999999999999999999, 17, byteorder='big', signed=True)
+
+    value = from_pb_decimal(pb_decimal)
+    assert value == PyDecimal("9999999999999999999999999999.9999999999")
+
+def test_decimal_round_trip_keeps_exponent():
+    for text in ("1E+5", "123.4500", "-0.00000000000000000000000000000000000001"):
+        value = from_pb_decimal(to_pb_decimal(PyDecimal(text)))
+        assert value.as_tuple() == PyDecimal(text).as_tuple()
+
 
 def test_to_pb_date_epoch():
     d = PyDate(1970, 1, 1)
@@ -0,0 +1,6 @@
+from tsurugidb.udf.client.local import create_blob_client, create_async_blob_client
+
+__all__ = [
+    "create_blob_client",
+    "create_async_blob_client",
+]
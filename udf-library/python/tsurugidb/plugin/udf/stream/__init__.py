@@ -1,5 +1,6 @@
-from tsurugidb.udf.client.stream import create_blob_client
+from tsurugidb.udf.client.stream import create_blob_client, create_async_blob_client
 
 __all__ = [
     "create_blob_client",
+    "create_async_blob_client",
 ]
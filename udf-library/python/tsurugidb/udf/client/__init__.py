@@ -1,4 +1,23 @@
-from .client import BlobRelayClient, BlobRelayError, BlobRelayTimeoutError
-from .factory import create_blob_client
+from .async_client import AsyncBlobRelayClient
+from .blob_cache import BlobCache, BlobCacheStats, CachingBlobRelayClient, get_default_blob_cache
+from .client import BlobRelayClient, BlobRelayError, BlobRelayTimeoutError, BlobSource, BlobTransferResult
+from .channel_pool import ChannelPool, ChannelPoolStats, get_default_channel_pool
+from .factory import create_blob_client, create_async_blob_client
 
-__all__ = ["BlobRelayClient", "BlobRelayError", "BlobRelayTimeoutError", "create_blob_client"]
+__all__ = [
+    "AsyncBlobRelayClient",
+    "BlobCache",
+    "BlobCacheStats",
+    "CachingBlobRelayClient",
+    "get_default_blob_cache",
+    "BlobRelayClient",
+    "BlobRelayError",
+    "BlobRelayTimeoutError",
+    "BlobSource",
+    "BlobTransferResult",
+    "ChannelPool",
+    "ChannelPoolStats",
+    "get_default_channel_pool",
+    "create_blob_client",
+    "create_async_blob_client",
+]
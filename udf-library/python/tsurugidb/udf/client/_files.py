@@ -0,0 +1,109 @@
+# package: tsurugidb.udf.client
+
+import logging
+import os
+import shutil
+
+from contextlib import suppress
+from pathlib import Path
+from typing import BinaryIO
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+LINK_MODE_HARDLINK = "hardlink"
+"""Hard-links the source file to the destination, and then falls back to LINK_MODE_REFLINK.
+
+The hard-linked destination shares its content with the source, so it must be treated as read-only.
+"""
+
+LINK_MODE_REFLINK = "reflink"
+"""Clones the source file into the destination (copy-on-write), and then falls back to LINK_MODE_COPY."""
+
+LINK_MODE_COPY = "copy"
+"""Copies the source file into the destination inside the kernel."""
+
+LINK_MODES = (LINK_MODE_HARDLINK, LINK_MODE_REFLINK, LINK_MODE_COPY)
+
+# Linux ioctl request to share the extents of another file (FICLONE = _IOW(0x94, 9, int))
+_FICLONE = 0x40049409
+
+LOGGER_NAME = 'tsurugidb.udf.blob.files'
+
+logger = logging.getLogger(LOGGER_NAME)
+
+def place_file(source: Path, destination: Path, link_mode: str = LINK_MODE_REFLINK) -> None:
+    """Places the content of `source` at `destination`, as cheaply as `link_mode` allows.
+
+    With LINK_MODE_HARDLINK, `destination` may be a hard link to `source`.
+    Writing to it then also changes `source`, so the caller must not open it for writing.
+    Changing its permissions would also change `source`, so this does not make it read-only.
+
+    Raises:
+        FileExistsError: If `destination` already exists.
+        OSError: If the file cannot be placed.
+    """
+    if link_mode == LINK_MODE_HARDLINK:
+        try:
+            os.link(source, destination)
+            return
+        except FileExistsError:
+            raise
+        except OSError as e:
+            # e.g. EXDEV across filesystems, or EPERM under fs.protected_hardlinks
+            logger.debug("failed to hard-link BLOB file, trying reflink: source=%s, error=%s", source, e)
+
+    with source.open("rb") as fsrc:
+        copy_to_new_file(fsrc, destination, reflink=link_mode != LINK_MODE_COPY)
+
+def copy_to_new_file(fsrc: BinaryIO, destination: Path, *, reflink: bool = True) -> None:
+    """Copies the whole content of the open file `fsrc` into the new file `destination`.
+
+    The destination is removed if the copy fails.
+
+    Raises:
+        FileExistsError: If `destination` already exists.
+        OSError: If the file cannot be copied.
+    """
+    file_staging = False
+    try:
+        with destination.open("xb") as fdst:
+            file_staging = True
+            if not reflink or not _reflink(fsrc, fdst):
+                _copy(fsrc, fdst)
+        file_staging = False
+    finally:
+        if file_staging:
+            with suppress(Exception):
+                destination.unlink()
+
+def _reflink(fsrc: BinaryIO, fdst: BinaryIO) -> bool:
+    """Clones `fsrc` into `fdst` if the filesystem supports it (e.g. Btrfs, XFS), and returns whether it succeeded."""
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        return True
+    except OSError as e:
+        logger.debug("failed to reflink BLOB file, trying copy: error=%s", e)
+        return False
+
+def _copy(fsrc: BinaryIO, fdst: BinaryIO) -> None:
+    if hasattr(os, "sendfile"):
+        # copy inside the kernel, so that the data does not pass through Python
+        infd, outfd = fsrc.fileno(), fdst.fileno()
+        offset = 0
+        try:
+            while True:
+                sent = os.sendfile(outfd, infd, offset, 1 << 30)
+                if sent == 0:
+                    return
+                offset += sent
+        except OSError as e:
+            if offset > 0:
+                raise
+            logger.debug("failed to sendfile BLOB file, trying user-space copy: error=%s", e)
+    fsrc.seek(0)
+    shutil.copyfileobj(fsrc, fdst)
@@ -0,0 +1,178 @@
+import asyncio
+
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Sequence, TypeVar
+from tsurugidb.udf import BlobReference, ClobReference
+
+from .client import DEFAULT_MAX_CONCURRENCY, BlobTransferResult
+
+T = TypeVar("T")
+
+
+class AsyncBlobRelayClient(ABC):
+    """An asyncio client for BLOB relay service.
+
+    This provides the same operations as BlobRelayClient as coroutines,
+    so that asyncio applications (e.g. grpc.aio servers) can run many transfers on one event loop.
+    """
+
+    @abstractmethod
+    async def download_blob(self, ref: BlobReference, destination: Path, *, timeout: timedelta | None = None) -> None:
+        """Download BLOB data identified by `ref` and save it to `destination`.
+
+        Args:
+            ref: The reference to the BLOB to download.
+            destination: The file path where the downloaded BLOB data will be saved.
+            timeout: timeout duration for the operation, or None for no timeout.
+
+        Raises:
+            BlobRelayError: If an error occurs in the BLOB relay service.
+            BlobRelayError: If there is an error during communication.
+            BlobRelayTimeoutError: If the operation times out.
+            OSError: If there is an error writing to the destination file.
+        """
+        pass
+
+    @abstractmethod
+    async def download_clob(self, ref: ClobReference, destination: Path, *, timeout: timedelta | None = None) -> None:
+        """Download CLOB data identified by `ref` and save it to `destination`.
+
+        Args:
+            ref: The reference to the CLOB to download.
+            destination: The file path where the downloaded CLOB data will be saved.
+            timeout: timeout duration for the operation, or None for no timeout.
+
+        Raises:
+            BlobRelayError: If an error occurs in the BLOB relay service.
+            BlobRelayError: If there is an error during communication.
+            BlobRelayTimeoutError: If the operation times out.
+            OSError: If there is an error writing to the destination file.
+        """
+        pass
+
+    @abstractmethod
+    async def upload_blob(self, source: Path, *, timeout: timedelta | None = None) -> BlobReference:
+        """Upload BLOB data from `source` and return a reference to the uploaded BLOB.
+
+        Args:
+            source: The file path of the BLOB data to upload.
+            timeout: timeout duration for the operation, or None for no timeout.
+
+        Returns:
+            A reference to the uploaded BLOB.
+
+        Raises:
+            OSError: If there is an error reading from the source file.
+            BlobRelayError: If there is an error during communication.
+            BlobRelayError: If an error occurs in the BLOB relay service.
+            BlobRelayTimeoutError: If the operation times out.
+        """
+        pass
+
+    @abstractmethod
+    async def upload_clob(self, source: Path, *, timeout: timedelta | None = None) -> ClobReference:
+        """Upload CLOB data from `source` and return a reference to the uploaded CLOB.
+
+        Args:
+            source: The file path of the CLOB data to upload.
+            timeout: timeout duration for the operation, or None for no timeout.
+
+        Returns:
+            A reference to the uploaded CLOB.
+
+        Raises:
+            OSError: If there is an error reading from the source file.
+            BlobRelayError: If there is an error during communication.
+            BlobRelayError: If an error occurs in the BLOB relay service.
+            BlobRelayTimeoutError: If the operation times out.
+        """
+        pass
+
+    async def download_many(
+            self,
+            refs: Sequence[BlobReference | ClobReference],
+            destinations: Sequence[Path],
+            *,
+            max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+            timeout: timedelta | None = None) -> list[BlobTransferResult[None]]:
+        """Download BLOB/CLOB data identified by each of `refs` and save it to the corresponding `destinations`.
+
+        See BlobRelayClient.download_many() for details.
+
+        Args:
+            refs: The references to the BLOBs or CLOBs to download.
+            destinations: The file paths where the downloaded data will be saved, in the same order as `refs`.
+            max_concurrency: The maximum number of downloads in progress at once.
+            timeout: timeout duration for each download, or None for no timeout.
+
+        Returns:
+            The results of the downloads, in the same order as `refs`.
+
+        Raises:
+            ValueError: If `refs` and `destinations` have different lengths, or `max_concurrency` is less than 1.
+        """
+        if len(refs) != len(destinations):
+            raise ValueError(f"refs and destinations must have the same length: {len(refs)} != {len(destinations)}")
+
+        async def download(ref: BlobReference | ClobReference, destination: Path) -> None:
+            if isinstance(ref, ClobReference):
+                return await self.download_clob(ref, destination, timeout=timeout)
+            return await self.download_blob(ref, destination, timeout=timeout)
+
+        return await _run_many(download, list(zip(refs, destinations)), max_concurrency)
+
+    async def upload_many(
+            self,
+            sources: Sequence[Path],
+            *,
+            clob: bool = False,
+            max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+            timeout: timedelta | None = None) -> list[BlobTransferResult[BlobReference | ClobReference]]:
+        """Upload BLOB/CLOB data from each of `sources` and return references to the uploaded data.
+
+        See BlobRelayClient.upload_many() for details.
+
+        Args:
+            sources: The file paths of the data to upload.
+            clob: Whether to upload the files as CLOBs instead of BLOBs.
+            max_concurrency: The maximum number of uploads in progress at once.
+            timeout: timeout duration for each upload, or None for no timeout.
+
+        Returns:
+            The results of the uploads, in the same order as `sources`.
+
+        Raises:
+            ValueError: If `max_concurrency` is less than 1.
+        """
+
+        async def upload(source: Path) -> BlobReference | ClobReference:
+            if clob:
+                return await self.upload_clob(source, timeout=timeout)
+            return await self.upload_blob(source, timeout=timeout)
+
+        return await _run_many(upload, [(source,) for source in sources], max_concurrency)
+
+
+async def _run_many(
+        task: Callable[..., Awaitable[T]],
+        arguments: list[tuple],
+        max_concurrency: int) -> list[BlobTransferResult[T]]:
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be >= 1: {max_concurrency}")
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(args: tuple) -> BlobTransferResult[T]:
+        async with semaphore:
+            try:
+                return BlobTransferResult(value=await task(*args))
+            except Exception as e:
+                return BlobTransferResult(error=e)
+
+    return list(await asyncio.gather(*(run(args) for args in arguments)))
+
+
+__all__ = [
+    "AsyncBlobRelayClient",
+]
@@ -0,0 +1,332 @@
+import atexit
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import BinaryIO, Callable
+from tsurugidb.udf import BlobReference, ClobReference
+
+from ._files import copy_to_new_file
+from .client import BlobRelayClient, BlobSource
+
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+LOGGER_NAME = 'tsurugidb.udf.blob.cache'
+
+logger = logging.getLogger(LOGGER_NAME)
+
+CacheKey = tuple[int, int, int]
+
+_PATTERN_ENTRY = re.compile(r"(\d+)-(\d+)-(\d+)")
+
+_TEMPORARY_PREFIX = ".tmp-"
+
+
+@dataclass(frozen=True)
+class BlobCacheStats:
+    """A snapshot of the BlobCache metrics."""
+
+    hits: int
+    """The number of reads served from the cache."""
+
+    misses: int
+    """The number of reads that downloaded the data."""
+
+    coalesced: int
+    """The number of reads that waited for a concurrent download of the same data instead of downloading it."""
+
+    evictions: int
+    """The number of entries removed from the cache to keep it within the size limit."""
+
+    entries: int
+    """The number of entries currently in the cache."""
+
+    size: int
+    """The total size of the entries currently in the cache, in bytes."""
+
+
+class BlobCache:
+    """A size-bounded on-disk cache of BLOB/CLOB data, keyed by (storage_id, object_id, tag).
+
+    Each entry is downloaded into a temporary file and then renamed into place, so that partially
+    downloaded data is never visible. Concurrent reads of the same entry share one download.
+    If the total size exceeds ``max_size``, the least recently used entries are removed.
+    Data larger than ``max_size`` is not cached.
+
+    Entries are opened before they can be evicted, so readers are not affected by the eviction
+    (the data is removed when the last reader closes it).
+    """
+
+    def __init__(self, directory: Path | str | None = None, *, max_size: int = DEFAULT_MAX_SIZE):
+        """Creates a new instance.
+
+        Args:
+            directory: The directory to store the entries, or None to use a new temporary directory
+                which is removed on close(). Entries already in the directory are reused.
+            max_size: The maximum total size of the entries, in bytes.
+
+        Raises:
+            ValueError: If max_size is negative.
+        """
+        if max_size < 0:
+            raise ValueError(f"max_size must be >= 0: {max_size}")
+        self.max_size = max_size
+        self.__owns_directory = directory is None
+        if directory is None:
+            self.__directory = Path(tempfile.mkdtemp(prefix="tsurugi-blob-cache-"))
+        else:
+            self.__directory = Path(directory)
+            self.__directory.mkdir(parents=True, exist_ok=True)
+        self.__lock = threading.Lock()
+        self.__entries: OrderedDict[CacheKey, int] = OrderedDict()
+        self.__inflight: dict[CacheKey, Future] = {}
+        self.__size = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__coalesced = 0
+        self.__evictions = 0
+        self.__load()
+
+    @property
+    def directory(self) -> Path:
+        """The directory where the entries are stored."""
+        return self.__directory
+
+    def open(self, key: CacheKey, download: Callable[[Path], None]) -> BinaryIO:
+        """Opens the cached data of the key, downloading it on a cache miss.
+
+        Args:
+            key: The (storage_id, object_id, tag) of the BLOB/CLOB.
+            download: The function to download the data into the given path, which does not exist yet.
+
+        Returns:
+            A readable binary file of the data. It should be closed after use.
+
+        Raises:
+            Exception: If `download` raises an error, including the ones waiting for the same download.
+        """
+        while True:
+            with self.__lock:
+                fp = self.__open_entry_unlocked(key)
+                if fp is not None:
+                    self.__hits += 1
+                    return fp
+                inflight = self.__inflight.get(key)
+                if inflight is None:
+                    self.__misses += 1
+                    inflight = Future()
+                    self.__inflight[key] = inflight
+                    break
+                self.__coalesced += 1
+            # wait for the other download, and then read its entry
+            inflight.result()
+
+        temporary = self.__directory / f"{_TEMPORARY_PREFIX}{uuid.uuid4().hex}"
+        fp = None
+        try:
+            logger.debug("start populating BLOB cache: key=%s", key)
+            download(temporary)
+            fp = temporary.open("rb")
+            size = os.fstat(fp.fileno()).st_size
+            with self.__lock:
+                if size <= self.max_size:
+                    os.replace(temporary, self.__path(key))
+                    self.__entries[key] = size
+                    self.__size += size
+                    self.__evict_unlocked()
+                else:
+                    logger.debug("skip caching oversized BLOB: key=%s, size=%d", key, size)
+            logger.debug("finish populating BLOB cache: key=%s, size=%d", key, size)
+            inflight.set_result(None)
+            return fp
+        except BaseException as e:
+            if fp is not None:
+                fp.close()
+            inflight.set_exception(e)
+            raise
+        finally:
+            with self.__lock:
+                del self.__inflight[key]
+            with suppress(FileNotFoundError):
+                temporary.unlink()
+
+    def stats(self) -> BlobCacheStats:
+        """Returns a snapshot of the cache metrics.
+
+        Returns:
+            The current metrics.
+        """
+        with self.__lock:
+            return BlobCacheStats(
+                hits=self.__hits,
+                misses=self.__misses,
+                coalesced=self.__coalesced,
+                evictions=self.__evictions,
+                entries=len(self.__entries),
+                size=self.__size,
+            )
+
+    def clear(self) -> None:
+        """Removes all entries from the cache."""
+        with self.__lock:
+            for key in list(self.__entries):
+                self.__remove_unlocked(key)
+
+    def close(self) -> None:
+        """Removes all entries, and also the directory if it was created by this cache."""
+        self.clear()
+        if self.__owns_directory:
+            shutil.rmtree(self.__directory, ignore_errors=True)
+
+    def __path(self, key: CacheKey) -> Path:
+        return self.__directory / "-".join(str(k) for k in key)
+
+    def __open_entry_unlocked(self, key: CacheKey) -> BinaryIO | None:
+        if key not in self.__entries:
+            return None
+        path = self.__path(key)
+        try:
+            fp = path.open("rb")
+        except FileNotFoundError:
+            # removed from outside
+            self.__size -= self.__entries.pop(key)
+            return None
+        self.__entries.move_to_end(key)
+        with suppress(OSError):
+            # keep the order for the next process which reuses the directory
+            os.utime(path)
+        return fp
+
+    def __evict_unlocked(self) -> None:
+        while self.__size > self.max_size and self.__entries:
+            key = next(iter(self.__entries))
+            logger.debug("evicting BLOB cache entry: key=%s", key)
+            self.__remove_unlocked(key)
+            self.__evictions += 1
+
+    def __remove_unlocked(self, key: CacheKey) -> None:
+        self.__size -= self.__entries.pop(key)
+        with suppress(FileNotFoundError):
+            self.__path(key).unlink()
+
+    def __load(self) -> None:
+        found = []
+        for path in self.__directory.iterdir():
+            if path.name.startswith(_TEMPORARY_PREFIX):
+                # left by an interrupted download
+                with suppress(OSError):
+                    path.unlink()
+                continue
+            match = _PATTERN_ENTRY.fullmatch(path.name)
+            if match is None or not path.is_file():
+                continue
+            stat = path.stat()
+            found.append((stat.st_mtime, tuple(int(g) for g in match.groups()), stat.st_size))
+        for _, key, size in sorted(found):
+            self.__entries[key] = size
+            self.__size += size
+        self.__evict_unlocked()
+
+
+class CachingBlobRelayClient(BlobRelayClient):
+    """A BlobRelayClient which reads BLOB/CLOB data through a BlobCache.
+
+    Downloads and opens are served from the cache, and uploads are passed through to the underlying client.
+    """
+
+    def __init__(self, client: BlobRelayClient, cache: BlobCache):
+        """Creates a new instance.
+
+        Args:
+            client: The client to download and upload the data.
+            cache: The cache to read the data through.
+        """
+        self.__client = client
+        self.__cache = cache
+
+    @staticmethod
+    def __key(ref: BlobReference | ClobReference) -> CacheKey:
+        return (ref.storage_id, ref.object_id, ref.tag)
+
+    def __download(self, fp_factory: Callable[[], BinaryIO], destination: Path) -> None:
+        if destination.exists():
+            raise FileExistsError(f"destination file already exists: {destination}")
+        with fp_factory() as fp:
+            copy_to_new_file(fp, destination)
+
+    def download_blob(self, ref: BlobReference, destination: Path, *, timeout: timedelta | None = None) -> None:
+        self.__download(lambda: self.open_blob(ref, timeout=timeout), destination)
+
+    def download_clob(self, ref: ClobReference, destination: Path, *, timeout: timedelta | None = None) -> None:
+        self.__download(lambda: self.open_clob(ref, timeout=timeout), destination)
+
+    def upload_blob(self, source: Path, *, timeout: timedelta | None = None) -> BlobReference:
+        return self.__client.upload_blob(source, timeout=timeout)
+
+    def upload_clob(self, source: Path, *, timeout: timedelta | None = None) -> ClobReference:
+        return self.__client.upload_clob(source, timeout=timeout)
+
+    def open_blob(self, ref: BlobReference, *, timeout: timedelta | None = None) -> BinaryIO:
+        return self.__cache.open(
+            self.__key(ref),
+            lambda path: self.__client.download_blob(ref, path, timeout=timeout))
+
+    def open_clob(self, ref: ClobReference, *, timeout: timedelta | None = None) -> BinaryIO:
+        return self.__cache.open(
+            self.__key(ref),
+            lambda path: self.__client.download_clob(ref, path, timeout=timeout))
+
+    def upload_blob_from(
+            self,
+            data: BlobSource,
+            *,
+            size: int | None = None,
+            timeout: timedelta | None = None) -> BlobReference:
+        return self.__client.upload_blob_from(data, size=size, timeout=timeout)
+
+    def upload_clob_from(
+            self,
+            data: BlobSource,
+            *,
+            size: int | None = None,
+            timeout: timedelta | None = None) -> ClobReference:
+        return self.__client.upload_clob_from(data, size=size, timeout=timeout)
+
+
+_default_cache: BlobCache | None = None
+
+_default_cache_lock = threading.Lock()
+
+
+def get_default_blob_cache() -> BlobCache:
+    """Returns the process-wide BLOB cache.
+
+    The cache is created in a temporary directory on first use, and removed when the process exits.
+
+    Returns:
+        The process-wide BlobCache.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = BlobCache()
+            atexit.register(_default_cache.close)
+        return _default_cache
+
+
+__all__ = [
+    "BlobCache",
+    "BlobCacheStats",
+    "CachingBlobRelayClient",
+    "get_default_blob_cache",
+]
@@ -0,0 +1,263 @@
+import atexit
+import grpc
+import logging
+import threading
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Hashable, Iterator
+
+DEFAULT_MAX_SIZE = 16
+
+DEFAULT_IDLE_TIMEOUT = 300.0
+
+LOGGER_NAME = 'tsurugidb.udf.blob.channel_pool'
+
+logger = logging.getLogger(LOGGER_NAME)
+
+ChannelKey = tuple[str, bool, Hashable]
+
+_UNHEALTHY_STATES = (
+    grpc.ChannelConnectivity.TRANSIENT_FAILURE,
+    grpc.ChannelConnectivity.SHUTDOWN,
+)
+
+
+@dataclass(frozen=True)
+class ChannelPoolStats:
+    """A snapshot of the ChannelPool metrics."""
+
+    hits: int
+    """The number of checkouts that reused a pooled channel."""
+
+    misses: int
+    """The number of checkouts that created a new channel."""
+
+    evictions: int
+    """The number of channels removed from the pool (idle, LRU or unhealthy)."""
+
+    size: int
+    """The number of channels currently in the pool."""
+
+    leased: int
+    """The number of checkouts currently in use."""
+
+
+class _Entry:
+
+    def __init__(self, key: ChannelKey, channel: grpc.Channel, now: float):
+        self.key = key
+        self.channel = channel
+        self.leases = 0
+        self.last_used = now
+        self.state: grpc.ChannelConnectivity | None = None
+        self.retired = False
+
+    def on_state_changed(self, state: grpc.ChannelConnectivity) -> None:
+        self.state = state
+
+
+def _create_channel(endpoint: str, secure: bool, credentials: grpc.ChannelCredentials | None) -> grpc.Channel:
+    if secure:
+        return grpc.secure_channel(endpoint, credentials or grpc.ssl_channel_credentials())
+    return grpc.insecure_channel(endpoint)
+
+
+class ChannelPool:
+    """A pool of gRPC channels shared between BLOB relay clients.
+
+    Channels are keyed by (endpoint, secure, credentials) and may be used by
+    several clients at once, as gRPC channels are thread-safe.
+    A channel that is not in use is closed when it has been idle for
+    ``idle_timeout`` seconds, or when the pool holds more than ``max_size``
+    channels (least recently used first). A channel whose connectivity has
+    failed is replaced on the next checkout.
+    """
+
+    def __init__(
+            self,
+            *,
+            max_size: int = DEFAULT_MAX_SIZE,
+            idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+            channel_factory: Callable[[str, bool, grpc.ChannelCredentials | None], grpc.Channel] = _create_channel,
+            clock: Callable[[], float] = time.monotonic):
+        """Creates a new instance.
+
+        Args:
+            max_size: The maximum number of channels kept in the pool. 0 disables pooling.
+                Channels in use are never closed, so the pool may temporarily exceed this size.
+            idle_timeout: The number of seconds an unused channel is kept in the pool.
+            channel_factory: The function to create a channel from (endpoint, secure, credentials).
+            clock: The monotonic clock in seconds.
+
+        Raises:
+            ValueError: If max_size or idle_timeout is negative.
+        """
+        if max_size < 0:
+            raise ValueError(f"max_size must be >= 0: {max_size}")
+        if idle_timeout < 0:
+            raise ValueError(f"idle_timeout must be >= 0: {idle_timeout}")
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.__channel_factory = channel_factory
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__entries: OrderedDict[ChannelKey, _Entry] = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__leased = 0
+
+    @contextmanager
+    def acquire(
+            self,
+            endpoint: str,
+            *,
+            secure: bool = False,
+            credentials: grpc.ChannelCredentials | None = None) -> Iterator[grpc.Channel]:
+        """Checks out a channel for the given endpoint.
+
+        Args:
+            endpoint: The gRPC endpoint URI.
+            secure: Whether to use a secure channel.
+            credentials: The channel credentials for a secure channel, or None to use the default SSL credentials.
+                Channels are shared only between checkouts with the same credentials object.
+
+        Returns:
+            A context manager that yields the channel, and returns it to the pool on exit.
+            The channel must not be closed by the caller.
+        """
+        entry = self.__checkout((endpoint, secure, credentials))
+        try:
+            yield entry.channel
+        finally:
+            self.__checkin(entry)
+
+    def stats(self) -> ChannelPoolStats:
+        """Returns a snapshot of the pool metrics.
+
+        Returns:
+            The current metrics.
+        """
+        with self.__lock:
+            return ChannelPoolStats(
+                hits=self.__hits,
+                misses=self.__misses,
+                evictions=self.__evictions,
+                size=len(self.__entries),
+                leased=self.__leased,
+            )
+
+    def close(self) -> None:
+        """Closes all channels in the pool.
+
+        Channels in use are closed when they are returned. The pool can still be used afterwards.
+        """
+        with self.__lock:
+            closing = [self.__remove_unlocked(entry) for entry in list(self.__entries.values())]
+        self.__close_all(closing)
+
+    def __checkout(self, key: ChannelKey) -> _Entry:
+        closing: list[_Entry | None] = []
+        with self.__lock:
+            now = self.__clock()
+            closing.extend(self.__evict_idle_unlocked(now))
+            entry = self.__entries.get(key)
+            if entry is not None and entry.state in _UNHEALTHY_STATES:
+                logger.debug("evicting unhealthy gRPC channel: target=%s, state=%s", key[0], entry.state)
+                closing.append(self.__remove_unlocked(entry))
+                entry = None
+            if entry is not None:
+                self.__hits += 1
+                self.__entries.move_to_end(key)
+            else:
+                self.__misses += 1
+                entry = self.__open_unlocked(key, now)
+            entry.leases += 1
+            entry.last_used = now
+            self.__leased += 1
+        self.__close_all(closing)
+        return entry
+
+    def __checkin(self, entry: _Entry) -> None:
+        closing: list[_Entry | None] = []
+        with self.__lock:
+            entry.leases -= 1
+            entry.last_used = self.__clock()
+            self.__leased -= 1
+            if entry.retired and entry.leases == 0:
+                closing.append(entry)
+            closing.extend(self.__evict_overflow_unlocked())
+        self.__close_all(closing)
+
+    def __open_unlocked(self, key: ChannelKey, now: float) -> _Entry:
+        endpoint, secure, credentials = key
+        logger.debug("start creating gRPC channel: target=%s, secure=%s", endpoint, secure)
+        channel = self.__channel_factory(endpoint, secure, credentials)
+        logger.debug("finish creating gRPC channel: target=%s, secure=%s", endpoint, secure)
+        entry = _Entry(key, channel, now)
+        channel.subscribe(entry.on_state_changed, try_to_connect=False)
+        self.__entries[key] = entry
+        return entry
+
+    def __evict_idle_unlocked(self, now: float) -> list[_Entry | None]:
+        expired = [
+            entry for entry in self.__entries.values()
+            if entry.leases == 0 and now - entry.last_used >= self.idle_timeout
+        ]
+        return [self.__remove_unlocked(entry) for entry in expired]
+
+    def __evict_overflow_unlocked(self) -> list[_Entry | None]:
+        overflow = len(self.__entries) - self.max_size
+        if overflow <= 0:
+            return []
+        victims = [entry for entry in self.__entries.values() if entry.leases == 0][:overflow]
+        return [self.__remove_unlocked(entry) for entry in victims]
+
+    def __remove_unlocked(self, entry: _Entry) -> _Entry | None:
+        """Removes the entry from the pool, and returns it if it can be closed immediately."""
+        del self.__entries[entry.key]
+        self.__evictions += 1
+        entry.retired = True
+        return entry if entry.leases == 0 else None
+
+    @staticmethod
+    def __close_all(entries: list[_Entry | None]) -> None:
+        for entry in entries:
+            if entry is None:
+                continue
+            endpoint, secure, _ = entry.key
+            logger.debug("start closing gRPC channel: target=%s, secure=%s", endpoint, secure)
+            entry.channel.unsubscribe(entry.on_state_changed)
+            entry.channel.close()
+            logger.debug("finish closing gRPC channel: target=%s, secure=%s", endpoint, secure)
+
+
+_default_pool: ChannelPool | None = None
+
+_default_pool_lock = threading.Lock()
+
+
+def get_default_channel_pool() -> ChannelPool:
+    """Returns the process-wide channel pool.
+
+    The pool is created on first use, and closed when the process exits.
+
+    Returns:
+        The process-wide ChannelPool.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ChannelPool()
+            atexit.register(_default_pool.close)
+        return _default_pool
+
+
+__all__ = [
+    "ChannelPool",
+    "ChannelPoolStats",
+    "get_default_channel_pool",
+]
@@ -1,8 +1,22 @@
+import tempfile
+
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import timedelta
 from pathlib import Path
+from typing import BinaryIO, Callable, Generic, Iterable, Iterator, Sequence, TypeVar, Union
 from tsurugidb.udf import BlobReference, ClobReference
 
+T = TypeVar("T")
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+DEFAULT_CHUNK_SIZE = 1_048_576
+
+BlobSource = Union[bytes, bytearray, memoryview, BinaryIO, Iterable[bytes]]
+"""In-memory BLOB content: a bytes-like object, a readable binary file object, or an iterable of byte chunks."""
+
 
 class BlobRelayError(RuntimeError):
     """Error raised by BlobRelayClient implementations."""
@@ -10,6 +24,34 @@ class BlobRelayError(RuntimeError):
 class BlobRelayTimeoutError(BlobRelayError):
     """Error raised when a BlobRelayClient operation times out."""
 
+@dataclass(frozen=True)
+class BlobTransferResult(Generic[T]):
+    """The result of an individual transfer in BlobRelayClient.download_many() or upload_many()."""
+
+    value: T | None = None
+    """The result value of the transfer, or None if it failed or returns nothing."""
+
+    error: Exception | None = None
+    """The error raised by the transfer, or None if it succeeded."""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the transfer succeeded."""
+        return self.error is None
+
+    def result(self) -> T | None:
+        """Returns the result value, or raises the error of the transfer.
+
+        Returns:
+            The result value.
+
+        Raises:
+            Exception: The error raised by the transfer.
+        """
+        if self.error is not None:
+            raise self.error
+        return self.value
+
 class BlobRelayClient(ABC):
     """A client for BLOB relay service."""
 
@@ -85,9 +127,248 @@ class BlobRelayClient(ABC):
         """
         pass
 
+    def open_blob(self, ref: BlobReference, *, timeout: timedelta | None = None) -> BinaryIO:
+        """Open BLOB data identified by `ref` as a readable binary stream.
+
+        The default implementation downloads the BLOB into a temporary file which is removed
+        as soon as it is opened; implementations may stream the data instead.
+
+        Args:
+            ref: The reference to the BLOB to open.
+            timeout: timeout duration for the operation, or None for no timeout.
+
+        Returns:
+            A readable binary stream of the BLOB data. It should be closed after use.
+
+        Raises:
+            BlobRelayError: If an error occurs in the BLOB relay service.
+            BlobRelayError: If there is an error during communication.
+            BlobRelayTimeoutError: If the operation times out.
+        """
+        return _open_downloaded(lambda path: self.download_blob(ref, path, timeout=timeout))
+
+    def open_clob(self, ref: ClobReference, *, timeout: timedelta | None = None) -> BinaryIO:
+        """Open CLOB data identified by `ref` as a readable binary stream.
+
+        See open_blob() for details.
+
+        Args:
+            ref: The reference to the CLOB to open.
+            timeout: timeout duration for the operation, or None for no timeout.
+
+        Returns:
+            A readable binary stream of the CLOB data. It should be closed after use.
+
+        Raises:
+            BlobRelayError: If an error occurs in the BLOB relay service.
+            BlobRelayError: If there is an error during communication.
+            BlobRelayTimeoutError: If the operation times out.
+        """
+        return _open_downloaded(lambda path: self.download_clob(ref, path, timeout=timeout))
+
+    def upload_blob_from(
+            self,
+            data: BlobSource,
+            *,
+            size: int | None = None,
+            timeout: timedelta | None = None) -> BlobReference:
+        """Upload BLOB data from memory, a file object or a chunk iterator, and return a reference to the uploaded BLOB.
+
+        The default implementation writes the data into a temporary file and uploads it;
+        implementations may stream the data instead.
+
+        Args:
+            data: The BLOB content.
+            size: The total size of the content in bytes if it is known, for file objects and iterables.
+                The size of a bytes-like object is always known.
+            timeout: timeout duration for the operation, or None for no timeout.
+
+        Returns:
+            A reference to the uploaded BLOB.
+
+        Raises:
+            OSError: If there is an error reading the data.
+            BlobRelayError: If the data size does not match `size`.
+            BlobRelayError: If there is an error during communication.
+            BlobRelayError: If an error occurs in the BLOB relay service.
+            BlobRelayTimeoutError: If the operation times out.
+        """
+        return _upload_buffered(data, size, lambda path: self.upload_blob(path, timeout=timeout))
+
+    def upload_clob_from(
+            self,
+            data: BlobSource,
+            *,
+            size: int | None = None,
+            timeout: timedelta | None = None) -> ClobReference:
+        """Upload CLOB data from memory, a file object or a chunk iterator, and return a reference to the uploaded CLOB.
+
+        See upload_blob_from() for details.
+
+        Args:
+            data: The CLOB content.
+            size: The total size of the content in bytes if it is known, for file objects and iterables.
+            timeout: timeout duration for the operation, or None for no timeout.
+
+        Returns:
+            A reference to the uploaded CLOB.
+
+        Raises:
+            OSError: If there is an error reading the data.
+            BlobRelayError: If the data size does not match `size`.
+            BlobRelayError: If there is an error during communication.
+            BlobRelayError: If an error occurs in the BLOB relay service.
+            BlobRelayTimeoutError: If the operation times out.
+        """
+        return _upload_buffered(data, size, lambda path: self.upload_clob(path, timeout=timeout))
+
+    def download_many(
+            self,
+            refs: Sequence[BlobReference | ClobReference],
+            destinations: Sequence[Path],
+            *,
+            max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+            timeout: timedelta | None = None) -> list[BlobTransferResult[None]]:
+        """Download BLOB/CLOB data identified by each of `refs` and save it to the corresponding `destinations`.
+
+        The downloads run concurrently, and a failed download does not stop the others.
+
+        Args:
+            refs: The references to the BLOBs or CLOBs to download.
+            destinations: The file paths where the downloaded data will be saved, in the same order as `refs`.
+            max_concurrency: The maximum number of downloads in progress at once.
+            timeout: timeout duration for each download, or None for no timeout.
+
+        Returns:
+            The results of the downloads, in the same order as `refs`.
+            Each error is one of those raised by download_blob() or download_clob().
+
+        Raises:
+            ValueError: If `refs` and `destinations` have different lengths, or `max_concurrency` is less than 1.
+        """
+        if len(refs) != len(destinations):
+            raise ValueError(f"refs and destinations must have the same length: {len(refs)} != {len(destinations)}")
+
+        def download(ref: BlobReference | ClobReference, destination: Path) -> None:
+            if isinstance(ref, ClobReference):
+                return self.download_clob(ref, destination, timeout=timeout)
+            return self.download_blob(ref, destination, timeout=timeout)
+
+        return _run_many(download, list(zip(refs, destinations)), max_concurrency)
+
+    def upload_many(
+            self,
+            sources: Sequence[Path],
+            *,
+            clob: bool = False,
+            max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+            timeout: timedelta | None = None) -> list[BlobTransferResult[BlobReference | ClobReference]]:
+        """Upload BLOB/CLOB data from each of `sources` and return references to the uploaded data.
+
+        The uploads run concurrently, and a failed upload does not stop the others.
+
+        Args:
+            sources: The file paths of the data to upload.
+            clob: Whether to upload the files as CLOBs instead of BLOBs.
+            max_concurrency: The maximum number of uploads in progress at once.
+            timeout: timeout duration for each upload, or None for no timeout.
+
+        Returns:
+            The results of the uploads, in the same order as `sources`.
+            Each value is a BlobReference, or a ClobReference if `clob` is True,
+            and each error is one of those raised by upload_blob() or upload_clob().
+
+        Raises:
+            ValueError: If `max_concurrency` is less than 1.
+        """
+
+        def upload(source: Path) -> BlobReference | ClobReference:
+            if clob:
+                return self.upload_clob(source, timeout=timeout)
+            return self.upload_blob(source, timeout=timeout)
+
+        return _run_many(upload, [(source,) for source in sources], max_concurrency)
+
+
+def _source_size(data: BlobSource, size: int | None) -> int | None:
+    """Returns the total size of the BLOB source, or None if it is unknown."""
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if isinstance(data, memoryview):
+        return data.nbytes
+    return size
+
+
+def _iter_source_chunks(data: BlobSource, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Splits the BLOB source into chunks of at most `chunk_size` bytes."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        view = memoryview(data).cast("B")
+        for offset in range(0, view.nbytes, chunk_size):
+            yield bytes(view[offset:offset + chunk_size])
+    elif hasattr(data, "read"):
+        while True:
+            buf = data.read(chunk_size)
+            if not buf:
+                break
+            yield bytes(buf)
+    else:
+        for item in data:
+            if len(item) <= chunk_size:
+                if item:
+                    yield bytes(item)
+                continue
+            view = memoryview(item).cast("B")
+            for offset in range(0, view.nbytes, chunk_size):
+                yield bytes(view[offset:offset + chunk_size])
+
+
+def _check_source_size(expected: int | None, actual: int) -> None:
+    if expected is not None and actual != expected:
+        raise BlobRelayError(f"upload size mismatch: expected {expected}, got {actual}")
+
+
+def _open_downloaded(download: Callable[[Path], None]) -> BinaryIO:
+    with tempfile.TemporaryDirectory(prefix="tsurugi-blob-") as directory:
+        path = Path(directory) / "data"
+        download(path)
+        # the file remains readable after the directory is removed on exit
+        return path.open("rb")
+
+
+def _upload_buffered(data: BlobSource, size: int | None, upload: Callable[[Path], T]) -> T:
+    expected = _source_size(data, size)
+    with tempfile.TemporaryDirectory(prefix="tsurugi-blob-") as directory:
+        path = Path(directory) / "data"
+        actual = 0
+        with path.open("xb") as fp:
+            for chunk in _iter_source_chunks(data):
+                fp.write(chunk)
+                actual += len(chunk)
+        _check_source_size(expected, actual)
+        return upload(path)
+
+
+def _run_many(task: Callable[..., T], arguments: list[tuple], max_concurrency: int) -> list[BlobTransferResult[T]]:
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be >= 1: {max_concurrency}")
+
+    def run(args: tuple) -> BlobTransferResult[T]:
+        try:
+            return BlobTransferResult(value=task(*args))
+        except Exception as e:
+            return BlobTransferResult(error=e)
+
+    workers = min(max_concurrency, len(arguments))
+    if workers <= 1:
+        return [run(args) for args in arguments]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="blob-relay") as executor:
+        return list(executor.map(run, arguments))
+
 
 __all__ = [
     "BlobRelayError",
     "BlobRelayTimeoutError",
     "BlobRelayClient",
+    "BlobTransferResult",
+    "BlobSource",
 ]
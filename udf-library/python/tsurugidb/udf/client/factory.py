@@ -1,12 +1,15 @@
+from .async_client import AsyncBlobRelayClient
+from .blob_cache import BlobCache, CachingBlobRelayClient, get_default_blob_cache
 from .client import BlobRelayClient
-from .grpc._constants import KEY_TRANSPORT
+from .grpc._constants import KEY_TRANSPORT, KEY_CACHE
 
 import grpc
 import importlib
 import logging
 import re
 
-from typing import ContextManager
+from contextlib import contextmanager
+from typing import AsyncContextManager, ContextManager, Iterator
 
 PATTERN_TRANSPORT = re.compile(r"[a-z][a-z0-9_]*")
 
@@ -14,17 +17,24 @@ PLUGIN_PACKAGE_PREFIX = "tsurugidb.plugin.udf."
 
 PLUGIN_ENTRY_POINT = "create_blob_client"
 
+PLUGIN_ASYNC_ENTRY_POINT = "create_async_blob_client"
+
 DEFAULT_TRANSPORT = "stream"
 
 LOGGER_NAME = 'tsurugidb.udf.blob.factory'
 
 logger = logging.getLogger(LOGGER_NAME)
 
-def create_blob_client(context: grpc.ServicerContext) -> ContextManager[BlobRelayClient]:
+def create_blob_client(
+        context: grpc.ServicerContext,
+        *,
+        cache: BlobCache | bool | None = None) -> ContextManager[BlobRelayClient]:
     """Create a StreamBlobRelayClient from the given gRPC context.
 
     Args:
         context: The gRPC ServicerContext to parse metadata from.
+        cache: The BlobCache to read BLOB/CLOB data through, True to use the process-wide cache,
+            False not to use a cache, or None to follow the 'X-TSURUGI-BLOB-CACHE' metadata value.
 
     Returns:
         A context manager that yields a BlobRelayClient.
@@ -37,6 +47,7 @@ def create_blob_client(context: grpc.ServicerContext) -> ContextManager[BlobRela
         X-TSURUGI-BLOB-SESSION         session ID (integer)
         X-TSURUGI-BLOB-ENDPOINT        gRPC URI (dns:///...)
         X-TSURUGI-BLOB-SECURE          whether to use a secure channel (boolean)
+        X-TSURUGI-BLOB-CACHE           whether to cache downloaded data in the process-wide cache, default false (boolean)
         X-TSURUGI-BLOB-<*>             additional keys for each transport plugin
 
     Note:
@@ -46,6 +57,52 @@ def create_blob_client(context: grpc.ServicerContext) -> ContextManager[BlobRela
         The plugin module must define a 'create_blob_client' function that takes a
         gRPC context (grpc.ServicerContext) and returns a context manager yielding a BlobRelayClient.
     """
+    blob_cache = _resolve_cache(context, cache) # if error occurs, plugin loading is not done
+    client = _load_entry_point(context, PLUGIN_ENTRY_POINT)(context)
+    if blob_cache is None:
+        return client
+    return _with_cache(client, blob_cache)
+
+@contextmanager
+def _with_cache(client: ContextManager[BlobRelayClient], cache: BlobCache) -> Iterator[BlobRelayClient]:
+    with client as c:
+        yield CachingBlobRelayClient(c, cache)
+
+def _resolve_cache(context: grpc.ServicerContext, cache: BlobCache | bool | None) -> BlobCache | None:
+    if cache is None:
+        metadata = {key.lower(): value for key, value in context.invocation_metadata()}
+        value = metadata.get(KEY_CACHE, "false")
+        if value.lower() not in ("true", "false"):
+            raise ValueError(f"invalid {KEY_CACHE.upper()}={value}: must be 'true' or 'false'")
+        cache = value.lower() == "true"
+    if cache is True:
+        return get_default_blob_cache()
+    if cache is False:
+        return None
+    return cache
+
+def create_async_blob_client(context: grpc.ServicerContext | grpc.aio.ServicerContext) -> AsyncContextManager[AsyncBlobRelayClient]:
+    """Create an AsyncBlobRelayClient from the given gRPC context.
+
+    This is the asyncio counterpart of create_blob_client(), and must be used in a running event loop.
+
+    Args:
+        context: The gRPC ServicerContext to parse metadata from.
+
+    Returns:
+        An asynchronous context manager that yields an AsyncBlobRelayClient.
+
+    Raises:
+        ValueError: If the transport plugin is invalid or unsupported.
+
+    Note:
+        The transport plugin module is selected in the same way as create_blob_client(),
+        and must define a 'create_async_blob_client' function that takes a gRPC context
+        and returns an asynchronous context manager yielding an AsyncBlobRelayClient.
+    """
+    return _load_entry_point(context, PLUGIN_ASYNC_ENTRY_POINT)(context)
+
+def _load_entry_point(context: grpc.ServicerContext | grpc.aio.ServicerContext, entry_point: str):
     metadata = {key.lower(): value for key, value in context.invocation_metadata()}
     transport = metadata.get(KEY_TRANSPORT, DEFAULT_TRANSPORT)
     if not PATTERN_TRANSPORT.match(transport):
@@ -58,10 +115,11 @@ def create_blob_client(context: grpc.ServicerContext) -> ContextManager[BlobRela
         logger.debug("finish loading BLOB relay transport module: %s", plugin_path)
     except ImportError as e:
         raise ValueError(f"unsupported BLOB relay transport: {transport}") from e
-    if not hasattr(plugin, PLUGIN_ENTRY_POINT):
-        raise ValueError(f"""BLOB relay transport plugin "{transport}" must have entry-point ({plugin_path}.{PLUGIN_ENTRY_POINT}) """)
-    return getattr(plugin, PLUGIN_ENTRY_POINT)(context)
+    if not hasattr(plugin, entry_point):
+        raise ValueError(f"""BLOB relay transport plugin "{transport}" must have entry-point ({plugin_path}.{entry_point}) """)
+    return getattr(plugin, entry_point)
 
 __all__ = [
     "create_blob_client",
+    "create_async_blob_client",
 ]
@@ -5,6 +5,7 @@ KEY_TRANSPORT = KEY_PREFIX + "transport"
 KEY_SESSION = KEY_PREFIX + "session"
 KEY_ENDPOINT = KEY_PREFIX + "endpoint"
 KEY_SECURE = KEY_PREFIX + "secure"
+KEY_CACHE = KEY_PREFIX + "cache"
 
 DEFAULT_SECURE = False
 
@@ -14,5 +15,6 @@ __all__ = [
     KEY_SESSION,
     KEY_ENDPOINT,
     KEY_SECURE,
+    KEY_CACHE,
     DEFAULT_SECURE,
 ]
\ No newline at end of file
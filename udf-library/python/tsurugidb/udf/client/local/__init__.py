@@ -0,0 +1,25 @@
+from ._local_blob_relay_client import (
+    LocalBlobRelayClient,
+    LINK_MODE_HARDLINK,
+    LINK_MODE_REFLINK,
+    LINK_MODE_COPY,
+    DEFAULT_LINK_MODE,
+)
+from ._factory import (
+    ClientConfig,
+    create_blob_client,
+    create_blob_client_from_config,
+    create_async_blob_client,
+)
+
+__all__ = [
+    "LocalBlobRelayClient",
+    "LINK_MODE_HARDLINK",
+    "LINK_MODE_REFLINK",
+    "LINK_MODE_COPY",
+    "DEFAULT_LINK_MODE",
+    "ClientConfig",
+    "create_blob_client",
+    "create_blob_client_from_config",
+    "create_async_blob_client",
+]
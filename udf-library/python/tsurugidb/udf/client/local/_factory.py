@@ -0,0 +1,149 @@
+from ._local_blob_relay_client import LocalBlobRelayClient, LINK_MODES, DEFAULT_LINK_MODE
+from ..channel_pool import ChannelPool, get_default_channel_pool
+from ..grpc import (
+    blob_relay_local_pb2_grpc as pb_service,
+    blob_relay_streaming_pb2_grpc as pb_stream_service,
+)
+from ..grpc._constants import KEY_PREFIX
+from ..stream import (
+    AsyncStreamBlobRelayClient,
+    ClientConfig as StreamClientConfig,
+    StreamBlobRelayClient,
+    create_async_blob_client as create_async_stream_blob_client,
+)
+
+import grpc
+import logging
+
+from contextlib import contextmanager
+from typing import AsyncContextManager, Iterator, ContextManager
+
+KEY_LOCAL_LINK_MODE = KEY_PREFIX + "local-link-mode"
+
+LOGGER_NAME = 'tsurugidb.udf.blob.local.factory'
+
+logger = logging.getLogger(LOGGER_NAME)
+
+class ClientConfig(StreamClientConfig):
+    """Represents a configuration for LocalBlobRelayClient.
+
+    This also contains the configuration of the streaming client, which is used as the fallback.
+    """
+
+    def __init__(
+            self,
+            session_id: int,
+            endpoint: str,
+            *,
+            link_mode: str = DEFAULT_LINK_MODE,
+            **kwargs):
+        """Creates a new instance.
+
+        Args:
+            session_id: The session ID for the BLOB relay service.
+            endpoint: The gRPC endpoint URI for the BLOB relay service.
+            link_mode: How to place downloaded BLOB files, one of "hardlink", "reflink" or "copy".
+            kwargs: The other options of the streaming client configuration.
+        """
+        super().__init__(session_id, endpoint, **kwargs)
+        self.link_mode = link_mode
+
+    @classmethod
+    def parse(cls, context: grpc.ServicerContext) -> "ClientConfig":
+        """Parses the configuration from the given gRPC context.
+
+        Args:
+            context: The gRPC ServicerContext to parse metadata from.
+
+        Returns:
+            A ClientConfig instance.
+
+        Raises:
+            ValueError: If required metadata is missing or invalid.
+
+        Metadata keys:
+            X-TSURUGI-BLOB-LOCAL-LINK-MODE   how to place downloaded files, default "reflink"
+                                             ("hardlink", "reflink" or "copy")
+            X-TSURUGI-BLOB-<*>               the keys for the streaming client, see tsurugidb.udf.client.stream.ClientConfig
+        """
+        base = StreamClientConfig.parse(context)
+
+        metadata = {key.lower(): value for key, value in context.invocation_metadata()}
+        link_mode = metadata.get(KEY_LOCAL_LINK_MODE, DEFAULT_LINK_MODE).lower()
+        if link_mode not in LINK_MODES:
+            raise ValueError(
+                f"invalid {KEY_LOCAL_LINK_MODE.upper()}={link_mode}: must be one of {', '.join(LINK_MODES)}")
+
+        return ClientConfig(link_mode=link_mode, **vars(base))
+
+def create_blob_client(context: grpc.ServicerContext) -> ContextManager[LocalBlobRelayClient]:
+    """Create a LocalBlobRelayClient from the given gRPC context.
+
+    Args:
+        context: The gRPC ServicerContext to parse metadata from.
+
+    Returns:
+        A context manager that yields a LocalBlobRelayClient.
+
+    See:
+        ClientConfig.parse() for available metadata keys.
+    """
+    config = ClientConfig.parse(context) # if error occurs, channel creation is not done
+    return create_blob_client_from_config(config)
+
+@contextmanager
+def create_blob_client_from_config(
+        config: ClientConfig,
+        *,
+        channel_pool: ChannelPool | None = None) -> Iterator[LocalBlobRelayClient]:
+    """Create a LocalBlobRelayClient from the given ClientConfig.
+
+    The local client and its streaming fallback share the same gRPC channel.
+
+    Args:
+        config: The ClientConfig to use for creating the client.
+        channel_pool: The pool to check out the gRPC channel from, or None to use the process-wide pool.
+    Returns:
+        A context manager that yields a LocalBlobRelayClient.
+    """
+    pool = channel_pool if channel_pool is not None else get_default_channel_pool()
+    with pool.acquire(config.endpoint, secure=config.secure) as channel:
+        fallback = StreamBlobRelayClient(
+            pb_stream_service.BlobRelayStreamingStub(channel),
+            config.session_id,
+            chunk_size=config.chunk_size,
+            adaptive_chunk=config.adaptive_chunk,
+            resume_attempts=config.resume_attempts,
+            range_parallelism=config.range_parallelism,
+            range_size=config.range_size,
+        )
+        client = LocalBlobRelayClient(
+            pb_service.BlobRelayLocalStub(channel),
+            config.session_id,
+            fallback,
+            link_mode=config.link_mode,
+        )
+        yield client
+
+def create_async_blob_client(
+        context: grpc.ServicerContext | grpc.aio.ServicerContext) -> AsyncContextManager[AsyncStreamBlobRelayClient]:
+    """Create an AsyncBlobRelayClient from the given gRPC context.
+
+    The local transport does not provide an asyncio client yet,
+    so this returns the streaming one (the same as the "stream" transport plugin).
+
+    Args:
+        context: The gRPC ServicerContext to parse metadata from.
+
+    Returns:
+        An asynchronous context manager that yields an AsyncStreamBlobRelayClient.
+    """
+    ClientConfig.parse(context) # validate the local transport options as well
+    return create_async_stream_blob_client(context)
+
+__all__ = [
+    "ClientConfig",
+    "create_blob_client",
+    "create_blob_client_from_config",
+    "create_async_blob_client",
+]
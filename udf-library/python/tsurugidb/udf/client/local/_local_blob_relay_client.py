@@ -0,0 +1,292 @@
+# package: tsurugidb.udf.client.local
+
+import grpc
+import logging
+import os
+
+from datetime import timedelta
+from google.protobuf.text_format import MessageToString
+from pathlib import Path
+from typing import BinaryIO, Type, TypeVar
+
+from ... import (
+    BlobRelayClient,
+    BlobRelayError,
+    BlobRelayTimeoutError,
+    BlobReference as UdfBlobReference,
+    ClobReference as UdfClobReference,
+)
+
+from .._files import (
+    LINK_MODE_HARDLINK,
+    LINK_MODE_REFLINK,
+    LINK_MODE_COPY,
+    LINK_MODES,
+    place_file,
+)
+from ..client import BlobSource
+from ..grpc import (
+    blob_relay_local_pb2 as pb_message,
+    blob_relay_local_pb2_grpc as pb_service,
+    blob_reference_pb2 as pb_model,
+)
+
+T = TypeVar("T", bound=UdfBlobReference | UdfClobReference)
+
+DEFAULT_LINK_MODE = LINK_MODE_REFLINK
+
+# status codes which mean the relay service cannot exchange files with this process
+_FALLBACK_CODES = frozenset((
+    grpc.StatusCode.UNIMPLEMENTED,
+    grpc.StatusCode.FAILED_PRECONDITION,
+))
+
+# on upload, the relay service also reports the files it cannot see from its side
+_PUT_FALLBACK_CODES = _FALLBACK_CODES | frozenset((
+    grpc.StatusCode.NOT_FOUND,
+    grpc.StatusCode.PERMISSION_DENIED,
+))
+
+LOGGER_NAME = 'tsurugidb.udf.blob.local.client'
+
+logger = logging.getLogger(LOGGER_NAME)
+
+class LocalBlobRelayClient(BlobRelayClient):
+    """An implementation of BlobRelayClient that exchanges BLOB file paths via the BlobRelayLocal service.
+
+    This is intended for UDF servers running on the same host as Tsurugi:
+    the BLOB data itself is not sent through gRPC, but is linked or copied between the files on both sides.
+    If the files cannot be shared (e.g. the UDF server runs in another host or container),
+    this falls back to the given `fallback` client for the rest of its lifetime.
+    """
+
+    __API_VERSION = 1
+
+    def __init__(
+            self,
+            stub: pb_service.BlobRelayLocalStub,
+            session_id: int,
+            fallback: BlobRelayClient,
+            *,
+            link_mode: str = DEFAULT_LINK_MODE):
+        """Creates a new instance.
+
+        Args:
+            stub: The gRPC stub to use for communication with the BLOB relay service.
+            session_id: The session ID for the BLOB relay service.
+            fallback: The client to use if the BLOB files cannot be shared with the BLOB relay service.
+            link_mode: How to place downloaded BLOB files, one of "hardlink", "reflink" or "copy".
+                Default is "reflink". Files placed by "hardlink" share their content with the
+                BLOB relay service, so they must be treated as read-only.
+
+        Raises:
+            ValueError: If `link_mode` is not supported.
+        """
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"unsupported link mode: {link_mode} (must be one of {', '.join(LINK_MODES)})")
+        self.__stub = stub
+        self.__session_id = session_id
+        self.__fallback = fallback
+        self.__link_mode = link_mode
+        self.__local_available = True
+
+    @classmethod
+    def api_version(cls) -> int:
+        """Returns the API version of this client implementation.
+
+        Returns:
+            The API version as an integer.
+        """
+        return cls.__API_VERSION
+
+    @property
+    def local_available(self) -> bool:
+        """Whether this client still exchanges BLOB files directly, instead of using the fallback client."""
+        return self.__local_available
+
+    def __disable_local(self, reason: object) -> None:
+        if self.__local_available:
+            logger.debug("fall back to the streaming transport: reason=%s", reason)
+        self.__local_available = False
+
+    def __get_path(self, ref: pb_model.BlobReference, timeout: float | None) -> Path | None:
+        """Returns the path of the BLOB file provided by the relay service, or None to fall back."""
+        req = pb_message.GetLocalRequest(
+            api_version=self.api_version(),
+            session_id=self.__session_id,
+            blob=ref,
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "start getting BLOB file: request=%s, timeout=%s",
+                MessageToString(req, as_one_line=True),
+                timeout)
+        try:
+            resp = self.__stub.Get(req, timeout=timeout)
+        except grpc.RpcError as e:
+            if e.code() in _FALLBACK_CODES:
+                self.__disable_local(e.code())
+                return None
+            if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                raise BlobRelayTimeoutError("download operation timed out") from e
+            raise BlobRelayError(f"download failed: {e}") from e
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "finish getting BLOB file: request=%s, response=%s",
+                MessageToString(req, as_one_line=True),
+                MessageToString(resp, as_one_line=True))
+        if not resp.HasField("data") or not resp.data.path:
+            raise BlobRelayError("invalid response: missing data")
+        path = Path(resp.data.path)
+        if not os.access(path, os.R_OK):
+            # the file lives in another filesystem namespace
+            self.__disable_local(f"inaccessible file: {path}")
+            return None
+        return path
+
+    def __download_internal(
+            self,
+            ref: pb_model.BlobReference,
+            destination: Path,
+            timeout: float | None) -> bool:
+        """Places the BLOB file at `destination`, and returns False if the fallback client should be used."""
+        if destination.exists():
+            raise FileExistsError(f"destination file already exists: {destination}")
+        source = self.__get_path(ref, timeout) if self.__local_available else None
+        if source is None:
+            return False
+        place_file(source, destination, self.__link_mode)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("finish placing BLOB file: source=%s, destination=%s", source, destination)
+        return True
+
+    def __open_internal(self, ref: pb_model.BlobReference, timeout: float | None) -> BinaryIO | None:
+        """Opens the BLOB file, and returns None if the fallback client should be used."""
+        source = self.__get_path(ref, timeout) if self.__local_available else None
+        if source is None:
+            return None
+        try:
+            return source.open("rb")
+        except OSError as e:
+            self.__disable_local(e)
+            return None
+
+    def __upload_internal(self, source: Path, timeout: float | None) -> pb_model.BlobReference | None:
+        """Registers the file as a BLOB, and returns None if the fallback client should be used."""
+        if not source.exists():
+            raise FileNotFoundError(f"source file does not exist: {source}")
+        if not self.__local_available:
+            return None
+
+        req = pb_message.PutLocalRequest(
+            api_version=self.api_version(),
+            session_id=self.__session_id,
+            data=pb_message.BlobFile(path=str(source.resolve())),
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "start putting BLOB file: request=%s, timeout=%s",
+                MessageToString(req, as_one_line=True),
+                timeout)
+        try:
+            resp = self.__stub.Put(req, timeout=timeout)
+        except grpc.RpcError as e:
+            if e.code() in _PUT_FALLBACK_CODES:
+                self.__disable_local(e.code())
+                return None
+            if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                raise BlobRelayTimeoutError("upload operation timed out") from e
+            raise BlobRelayError(f"upload failed: {e}") from e
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "finish putting BLOB file: request=%s, response=%s",
+                MessageToString(req, as_one_line=True),
+                MessageToString(resp, as_one_line=True))
+        return resp.blob
+
+    def __to_pb_reference(self, ref: UdfBlobReference | UdfClobReference) -> pb_model.BlobReference:
+        return pb_model.BlobReference(
+            storage_id=ref.storage_id,
+            object_id=ref.object_id,
+            tag=ref.tag,
+            # pb_reference has no provisioned field since relay service does not use it for now
+        )
+
+    def __from_pb_reference(self, ref: pb_model.BlobReference, return_class: Type[T]) -> T:
+        return return_class(
+            storage_id=ref.storage_id,
+            object_id=ref.object_id,
+            tag=ref.tag,
+            provisioned=False,  # provisioned field is not relevant for relay service
+        )
+
+    def __to_seconds(self, timeout: timedelta | int | float | None) -> float | None:
+        if timeout is None:
+            return None
+        if isinstance(timeout, timedelta):
+            return timeout.total_seconds()
+        return float(timeout)
+
+    def download_blob(self, ref: UdfBlobReference, destination: Path, *, timeout: timedelta | None = None) -> None:
+        if not self.__download_internal(self.__to_pb_reference(ref), destination, self.__to_seconds(timeout)):
+            self.__fallback.download_blob(ref, destination, timeout=timeout)
+
+    def download_clob(self, ref: UdfClobReference, destination: Path, *, timeout: timedelta | None = None) -> None:
+        if not self.__download_internal(self.__to_pb_reference(ref), destination, self.__to_seconds(timeout)):
+            self.__fallback.download_clob(ref, destination, timeout=timeout)
+
+    def upload_blob(self, source: Path, *, timeout: timedelta | None = None) -> UdfBlobReference:
+        ref_pb = self.__upload_internal(source, self.__to_seconds(timeout))
+        if ref_pb is None:
+            return self.__fallback.upload_blob(source, timeout=timeout)
+        return self.__from_pb_reference(ref_pb, UdfBlobReference)
+
+    def upload_clob(self, source: Path, *, timeout: timedelta | None = None) -> UdfClobReference:
+        ref_pb = self.__upload_internal(source, self.__to_seconds(timeout))
+        if ref_pb is None:
+            return self.__fallback.upload_clob(source, timeout=timeout)
+        return self.__from_pb_reference(ref_pb, UdfClobReference)
+
+    def open_blob(self, ref: UdfBlobReference, *, timeout: timedelta | None = None) -> BinaryIO:
+        """Open BLOB data identified by `ref` as a readable binary stream.
+
+        If the BLOB file is shared with the relay service, this opens the file itself without copying,
+        so that it can also be memory-mapped via `mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)`.
+
+        See BlobRelayClient.open_blob() for details.
+        """
+        fp = self.__open_internal(self.__to_pb_reference(ref), self.__to_seconds(timeout))
+        if fp is None:
+            return self.__fallback.open_blob(ref, timeout=timeout)
+        return fp
+
+    def open_clob(self, ref: UdfClobReference, *, timeout: timedelta | None = None) -> BinaryIO:
+        fp = self.__open_internal(self.__to_pb_reference(ref), self.__to_seconds(timeout))
+        if fp is None:
+            return self.__fallback.open_clob(ref, timeout=timeout)
+        return fp
+
+    def upload_blob_from(
+            self,
+            data: BlobSource,
+            *,
+            size: int | None = None,
+            timeout: timedelta | None = None) -> UdfBlobReference:
+        # in-memory data has no file to share, so stream it directly
+        return self.__fallback.upload_blob_from(data, size=size, timeout=timeout)
+
+    def upload_clob_from(
+            self,
+            data: BlobSource,
+            *,
+            size: int | None = None,
+            timeout: timedelta | None = None) -> UdfClobReference:
+        return self.__fallback.upload_clob_from(data, size=size, timeout=timeout)
+
+__all__ = [
+    "LocalBlobRelayClient",
+    "LINK_MODE_HARDLINK",
+    "LINK_MODE_REFLINK",
+    "LINK_MODE_COPY",
+    "DEFAULT_LINK_MODE",
+]
@@ -1,9 +1,24 @@
+from ._chunk_sizer import AdaptiveChunkSizer, DEFAULT_MAX_MESSAGE_SIZE
 from ._stream_blob_relay_client import StreamBlobRelayClient
-from ._factory import ClientConfig, create_blob_client, create_blob_client_from_config
+from ._stream_blob_reader import StreamBlobReader
+from ._async_stream_blob_relay_client import AsyncStreamBlobRelayClient
+from ._factory import (
+    ClientConfig,
+    create_blob_client,
+    create_blob_client_from_config,
+    create_async_blob_client,
+    create_async_blob_client_from_config,
+)
 
 __all__ = [
+    "AdaptiveChunkSizer",
+    "DEFAULT_MAX_MESSAGE_SIZE",
     "StreamBlobRelayClient",
+    "StreamBlobReader",
+    "AsyncStreamBlobRelayClient",
     "ClientConfig",
     "create_blob_client",
     "create_blob_client_from_config",
+    "create_async_blob_client",
+    "create_async_blob_client_from_config",
 ]
@@ -0,0 +1,247 @@
+# package: tsurugidb.udf.client.stream
+
+import grpc
+import logging
+import time
+
+from contextlib import suppress
+from datetime import timedelta
+from google.protobuf.text_format import MessageToString
+from pathlib import Path
+from typing import AsyncIterator, Type, TypeVar
+
+from ... import (
+    AsyncBlobRelayClient,
+    BlobRelayError,
+    BlobRelayTimeoutError,
+    BlobReference as UdfBlobReference,
+    ClobReference as UdfClobReference,
+)
+
+from ..grpc import (
+    blob_relay_streaming_pb2 as pb_message,
+    blob_relay_streaming_pb2_grpc as pb_service,
+    blob_reference_pb2 as pb_model,
+)
+
+from ._chunk_sizer import AdaptiveChunkSizer, DEFAULT_MAX_MESSAGE_SIZE
+from ._stream_blob_relay_client import StreamBlobRelayClient
+
+T = TypeVar("T", bound=UdfBlobReference | UdfClobReference)
+
+LOGGER_NAME = 'tsurugidb.udf.blob.stream.async_client'
+
+logger = logging.getLogger(LOGGER_NAME)
+
+class AsyncStreamBlobRelayClient(AsyncBlobRelayClient):
+    """An implementation of AsyncBlobRelayClient that exchanges BLOBs via grpc.aio streaming."""
+
+    def __init__(
+            self,
+            stub: pb_service.BlobRelayStreamingStub,
+            session_id: int,
+            *,
+            chunk_size: int = 1_048_576,
+            adaptive_chunk: bool = False,
+            max_message_size: int = DEFAULT_MAX_MESSAGE_SIZE):
+        """Creates a new instance.
+
+        Args:
+            stub: The gRPC stub bound to a grpc.aio channel to use for communication with the BLOB relay service.
+            session_id: The session ID for the BLOB relay service.
+            chunk_size: The size of each chunk to use when streaming data. Default is 1,048,576 bytes (1 MB).
+            adaptive_chunk: Whether to adjust the chunk size of file uploads to the observed throughput,
+                starting from `chunk_size`.
+            max_message_size: The maximum size of gRPC messages accepted by the relay service,
+                which bounds the adaptive chunk size.
+        """
+        self.__stub = stub
+        self.__session_id = session_id
+        self.__chunk_size = chunk_size
+        self.__adaptive_chunk = adaptive_chunk
+        self.__max_message_size = max_message_size
+
+    @classmethod
+    def api_version(cls) -> int:
+        """Returns the API version of this client implementation.
+
+        Returns:
+            The API version as an integer.
+        """
+        return StreamBlobRelayClient.api_version()
+
+    async def __download_internal(
+            self,
+            ref: pb_model.BlobReference,
+            destination: Path,
+            timeout: float | None = None) -> None:
+        if destination.exists():
+            raise FileExistsError(f"destination file already exists: {destination}")
+
+        req = pb_message.GetStreamingRequest(
+            api_version=self.api_version(),
+            session_id=self.__session_id,
+            blob=ref,
+        )
+        file_staging = False
+        call = None
+        try:
+            # NOTE: local file writes are short compared to the network round trips, so they run on the event loop
+            with destination.open("xb") as fp:
+                file_staging = True
+                expected_size: int | None = None
+                saw_metadata = False
+                actual_size = 0
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "start downloading BLOB: request=%s, timeout=%s",
+                        MessageToString(req, as_one_line=True),
+                        timeout)
+                call = self.__stub.Get(req, timeout=timeout)
+                async for resp in call:
+                    if not saw_metadata:
+                        # first time - receive metadata
+                        saw_metadata = True
+                        if not resp.HasField("metadata"):
+                            raise BlobRelayError("invalid response: missing metadata")
+                        metadata = resp.metadata
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(
+                                "stream downloading BLOB metadata: %s",
+                                MessageToString(metadata, as_one_line=True))
+                        if metadata.HasField("blob_size"):
+                            expected_size = metadata.blob_size
+                    # rest times - receive chunks
+                    else:
+                        if not resp.HasField("chunk"):
+                            raise BlobRelayError("invalid response: missing chunk")
+                        chunk = resp.chunk
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("stream downloading BLOB chunk: size=%d", len(chunk))
+                        fp.write(chunk)
+                        actual_size += len(chunk)
+                call = None
+
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "finish downloading BLOB: request=%s, timeout=%s, actual_size=%d",
+                        MessageToString(req, as_one_line=True),
+                        timeout,
+                        actual_size)
+
+                if expected_size is not None and actual_size != expected_size:
+                    raise BlobRelayError(f"download size mismatch: expected {expected_size}, got {actual_size}")
+            file_staging = False
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                raise BlobRelayTimeoutError("download operation timed out") from e
+            raise BlobRelayError(f"download failed: {e}") from e
+        finally:
+            if call is not None:
+                # stopped before the end of stream (error or task cancellation)
+                call.cancel()
+            if file_staging and destination.exists():
+                with suppress(Exception):
+                    destination.unlink()
+
+    def __new_chunk_sizer(self) -> AdaptiveChunkSizer | None:
+        if not self.__adaptive_chunk:
+            return None
+        return AdaptiveChunkSizer(self.__chunk_size, max_message_size=self.__max_message_size)
+
+    async def __upload_internal(
+            self,
+            source: Path,
+            timeout: float | None = None) -> pb_model.BlobReference:
+        if not source.exists():
+            raise FileNotFoundError(f"source file does not exist: {source}")
+
+        try:
+            blob_size = source.stat().st_size
+
+            async def gen() -> AsyncIterator[pb_message.PutStreamingRequest]:
+                # first time - send metadata
+                metadata = pb_message.PutStreamingRequest.Metadata(
+                    api_version=self.api_version(),
+                    session_id=self.__session_id,
+                    blob_size=blob_size,
+                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "stream uploading BLOB metadata: %s",
+                        MessageToString(metadata, as_one_line=True))
+                yield pb_message.PutStreamingRequest(metadata=metadata)
+                # rest times - send chunks
+                sizer = self.__new_chunk_sizer()
+                with source.open("rb") as fp:
+                    while True:
+                        started = time.perf_counter()
+                        buf = fp.read(sizer.size if sizer is not None else self.__chunk_size)
+                        if not buf:
+                            break
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("stream uploading BLOB chunk: size=%d", len(buf))
+                        yield pb_message.PutStreamingRequest(chunk=buf)
+                        if sizer is not None:
+                            sizer.observe(len(buf), time.perf_counter() - started)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("start uploading BLOB: source=%s, size=%d, timeout=%s", source, blob_size, timeout)
+            resp = await self.__stub.Put(gen(), timeout=timeout)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "finish uploading BLOB: source=%s, size=%d, timeout=%s, response=%s",
+                    source,
+                    blob_size,
+                    timeout,
+                    MessageToString(resp, as_one_line=True))
+
+            return resp.blob
+
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                raise BlobRelayTimeoutError("upload operation timed out") from e
+            raise BlobRelayError(f"upload failed: {e}") from e
+
+    def __to_pb_reference(self, ref: UdfBlobReference | UdfClobReference) -> pb_model.BlobReference:
+        return pb_model.BlobReference(
+            storage_id=ref.storage_id,
+            object_id=ref.object_id,
+            tag=ref.tag,
+            # pb_reference has no provisioned field since relay service does not use it for now
+        )
+
+    def __from_pb_reference(self, ref: pb_model.BlobReference, return_class: Type[T]) -> T:
+        return return_class(
+            storage_id=ref.storage_id,
+            object_id=ref.object_id,
+            tag=ref.tag,
+            provisioned=False,  # provisioned field is not relevant for relay service
+        )
+
+    def __to_seconds(self, timeout: timedelta | int | float | None) -> float | None:
+        if timeout is None:
+            return None
+        if isinstance(timeout, timedelta):
+            return timeout.total_seconds()
+        return float(timeout)
+
+    async def download_blob(self, ref: UdfBlobReference, destination: Path, *, timeout: timedelta | None = None) -> None:
+        ref_pb = self.__to_pb_reference(ref)
+        return await self.__download_internal(ref_pb, destination, timeout=self.__to_seconds(timeout))
+
+    async def download_clob(self, ref: UdfClobReference, destination: Path, *, timeout: timedelta | None = None) -> None:
+        ref_pb = self.__to_pb_reference(ref)
+        return await self.__download_internal(ref_pb, destination, timeout=self.__to_seconds(timeout))
+
+    async def upload_blob(self, source: Path, *, timeout: timedelta | None = None) -> UdfBlobReference:
+        ref_pb = await self.__upload_internal(source, timeout=self.__to_seconds(timeout))
+        return self.__from_pb_reference(ref_pb, UdfBlobReference)
+
+    async def upload_clob(self, source: Path, *, timeout: timedelta | None = None) -> UdfClobReference:
+        ref_pb = await self.__upload_internal(source, timeout=self.__to_seconds(timeout))
+        return self.__from_pb_reference(ref_pb, UdfClobReference)
+
+__all__ = [
+    "AsyncStreamBlobRelayClient",
+]
@@ -0,0 +1,112 @@
+# package: tsurugidb.udf.client.stream
+
+DEFAULT_MAX_MESSAGE_SIZE = 4 * 1024 * 1024
+"""The default maximum size of gRPC messages accepted by the relay service (the gRPC default)."""
+
+MIN_ADAPTIVE_CHUNK_SIZE = 64 * 1024
+
+# room for the message envelope of PutStreamingRequest around the chunk
+_MESSAGE_OVERHEAD = 1024
+
+# the number of chunks to measure the throughput of each size, to smooth out the jitter of single chunks
+_WINDOW_CHUNKS = 4
+
+# start probing again if the throughput of the settled size changes by this ratio
+_REPROBE_RATIO = 2.0
+
+class AdaptiveChunkSizer:
+    """Chooses the size of the next upload chunk from the throughput of the previous ones.
+
+    This is a hill climber: it doubles the size while the throughput measured over a few chunks improves,
+    and then goes back to the best size and stays there.
+    Larger chunks are not always faster, because a chunk is read and sent one after another.
+    The size is bounded by the largest chunk that fits in a gRPC message.
+    If the throughput of the settled size halves or doubles (e.g. the network becomes congested or free),
+    this starts probing again toward smaller or larger sizes respectively.
+    """
+
+    def __init__(
+            self,
+            initial_size: int = MIN_ADAPTIVE_CHUNK_SIZE,
+            *,
+            max_message_size: int = DEFAULT_MAX_MESSAGE_SIZE):
+        """Creates a new instance.
+
+        Args:
+            initial_size: The size of the first chunk.
+            max_message_size: The maximum size of gRPC messages accepted by the relay service.
+        """
+        self.__min_size = min(MIN_ADAPTIVE_CHUNK_SIZE, max(1, initial_size))
+        self.__max_size = max(self.__min_size, max_message_size - _MESSAGE_OVERHEAD)
+        self.__size = min(max(initial_size, self.__min_size), self.__max_size)
+        self.__direction = 1
+        self.__last_rate: float | None = None
+        self.__settled_rate: float | None = None
+        self.__window_bytes = 0
+        self.__window_seconds = 0.0
+        self.__window_chunks = 0
+
+    @property
+    def size(self) -> int:
+        """The size of the next chunk."""
+        return self.__size
+
+    def observe(self, nbytes: int, seconds: float) -> None:
+        """Records that a chunk of `nbytes` was read and sent in `seconds`.
+
+        Args:
+            nbytes: The size of the chunk.
+            seconds: The elapsed time to read and send the chunk.
+        """
+        if nbytes < self.__size:
+            # the last chunk is partial, so its rate is not comparable
+            return
+        self.__window_bytes += nbytes
+        self.__window_seconds += seconds
+        self.__window_chunks += 1
+        if self.__window_chunks < _WINDOW_CHUNKS:
+            return
+        rate = self.__window_bytes / max(self.__window_seconds, 1e-9)
+        self.__window_bytes = 0
+        self.__window_seconds = 0.0
+        self.__window_chunks = 0
+
+        if self.__settled_rate is not None:
+            if rate * _REPROBE_RATIO < self.__settled_rate:
+                self.__probe(-1, rate)
+            elif rate > self.__settled_rate * _REPROBE_RATIO:
+                self.__probe(1, rate)
+            return
+
+        if self.__last_rate is None or rate >= self.__last_rate:
+            # still improving
+            self.__last_rate = rate
+            if not self.__step(self.__direction):
+                self.__settled_rate = rate
+        else:
+            # the previous size was better
+            self.__step(-self.__direction)
+            self.__settled_rate = self.__last_rate
+
+    def __probe(self, direction: int, rate: float) -> None:
+        self.__settled_rate = None
+        self.__direction = direction
+        self.__last_rate = rate
+        if not self.__step(direction):
+            self.__settled_rate = rate
+
+    def __step(self, direction: int) -> bool:
+        if direction > 0:
+            size = min(self.__size * 2, self.__max_size)
+        else:
+            size = max(self.__size // 2, self.__min_size)
+        if size == self.__size:
+            return False
+        self.__size = size
+        return True
+
+__all__ = [
+    "AdaptiveChunkSizer",
+    "DEFAULT_MAX_MESSAGE_SIZE",
+    "MIN_ADAPTIVE_CHUNK_SIZE",
+]
@@ -1,4 +1,7 @@
-from ._stream_blob_relay_client import StreamBlobRelayClient
+from ._stream_blob_relay_client import StreamBlobRelayClient, DEFAULT_RESUME_ATTEMPTS, DEFAULT_RANGE_SIZE
+from ._async_stream_blob_relay_client import AsyncStreamBlobRelayClient
+from ._chunk_sizer import MIN_ADAPTIVE_CHUNK_SIZE
+from ..channel_pool import ChannelPool, get_default_channel_pool
 from ..grpc import blob_relay_streaming_pb2_grpc as pb_service
 from ..grpc._constants import (
     KEY_PREFIX,
@@ -11,13 +14,21 @@ from ..grpc._constants import (
 import grpc
 import logging
 
-from contextlib import contextmanager
-from typing import Iterator, ContextManager
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, AsyncContextManager, Iterator, ContextManager
 
 KEY_STREAM_CHUNK_SIZE = KEY_PREFIX + "stream-chunk-size"
 
 DEFAULT_STREAM_CHUNK_SIZE = 1_048_576
 
+CHUNK_SIZE_AUTO = "auto"
+
+KEY_STREAM_RESUME_ATTEMPTS = KEY_PREFIX + "stream-resume-attempts"
+
+KEY_STREAM_RANGE_PARALLELISM = KEY_PREFIX + "stream-range-parallelism"
+
+KEY_STREAM_RANGE_SIZE = KEY_PREFIX + "stream-range-size"
+
 LOGGER_NAME = 'tsurugidb.udf.blob.stream.factory'
 
 logger = logging.getLogger(LOGGER_NAME)
@@ -31,7 +42,11 @@ class ClientConfig:
             endpoint: str,
             *,
             secure: bool = DEFAULT_SECURE,
-            chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE):
+            chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+            adaptive_chunk: bool = False,
+            resume_attempts: int = DEFAULT_RESUME_ATTEMPTS,
+            range_parallelism: int = 1,
+            range_size: int = DEFAULT_RANGE_SIZE):
         """Creates a new instance.
 
         Args:
@@ -39,11 +54,19 @@ class ClientConfig:
             endpoint: The gRPC endpoint URI for the BLOB relay service.
             secure: Whether to use a secure gRPC channel.
             chunk_size: The size of each chunk to use when streaming data. Default is 1,048,576 bytes (1 MB).
+            adaptive_chunk: Whether to adjust the chunk size of file uploads to the observed throughput.
+            resume_attempts: The maximum number of times to resume a broken download.
+            range_parallelism: The number of ranges of a BLOB to download in parallel.
+            range_size: The size of each range for parallel downloads.
         """
         self.session_id = session_id
         self.endpoint = endpoint
         self.secure = secure
         self.chunk_size = chunk_size
+        self.adaptive_chunk = adaptive_chunk
+        self.resume_attempts = resume_attempts
+        self.range_parallelism = range_parallelism
+        self.range_size = range_size
 
     @classmethod
     def parse(cls, context: grpc.ServicerContext) -> "ClientConfig":
@@ -62,7 +85,11 @@ class ClientConfig:
             X-TSURUGI-BLOB-SESSION           session ID (integer)
             X-TSURUGI-BLOB-ENDPOINT          gRPC URI (dns:///...)
             X-TSURUGI-BLOB-SECURE            whether to use a secure channel (boolean)
-            X-TSURUGI-BLOB-STREAM-CHUNK-SIZE chunk size for uploading BLOB data, default 1048576 (integer)
+            X-TSURUGI-BLOB-STREAM-CHUNK-SIZE chunk size for uploading BLOB data, default 1048576 (integer),
+                                             or "auto" to adjust it to the observed throughput
+            X-TSURUGI-BLOB-STREAM-RESUME-ATTEMPTS   max times to resume a broken download, default 3 (integer)
+            X-TSURUGI-BLOB-STREAM-RANGE-PARALLELISM number of ranges to download in parallel, default 1 (integer)
+            X-TSURUGI-BLOB-STREAM-RANGE-SIZE        size of each parallel range, default 67108864 (integer)
             X-TSURUGI-BLOB-STREAM-DEADLINE   optional deadline in seconds (integer)
         """
 
@@ -87,20 +114,42 @@ class ClientConfig:
         else:
             secure = DEFAULT_SECURE
 
-        if chunk_size_str:
+        adaptive_chunk = False
+        if chunk_size_str and chunk_size_str.lower() == CHUNK_SIZE_AUTO:
+            # start from small chunks, which are faster for small BLOBs
+            adaptive_chunk = True
+            chunk_size = MIN_ADAPTIVE_CHUNK_SIZE
+        elif chunk_size_str:
             if not chunk_size_str.isdigit():
-                raise ValueError(f"invalid {KEY_STREAM_CHUNK_SIZE.upper()}={chunk_size_str}: must be an integer")
+                raise ValueError(
+                    f"invalid {KEY_STREAM_CHUNK_SIZE.upper()}={chunk_size_str}: must be an integer or '{CHUNK_SIZE_AUTO}'")
             chunk_size = int(chunk_size_str)
         else:
             chunk_size = DEFAULT_STREAM_CHUNK_SIZE
 
+        resume_attempts = _parse_int(metadata, KEY_STREAM_RESUME_ATTEMPTS, DEFAULT_RESUME_ATTEMPTS)
+        range_parallelism = _parse_int(metadata, KEY_STREAM_RANGE_PARALLELISM, 1, minimum=1)
+        range_size = _parse_int(metadata, KEY_STREAM_RANGE_SIZE, DEFAULT_RANGE_SIZE, minimum=1)
+
         return ClientConfig(
             session_id=session_id,
             endpoint=endpoint,
             secure=secure,
             chunk_size=chunk_size,
+            adaptive_chunk=adaptive_chunk,
+            resume_attempts=resume_attempts,
+            range_parallelism=range_parallelism,
+            range_size=range_size,
         )
 
+def _parse_int(metadata: dict[str, str], key: str, default: int, *, minimum: int = 0) -> int:
+    value = metadata.get(key)
+    if not value:
+        return default
+    if not value.isdigit() or int(value) < minimum:
+        raise ValueError(f"invalid {key.upper()}={value}: must be an integer >= {minimum}")
+    return int(value)
+
 def create_blob_client(context: grpc.ServicerContext) -> ContextManager[StreamBlobRelayClient]:
     """Create a StreamBlobRelayClient from the given gRPC context.
 
@@ -117,37 +166,86 @@ def create_blob_client(context: grpc.ServicerContext) -> ContextManager[StreamBl
     return create_blob_client_from_config(config)
 
 @contextmanager
-def create_blob_client_from_config(config: ClientConfig) -> Iterator[StreamBlobRelayClient]:
+def create_blob_client_from_config(
+        config: ClientConfig,
+        *,
+        channel_pool: ChannelPool | None = None) -> Iterator[StreamBlobRelayClient]:
     """Create a StreamBlobRelayClient from the given ClientConfig.
 
     Args:
         config: The ClientConfig to use for creating the client.
+        channel_pool: The pool to check out the gRPC channel from, or None to use the process-wide pool.
     Returns:
         A context manager that yields a StreamBlobRelayClient.
     """
-    logger.debug("start creating gRPC channel: target=%s, secure=%s", config.endpoint, config.secure)
+    pool = channel_pool if channel_pool is not None else get_default_channel_pool()
+    with pool.acquire(config.endpoint, secure=config.secure) as channel:
+        stub = pb_service.BlobRelayStreamingStub(channel)
+        client = StreamBlobRelayClient(
+            stub,
+            config.session_id,
+            chunk_size=config.chunk_size,
+            adaptive_chunk=config.adaptive_chunk,
+            resume_attempts=config.resume_attempts,
+            range_parallelism=config.range_parallelism,
+            range_size=config.range_size,
+        )
+        yield client
+
+def create_async_blob_client(
+        context: grpc.ServicerContext | grpc.aio.ServicerContext) -> AsyncContextManager[AsyncStreamBlobRelayClient]:
+    """Create an AsyncStreamBlobRelayClient from the given gRPC context.
+
+    Args:
+        context: The gRPC ServicerContext to parse metadata from.
+
+    Returns:
+        An asynchronous context manager that yields an AsyncStreamBlobRelayClient.
+
+    See:
+        ClientConfig.parse() for available metadata keys.
+    """
+    config = ClientConfig.parse(context) # if error occurs, channel creation is not done
+    return create_async_blob_client_from_config(config)
+
+@asynccontextmanager
+async def create_async_blob_client_from_config(config: ClientConfig) -> AsyncIterator[AsyncStreamBlobRelayClient]:
+    """Create an AsyncStreamBlobRelayClient from the given ClientConfig.
+
+    The grpc.aio channel belongs to the running event loop, so it is created for each client
+    instead of being taken from the channel pool.
+
+    Args:
+        config: The ClientConfig to use for creating the client.
+    Returns:
+        An asynchronous context manager that yields an AsyncStreamBlobRelayClient.
+    """
+    logger.debug("start creating gRPC aio channel: target=%s, secure=%s", config.endpoint, config.secure)
     if config.secure:
         credentials = grpc.ssl_channel_credentials()
-        channel = grpc.secure_channel(config.endpoint, credentials)
+        channel = grpc.aio.secure_channel(config.endpoint, credentials)
     else:
-        channel = grpc.insecure_channel(config.endpoint)
-    logger.debug("finish creating gRPC channel: target=%s, secure=%s", config.endpoint, config.secure)
+        channel = grpc.aio.insecure_channel(config.endpoint)
+    logger.debug("finish creating gRPC aio channel: target=%s, secure=%s", config.endpoint, config.secure)
 
     try:
         stub = pb_service.BlobRelayStreamingStub(channel)
-        client = StreamBlobRelayClient(
+        client = AsyncStreamBlobRelayClient(
             stub,
             config.session_id,
             chunk_size=config.chunk_size,
+            adaptive_chunk=config.adaptive_chunk,
         )
         yield client
     finally:
-        logger.debug("start closing gRPC channel: target=%s, secure=%s", config.endpoint, config.secure)
-        channel.close()
-        logger.debug("finish closing gRPC channel: target=%s, secure=%s", config.endpoint, config.secure)
+        logger.debug("start closing gRPC aio channel: target=%s, secure=%s", config.endpoint, config.secure)
+        await channel.close()
+        logger.debug("finish closing gRPC aio channel: target=%s, secure=%s", config.endpoint, config.secure)
 
 __all__ = [
     "ClientConfig",
     "create_blob_client",
     "create_blob_client_from_config",
+    "create_async_blob_client",
+    "create_async_blob_client_from_config",
 ]
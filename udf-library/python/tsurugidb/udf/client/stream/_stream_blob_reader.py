@@ -0,0 +1,159 @@
+# package: tsurugidb.udf.client.stream
+
+import grpc
+import io
+import logging
+
+from typing import Iterator
+
+from ... import (
+    BlobRelayError,
+    BlobRelayTimeoutError,
+)
+
+from ..grpc import (
+    blob_relay_streaming_pb2 as pb_message,
+)
+
+LOGGER_NAME = 'tsurugidb.udf.blob.stream.reader'
+
+logger = logging.getLogger(LOGGER_NAME)
+
+class StreamBlobReader(io.RawIOBase):
+    """A readable binary stream over the chunks of a BLOB download stream.
+
+    This is returned from StreamBlobRelayClient.open_blob() and open_clob().
+    The data is read directly from the gRPC response chunks without staging it to a file,
+    and the size announced in the response metadata is checked when the end of the stream is reached.
+    Closing the reader before the end of the stream cancels the download.
+    """
+
+    def __init__(self, responses: Iterator[pb_message.GetStreamingResponse]):
+        """Creates a new instance, and receives the metadata of the stream.
+
+        Args:
+            responses: The response stream of BlobRelayStreaming.Get.
+
+        Raises:
+            BlobRelayError: If the response metadata is missing.
+            BlobRelayError: If there is an error during communication.
+            BlobRelayTimeoutError: If the operation times out.
+        """
+        super().__init__()
+        self.__responses = responses
+        self.__expected_size: int | None = None
+        self.__actual_size = 0
+        self.__chunk = b""
+        self.__offset = 0
+        self.__eof = False
+        try:
+            metadata = self.__next()
+            if metadata is None or not metadata.HasField("metadata"):
+                raise BlobRelayError("invalid response: missing metadata")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("stream opening BLOB metadata: blob_size=%s", metadata.metadata.blob_size)
+            if metadata.metadata.HasField("blob_size"):
+                self.__expected_size = metadata.metadata.blob_size
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def size(self) -> int | None:
+        """The BLOB size announced by the relay service, or None if it is unknown."""
+        return self.__expected_size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        if not self.__fill():
+            return 0
+        n = min(view.nbytes, len(self.__chunk) - self.__offset)
+        view[:n] = self.__chunk[self.__offset:self.__offset + n]
+        self.__offset += n
+        return n
+
+    def read(self, size: int | None = -1) -> bytes:
+        if size is None or size < 0:
+            return self.readall()
+        parts = []
+        while size > 0 and self.__fill():
+            part = self.__take(size)
+            parts.append(part)
+            size -= len(part)
+        return parts[0] if len(parts) == 1 else b"".join(parts)
+
+    def readall(self) -> bytes:
+        return b"".join(self.iter_chunks())
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        """Returns an iterator over the rest of the BLOB data, chunk by chunk as received.
+
+        Returns:
+            An iterator of the chunks.
+
+        Raises:
+            BlobRelayError: If the stream is broken, or the total size does not match the metadata.
+            BlobRelayError: If there is an error during communication.
+            BlobRelayTimeoutError: If the operation times out.
+        """
+        while self.__fill():
+            yield self.__take(len(self.__chunk) - self.__offset)
+
+    def close(self) -> None:
+        if not self.closed and not self.__eof:
+            # abandon the rest of the stream
+            cancel = getattr(self.__responses, "cancel", None)
+            if cancel is not None:
+                cancel()
+            self.__eof = True
+        super().close()
+
+    def __take(self, size: int) -> bytes:
+        chunk, offset = self.__chunk, self.__offset
+        if offset == 0 and size >= len(chunk):
+            self.__offset = len(chunk)
+            return chunk
+        self.__offset = min(offset + size, len(chunk))
+        return chunk[offset:self.__offset]
+
+    def __fill(self) -> bool:
+        """Ensures the current chunk has unread data, and returns False on the end of the stream."""
+        if self.closed:
+            raise ValueError("I/O operation on closed stream")
+        while self.__offset >= len(self.__chunk):
+            if self.__eof:
+                return False
+            resp = self.__next()
+            if resp is None:
+                self.__eof = True
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("finish reading BLOB stream: actual_size=%d", self.__actual_size)
+                if self.__expected_size is not None and self.__actual_size != self.__expected_size:
+                    raise BlobRelayError(
+                        f"download size mismatch: expected {self.__expected_size}, got {self.__actual_size}")
+                return False
+            if not resp.HasField("chunk"):
+                self.close()
+                raise BlobRelayError("invalid response: missing chunk")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("stream reading BLOB chunk: size=%d", len(resp.chunk))
+            self.__chunk = resp.chunk
+            self.__offset = 0
+            self.__actual_size += len(self.__chunk)
+        return True
+
+    def __next(self) -> pb_message.GetStreamingResponse | None:
+        try:
+            return next(self.__responses, None)
+        except grpc.RpcError as e:
+            self.__eof = True
+            if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                raise BlobRelayTimeoutError("download operation timed out") from e
+            raise BlobRelayError(f"download failed: {e}") from e
+
+__all__ = [
+    "StreamBlobReader",
+]
@@ -2,12 +2,15 @@
 
 import grpc
 import logging
+import os
+import time
 
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
 from datetime import timedelta
 from google.protobuf.text_format import MessageToString
 from pathlib import Path
-from typing import Type, TypeVar
+from typing import Iterator, Type, TypeVar
 
 from ... import (
     BlobRelayClient,
@@ -17,14 +20,30 @@ from ... import (
     ClobReference as UdfClobReference,
 )
 
+from ..client import BlobSource, _check_source_size, _iter_source_chunks, _source_size
 from ..grpc import (
     blob_relay_streaming_pb2 as pb_message,
     blob_relay_streaming_pb2_grpc as pb_service,
     blob_reference_pb2 as pb_model,
 )
 
+from ._chunk_sizer import AdaptiveChunkSizer, DEFAULT_MAX_MESSAGE_SIZE
+from ._stream_blob_reader import StreamBlobReader
+
 T = TypeVar("T", bound=UdfBlobReference | UdfClobReference)
 
+DEFAULT_RESUME_ATTEMPTS = 3
+
+DEFAULT_RANGE_SIZE = 64 * 1024 * 1024
+
+# status codes of broken streams, which are worth requesting the rest again
+_RESUMABLE_CODES = frozenset((
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.ABORTED,
+    grpc.StatusCode.INTERNAL,
+))
+
 LOGGER_NAME = 'tsurugidb.udf.blob.stream.client'
 
 logger = logging.getLogger(LOGGER_NAME)
@@ -39,17 +58,36 @@ class StreamBlobRelayClient(BlobRelayClient):
             stub: pb_service.BlobRelayStreamingStub,
             session_id: int,
             *,
-            chunk_size: int = 1_048_576):
+            chunk_size: int = 1_048_576,
+            adaptive_chunk: bool = False,
+            max_message_size: int = DEFAULT_MAX_MESSAGE_SIZE,
+            resume_attempts: int = DEFAULT_RESUME_ATTEMPTS,
+            range_parallelism: int = 1,
+            range_size: int = DEFAULT_RANGE_SIZE):
         """Creates a new instance.
 
         Args:
             stub: The gRPC stub to use for communication with the BLOB relay service.
             session_id: The session ID for the BLOB relay service.
             chunk_size: The size of each chunk to use when streaming data. Default is 1,048,576 bytes (1 MB).
+            adaptive_chunk: Whether to adjust the chunk size of file uploads to the observed throughput,
+                starting from `chunk_size`.
+            max_message_size: The maximum size of gRPC messages accepted by the relay service,
+                which bounds the adaptive chunk size.
+            resume_attempts: The maximum number of times to resume a download from the received position,
+                if the stream is broken after some data was received. The timeout applies to each request.
+            range_parallelism: The number of ranges of a BLOB to download in parallel,
+                if the relay service supports ranged downloads. Default is 1 (sequential).
+            range_size: The size of each range for parallel downloads. Default is 64 MiB.
         """
         self.__stub = stub
         self.__session_id = session_id
         self.__chunk_size = chunk_size
+        self.__adaptive_chunk = adaptive_chunk
+        self.__max_message_size = max_message_size
+        self.__resume_attempts = resume_attempts
+        self.__range_parallelism = range_parallelism
+        self.__range_size = range_size
 
     @classmethod
     def api_version(cls) -> int:
@@ -68,23 +106,75 @@ class StreamBlobRelayClient(BlobRelayClient):
         if destination.exists():
             raise FileExistsError(f"destination file already exists: {destination}")
 
-        req = pb_message.GetStreamingRequest(
-            api_version=self.api_version(),
-            session_id=self.__session_id,
-            blob=ref,
-        )
         file_staging = False
         try:
             with destination.open("xb") as fp:
                 file_staging = True
-                expected_size: int | None = None
-                saw_metadata = False
-                actual_size = 0
+                fd = fp.fileno()
+                if self.__range_parallelism <= 1:
+                    self.__download_range(fd, ref, 0, None, timeout)
+                else:
+                    blob_size, ranged = self.__download_range(fd, ref, 0, self.__range_size, timeout)
+                    if ranged and blob_size is not None and blob_size > self.__range_size:
+                        ranges = [
+                            (offset, min(self.__range_size, blob_size - offset))
+                            for offset in range(self.__range_size, blob_size, self.__range_size)
+                        ]
+                        with ThreadPoolExecutor(max_workers=min(self.__range_parallelism, len(ranges))) as executor:
+                            futures = [
+                                executor.submit(self.__download_range, fd, ref, offset, length, timeout)
+                                for offset, length in ranges
+                            ]
+                            try:
+                                for future in futures:
+                                    future.result()
+                            except BaseException:
+                                for future in futures:
+                                    future.cancel()
+                                raise
+            file_staging = False
+        finally:
+            if file_staging and destination.exists():
+                with suppress(Exception):
+                    destination.unlink()
+
+    def __download_range(
+            self,
+            fd: int,
+            ref: pb_model.BlobReference,
+            start: int,
+            length: int | None,
+            timeout: float | None = None) -> tuple[int | None, bool]:
+        """Downloads the range of the BLOB into the same position of the file.
+
+        If the stream is broken, this requests the rest of the range again up to `resume_attempts` times.
+
+        Returns:
+            The BLOB size announced by the relay service (or None if it is unknown),
+            and whether the relay service supports ranged downloads.
+        """
+        position = start
+        end = None if length is None else start + length
+        expected_size: int | None = None
+        ranged = False
+        resumes = 0
+        while True:
+            req = pb_message.GetStreamingRequest(
+                api_version=self.api_version(),
+                session_id=self.__session_id,
+                blob=ref,
+                offset=position,
+            )
+            if end is not None:
+                req.length = end - position
+            progress = False
+            try:
                 if logger.isEnabledFor(logging.DEBUG):
                     logger.debug(
                         "start downloading BLOB: request=%s, timeout=%s",
                         MessageToString(req, as_one_line=True),
                         timeout)
+                saw_metadata = False
                 for resp in self.__stub.Get(req, timeout=timeout):
                     if not saw_metadata:
                         # first time - receive metadata
@@ -98,6 +188,19 @@ class StreamBlobRelayClient(BlobRelayClient):
                                 MessageToString(metadata, as_one_line=True))
                         if metadata.HasField("blob_size"):
                             expected_size = metadata.blob_size
+                        ranged = metadata.HasField("offset")
+                        if not ranged:
+                            # the relay service ignores ranges, and sends the whole BLOB
+                            if start != 0:
+                                raise BlobRelayError("relay service does not support ranged downloads")
+                            end = None
+                            if position != 0:
+                                logger.debug("restart downloading BLOB from the beginning: position=%d", position)
+                                position = 0
+                                os.ftruncate(fd, 0)
+                        elif metadata.offset != position:
+                            raise BlobRelayError(
+                                f"invalid response: requested offset {position}, got {metadata.offset}")
                     # rest times - receive chunks
                     else:
                         if not resp.HasField("chunk"):
@@ -105,28 +208,62 @@ class StreamBlobRelayClient(BlobRelayClient):
                         chunk = resp.chunk
                         if logger.isEnabledFor(logging.DEBUG):
                             logger.debug("stream downloading BLOB chunk: size=%d", len(chunk))
-                        fp.write(chunk)
-                        actual_size += len(chunk)
-
-                if logger.isEnabledFor(logging.DEBUG):
+                        os.pwrite(fd, chunk, position)
+                        position += len(chunk)
+                        progress = progress or len(chunk) > 0
+                break
+            except grpc.RpcError as e:
+                # a request timed out without progress would just time out again
+                resumable = e.code() in _RESUMABLE_CODES and (progress or e.code() != grpc.StatusCode.DEADLINE_EXCEEDED)
+                if resumable and resumes < self.__resume_attempts:
+                    resumes += 1
                     logger.debug(
-                        "finish downloading BLOB: request=%s, timeout=%s, actual_size=%d",
-                        MessageToString(req, as_one_line=True),
-                        timeout,
-                        actual_size)
-
-                if expected_size is not None and actual_size != expected_size:
-                    raise BlobRelayError(f"download size mismatch: expected {expected_size}, got {actual_size}")
-            file_staging = False
+                        "resume downloading BLOB: position=%d, attempt=%d, code=%s", position, resumes, e.code())
+                    continue
+                if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+                    raise BlobRelayTimeoutError("download operation timed out") from e
+                raise BlobRelayError(f"download failed: {e}") from e
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "finish downloading BLOB: request=%s, timeout=%s, actual_size=%d",
+                MessageToString(req, as_one_line=True),
+                timeout,
+                position - start)
+
+        if expected_size is not None:
+            expected_end = expected_size if end is None else min(end, expected_size)
+            if position != expected_end:
+                raise BlobRelayError(
+                    f"download size mismatch: expected {expected_end - start}, got {position - start}")
+        return expected_size, ranged
+
+    def __open_internal(
+            self,
+            ref: pb_model.BlobReference,
+            timeout: float | None = None) -> StreamBlobReader:
+        req = pb_message.GetStreamingRequest(
+            api_version=self.api_version(),
+            session_id=self.__session_id,
+            blob=ref,
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "start opening BLOB: request=%s, timeout=%s",
+                MessageToString(req, as_one_line=True),
+                timeout)
+        try:
+            responses = self.__stub.Get(req, timeout=timeout)
         except grpc.RpcError as e:
             if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
                 raise BlobRelayTimeoutError("download operation timed out") from e
             raise BlobRelayError(f"download failed: {e}") from e
-        finally:
-            if file_staging and destination.exists():
-                with suppress(Exception):
-                    destination.unlink()
+        return StreamBlobReader(responses)
 
+    def __new_chunk_sizer(self) -> AdaptiveChunkSizer | None:
+        if not self.__adaptive_chunk:
+            return None
+        return AdaptiveChunkSizer(self.__chunk_size, max_message_size=self.__max_message_size)
 
     def __upload_internal(
             self,
@@ -135,9 +272,32 @@ class StreamBlobRelayClient(BlobRelayClient):
         if not source.exists():
             raise FileNotFoundError(f"source file does not exist: {source}")
 
+        blob_size = source.stat().st_size
+
+        def chunks():
+            sizer = self.__new_chunk_sizer()
+            with source.open("rb") as fp:
+                while True:
+                    started = time.perf_counter()
+                    # NOTE: protobuf bytes fields only take bytes, so reading into a reused bytearray would add a copy
+                    buf = fp.read(sizer.size if sizer is not None else self.__chunk_size)
+                    if not buf:
+                        break
+                    yield buf
+                    if sizer is not None:
+                        # the next chunk is requested after this one has been sent
+                        sizer.observe(len(buf), time.perf_counter() - started)
+
+        return self.__upload_chunks(chunks(), blob_size, source, timeout)
+
+    def __upload_chunks(
+            self,
+            chunks: Iterator[bytes],
+            blob_size: int | None,
+            source: object,
+            timeout: float | None = None) -> pb_model.BlobReference:
+        mismatch: list[BlobRelayError] = []
         try:
-            blob_size = source.stat().st_size
-
             def gen():
                 # first time - send metadata
                 metadata = pb_message.PutStreamingRequest.Metadata(
@@ -151,22 +311,26 @@ class StreamBlobRelayClient(BlobRelayClient):
                         MessageToString(metadata, as_one_line=True))
                 yield pb_message.PutStreamingRequest(metadata=metadata)
                 # rest times - send chunks
-                with source.open("rb") as fp:
-                    while True:
-                        buf = fp.read(self.__chunk_size)
-                        if not buf:
-                            break
-                        if logger.isEnabledFor(logging.DEBUG):
-                            logger.debug("stream uploading BLOB chunk: size=%d", len(buf))
-                        yield pb_message.PutStreamingRequest(chunk=buf)
+                actual_size = 0
+                for buf in chunks:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("stream uploading BLOB chunk: size=%d", len(buf))
+                    actual_size += len(buf)
+                    yield pb_message.PutStreamingRequest(chunk=buf)
+                try:
+                    _check_source_size(blob_size, actual_size)
+                except BlobRelayError as e:
+                    # abort the call before the relay service commits the BLOB
+                    mismatch.append(e)
+                    raise
 
             # NOTE: Client Streaming RPC does not actually start sending data, but keep this logging for symmetry.
             if logger.isEnabledFor(logging.DEBUG):
-                logger.debug("start uploading BLOB: source=%s, size=%d, timeout=%s", source, blob_size, timeout)
+                logger.debug("start uploading BLOB: source=%s, size=%s, timeout=%s", source, blob_size, timeout)
             resp = self.__stub.Put(gen(), timeout=timeout)
             if logger.isEnabledFor(logging.DEBUG):
                 logger.debug(
-                    "finish uploading BLOB: source=%s, size=%d, timeout=%s, response=%s",
+                    "finish uploading BLOB: source=%s, size=%s, timeout=%s, response=%s",
                     source,
                     blob_size,
                     timeout,
@@ -175,6 +339,8 @@ class StreamBlobRelayClient(BlobRelayClient):
             return resp.blob
 
         except grpc.RpcError as e:
+            if mismatch:
+                raise mismatch[0] from e
             if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
                 raise BlobRelayTimeoutError("upload operation timed out") from e
             raise BlobRelayError(f"upload failed: {e}") from e
@@ -218,6 +384,34 @@ class StreamBlobRelayClient(BlobRelayClient):
         ref_pb = self.__upload_internal(source, timeout=self.__to_seconds(timeout))
         return self.__from_pb_reference(ref_pb, UdfClobReference)
 
+    def open_blob(self, ref: UdfBlobReference, *, timeout: timedelta | None = None) -> StreamBlobReader:
+        ref_pb = self.__to_pb_reference(ref)
+        return self.__open_internal(ref_pb, timeout=self.__to_seconds(timeout))
+
+    def open_clob(self, ref: UdfClobReference, *, timeout: timedelta | None = None) -> StreamBlobReader:
+        ref_pb = self.__to_pb_reference(ref)
+        return self.__open_internal(ref_pb, timeout=self.__to_seconds(timeout))
+
+    def upload_blob_from(
+            self,
+            data: BlobSource,
+            *,
+            size: int | None = None,
+            timeout: timedelta | None = None) -> UdfBlobReference:
+        chunks = _iter_source_chunks(data, self.__chunk_size)
+        ref_pb = self.__upload_chunks(chunks, _source_size(data, size), type(data).__name__, self.__to_seconds(timeout))
+        return self.__from_pb_reference(ref_pb, UdfBlobReference)
+
+    def upload_clob_from(
+            self,
+            data: BlobSource,
+            *,
+            size: int | None = None,
+            timeout: timedelta | None = None) -> UdfClobReference:
+        chunks = _iter_source_chunks(data, self.__chunk_size)
+        ref_pb = self.__upload_chunks(chunks, _source_size(data, size), type(data).__name__, self.__to_seconds(timeout))
+        return self.__from_pb_reference(ref_pb, UdfClobReference)
+
 __all__ = [
     "StreamBlobRelayClient",
 ]
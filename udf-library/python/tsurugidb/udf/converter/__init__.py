@@ -10,6 +10,18 @@ from .converter import (
     to_pb_offset_datetime,
     from_pb_offset_datetime,
 )
+from .batch import (
+    to_pb_decimals,
+    from_pb_decimals,
+    to_pb_dates,
+    from_pb_dates,
+    to_pb_local_times,
+    from_pb_local_times,
+    to_pb_local_datetimes,
+    from_pb_local_datetimes,
+    to_pb_offset_datetimes,
+    from_pb_offset_datetimes,
+)
 
 __all__ = [
     "to_pb_decimal",
@@ -22,4 +34,14 @@ __all__ = [
     "from_pb_local_datetime",
     "to_pb_offset_datetime",
     "from_pb_offset_datetime",
+    "to_pb_decimals",
+    "from_pb_decimals",
+    "to_pb_dates",
+    "from_pb_dates",
+    "to_pb_local_times",
+    "from_pb_local_times",
+    "to_pb_local_datetimes",
+    "from_pb_local_datetimes",
+    "to_pb_offset_datetimes",
+    "from_pb_offset_datetimes",
 ]
@@ -0,0 +1,440 @@
+"""Batch variants of the converter functions.
+
+Each function converts a whole column of values in one call. The temporal
+conversions work on integer epoch offsets rather than building a ``timedelta``
+per value, and use NumPy for the bulk arithmetic when it is installed.
+
+NumPy is optional: ``numpy.ndarray`` of ``datetime64`` / ``timedelta64`` is
+accepted as an input wherever noted, and ``as_numpy=True`` returns NumPy arrays,
+but every function also works on plain Python sequences without NumPy.
+"""
+
+import sys
+from collections.abc import Iterable, Sequence
+from datetime import date, time, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any
+
+from .. import (
+    Decimal as PbDecimal,
+    Date as PbDate,
+    LocalTime as PbLocalTime,
+    LocalDatetime as PbLocalDatetime,
+    OffsetDatetime as PbOffsetDatetime,
+)
+from .converter import _decimal_to_fields, _decimal_from_fields
+
+if TYPE_CHECKING:
+    from google.protobuf.internal.containers import RepeatedCompositeFieldContainer
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_EPOCH_DATETIME = datetime(1970, 1, 1)
+_EPOCH_DATETIME_UTC = _EPOCH_DATETIME.replace(tzinfo=timezone.utc)
+
+_MIN_DAYS = date.min.toordinal() - _EPOCH_ORDINAL
+_MAX_DAYS = date.max.toordinal() - _EPOCH_ORDINAL
+_MIN_MICROS = _MIN_DAYS * 86_400_000_000
+_MAX_MICROS = (_MAX_DAYS + 1) * 86_400_000_000 - 1
+_NANOS_PER_DAY = 86_400_000_000_000
+
+
+def to_pb_decimals(
+    values: Iterable[Decimal],
+    out: "RepeatedCompositeFieldContainer[PbDecimal] | None" = None,
+) -> "list[PbDecimal] | RepeatedCompositeFieldContainer[PbDecimal]":
+    """Converts standard library Decimals to Protocol Buffer Decimal messages.
+
+    Args:
+        values: The decimal values to convert.
+        out: Repeated ``Decimal`` field to append the messages to.
+            If omitted, a new list is returned.
+
+    Returns:
+        The list of Protocol Buffer messages, or ``out`` if it is specified.
+
+    Raises:
+        ValueError: If any of the decimal values is infinite or NaN.
+    """
+    fields = map(_decimal_to_fields, values)
+    if out is None:
+        return [PbDecimal(unscaled_value=u, exponent=e) for u, e in fields]
+    add = out.add
+    for u, e in fields:
+        add(unscaled_value=u, exponent=e)
+    return out
+
+
+def from_pb_decimals(messages: Iterable[PbDecimal]) -> list[Decimal]:
+    """Converts Protocol Buffer Decimal messages to standard library Decimals.
+
+    Args:
+        messages: Protocol Buffer messages of the decimals to convert.
+
+    Returns:
+        The list of standard library Decimal values.
+    """
+    return [_decimal_from_fields(m.unscaled_value, m.exponent) for m in messages]
+
+
+def to_pb_dates(
+    values: "Iterable[date] | Any",
+    out: "RepeatedCompositeFieldContainer[PbDate] | None" = None,
+) -> "list[PbDate] | RepeatedCompositeFieldContainer[PbDate]":
+    """Converts standard library dates to Protocol Buffer Date messages.
+
+    Args:
+        values: The date values to convert, or a NumPy ``datetime64`` array.
+        out: Repeated ``Date`` field to append the messages to.
+            If omitted, a new list is returned.
+
+    Returns:
+        The list of Protocol Buffer messages, or ``out`` if it is specified.
+
+    Raises:
+        ValueError: If the NumPy array contains ``NaT``.
+    """
+    np = _numpy_of(values)
+    if np is not None:
+        days = _check_not_nat(np, values).astype("datetime64[D]").view(np.int64).tolist()
+    else:
+        epoch = _EPOCH_ORDINAL
+        days = [v.toordinal() - epoch for v in values]
+    if out is None:
+        return [PbDate(days=d) for d in days]
+    add = out.add
+    for d in days:
+        add(days=d)
+    return out
+
+
+def from_pb_dates(messages: Iterable[PbDate], *, as_numpy: bool = False) -> "list[date] | Any":
+    """Converts Protocol Buffer Date messages to standard library dates.
+
+    Args:
+        messages: Protocol Buffer messages of the dates to convert.
+        as_numpy: If True, returns a NumPy ``datetime64[D]`` array instead of a list.
+
+    Returns:
+        The list of standard library date values, or a NumPy array.
+
+    Raises:
+        ImportError: If ``as_numpy`` is True and NumPy is not installed.
+        OverflowError: If any of the dates is out of the range of ``datetime.date``.
+    """
+    np = _import_numpy(as_numpy)
+    if np is None:
+        epoch = _EPOCH_ORDINAL
+        return [date.fromordinal(m.days + epoch) for m in messages]
+    days = _fromiter(np, (m.days for m in messages), messages)
+    result = days.astype("datetime64[D]")
+    if as_numpy:
+        return result
+    _check_range(np, days, _MIN_DAYS, _MAX_DAYS, "date value out of range")
+    return result.tolist()
+
+
+def to_pb_local_times(
+    values: "Iterable[time] | Any",
+    out: "RepeatedCompositeFieldContainer[PbLocalTime] | None" = None,
+) -> "list[PbLocalTime] | RepeatedCompositeFieldContainer[PbLocalTime]":
+    """Converts standard library times to Protocol Buffer LocalTime messages.
+
+    This ignores the timezone information of the input times.
+
+    Args:
+        values: The time values to convert, or a NumPy ``timedelta64`` array
+            of the elapsed time since midnight.
+        out: Repeated ``LocalTime`` field to append the messages to.
+            If omitted, a new list is returned.
+
+    Returns:
+        The list of Protocol Buffer messages, or ``out`` if it is specified.
+
+    Raises:
+        ValueError: If the NumPy array contains ``NaT`` or a value out of a day.
+    """
+    np = _numpy_of(values)
+    if np is not None:
+        nanos = _check_not_nat(np, values).astype("timedelta64[ns]").view(np.int64)
+        _check_range(np, nanos, 0, _NANOS_PER_DAY - 1, "time value out of range", ValueError)
+        nanos = nanos.tolist()
+    else:
+        nanos = [
+            v.hour * 3_600_000_000_000
+            + v.minute * 60_000_000_000
+            + v.second * 1_000_000_000
+            + v.microsecond * 1000
+            for v in values
+        ]
+    if out is None:
+        return [PbLocalTime(nanos=n) for n in nanos]
+    add = out.add
+    for n in nanos:
+        add(nanos=n)
+    return out
+
+
+def from_pb_local_times(messages: Iterable[PbLocalTime], *, as_numpy: bool = False) -> "list[time] | Any":
+    """Converts Protocol Buffer LocalTime messages to standard library times.
+
+    The returned times will have no timezone information (tzinfo=None).
+    Nanosecond precision is truncated to microsecond precision, except for
+    NumPy arrays which keep nanoseconds.
+
+    Args:
+        messages: Protocol Buffer messages of the times to convert.
+        as_numpy: If True, returns a NumPy ``timedelta64[ns]`` array of the elapsed
+            time since midnight instead of a list.
+
+    Returns:
+        The list of standard library time values, or a NumPy array.
+
+    Raises:
+        ImportError: If ``as_numpy`` is True and NumPy is not installed.
+    """
+    if as_numpy:
+        np = _import_numpy(True)
+        return _fromiter(np, (m.nanos for m in messages), messages).astype("timedelta64[ns]")
+    result = []
+    append = result.append
+    for m in messages:
+        minutes, micros = divmod(m.nanos // 1000, 60_000_000)
+        hours, minutes = divmod(minutes, 60)
+        seconds, micros = divmod(micros, 1_000_000)
+        append(time(hours, minutes, seconds, micros))
+    return result
+
+
+def to_pb_local_datetimes(
+    values: "Iterable[datetime] | Any",
+    out: "RepeatedCompositeFieldContainer[PbLocalDatetime] | None" = None,
+) -> "list[PbLocalDatetime] | RepeatedCompositeFieldContainer[PbLocalDatetime]":
+    """Converts standard library datetimes to Protocol Buffer LocalDatetime messages.
+
+    This ignores the timezone information of the input datetimes.
+    The offset seconds are computed in the same way as ``to_pb_local_datetime``.
+
+    Args:
+        values: The datetime values to convert, or a NumPy ``datetime64`` array.
+            Nanoseconds are kept for ``datetime64[ns]`` arrays.
+        out: Repeated ``LocalDatetime`` field to append the messages to.
+            If omitted, a new list is returned.
+
+    Returns:
+        The list of Protocol Buffer messages, or ``out`` if it is specified.
+
+    Raises:
+        ValueError: If the NumPy array contains ``NaT``.
+    """
+    np = _numpy_of(values)
+    if np is not None:
+        seconds, nanos = _split_datetime64(np, _check_not_nat(np, values))
+        pairs = zip(seconds.tolist(), nanos.tolist())
+    else:
+        pairs = map(_split_datetime, values)
+    if out is None:
+        return [PbLocalDatetime(offset_seconds=s, nano_adjustment=n) for s, n in pairs]
+    add = out.add
+    for s, n in pairs:
+        add(offset_seconds=s, nano_adjustment=n)
+    return out
+
+
+def from_pb_local_datetimes(
+    messages: Iterable[PbLocalDatetime],
+    *,
+    as_numpy: bool = False,
+) -> "list[datetime] | Any":
+    """Converts Protocol Buffer LocalDatetime messages to standard library datetimes.
+
+    The returned datetimes will have no timezone information (tzinfo=None).
+    Nanosecond precision is truncated to microsecond precision.
+
+    Args:
+        messages: Protocol Buffer messages of the datetimes to convert.
+        as_numpy: If True, returns a NumPy ``datetime64[us]`` array instead of a list.
+
+    Returns:
+        The list of standard library datetime values, or a NumPy array.
+
+    Raises:
+        ImportError: If ``as_numpy`` is True and NumPy is not installed.
+        OverflowError: If any of the datetimes is out of the range of ``datetime.datetime``.
+    """
+    np = _import_numpy(as_numpy)
+    if np is None:
+        epoch = _EPOCH_DATETIME
+        return [epoch + timedelta(0, m.offset_seconds, m.nano_adjustment // 1000) for m in messages]
+    messages = _as_sequence(messages)
+    seconds = _fromiter(np, (m.offset_seconds for m in messages), messages)
+    nanos = _fromiter(np, (m.nano_adjustment for m in messages), messages)
+    # check the seconds first so that the conversion to microseconds never overflows
+    _check_range(np, seconds, _MIN_MICROS // 1_000_000 - 1, _MAX_MICROS // 1_000_000 + 1, "date value out of range")
+    micros = seconds * 1_000_000 + nanos // 1000
+    _check_range(np, micros, _MIN_MICROS, _MAX_MICROS, "date value out of range")
+    result = micros.astype("datetime64[us]")
+    return result if as_numpy else result.tolist()
+
+
+def to_pb_offset_datetimes(
+    values: Iterable[datetime],
+    out: "RepeatedCompositeFieldContainer[PbOffsetDatetime] | None" = None,
+) -> "list[PbOffsetDatetime] | RepeatedCompositeFieldContainer[PbOffsetDatetime]":
+    """Converts standard library datetimes to Protocol Buffer OffsetDatetime messages.
+
+    If an input datetime has no timezone information (tzinfo is None),
+    it is treated as the system's local timezone.
+
+    Args:
+        values: The datetime values to convert.
+        out: Repeated ``OffsetDatetime`` field to append the messages to.
+            If omitted, a new list is returned.
+
+    Returns:
+        The list of Protocol Buffer messages, or ``out`` if it is specified.
+
+    Raises:
+        ValueError: If an input datetime has no timezone information and
+        the system's local timezone cannot be determined for it.
+    """
+    offsets: dict[timedelta, tuple[int, int]] = {}
+    epoch = _EPOCH_ORDINAL
+
+    def fields(value: datetime) -> tuple[int, int, int]:
+        if value.tzinfo is None:
+            try:
+                value = value.astimezone()
+            except Exception as e:
+                raise ValueError(f"Cannot determine system's local timezone for the given datetime: {value}") from e
+        utcoffset = value.utcoffset()
+        offset = offsets.get(utcoffset)
+        if offset is None:
+            offset = offsets[utcoffset] = (int(utcoffset.total_seconds()) // 60, utcoffset // timedelta(microseconds=1))
+        tz_offset, offset_micros = offset
+        micros = value.microsecond
+        utc_micros = (
+            ((value.toordinal() - epoch) * 86_400 + value.hour * 3_600 + value.minute * 60 + value.second) * 1_000_000
+            + micros
+            - offset_micros
+        )
+        # truncated toward zero like to_pb_offset_datetime
+        seconds = utc_micros // 1_000_000 if utc_micros >= 0 else -(-utc_micros // 1_000_000)
+        return seconds, micros * 1000, tz_offset
+
+    triples = map(fields, values)
+    if out is None:
+        return [PbOffsetDatetime(offset_seconds=s, nano_adjustment=n, time_zone_offset=z) for s, n, z in triples]
+    add = out.add
+    for s, n, z in triples:
+        add(offset_seconds=s, nano_adjustment=n, time_zone_offset=z)
+    return out
+
+
+def from_pb_offset_datetimes(messages: Iterable[PbOffsetDatetime]) -> list[datetime]:
+    """Converts Protocol Buffer OffsetDatetime messages to standard library datetimes.
+
+    Nanosecond precision is truncated to microsecond precision.
+
+    Args:
+        messages: Protocol Buffer messages of the datetimes to convert.
+
+    Returns:
+        The list of standard library datetime values with timezone information.
+
+    Raises:
+        OverflowError: If any of the datetimes is out of the range of ``datetime.datetime``.
+    """
+    zones: dict[int, timezone] = {}
+    result = []
+    append = result.append
+    epoch = _EPOCH_DATETIME_UTC
+    for m in messages:
+        minutes = m.time_zone_offset
+        tz = zones.get(minutes)
+        if tz is None:
+            tz = zones[minutes] = timezone(timedelta(minutes=minutes))
+        dt_utc = epoch + timedelta(0, m.offset_seconds, m.nano_adjustment // 1000)
+        append(dt_utc.astimezone(tz))
+    return result
+
+
+def _split_datetime(value: datetime) -> tuple[int, int]:
+    """Returns (offset_seconds, nano_adjustment) of the naive part of the datetime.
+
+    The seconds are truncated toward zero like ``int(timedelta.total_seconds())``.
+    """
+    micros = value.microsecond
+    seconds = (
+        (value.toordinal() - _EPOCH_ORDINAL) * 86_400
+        + value.hour * 3_600
+        + value.minute * 60
+        + value.second
+    )
+    if seconds < 0 and micros:
+        seconds += 1
+    return seconds, micros * 1000
+
+
+def _split_datetime64(np: Any, values: Any) -> tuple[Any, Any]:
+    """Vectorized ``_split_datetime`` for NumPy ``datetime64`` arrays."""
+    if np.datetime_data(values.dtype)[0] in ("ns", "ps", "fs", "as"):
+        ticks = values.astype("datetime64[ns]").view(np.int64)
+        per_second = 1_000_000_000
+    else:
+        ticks = values.astype("datetime64[us]").view(np.int64)
+        per_second = 1_000_000
+    seconds = ticks // per_second
+    fraction = ticks - seconds * per_second
+    seconds += (seconds < 0) & (fraction != 0)
+    return seconds, fraction * (1_000_000_000 // per_second)
+
+
+def _numpy_of(values: Any) -> Any:
+    """Returns the NumPy module if the values are a NumPy array, or None otherwise."""
+    # if NumPy has not been imported yet, the values cannot be its array
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(values, np.ndarray):
+        return np
+    return None
+
+
+def _import_numpy(required: bool) -> Any:
+    """Returns the NumPy module, or None if it is not available and not required."""
+    try:
+        import numpy
+    except ImportError:
+        if required:
+            raise ImportError("NumPy is required for as_numpy=True; install tsurugi-udf-library[numpy]") from None
+        return None
+    return numpy
+
+
+def _as_sequence(values: Iterable[Any]) -> Sequence[Any]:
+    if hasattr(values, "__len__") and hasattr(values, "__getitem__"):
+        return values  # type: ignore[return-value]
+    return list(values)
+
+
+def _fromiter(np: Any, fields: Iterable[int], messages: Any) -> Any:
+    count = len(messages) if hasattr(messages, "__len__") else -1
+    return np.fromiter(fields, dtype=np.int64, count=count)
+
+
+def _check_not_nat(np: Any, values: Any) -> Any:
+    if np.isnat(values).any():
+        raise ValueError("NaT is not supported")
+    return values
+
+
+def _check_range(np: Any, values: Any, lower: int, upper: int, message: str, error: type = OverflowError) -> None:
+    if values.size and (values.min() < lower or values.max() > upper):
+        raise error(message)
+
+
+__all__ = [
+    'to_pb_decimals', 'from_pb_decimals',
+    'to_pb_dates', 'from_pb_dates',
+    'to_pb_local_times', 'from_pb_local_times',
+    'to_pb_local_datetimes', 'from_pb_local_datetimes',
+    'to_pb_offset_datetimes', 'from_pb_offset_datetimes',
+]
@@ -1,5 +1,5 @@
 from datetime import date, time, datetime, timedelta, timezone
-from decimal import Decimal
+from decimal import Context, Decimal, MAX_EMAX, MAX_PREC, MIN_EMIN
 from .. import (
     Decimal as PbDecimal,
     Date as PbDate,
@@ -20,25 +20,7 @@ def to_pb_decimal(value: Decimal) -> PbDecimal:
     Raises:
         ValueError: If the decimal value is infinite or NaN.
     """
-    if not value.is_finite():
-        raise ValueError("Only finite decimal values are supported.")
-
-    sign, digits, exponent = value.as_tuple()
-    unscaled_int = 0
-    for d in digits:
-        unscaled_int = unscaled_int * 10 + d
-    if sign == 1:
-        unscaled_int = -unscaled_int
-    if unscaled_int == 0:
-        unscaled_bytes = b"\x00"
-    else:
-        byte_length = (unscaled_int.bit_length() + 8) // 8
-        unscaled_bytes = unscaled_int.to_bytes(
-            byte_length,
-            byteorder="big",
-            signed=True,
-        )
-
+    unscaled_bytes, exponent = _decimal_to_fields(value)
     pb = PbDecimal()
     pb.unscaled_value = unscaled_bytes
     pb.exponent = exponent
@@ -48,16 +30,53 @@ def to_pb_decimal(value: Decimal) -> PbDecimal:
 def from_pb_decimal(message: PbDecimal) -> Decimal:
     """Converts a Protocol Buffer Decimal message to standard library Decimal.
 
+    The result keeps all digits and the exponent of the message; it is not
+    rounded to the precision of the current decimal context.
+
     Args:
         message: Protocol Buffer message of the decimal to convert.
 
     Returns:
         Standard library Decimal value.
     """
+    return _decimal_from_fields(message.unscaled_value, message.exponent)
+
+
+# exact context for scaleb(): never rounds the coefficient, whatever its number of digits
+_EXACT_CONTEXT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+# coefficients up to this many digits are cheaper to accumulate than to rescale
+_SHORT_DIGITS = 6
+
+# signed big-endian byte length by bit length, covering DECIMAL(38) (127 bits) and beyond
+_BYTE_LENGTHS = tuple((bits + 8) // 8 for bits in range(257))
+
+
+def _decimal_to_fields(value: Decimal) -> tuple[bytes, int]:
+    """Returns the (unscaled_value, exponent) fields of the Decimal message for the value."""
+    if not value.is_finite():
+        raise ValueError("Only finite decimal values are supported.")
+
+    sign, digits, exponent = value.as_tuple()
+    if len(digits) <= _SHORT_DIGITS:
+        unscaled_int = 0
+        for d in digits:
+            unscaled_int = unscaled_int * 10 + d
+        if sign == 1:
+            unscaled_int = -unscaled_int
+    else:
+        unscaled_int = int(value.scaleb(-exponent, _EXACT_CONTEXT))
+    if unscaled_int == 0:
+        return b"\x00", exponent
+    bits = unscaled_int.bit_length()
+    byte_length = _BYTE_LENGTHS[bits] if bits < len(_BYTE_LENGTHS) else (bits + 8) // 8
+    return unscaled_int.to_bytes(byte_length, byteorder="big", signed=True), exponent
+
 
-    unscaled_int = int.from_bytes(message.unscaled_value, byteorder="big", signed=True)
-    exponent = message.exponent
-    return Decimal(unscaled_int) * (Decimal(10) ** exponent)
+def _decimal_from_fields(unscaled_value: bytes, exponent: int) -> Decimal:
+    """Returns the Decimal value of the (unscaled_value, exponent) fields of the Decimal message."""
+    unscaled_int = int.from_bytes(unscaled_value, byteorder="big", signed=True)
+    return Decimal(unscaled_int).scaleb(exponent, _EXACT_CONTEXT)
 
 
 _EPOCH_DATE = date(1970, 1, 1)
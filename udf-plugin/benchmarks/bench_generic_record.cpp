@@ -0,0 +1,155 @@
+/*
+ * Copyright 2018-2026 Project Tsurugi.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+// Counts the heap allocations per row while filling a server streaming result.
+//
+// "fresh" builds each row as the generated RPC client used to do:
+// a new generic_record_impl per row, and a std::string / bytes_value per column.
+// "reused" builds each row as the generated RPC client does now:
+// one record reserved for the column count, and values appended to its payload buffer.
+// Both push the rows into a generic_record_stream_impl, and drain it with next_batch().
+//
+// Usage:
+//     cd udf-plugin
+//     SRC=tsurugi_udf/common/tsurugi_udf_common/src/udf
+//     g++ -std=c++17 -O2 -Itsurugi_udf/common/tsurugi_udf_common/include/udf -o bench_generic_record
+//         benchmarks/bench_generic_record.cpp $SRC/generic_record_impl.cpp $SRC/error_info.cpp -lpthread
+//     ./bench_generic_record [rows]
+
+#include <atomic>
+#include <chrono>
+#include <cstddef>
+#include <cstdint>
+#include <cstdlib>
+#include <iostream>
+#include <memory>
+#include <new>
+#include <string>
+#include <string_view>
+#include <vector>
+
+#include "generic_record_impl.h"
+
+namespace {
+
+std::atomic<std::uint64_t> allocations{0};
+
+}  // namespace
+
+void* operator new(std::size_t size) {
+    allocations.fetch_add(1, std::memory_order_relaxed);
+    if(auto* p = std::malloc(size == 0 ? 1 : size)) { return p; }
+    throw std::bad_alloc{};
+}
+
+void operator delete(void* p) noexcept { std::free(p); }
+void operator delete(void* p, std::size_t) noexcept { std::free(p); }
+
+namespace {
+
+using plugin::udf::generic_record_impl;
+using plugin::udf::generic_record_stream_impl;
+
+constexpr std::size_t column_count = 6;
+constexpr std::size_t stream_capacity = 256;
+
+// longer than the small string buffer, as names and payloads usually are
+std::string const name(40, 'n');
+std::string const comment(64, 'c');
+std::string const data(128, 'd');
+
+void add_fresh(generic_record_impl& record, std::int64_t row) {
+    record.add_int8(row);
+    record.add_string(std::string{name});
+    record.add_string(std::string{comment});
+    record.add_bytes(plugin::udf::bytes_value{std::string{data}});
+    record.add_double(static_cast<double>(row));
+    record.add_string_null();
+}
+
+void add_reused(generic_record_impl& record, std::int64_t row) {
+    record.reserve(column_count);
+    record.add_int8(row);
+    record.add_string_view(name);
+    record.add_string_view(comment);
+    record.add_bytes_view(data);
+    record.add_double(static_cast<double>(row));
+    record.add_string_null();
+}
+
+struct result {
+    double allocations_per_row;
+    double nanos_per_row;
+};
+
+template<class Fill>
+result run(std::size_t rows, Fill&& fill) {
+    generic_record_stream_impl stream{stream_capacity};
+    auto writer = stream.writer();
+    std::vector<std::unique_ptr<generic_record_impl>> batch{};
+
+    auto drain = [&] {
+        while(stream.next_batch(batch, 0, std::chrono::milliseconds{0}) ==
+              plugin::udf::generic_record_stream::status_type::ok) {}
+    };
+    // warm up the ring buffer slots and the batch vector
+    for(std::size_t i = 0; i < stream_capacity * 2; ++i) {
+        fill(writer, static_cast<std::int64_t>(i));
+        if((i + 1) % stream_capacity == 0) { drain(); }
+    }
+
+    auto before = allocations.load();
+    auto start = std::chrono::steady_clock::now();
+    for(std::size_t i = 0; i < rows; ++i) {
+        fill(writer, static_cast<std::int64_t>(i));
+        if((i + 1) % stream_capacity == 0) { drain(); }
+    }
+    drain();
+    auto elapsed = std::chrono::steady_clock::now() - start;
+    auto count = allocations.load() - before;
+    return result{
+        static_cast<double>(count) / static_cast<double>(rows),
+        static_cast<double>(std::chrono::duration_cast<std::chrono::nanoseconds>(elapsed).count()) /
+            static_cast<double>(rows),
+    };
+}
+
+void print(char const* label, result const& r) {
+    std::cout << label << ": " << r.allocations_per_row << " allocations/row, " << r.nanos_per_row << " ns/row\n";
+}
+
+}  // namespace
+
+int main(int argc, char** argv) {
+    std::size_t rows = argc > 1 ? std::strtoull(argv[1], nullptr, 10) : 1'000'000;
+    if(rows == 0) { rows = 1; }
+
+    auto fresh = run(rows, [](auto& writer, std::int64_t row) {
+        auto record = std::make_unique<generic_record_impl>();
+        add_fresh(*record, row);
+        writer.push(std::move(record));
+    });
+    generic_record_impl record{};
+    auto reused = run(rows, [&record](auto& writer, std::int64_t row) {
+        add_reused(record, row);
+        writer.push(std::move(record));
+    });
+
+    std::cout << "rows=" << rows << " columns=" << column_count << " stream_capacity=" << stream_capacity << "\n";
+    print("fresh ", fresh);
+    print("reused", reused);
+    return 0;
+}
@@ -0,0 +1,164 @@
+"""Builds a synthetic schema of many small .proto files with and without --unity.
+
+Every generated proto imports a shared common.proto and defines a few messages;
+every --service-every'th proto also defines a service, so that protoc writes a
+.grpc.pb.cc next to its .pb.cc. Each mode is a clean build without the object
+cache, run in a child process, and reports the wall-clock time, the CPU time of
+the builder and the compilers it ran, and the number of compiled translation
+units for the generated sources.
+
+Usage:
+    cd udf-plugin
+    python -m benchmarks.bench_unity [--protos N] [--service-every K] [--jobs J]
+        [--grpc-plugin PATH] [--repeat R]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_COMMON = """syntax = "proto3";
+
+package bench;
+
+message Money {
+  string currency = 1;
+  int64 units = 2;
+  int32 nanos = 3;
+}
+
+message Audit {
+  string created_by = 1;
+  int64 created_at = 2;
+  string updated_by = 3;
+  int64 updated_at = 4;
+}
+"""
+
+
+def _proto(index: int, service: bool) -> str:
+    name = f"Item{index:03d}"
+    lines = [
+        'syntax = "proto3";',
+        "",
+        f"package bench.p{index:03d};",
+        "",
+        'import "common.proto";',
+        "",
+        f"message {name} {{",
+        "  int64 id = 1;",
+        "  string name = 2;",
+        "  string description = 3;",
+        "  bench.Money price = 4;",
+        "  repeated string tags = 5;",
+        "  bool active = 6;",
+        "  double weight = 7;",
+        "  bench.Audit audit = 8;",
+        "}",
+        "",
+        f"message {name}Request {{",
+        "  int64 id = 1;",
+        "  int32 limit = 2;",
+        "}",
+        "",
+        f"message {name}Response {{",
+        f"  {name} item = 1;",
+        "  int32 status = 2;",
+        "}",
+    ]
+    if service:
+        lines += [
+            "",
+            f"service {name}Service {{",
+            f"  rpc Get{name}({name}Request) returns ({name}Response);",
+            f"  rpc Count{name}({name}Request) returns ({name}Response);",
+            "}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def _write_schema(directory: Path, protos: int, service_every: int) -> list[Path]:
+    (directory / "common.proto").write_text(_COMMON, encoding="utf-8")
+    paths = []
+    for i in range(protos):
+        service = service_every > 0 and i % service_every == 0
+        path = directory / f"p{i:03d}.proto"
+        path.write_text(_proto(i, service), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def _build(
+    schema: Path, protos: list[Path], work: Path, unity: bool, args: argparse.Namespace
+) -> tuple[float, float, int]:
+    cmd = [
+        sys.executable,
+        "-c",
+        "from tsurugi_udf.builder.cli import main; main()",
+        "--proto",
+        *map(str, protos),
+        "-I",
+        str(schema),
+        "--build-dir",
+        str(work / "build"),
+        "--output-dir",
+        str(work / "out"),
+        "--clean",
+        "--no-cache",
+    ]
+    if args.jobs:
+        cmd += ["--jobs", str(args.jobs)]
+    if args.grpc_plugin:
+        cmd += ["--grpc-plugin", args.grpc_plugin]
+    if unity:
+        cmd.append("--unity")
+
+    start = time.perf_counter()
+    with tempfile.TemporaryFile() as out:
+        p = subprocess.Popen(cmd, stdout=out, stderr=subprocess.STDOUT)
+        # the builder waits for its compilers, so their CPU time is included
+        _, status, usage = os.wait4(p.pid, 0)
+        elapsed = time.perf_counter() - start
+        out.seek(0)
+        text = out.read().decode(errors="replace")
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise SystemExit(f"build failed ({'unity' if unity else 'default'}):\n{text}")
+    m = re.search(r"compiled generated sources: (\d+) objects", text)
+    units = int(m.group(1)) if m else -1
+    return elapsed, usage.ru_utime + usage.ru_stime, units
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--protos", type=int, default=200)
+    parser.add_argument("--service-every", type=int, default=10)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--grpc-plugin", default=None)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-unity-") as directory:
+        schema = Path(directory) / "proto"
+        schema.mkdir()
+        protos = _write_schema(schema, args.protos, args.service_every)
+        services = sum(
+            1 for i in range(args.protos) if args.service_every > 0 and i % args.service_every == 0
+        )
+        print(f"{args.protos} protos, {services} with a service")
+        print(f"{'mode':>8}  {'TUs':>5}  {'wall s':>8}  {'CPU s':>8}")
+        for unity in (False, True):
+            runs = [
+                _build(schema, protos, Path(directory) / "work", unity, args)
+                for _ in range(args.repeat)
+            ]
+            elapsed, cpu, units = min(runs)
+            print(f"{'unity' if unity else 'default':>8}  {units:5d}  {elapsed:8.2f}  {cpu:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
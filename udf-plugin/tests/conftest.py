@@ -4,3 +4,14 @@ import pytest
 @pytest.fixture(autouse=True)
 def no_user_site(monkeypatch):
     monkeypatch.delenv("PYTHONPATH", raising=False)
+
+
+@pytest.fixture(scope="session")
+def object_cache_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("object-cache")
+
+
+@pytest.fixture(autouse=True)
+def isolated_object_cache(monkeypatch, object_cache_dir):
+    # shared by the tests, but not with the user's own builds
+    monkeypatch.setenv("TSURUGI_UDF_CACHE_DIR", str(object_cache_dir))
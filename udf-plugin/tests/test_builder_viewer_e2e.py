@@ -719,3 +719,464 @@ def test_builder_cli_rpc_client_uses_generic_client_context_for_metadata(
     assert "apply_deadline(context, generic_client_context);" in rpc_client_text
 
     assert "grpc::ClientContext context{};" not in rpc_client_text
+
+
+def test_builder_cli_rpc_client_ini_section(tmp_path: Path) -> None:
+    proto = DATA_DIR / "udf_stream.proto"
+    build_dir = tmp_path / "build"
+    out_dir = tmp_path / "out"
+
+    argv = [
+        "--proto",
+        str(proto),
+        "-I",
+        str(DATA_DIR),
+        "-I",
+        str(REPO_PROTO_DIR),
+        "--async-workers",
+        "4",
+        "--stream-capacity",
+        "256",
+        "--channels",
+        "4",
+        "--metrics-file",
+        "{lib}.metrics.json",
+        "--build-dir",
+        str(build_dir),
+        "--output-dir",
+        str(out_dir),
+        "--clean",
+        "--debug",
+    ]
+
+    try:
+        main(argv)
+    except SystemExit as e:
+        pytest.fail(f"builder cli failed with SystemExit({e.code})")
+
+    ini_text = (out_dir / "libudf_stream.ini").read_text(encoding="utf-8")
+
+    assert "[rpc_client]" in ini_text
+    assert "async_workers=4" in ini_text
+    assert "stream_capacity=256" in ini_text
+    assert "channels=4" in ini_text
+    assert "metrics_file=libudf_stream.metrics.json" in ini_text
+
+    rpc_client_files = sorted(build_dir.rglob("rpc_client.cpp"))
+    assert rpc_client_files, f"generated rpc_client.cpp not found under {build_dir}"
+
+    rpc_client_text = rpc_client_files[0].read_text(encoding="utf-8")
+
+    assert "server_streaming_reader<response_type>::submit(" in rpc_client_text
+    assert ".detach();" not in rpc_client_text
+    assert "channels_.acquire()" in rpc_client_text
+    assert "fn_metrics.add_rows(1);" in rpc_client_text
+
+    plugin_api_files = sorted(build_dir.rglob("plugin_api_impl.cpp"))
+    assert plugin_api_files, f"generated plugin_api_impl.cpp not found under {build_dir}"
+    assert "rpc_client::metrics().snapshot()" in plugin_api_files[0].read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize(
+    ("proto_name", "arena", "expected"),
+    [
+        ("udf_stream.proto", None, 3),
+        ("udf_stream.proto", "none", 0),
+        ("batch.proto", None, 0),
+        ("batch.proto", "all", 4),
+    ],
+)
+def test_builder_cli_arena(
+    tmp_path: Path,
+    proto_name: str,
+    arena: str | None,
+    expected: int,
+) -> None:
+    proto = DATA_DIR / proto_name
+    build_dir = tmp_path / "build"
+    out_dir = tmp_path / "out"
+
+    argv = [
+        "--proto",
+        str(proto),
+        "-I",
+        str(DATA_DIR),
+        "-I",
+        str(REPO_PROTO_DIR),
+        *(["--arena", arena] if arena else []),
+        "--arena-initial-block",
+        "8192",
+        "--build-dir",
+        str(build_dir),
+        "--output-dir",
+        str(out_dir),
+        "--clean",
+        "--debug",
+    ]
+
+    try:
+        main(argv)
+    except SystemExit as e:
+        pytest.fail(f"builder cli failed with SystemExit({e.code})")
+
+    ini_text = (out_dir / f"lib{proto.stem}.ini").read_text(encoding="utf-8")
+
+    assert "arena_initial_block=8192" in ini_text
+
+    rpc_client_files = sorted(build_dir.rglob("rpc_client.cpp"))
+    assert rpc_client_files, f"generated rpc_client.cpp not found under {build_dir}"
+
+    rpc_client_text = rpc_client_files[0].read_text(encoding="utf-8")
+
+    # request and response of each call() case and batched call, and the request of each
+    # asynchronous server streaming call, whose response is reused by its reader
+    actual = rpc_client_text.count("google::protobuf::Arena::CreateMessage<")
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "option",
+    [
+        "--async-workers",
+        "--stream-capacity",
+        "--channels",
+        "--batch-size",
+        "--batch-flush-latency",
+        "--arena-initial-block",
+        "--metrics-interval",
+        "--cache-size",
+        "--jobs",
+        "--max-memory",
+    ],
+)
+@pytest.mark.parametrize("value", ["0", "-1"])
+def test_builder_cli_rpc_client_options_must_be_positive(
+    tmp_path: Path,
+    option: str,
+    value: str,
+) -> None:
+    proto = DATA_DIR / "minimal.proto"
+
+    argv = [
+        "--proto",
+        str(proto),
+        "-I",
+        str(DATA_DIR),
+        "-I",
+        str(REPO_PROTO_DIR),
+        option,
+        value,
+        "--build-dir",
+        str(tmp_path / "build"),
+        "--output-dir",
+        str(tmp_path / "out"),
+    ]
+
+    with pytest.raises(SystemExit) as e:
+        main(argv)
+
+    assert e.value.code == 2
+
+
+def test_builder_cli_batch_method(tmp_path: Path) -> None:
+    proto = DATA_DIR / "batch.proto"
+    build_dir = tmp_path / "build"
+    out_dir = tmp_path / "out"
+
+    argv = [
+        "--proto",
+        str(proto),
+        "-I",
+        str(DATA_DIR),
+        "-I",
+        str(REPO_PROTO_DIR),
+        "--batch-size",
+        "64",
+        "--batch-flush-latency",
+        "5",
+        "--build-dir",
+        str(build_dir),
+        "--output-dir",
+        str(out_dir),
+        "--clean",
+        "--debug",
+    ]
+
+    try:
+        main(argv)
+    except SystemExit as e:
+        pytest.fail(f"builder cli failed with SystemExit({e.code})")
+
+    ini_text = (out_dir / "libbatch.ini").read_text(encoding="utf-8")
+
+    assert "batch_size=64" in ini_text
+    assert "batch_flush_latency=5" in ini_text
+
+    rpc_client_files = sorted(build_dir.rglob("rpc_client.cpp"))
+    assert rpc_client_files, f"generated rpc_client.cpp not found under {build_dir}"
+
+    rpc_client_text = rpc_client_files[0].read_text(encoding="utf-8")
+
+    assert "->Square_batch(&context, req, &rep);" in rpc_client_text
+    assert "req.add_rows();" in rpc_client_text
+
+    # the batch method serves Square, and is not a UDF by itself
+    actual = list_visible_udf_functions(tmp_path, [out_dir / "libbatch.so"])
+    assert actual == {"square"}
+
+
+def test_builder_cli_client_and_bidirectional_streaming(tmp_path: Path) -> None:
+    proto = DATA_DIR / "streaming.proto"
+    build_dir = tmp_path / "build"
+    out_dir = tmp_path / "out"
+
+    argv = [
+        "--proto",
+        str(proto),
+        "-I",
+        str(DATA_DIR),
+        "-I",
+        str(REPO_PROTO_DIR),
+        "--build-dir",
+        str(build_dir),
+        "--output-dir",
+        str(out_dir),
+        "--clean",
+        "--debug",
+    ]
+
+    try:
+        main(argv)
+    except SystemExit as e:
+        pytest.fail(f"builder cli failed with SystemExit({e.code})")
+
+    rpc_client_files = sorted(build_dir.rglob("rpc_client.cpp"))
+    assert rpc_client_files, f"generated rpc_client.cpp not found under {build_dir}"
+
+    rpc_client_text = rpc_client_files[0].read_text(encoding="utf-8")
+
+    assert "client_streaming_writer<request_type, response_type>::start(" in rpc_client_text
+    assert "return stub->Sum(context, rep);" in rpc_client_text
+    assert "bidi_streaming_writer<request_type, response_type>::start(" in rpc_client_text
+    assert "return stub->Echo(context);" in rpc_client_text
+    # both writers record the status and latency of their calls
+    assert rpc_client_text.count("metrics().at(0),\n            stopwatch,") == 1
+    assert rpc_client_text.count("metrics().at(1),\n            stopwatch,") == 1
+
+    actual = list_visible_udf_functions(tmp_path, [out_dir / "libstreaming.so"])
+    assert actual == {"sum", "echo"}
+
+
+def test_builder_cli_reuses_build_dir(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    proto_dir = tmp_path / "proto"
+    proto_dir.mkdir()
+    proto = proto_dir / "minimal.proto"
+    proto.write_text((DATA_DIR / "minimal.proto").read_text(encoding="utf-8"))
+    build_dir = tmp_path / "build"
+    out_dir = tmp_path / "out"
+
+    argv = [
+        "--proto",
+        str(proto),
+        "-I",
+        str(proto_dir),
+        "-I",
+        str(REPO_PROTO_DIR),
+        "--jobs",
+        "2",
+        "--build-dir",
+        str(build_dir),
+        "--output-dir",
+        str(out_dir),
+    ]
+
+    def build() -> str:
+        capsys.readouterr()
+        try:
+            main(argv)
+        except SystemExit as e:
+            pytest.fail(f"builder cli failed with SystemExit({e.code})")
+        return capsys.readouterr().out
+
+    first = build()
+    assert "up to date" not in first
+    assert "critical path" in first
+    assert "peak RSS" in first
+    assert (build_dir / "manifest.json").exists()
+    assert (build_dir / "lib" / "libminimal.so").exists()
+
+    second = build()
+    assert "generated sources are up to date." in second
+    assert "template sources up to date: 3 of 3" in second
+    assert "shared libraries up to date: 2 of 2" in second
+
+    proto.write_text(
+        proto.read_text(encoding="utf-8") + "\nmessage Unused { int64 value = 1; }\n"
+    )
+    third = build()
+    assert "generated sources are up to date." not in third
+    assert "shared libraries up to date: 2 of 2" not in third
+
+    actual = list_visible_udf_functions(tmp_path, [out_dir / "libminimal.so"])
+    assert actual == {"ping"}
+
+
+def test_builder_cli_reuses_build_dir_with_auto_deps(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    build_dir = tmp_path / "build"
+    out_dir = tmp_path / "out"
+
+    argv = [
+        "--proto",
+        str(DATA_DIR / "multi_c.proto"),
+        "-I",
+        str(DATA_DIR),
+        "-I",
+        str(REPO_PROTO_DIR),
+        "--build-dir",
+        str(build_dir),
+        "--output-dir",
+        str(out_dir),
+    ]
+
+    def build() -> str:
+        capsys.readouterr()
+        try:
+            main(argv)
+        except SystemExit as e:
+            pytest.fail(f"builder cli failed with SystemExit({e.code})")
+        return capsys.readouterr().out
+
+    first = build()
+    assert "Auto-deps enabled" in first
+    assert "up to date" not in first
+
+    # the entry recorded after the auto-deps rerun covers the requested protos
+    second = build()
+    assert "generated sources are up to date." in second
+
+    (build_dir / "gen" / "multi_common_service.pb.cc").unlink()
+    third = build()
+    assert "generated sources are up to date." not in third
+    assert (build_dir / "gen" / "multi_common_service.pb.cc").exists()
+
+
+def test_builder_cli_object_cache_shared_by_projects(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    proto = DATA_DIR / "minimal.proto"
+    cache_dir = tmp_path / "cache"
+
+    def build(name: str) -> str:
+        argv = [
+            "--proto",
+            str(proto),
+            "-I",
+            str(DATA_DIR),
+            "-I",
+            str(REPO_PROTO_DIR),
+            "--cache-dir",
+            str(cache_dir),
+            "--build-dir",
+            str(tmp_path / name / "build"),
+            "--output-dir",
+            str(tmp_path / name / "out"),
+            "--clean",
+        ]
+        capsys.readouterr()
+        try:
+            main(argv)
+        except SystemExit as e:
+            pytest.fail(f"builder cli failed with SystemExit({e.code})")
+        return capsys.readouterr().out
+
+    first = build("first")
+    assert "object cache: 0 hit(s)" in first
+    assert sorted(cache_dir.glob("archives/*/*"))
+
+    second = build("second")
+    assert re.search(r"object cache: \d+ hit\(s\), 0 miss\(es\)", second)
+
+    actual = list_visible_udf_functions(
+        tmp_path, [tmp_path / "second" / "out" / "libminimal.so"]
+    )
+    assert actual == {"ping"}
+
+
+
+def test_builder_cli_max_memory_holds_back_compiles(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    proto = DATA_DIR / "minimal.proto"
+    out_dir = tmp_path / "out"
+
+    argv = [
+        "--proto",
+        str(proto),
+        "-I",
+        str(DATA_DIR),
+        "-I",
+        str(REPO_PROTO_DIR),
+        "--jobs",
+        "4",
+        "--max-memory",
+        "1",
+        "--no-cache",
+        "--build-dir",
+        str(tmp_path / "build"),
+        "--output-dir",
+        str(out_dir),
+    ]
+
+    try:
+        main(argv)
+    except SystemExit as e:
+        pytest.fail(f"builder cli failed with SystemExit({e.code})")
+    out = capsys.readouterr().out
+
+    # every compile is over the budget, so they run one at a time
+    assert "memory budget 1 MiB" in out
+    assert re.search(r"tasks held back for memory: [1-9]", out)
+
+    actual = list_visible_udf_functions(tmp_path, [out_dir / "libminimal.so"])
+    assert actual == {"ping"}
+
+
+def test_builder_cli_unity_build(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    proto = DATA_DIR / "minimal.proto"
+    build_dir = tmp_path / "build"
+    out_dir = tmp_path / "out"
+
+    argv = [
+        "--proto",
+        str(proto),
+        "-I",
+        str(DATA_DIR),
+        "-I",
+        str(REPO_PROTO_DIR),
+        "--unity",
+        "--no-cache",
+        "--build-dir",
+        str(build_dir),
+        "--output-dir",
+        str(out_dir),
+    ]
+
+    try:
+        main(argv)
+    except SystemExit as e:
+        pytest.fail(f"builder cli failed with SystemExit({e.code})")
+    out = capsys.readouterr().out
+
+    # minimal.pb.cc and minimal.grpc.pb.cc are one translation unit
+    assert "unity build: 2 generated source(s) in 1 translation unit(s)" in out
+    assert (build_dir / "obj" / "gen" / "minimal.unity.o").exists()
+    assert not (build_dir / "obj" / "gen" / "minimal.pb.o").exists()
+
+    actual = list_visible_udf_functions(tmp_path, [out_dir / "libminimal.so"])
+    assert actual == {"ping"}
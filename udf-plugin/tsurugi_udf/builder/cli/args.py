@@ -15,10 +15,25 @@ class CliArgs:
     grpc_server_endpoint: str | None = None
     grpc_transport: str = "stream"
     udf_timeout: int | None = None
+    async_workers: int | None = None
+    stream_capacity: int | None = None
+    channels: int | None = None
+    batch_size: int | None = None
+    batch_flush_latency: int | None = None
+    arena: str = "streaming"
+    arena_initial_block: int | None = None
+    metrics_file: str | None = None
+    metrics_interval: int | None = None
     output_dir: str | None = None
     debug: bool = False
     clean: bool = False
     auto_deps: bool = True
+    jobs: int | None = None
+    max_memory: int | None = None
+    unity: bool = False
+    cache: bool = True
+    cache_dir: str | None = None
+    cache_size: int | None = None
     secure: bool = False
     disable: bool = False
 
@@ -67,6 +82,71 @@ class CliArgs:
             default=None,
             help="UDF RPC call timeout in seconds. If omitted, no timeout is written to ini.",
         )
+        p.add_argument(
+            "--async-workers",
+            type=int,
+            default=None,
+            help="Number of worker threads for asynchronous (server streaming) UDF calls. "
+            "If omitted, no value is written to ini and the plugin uses its default.",
+        )
+        p.add_argument(
+            "--stream-capacity",
+            type=int,
+            default=None,
+            help="Number of rows buffered for each server streaming UDF call. "
+            "If omitted, no value is written to ini and the plugin uses its default.",
+        )
+        p.add_argument(
+            "--channels",
+            type=int,
+            default=None,
+            help="Number of gRPC channels, each on its own connection, shared by the UDF calls. "
+            "More than one channel is used only without --secure. "
+            "If omitted, no value is written to ini and the plugin uses its default.",
+        )
+        p.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Maximum number of rows sent in one batched UDF call. "
+            "If omitted, no value is written to ini and the plugin uses its default.",
+        )
+        p.add_argument(
+            "--batch-flush-latency",
+            type=int,
+            default=None,
+            help="Maximum time in milliseconds to hold a row before sending an incomplete batch. "
+            "If omitted, no value is written to ini and the plugin uses its default.",
+        )
+        p.add_argument(
+            "--arena",
+            choices=["none", "streaming", "all"],
+            default="streaming",
+            help="UDF calls whose protobuf messages are allocated on a per-call arena: "
+            "none, streaming (server streaming calls only), or all (default: streaming)",
+        )
+        p.add_argument(
+            "--arena-initial-block",
+            type=int,
+            default=None,
+            help="Size in bytes of the first block of each per-call arena. "
+            "If omitted, no value is written to ini and the plugin uses its default.",
+        )
+        p.add_argument(
+            "--metrics-file",
+            default=None,
+            help="JSON file to which the plugin periodically writes its per-function metrics. "
+            "'{lib}' is replaced with the library name, e.g. '{lib}.metrics.json'. "
+            "A relative path is resolved against the directory of the ini. "
+            "If omitted, no value is written to ini and the metrics are not written.",
+        )
+        p.add_argument(
+            "--metrics-interval",
+            type=int,
+            default=None,
+            help="Interval in seconds between writes of the metrics file. "
+            "If omitted, no value is written to ini and the plugin uses its default.",
+        )
         p.add_argument(
             "--output-dir",
             default=".",
@@ -89,6 +169,46 @@ class CliArgs:
             help="Automatically include imported .proto files (default: enabled). "
             "Use --no-auto-deps to disable and treat unlisted imports as error.",
         )
+        p.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=None,
+            help="Number of build steps run in parallel "
+            "(default: number of CPUs, limited by the cgroup CPU quota)",
+        )
+        p.add_argument(
+            "--max-memory",
+            type=int,
+            default=None,
+            help="Memory in MiB that parallel compiles may use together "
+            "(default: 90%% of the available memory, limited by the cgroup memory limit)",
+        )
+        p.add_argument(
+            "--unity",
+            action="store_true",
+            help="Compile the generated sources of each .proto file as one translation unit",
+        )
+        p.add_argument(
+            "--cache",
+            action=argparse.BooleanOptionalAction,
+            default=True,
+            help="Reuse compiled objects from the user-level object cache shared by all projects "
+            "(default: enabled). Use --no-cache to always compile.",
+        )
+        p.add_argument(
+            "--cache-dir",
+            default=None,
+            help="Directory of the object cache "
+            "(default: $TSURUGI_UDF_CACHE_DIR, or $XDG_CACHE_HOME/tsurugi-udf-builder)",
+        )
+        p.add_argument(
+            "--cache-size",
+            type=int,
+            default=None,
+            help="Maximum size of the object cache in MiB; "
+            "the least recently used objects are evicted beyond it (default: 1024)",
+        )
         p.add_argument(
             "--secure",
             action="store_true",
@@ -113,6 +233,26 @@ class CliArgs:
 
         if ns.udf_timeout is not None and ns.udf_timeout <= 0:
             parser.error("--udf-timeout must be a positive integer in seconds")
+        if ns.async_workers is not None and ns.async_workers <= 0:
+            parser.error("--async-workers must be a positive integer")
+        if ns.stream_capacity is not None and ns.stream_capacity <= 0:
+            parser.error("--stream-capacity must be a positive integer")
+        if ns.channels is not None and ns.channels <= 0:
+            parser.error("--channels must be a positive integer")
+        if ns.batch_size is not None and ns.batch_size <= 0:
+            parser.error("--batch-size must be a positive integer")
+        if ns.batch_flush_latency is not None and ns.batch_flush_latency <= 0:
+            parser.error("--batch-flush-latency must be a positive integer in milliseconds")
+        if ns.arena_initial_block is not None and ns.arena_initial_block <= 0:
+            parser.error("--arena-initial-block must be a positive integer in bytes")
+        if ns.metrics_interval is not None and ns.metrics_interval <= 0:
+            parser.error("--metrics-interval must be a positive integer in seconds")
+        if ns.jobs is not None and ns.jobs <= 0:
+            parser.error("--jobs must be a positive integer")
+        if ns.max_memory is not None and ns.max_memory <= 0:
+            parser.error("--max-memory must be a positive integer in MiB")
+        if ns.cache_size is not None and ns.cache_size <= 0:
+            parser.error("--cache-size must be a positive integer in MiB")
 
         return cls(
             proto_files=list(ns.proto_files),
@@ -123,10 +263,25 @@ class CliArgs:
             grpc_server_endpoint=ns.grpc_server_endpoint,
             grpc_transport=ns.grpc_transport,
             udf_timeout=ns.udf_timeout,
+            async_workers=ns.async_workers,
+            stream_capacity=ns.stream_capacity,
+            channels=ns.channels,
+            batch_size=ns.batch_size,
+            batch_flush_latency=ns.batch_flush_latency,
+            arena=ns.arena,
+            arena_initial_block=ns.arena_initial_block,
+            metrics_file=ns.metrics_file,
+            metrics_interval=ns.metrics_interval,
             output_dir=ns.output_dir,
             debug=bool(ns.debug),
             clean=bool(ns.clean),
             auto_deps=bool(ns.auto_deps),
+            jobs=ns.jobs,
+            max_memory=ns.max_memory,
+            unity=bool(ns.unity),
+            cache=bool(ns.cache),
+            cache_dir=ns.cache_dir,
+            cache_size=ns.cache_size,
             secure=ns.secure,
             disable=ns.disable,
         )
@@ -142,8 +297,21 @@ class CliArgs:
             f"secure={'true' if self.secure else 'false'}, "
             f"auto_deps={'true' if self.auto_deps else 'false'}, "
             f"clean={'true' if self.clean else 'false'}, "
+            f"jobs={self.jobs}, "
+            f"max_memory={self.max_memory}, "
+            f"unity={'true' if self.unity else 'false'}, "
+            f"cache={'true' if self.cache else 'false'}, "
             f"out={self.output_dir}, "
-            f"udf_timeout={self.udf_timeout}"
+            f"udf_timeout={self.udf_timeout}, "
+            f"async_workers={self.async_workers}, "
+            f"stream_capacity={self.stream_capacity}, "
+            f"channels={self.channels}, "
+            f"batch_size={self.batch_size}, "
+            f"batch_flush_latency={self.batch_flush_latency}, "
+            f"arena={self.arena}, "
+            f"arena_initial_block={self.arena_initial_block}, "
+            f"metrics_file={self.metrics_file}, "
+            f"metrics_interval={self.metrics_interval}"
         )
 
     def to_debug_detail_lines(self) -> list[str]:
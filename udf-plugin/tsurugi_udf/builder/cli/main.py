@@ -1,13 +1,24 @@
 from __future__ import annotations
 
+from functools import partial
 from pathlib import Path
 import sys
 import shutil
 import importlib.util
 
+from google.protobuf.descriptor_pb2 import FileDescriptorSet
+
 from .args import CliArgs
 from .validate import validate_includes, validate_proto_files
-from ..core.compile_gen import build_objects_parallel
+from ..core.compile_gen import (
+    compile_one,
+    find_generated_cc,
+    obj_path_for,
+    proto_name_for,
+    unity_obj_path_for,
+    unity_source_for,
+    write_unity_source,
+)
 from ..core.paths import BuildPaths
 from ..core.fs import ensure_dirs, move_outputs
 from ..core.tools.grpc_plugin import find_grpc_cpp_plugin
@@ -15,22 +26,45 @@ from ..core.tools import protoc
 from ..core.errors import ToolNotFoundError, CommandFailedError
 from ..core.descriptor import (
     load_fds,
+    proto_source_paths,
     build_import_graph,
     find_unlisted_imports,
     descriptor_name,
     is_well_known_proto,
 )
-from ..core.gen_tpl import render_tpl_for_rpc_protos
+from ..core.gen_tpl import render_tpl_for_rpc_protos, tpl_paths_for_rpc_protos
 from ..core.log import info, debug, error, debug_list, setup, warn, section
-from ..core.compile_tpl import compile_tpl_objects_parallel
-from ..core.compile_common import compile_common_objects, archive_common_static
-from ..core.link_shared import build_split_shared_libs_layered_parallel
+from ..core.compile_tpl import compile_tpl_one, tpl_obj_path_for
+from ..core.compile_common import (
+    archive_common_static,
+    common_obj_path,
+    compile_common_object,
+)
+from ..core.manifest import BuildManifest, digest_strings
+from ..core.object_cache import DEFAULT_MAX_SIZE_MIB, ObjectCache, default_cache_dir
+from ..core.link_shared import (
+    link_one_plugin_shared,
+    link_one_proto_shared,
+    plan_split_shared_libs,
+    topo_layers,
+)
+from ..core.resources import MiB, default_memory_budget, estimate_compile_memory
+from ..core.scheduler import BuildScheduler
+from ..core.toolchain import get_cxx, get_cxxflags, get_ldflags
 from ..core.verify_so import verify_split_shared_libs
 from ..core.analyze_rpcs import dump_rpc_so_report, collect_rpc_proto_names
 from ..core.write_ini import write_ini_files_for_rpc_libs
 from ..core.validate_descriptor import validate_oneof_categories
 
 
+def _report_up_to_date(
+    label: str, scheduler: BuildScheduler, tasks: list[str]
+) -> None:
+    up_to_date = sum(1 for t in tasks if not scheduler.result(t))
+    if up_to_date:
+        info(f"{label} up to date: {up_to_date} of {len(tasks)}")
+
+
 def main(argv: list[str] | None = None) -> None:
     args = CliArgs.from_cli(argv)
     setup(debug=args.debug)
@@ -60,6 +94,22 @@ def main(argv: list[str] | None = None) -> None:
     proto_outputs: dict[str, Path] | None = None
     ini_outputs: dict[str, Path] | None = None
     output_dir: Path | None = None
+    manifest: BuildManifest | None = None
+    cache: ObjectCache | None = None
+    if args.cache:
+        cache = ObjectCache(
+            Path(args.cache_dir) if args.cache_dir else default_cache_dir(),
+            max_size=(args.cache_size or DEFAULT_MAX_SIZE_MIB) * 1024 * 1024,
+        )
+        debug(f"object cache: {cache.root} (max {cache.max_size} bytes)")
+    memory_budget = (
+        args.max_memory * MiB if args.max_memory else default_memory_budget()
+    )
+    scheduler = BuildScheduler(jobs=args.jobs, memory_budget=memory_budget)
+    debug(
+        f"build scheduler: jobs={scheduler.jobs}, memory budget="
+        + (f"{memory_budget // MiB} MiB" if memory_budget is not None else "unlimited")
+    )
 
     try:
         with section("build dir"):
@@ -73,6 +123,7 @@ def main(argv: list[str] | None = None) -> None:
                 info(f"creating build dir: {build_dir}")
 
             ensure_dirs(paths)
+            manifest = BuildManifest.load(build_dir)
             debug(
                 "BuildPaths: "
                 f"GEN={paths.GEN} TPL={paths.TPL} OBJ={paths.OBJ} "
@@ -84,90 +135,179 @@ def main(argv: list[str] | None = None) -> None:
             grpc_plugin = find_grpc_cpp_plugin(args.grpc_plugin)
             debug(f"resolved grpc plugin: {grpc_plugin}")
 
-            cmd = protoc.build_protoc_cmd(
-                includes=includes,
-                proto_files=proto_files,
-                desc_out=desc_pb,
-                gen_dir=paths.GEN,
-                grpc_plugin_path=grpc_plugin,
+            # the runtime does not depend on the .proto files, so it compiles meanwhile
+            common_srcs = [
+                tsurugi_udf_common_dir / "src" / "udf" / "descriptor_impl.cpp",
+                tsurugi_udf_common_dir / "src" / "udf" / "error_info.cpp",
+                tsurugi_udf_common_dir / "src" / "udf" / "generic_record_impl.cpp",
+                tsurugi_udf_common_dir / "src" / "udf" / "async_executor.cpp",
+                tsurugi_udf_common_dir / "src" / "udf" / "plugin_config.cpp",
+                tsurugi_udf_common_dir / "src" / "udf" / "channel_pool.cpp",
+                tsurugi_udf_common_dir / "src" / "udf" / "function_metrics.cpp",
+            ]
+            common_include_dirs = [
+                tsurugi_udf_common_dir / "include" / "udf",
+                paths.GEN,
+                *includes,
+            ]
+            debug_list("common_srcs", common_srcs)
+            debug_list("common_include_dirs", common_include_dirs)
+
+            def compile_memory(obj: Path, *sources: Path) -> int:
+                # the peak RSS of the last compile is a better guess than the source size
+                return estimate_compile_memory(*sources, peak_rss=manifest.peak_rss(obj))
+
+            cxx = get_cxx()
+            cxxflags = get_cxxflags()
+            common_obj_dir = paths.OBJ / "common" / "obj"
+            common_objs = [common_obj_path(src, common_obj_dir) for src in common_srcs]
+            runtime_tasks = [
+                scheduler.add(
+                    f"compile runtime/{src.name}",
+                    partial(
+                        compile_common_object,
+                        cxx=cxx,
+                        src=src,
+                        obj=obj,
+                        include_dirs=[str(p) for p in common_include_dirs],
+                        extra_cflags=cxxflags,
+                        manifest=manifest,
+                        cache=cache,
+                    ),
+                    memory=compile_memory(obj, src),
+                )
+                for src, obj in zip(common_srcs, common_objs)
+            ]
+            archive_task = scheduler.add(
+                "archive runtime",
+                partial(
+                    archive_common_static,
+                    objs=common_objs,
+                    out_dir=paths.OBJ / "common" / "lib",
+                    manifest=manifest,
+                    cache=cache,
+                ),
+                deps=runtime_tasks,
             )
-            debug("protoc cmd: " + " ".join(map(str, cmd)))
-            protoc.run(cmd)
-            debug(f"descriptor: {desc_pb}")
-
-            fds = load_fds(desc_pb)
-            validate_oneof_categories(fds)
-            graph = build_import_graph(fds)
-            info(f"import graph: {len(graph)} proto(s)")
-            debug_list("import graph protos", sorted(graph.keys()))
-
-            unmappable, unlisted = find_unlisted_imports(
-                fds=fds,
-                includes=includes,
-                proto_files=proto_files,
-                exclude_well_known=True,
+            info(
+                f"compiling runtime sources meanwhile: {len(common_srcs)} file(s) "
+                f"(jobs={scheduler.jobs})"
             )
-            if unmappable:
-                warn("Some specified .proto files are not under any -I include path.")
-                warn("Cannot map them to import names (check your --I settings):")
-                for p in unmappable:
-                    warn(f" - {p}")
 
-            if unlisted:
-                info(
-                    "Imported .proto files detected that were not explicitly specified:"
+            def generate() -> tuple[FileDescriptorSet, dict[str, set[str]]]:
+                cmd = protoc.build_protoc_cmd(
+                    includes=includes,
+                    proto_files=proto_files,
+                    desc_out=desc_pb,
+                    gen_dir=paths.GEN,
+                    grpc_plugin_path=grpc_plugin,
+                )
+                debug("protoc cmd: " + " ".join(map(str, cmd)))
+                # keyed on the requested protos rather than the last protoc command,
+                # so that the entry recorded after an auto-deps rerun covers both runs
+                key = digest_strings(
+                    *map(str, cmd), protoc.version(), f"auto_deps={args.auto_deps}"
+                )
+                up_to_date = manifest.is_up_to_date(desc_pb, key)
+                if up_to_date:
+                    info("generated sources are up to date.")
+                else:
+                    protoc.run(cmd)
+                debug(f"descriptor: {desc_pb}")
+
+                fds = load_fds(desc_pb)
+                validate_oneof_categories(fds)
+                graph = build_import_graph(fds)
+                info(f"import graph: {len(graph)} proto(s)")
+                debug_list("import graph protos", sorted(graph.keys()))
+
+                unmappable, unlisted = find_unlisted_imports(
+                    fds=fds,
+                    includes=includes,
+                    proto_files=proto_files,
+                    exclude_well_known=True,
                 )
-                for n in unlisted:
-                    info(f" - {n}")
+                if unmappable:
+                    warn("Some specified .proto files are not under any -I include path.")
+                    warn("Cannot map them to import names (check your --I settings):")
+                    for p in unmappable:
+                        warn(f" - {p}")
 
-                if args.auto_deps:
+                if unlisted:
                     info(
-                        "Auto-deps enabled (default): including them and retrying code generation."
+                        "Imported .proto files detected that were not explicitly specified:"
                     )
-                    proto_files2 = [*proto_files, *unlisted]  # Path + str mixed OK
-                    cmd2 = protoc.build_protoc_cmd(
-                        includes=includes,
-                        proto_files=proto_files2,
-                        desc_out=desc_pb,
-                        gen_dir=paths.GEN,
-                        grpc_plugin_path=grpc_plugin,
-                    )
-                    debug("protoc cmd (auto-deps): " + " ".join(map(str, cmd2)))
-                    protoc.run(cmd2)
-
-                    fds = load_fds(desc_pb)
-                    validate_oneof_categories(fds)
-                    graph = build_import_graph(fds)
-                    info(f"import graph (after auto-deps): {len(graph)} proto(s)")
-                    debug_list(
-                        "import graph protos (after auto-deps)",
-                        sorted(graph.keys()),
-                    )
-                else:
-                    error(
-                        "Unlisted imported .proto files found and --no-auto-deps specified."
-                    )
-                    error("Please explicitly add them via --proto or enable auto-deps.")
                     for n in unlisted:
-                        error(f" - {n}")
-                    raise SystemExit(1)
+                        info(f" - {n}")
+
+                    if args.auto_deps:
+                        info(
+                            "Auto-deps enabled (default): including them and retrying code generation."
+                        )
+                        proto_files2 = [*proto_files, *unlisted]  # Path + str mixed OK
+                        cmd2 = protoc.build_protoc_cmd(
+                            includes=includes,
+                            proto_files=proto_files2,
+                            desc_out=desc_pb,
+                            gen_dir=paths.GEN,
+                            grpc_plugin_path=grpc_plugin,
+                        )
+                        debug("protoc cmd (auto-deps): " + " ".join(map(str, cmd2)))
+                        if not up_to_date:
+                            protoc.run(cmd2)
+
+                        fds = load_fds(desc_pb)
+                        validate_oneof_categories(fds)
+                        graph = build_import_graph(fds)
+                        info(f"import graph (after auto-deps): {len(graph)} proto(s)")
+                        debug_list(
+                            "import graph protos (after auto-deps)",
+                            sorted(graph.keys()),
+                        )
+                    else:
+                        error(
+                            "Unlisted imported .proto files found and --no-auto-deps specified."
+                        )
+                        error("Please explicitly add them via --proto or enable auto-deps.")
+                        for n in unlisted:
+                            error(f" - {n}")
+                        raise SystemExit(1)
+
+                if not up_to_date:
+                    # the generated sources count too, so that protoc runs again if one is lost
+                    generated = sorted(
+                        p for p in paths.GEN.rglob("*") if p.name.endswith((".pb.cc", ".pb.h"))
+                    )
+                    inputs = proto_source_paths(fds, includes)
+                    manifest.record(desc_pb, key, [*inputs, grpc_plugin, *generated])
+                return fds, graph
 
+            codegen_task = "code generation"
+            fds, graph = scheduler.run(codegen_task, generate)
             info("code generation completed.")
 
         with section("templates"):
-            info("rendering RPC templates...")
             templates_dir = Path(__file__).resolve().parents[1] / "templates"
             debug(f"templates_dir: {templates_dir}")
 
-            rendered = render_tpl_for_rpc_protos(
-                fds=fds,
-                templates_dir=templates_dir,
-                tpl_dir=paths.TPL,
+            # the rendered files are known from the descriptors, so that their compiles
+            # can be queued together with the generated sources instead of after rendering
+            tpl_paths = tpl_paths_for_rpc_protos(fds=fds, tpl_dir=paths.TPL)
+            render_task = scheduler.add(
+                "render templates",
+                partial(
+                    render_tpl_for_rpc_protos,
+                    fds=fds,
+                    templates_dir=templates_dir,
+                    tpl_dir=paths.TPL,
+                    arena=args.arena,
+                ),
+                deps=[codegen_task],
             )
-            info(f"template rendering completed. ({len(rendered)} proto(s))")
+            info(f"rendering RPC templates meanwhile: {len(tpl_paths)} proto(s)")
             debug(f"template dir: {paths.TPL}")
 
-            tpl_subdirs = [p for p in sorted(paths.TPL.glob("*")) if p.is_dir()]
+            tpl_subdirs = sorted({p.parent for files in tpl_paths.values() for p in files.values()})
             gen_subdirs = [p for p in sorted(paths.GEN.rglob("*")) if p.is_dir()]
             tpl_include_dirs: list[Path] = [
                 *tpl_subdirs,
@@ -180,49 +320,7 @@ def main(argv: list[str] | None = None) -> None:
             debug_list("gen_subdirs", gen_subdirs)
             debug_list("tpl_include_dirs", tpl_include_dirs)
 
-        with section("compile templates"):
-            tpl_objs, tpl_objs_by_stem = compile_tpl_objects_parallel(
-                tpl_dir=paths.TPL,
-                obj_dir=paths.OBJ,
-                include_dirs=[str(p) for p in tpl_include_dirs],
-                jobs=None,
-            )
-            info(f"compiled template sources: {len(tpl_objs)} objects")
-            for stem, objs in sorted(tpl_objs_by_stem.items()):
-                debug(
-                    f"tpl stem '{stem}': {len(objs)} objs -> {(paths.OBJ / 'tpl' / stem)}"
-                )
-                for o in sorted(objs, key=lambda p: p.name):
-                    debug(f" - {o.name}")
-
-        with section("compile runtime"):
-            common_srcs = [
-                tsurugi_udf_common_dir / "src" / "udf" / "descriptor_impl.cpp",
-                tsurugi_udf_common_dir / "src" / "udf" / "error_info.cpp",
-                tsurugi_udf_common_dir / "src" / "udf" / "generic_record_impl.cpp",
-            ]
-            common_include_dirs = [
-                tsurugi_udf_common_dir / "include" / "udf",
-                paths.GEN,
-                *includes,
-            ]
-            debug_list("common_srcs", common_srcs)
-            debug_list("common_include_dirs", common_include_dirs)
-
-            common_obj_dir = paths.OBJ / "common" / "obj"
-            common_objs = compile_common_objects(
-                sources=common_srcs,
-                obj_dir=common_obj_dir,
-                include_dirs=[str(p) for p in common_include_dirs],
-            )
-            common_a = archive_common_static(
-                objs=common_objs,
-                out_dir=paths.OBJ / "common" / "lib",
-            )
-            info(f"compiled runtime library: {common_a.name}")
-            debug(f"runtime static: {common_a}")
-
-        with section("compile generated"):
+        with section("compile and link"):
             gen_include_dirs = [
                 paths.GEN,
                 *includes,
@@ -230,38 +328,196 @@ def main(argv: list[str] | None = None) -> None:
             ]
             debug_list("gen_include_dirs", gen_include_dirs)
 
-            gen_objs = build_objects_parallel(
-                gen_dir=paths.GEN,
-                obj_dir=paths.OBJ / "gen",
-                include_dirs=[str(p) for p in gen_include_dirs],
-                jobs=None,
-            )
-            info(f"compiled generated sources: {len(gen_objs)} objects")
-            for obj in gen_objs:
-                rel = obj.relative_to(paths.OBJ / "gen")
-                src = (paths.GEN / rel).with_suffix(".cc")
-                debug(f"gen: {src} -> {obj}")
-
-        with section("link"):
             target_protos = set(graph.keys())
             rpc_protos = collect_rpc_proto_names(fds)
 
             exclude_protos: set[str] = {
                 p for p in target_protos if is_well_known_proto(p)
             }
-
-            outputs, proto_outputs = build_split_shared_libs_layered_parallel(
+            plan = plan_split_shared_libs(
                 import_graph=graph,
                 target_protos=target_protos,
                 rpc_protos=rpc_protos,
-                obj_dir=paths.OBJ / "gen",
-                plugin_lib_dir=paths.LIB,
-                proto_lib_dir=paths.LIB / "deps",
                 exclude_protos=exclude_protos,
-                jobs=None,
-                tpl_objs_by_stem=tpl_objs_by_stem,
-                common_static=common_a,
             )
+            ldflags = get_ldflags()
+            gen_obj_dir = paths.OBJ / "gen"
+            proto_lib_dir = paths.LIB / "deps"
+
+            gen_srcs: dict[str, list[Path]] = {}
+            for cc in find_generated_cc(paths.GEN):
+                gen_srcs.setdefault(proto_name_for(cc, paths.GEN), []).append(cc)
+            tpl_srcs: dict[str, list[Path]] = {}
+            for files in tpl_paths.values():
+                for src in sorted(p for p in files.values() if p.suffix == ".cpp"):
+                    tpl_srcs.setdefault(src.relative_to(paths.TPL).parts[0], []).append(src)
+
+            gen_tasks: list[str] = []
+            tpl_tasks: list[str] = []
+            link_tasks: list[str] = []
+            proto_link_tasks: dict[str, str] = {}
+            unity_members: list[int] = []
+            tpl_objs_by_stem: dict[str, list[Path]] = {}
+            outputs = {}
+            proto_outputs = {}
+
+            def add_gen_compiles(pn: str) -> list[str]:
+                if args.unity:
+                    return add_unity_compile(pn)
+                names: list[str] = []
+                for cc in gen_srcs.pop(pn, []):
+                    obj = obj_path_for(cc, paths.GEN, gen_obj_dir)
+                    names.append(
+                        scheduler.add(
+                            f"compile gen/{cc.relative_to(paths.GEN)}",
+                            partial(
+                                compile_one,
+                                cxx=cxx,
+                                cc=cc,
+                                obj=obj,
+                                include_dirs=[str(p) for p in gen_include_dirs],
+                                extra_cflags=cxxflags,
+                                manifest=manifest,
+                                cache=cache,
+                            ),
+                            deps=[codegen_task],
+                            memory=compile_memory(obj, cc),
+                        )
+                    )
+                gen_tasks.extend(names)
+                return names
+
+            def add_unity_compile(pn: str) -> list[str]:
+                members = gen_srcs.pop(pn, [])
+                if not members:
+                    return []
+                src = unity_source_for(pn, paths.UNITY)
+                obj = unity_obj_path_for(pn, gen_obj_dir)
+                write_unity_source(src, members, paths.GEN)
+                unity_members.append(len(members))
+                name = scheduler.add(
+                    f"compile unity/{src.relative_to(paths.UNITY)}",
+                    partial(
+                        compile_one,
+                        cxx=cxx,
+                        cc=src,
+                        obj=obj,
+                        include_dirs=[str(p) for p in gen_include_dirs],
+                        extra_cflags=cxxflags,
+                        manifest=manifest,
+                        cache=cache,
+                    ),
+                    deps=[codegen_task],
+                    memory=compile_memory(obj, *members),
+                )
+                gen_tasks.append(name)
+                return [name]
+
+            def add_tpl_compiles(stem: str) -> list[str]:
+                names: list[str] = []
+                for src in tpl_srcs.pop(stem, []):
+                    obj = tpl_obj_path_for(src, paths.TPL, paths.OBJ)
+                    tpl_objs_by_stem.setdefault(stem, []).append(obj)
+                    names.append(
+                        scheduler.add(
+                            f"compile tpl/{src.relative_to(paths.TPL)}",
+                            partial(
+                                compile_tpl_one,
+                                cxx=cxx,
+                                src=src,
+                                obj=obj,
+                                include_dirs=[str(p) for p in tpl_include_dirs],
+                                extra_cflags=cxxflags,
+                                manifest=manifest,
+                                cache=cache,
+                            ),
+                            deps=[render_task],
+                            memory=compile_memory(obj, src),
+                        )
+                    )
+                tpl_tasks.extend(names)
+                return names
+
+            def link_plugin(pn: str, out: Path) -> bool:
+                return link_one_plugin_shared(
+                    proto_name=pn,
+                    out_lib_path=out,
+                    proto_lib_dir=proto_lib_dir,
+                    proto_to_proto_libfile=plan.proto_libfiles,
+                    extra_ldflags=ldflags,
+                    cxx=cxx,
+                    extra_objs=tpl_objs_by_stem.get(Path(pn).stem, []),
+                    common_static=scheduler.result(archive_task),
+                    manifest=manifest,
+                )
+
+            # each proto's objects, then its libraries, in dependency order, so that
+            # compiles of different kinds interleave, and every link starts as soon as
+            # its own objects and the libraries it depends on exist
+            for pn in [pn for layer in topo_layers(plan.proto_dep_graph) for pn in layer]:
+                compile_tasks = add_gen_compiles(pn)
+                deps = sorted(plan.proto_dep_graph[pn])
+                out = proto_lib_dir / plan.proto_libfiles[pn]
+                proto_outputs[pn] = out
+                proto_link_tasks[pn] = scheduler.add(
+                    f"link deps/{out.name}",
+                    partial(
+                        link_one_proto_shared,
+                        proto_name=pn,
+                        out_lib_path=out,
+                        obj_dir=gen_obj_dir,
+                        lib_dir=proto_lib_dir,
+                        deps=deps,
+                        proto_to_libfile=plan.proto_libfiles,
+                        extra_ldflags=ldflags,
+                        cxx=cxx,
+                        manifest=manifest,
+                        unity=args.unity,
+                    ),
+                    deps=[*compile_tasks, *(proto_link_tasks[d] for d in deps)],
+                )
+                link_tasks.append(proto_link_tasks[pn])
+
+                if pn not in plan.plugin_libfiles:
+                    continue
+                out = paths.LIB / plan.plugin_libfiles[pn]
+                outputs[pn] = out
+                link_tasks.append(
+                    scheduler.add(
+                        f"link {out.name}",
+                        partial(link_plugin, pn, out),
+                        deps=[
+                            *add_tpl_compiles(Path(pn).stem),
+                            proto_link_tasks[pn],
+                            archive_task,
+                        ],
+                    )
+                )
+            # sources which are not linked into any library still compile, as before
+            for pn in sorted(gen_srcs):
+                add_gen_compiles(pn)
+            for stem in sorted(tpl_srcs):
+                add_tpl_compiles(stem)
+
+            scheduler.wait()
+
+            info(
+                f"template rendering completed. ({len(scheduler.result(render_task))} proto(s))"
+            )
+            _report_up_to_date("runtime sources", scheduler, runtime_tasks)
+            _report_up_to_date("generated sources", scheduler, gen_tasks)
+            _report_up_to_date("template sources", scheduler, tpl_tasks)
+            _report_up_to_date("shared libraries", scheduler, link_tasks)
+            common_a = scheduler.result(archive_task)
+            info(f"compiled runtime library: {common_a.name}")
+            debug(f"runtime static: {common_a}")
+            info(f"compiled generated sources: {len(gen_tasks)} objects")
+            if args.unity:
+                info(
+                    f"unity build: {sum(unity_members)} generated source(s) "
+                    f"in {len(unity_members)} translation unit(s)"
+                )
+            info(f"compiled template sources: {len(tpl_tasks)} objects")
             info(
                 f"linked shared libraries: "
                 f"{len(outputs)} plugin entry lib(s), {len(proto_outputs)} proto lib(s)"
@@ -270,6 +526,7 @@ def main(argv: list[str] | None = None) -> None:
                 debug(f"plugin so: {pn} -> {outputs[pn]}")
             for pn in sorted(proto_outputs.keys()):
                 debug(f"proto so: {pn} -> {proto_outputs[pn]}")
+            scheduler.report()
 
         with section("verify"):
             verify_split_shared_libs(
@@ -295,6 +552,14 @@ def main(argv: list[str] | None = None) -> None:
                 secure=args.secure,
                 enabled=not args.disable,
                 udf_timeout=args.udf_timeout,
+                async_workers=args.async_workers,
+                stream_capacity=args.stream_capacity,
+                channels=args.channels,
+                batch_size=args.batch_size,
+                batch_flush_latency=args.batch_flush_latency,
+                arena_initial_block=args.arena_initial_block,
+                metrics_file=args.metrics_file,
+                metrics_interval=args.metrics_interval,
             )
             info(
                 "wrote ini files: "
@@ -308,6 +573,7 @@ def main(argv: list[str] | None = None) -> None:
                 src_ini_dir=paths.INI,
                 dst_root=output_dir,
                 src_deps_lib_dir=paths.LIB / "deps",
+                keep=True,
             )
 
             shutil.copy2(desc_pb, output_dir / desc_pb.name)
@@ -336,6 +602,16 @@ def main(argv: list[str] | None = None) -> None:
     except ValueError as e:
         error(str(e))
         raise SystemExit(1)
+    finally:
+        # the running steps still record their outputs
+        scheduler.close()
+        # keep the outputs finished so far, also when a later stage failed
+        if manifest is not None:
+            manifest.save()
+        if cache is not None:
+            if cache.hits or cache.misses:
+                info(f"object cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+            cache.evict()
 
 
 if __name__ == "__main__":
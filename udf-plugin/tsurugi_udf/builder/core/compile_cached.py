@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from .manifest import BuildManifest, digest_strings, read_depfile
+from .object_cache import ObjectCache
+from .resources import run_measured
+from .toolchain import toolchain_fingerprint
+
+
+def compile_cached(
+    cmd: list[str],
+    *,
+    cxx: str,
+    src: Path,
+    obj: Path,
+    manifest: BuildManifest | None = None,
+    cache: ObjectCache | None = None,
+    label: str = "compile",
+) -> bool:
+    """Compile src into obj with cmd, unless obj is up to date or in the object cache.
+
+    With a manifest, the compiler also writes the headers it read to a depfile, and
+    they are recorded as inputs of obj. Returns False if obj is up to date.
+    Raises RuntimeError starting with "{label} failed:" if the compile fails.
+    """
+    obj.parent.mkdir(parents=True, exist_ok=True)
+
+    if manifest is not None:
+        depfile = obj.with_suffix(".d")
+        cmd = [*cmd, "-MMD", "-MF", str(depfile)]
+        key = digest_strings(*cmd, toolchain_fingerprint(cxx))
+        if manifest.is_up_to_date(obj, key):
+            return False
+
+    cache_key = cache.key_for(cmd, src=src, obj=obj) if cache is not None else None
+    if cache_key is not None and cache.fetch(cache_key, obj):
+        if manifest is not None:
+            manifest.record(obj, key, read_depfile(depfile))
+        return True
+
+    r, peak_rss = run_measured(cmd)
+    if r.returncode != 0:
+        msg = [f"{label} failed:", "  " + " ".join(map(str, cmd))]
+        if r.stdout:
+            msg.append(r.stdout)
+        if r.stderr:
+            msg.append(r.stderr)
+        raise RuntimeError("\n".join(msg))
+
+    if manifest is not None:
+        manifest.record(obj, key, read_depfile(depfile), peak_rss=peak_rss)
+    if cache_key is not None:
+        cache.store(cache_key, obj)
+    return True
@@ -2,43 +2,42 @@ from __future__ import annotations
 
 import subprocess
 from pathlib import Path
-from .toolchain import get_cxx, get_cxxflags
+from .compile_cached import compile_cached
+from .manifest import BuildManifest, digest_file, digest_strings
+from .object_cache import ObjectCache
 
 
-def compile_common_objects(
-    *,
-    sources: list[Path],
-    obj_dir: Path,
-    include_dirs: list[str],
-) -> list[Path]:
-    cxx = get_cxx()
-    extra = get_cxxflags()
-
-    objs: list[Path] = []
-    for src in sources:
-        if not src.exists():
-            raise FileNotFoundError(f"common source not found: {src}")
+def common_obj_path(src: Path, obj_dir: Path) -> Path:
+    return (obj_dir / src.name).with_suffix(".o")
 
-        obj = (obj_dir / src.name).with_suffix(".o")
-        obj.parent.mkdir(parents=True, exist_ok=True)
 
-        cmd = [cxx, "-fPIC", "-c", str(src), "-o", str(obj)]
-        for inc in include_dirs:
-            cmd.append(f"-I{inc}")
-        cmd += extra
-
-        r = subprocess.run(cmd, text=True, capture_output=True)
-        if r.returncode != 0:
-            msg = ["compile common failed:", "  " + " ".join(map(str, cmd))]
-            if r.stdout:
-                msg.append(r.stdout)
-            if r.stderr:
-                msg.append(r.stderr)
-            raise RuntimeError("\n".join(msg))
+def compile_common_object(
+    *,
+    cxx: str,
+    src: Path,
+    obj: Path,
+    include_dirs: list[str],
+    extra_cflags: list[str],
+    manifest: BuildManifest | None = None,
+    cache: ObjectCache | None = None,
+) -> bool:
+    if not src.exists():
+        raise FileNotFoundError(f"common source not found: {src}")
 
-        objs.append(obj)
+    cmd = [cxx, "-fPIC", "-c", str(src), "-o", str(obj)]
+    for inc in include_dirs:
+        cmd.append(f"-I{inc}")
+    cmd += extra_cflags
 
-    return objs
+    return compile_cached(
+        cmd,
+        cxx=cxx,
+        src=src,
+        obj=obj,
+        manifest=manifest,
+        cache=cache,
+        label="compile common",
+    )
 
 
 def archive_common_static(
@@ -46,13 +45,32 @@ def archive_common_static(
     objs: list[Path],
     out_dir: Path,
     name: str = "libtsurugi_udf_common.a",
+    manifest: BuildManifest | None = None,
+    cache: ObjectCache | None = None,
 ) -> Path:
     out_dir.mkdir(parents=True, exist_ok=True)
     out = out_dir / name
 
+    cmd = ["ar", "rcs", str(out), *map(str, objs)]
+    key = digest_strings(*cmd)
+    if manifest is not None and manifest.is_up_to_date(out, key):
+        return out
+
+    # the objects come from the cache when the toolchain matches, so the archive does too
+    cache_key = None
+    if cache is not None:
+        cache_key = digest_strings(name, *(digest_file(o) for o in objs))
+        if cache.fetch(cache_key, out, kind="archives"):
+            if manifest is not None:
+                manifest.record(out, key, objs)
+            return out
+
     if out.exists():
         out.unlink()
 
-    cmd = ["ar", "rcs", str(out), *map(str, objs)]
     subprocess.run(cmd, check=True)
+    if manifest is not None:
+        manifest.record(out, key, objs)
+    if cache_key is not None:
+        cache.store(cache_key, out, kind="archives")
     return out
@@ -1,12 +1,10 @@
 from __future__ import annotations
 
-import concurrent.futures
-import os
-import subprocess
 from pathlib import Path
 
-from .log import debug, debug_list
-from .toolchain import get_cxx, get_cxxflags
+from .compile_cached import compile_cached
+from .manifest import BuildManifest
+from .object_cache import ObjectCache
 
 
 def find_generated_cc(gen_dir: Path) -> list[Path]:
@@ -22,6 +20,40 @@ def obj_path_for(cc: Path, gen_dir: Path, obj_dir: Path) -> Path:
     return (obj_dir / rel).with_suffix(".o")
 
 
+def proto_name_for(cc: Path, gen_dir: Path) -> str:
+    rel = cc.relative_to(gen_dir).as_posix()
+    for suffix in (".grpc.pb.cc", ".pb.cc"):
+        if rel.endswith(suffix):
+            return rel[: -len(suffix)] + ".proto"
+    raise ValueError(f"not a generated source: {cc}")
+
+
+def unity_source_for(proto_name: str, unity_dir: Path) -> Path:
+    return unity_dir / Path(proto_name).with_suffix(".unity.cc")
+
+
+def unity_obj_path_for(proto_name: str, obj_dir: Path) -> Path:
+    return obj_dir / Path(proto_name).with_suffix(".unity.o")
+
+
+def write_unity_source(src: Path, members: list[Path], gen_dir: Path) -> None:
+    """Write a translation unit which includes the generated sources of one proto.
+
+    The protobuf headers, and the gRPC headers for a service, are then parsed once
+    for the proto instead of once for each of its sources.
+    """
+    # the message sources first, as protoc orders the includes of the service sources
+    members = sorted(members, key=lambda cc: (cc.name.endswith(".grpc.pb.cc"), cc))
+    lines = ["// generated by udf-plugin-builder --unity"]
+    lines += [f'#include "{cc.relative_to(gen_dir).as_posix()}"' for cc in members]
+    text = "\n".join(lines) + "\n"
+    # leave an unchanged file alone, so that its digest is not computed again
+    if src.exists() and src.read_text(encoding="utf-8") == text:
+        return
+    src.parent.mkdir(parents=True, exist_ok=True)
+    src.write_text(text, encoding="utf-8")
+
+
 def compile_one(
     *,
     cxx: str,
@@ -29,60 +61,19 @@ def compile_one(
     obj: Path,
     include_dirs: list[str],
     extra_cflags: list[str],
-) -> None:
-    obj.parent.mkdir(parents=True, exist_ok=True)
-
+    manifest: BuildManifest | None = None,
+    cache: ObjectCache | None = None,
+) -> bool:
     cmd = [cxx, "-fPIC", "-c", str(cc), "-o", str(obj)]
     for inc in include_dirs:
         cmd.append(f"-I{inc}")
     cmd += extra_cflags
 
-    r = subprocess.run(cmd, text=True, capture_output=True)
-    if r.returncode != 0:
-        msg = ["compile failed:", "  " + " ".join(map(str, cmd))]
-        if r.stdout:
-            msg.append(r.stdout)
-        if r.stderr:
-            msg.append(r.stderr)
-        raise RuntimeError("\n".join(msg))
-
-
-def build_objects_parallel(
-    *, gen_dir: Path, obj_dir: Path, include_dirs: list[str], jobs: int | None = None
-) -> list[Path]:
-    cxx = get_cxx()
-    extra = get_cxxflags()
-
-    cc_files = find_generated_cc(gen_dir)
-    if not cc_files:
-        debug(f"no generated .cc files found under: {gen_dir}")
-        return []
-
-    objs = [obj_path_for(cc, gen_dir, obj_dir) for cc in cc_files]
-
-    max_workers = jobs or (os.cpu_count() or 4)
-    debug(
-        f"compiling generated sources: {len(cc_files)} files -> {obj_dir} (jobs={max_workers})"
+    return compile_cached(
+        cmd,
+        cxx=cxx,
+        src=cc,
+        obj=obj,
+        manifest=manifest,
+        cache=cache,
     )
-
-    if len(cc_files) <= 30:
-        debug_list("generated .cc files", (str(p) for p in cc_files))
-    else:
-        debug(f"generated .cc files: {len(cc_files)} (list omitted)")
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futs = [
-            ex.submit(
-                compile_one,
-                cxx=cxx,
-                cc=cc,
-                obj=obj,
-                include_dirs=include_dirs,
-                extra_cflags=extra,
-            )
-            for cc, obj in zip(cc_files, objs)
-        ]
-        for f in concurrent.futures.as_completed(futs):
-            f.result()
-
-    return objs
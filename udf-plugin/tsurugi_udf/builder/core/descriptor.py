@@ -1,7 +1,11 @@
 from pathlib import Path
 from google.protobuf.descriptor_pb2 import FileDescriptorSet
+import hashlib
 import re
 
+# a file name is at most 255 bytes; leave room for the suffix and temporary names
+MAX_DESCRIPTOR_STEM = 200
+
 
 def load_fds(desc_pb: Path) -> FileDescriptorSet:
     fds = FileDescriptorSet()
@@ -17,6 +21,17 @@ def build_import_graph(fds: FileDescriptorSet) -> dict[str, set[str]]:
     return {fd.name: set(fd.dependency) for fd in fds.file}
 
 
+def proto_source_paths(fds: FileDescriptorSet, includes: list[Path]) -> list[Path]:
+    paths: list[Path] = []
+    for fd in fds.file:
+        for inc in includes:
+            p = Path(inc) / fd.name
+            if p.is_file():
+                paths.append(p)
+                break
+    return paths
+
+
 def normalize_proto_arg_to_fd_name(
     proto_path: Path, includes: list[Path]
 ) -> str | None:
@@ -66,5 +81,8 @@ def slugify(text: str) -> str:
 
 def descriptor_name(proto_files: list[Path]) -> str:
     names = sorted(p.stem for p in proto_files)
-    joined = "_".join(names)
-    return f"{slugify(joined)}.desc.pb"
+    stem = slugify("_".join(names))
+    if len(stem) > MAX_DESCRIPTOR_STEM:
+        digest = hashlib.sha256(stem.encode("utf-8")).hexdigest()[:16]
+        stem = f"{stem[: MAX_DESCRIPTOR_STEM - len(digest) - 1].rstrip('_')}_{digest}"
+    return f"{stem}.desc.pb"
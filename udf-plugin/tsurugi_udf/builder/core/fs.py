@@ -1,4 +1,5 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
 from pathlib import Path
 from .paths import BuildPaths
 from .log import debug
@@ -16,6 +17,7 @@ def ensure_dirs(paths: BuildPaths) -> None:
         paths.LIB,
         paths.INI,
         paths.CMN,
+        paths.UNITY,
     ]
 
     with ThreadPoolExecutor() as ex:
@@ -30,16 +32,20 @@ def move_outputs(
     src_ini_dir: Path,
     dst_root: Path,
     src_deps_lib_dir: Path | None = None,
+    keep: bool = False,
 ) -> None:
+    """Move the built libraries and ini files into dst_root.
+
+    With keep=True the libraries are copied instead, so that the build dir keeps
+    them for the next incremental build.
+    """
     dst_root = dst_root.resolve()
     dst_root.mkdir(parents=True, exist_ok=True)
 
     if src_lib_dir.exists():
         for p in src_lib_dir.iterdir():
             if p.is_file() and p.suffix == ".so":
-                dst = dst_root / p.name
-                debug(f"move {p} -> {dst}")
-                shutil.move(str(p), dst)
+                _install(p, dst_root / p.name, keep)
 
     if src_ini_dir.exists():
         for p in src_ini_dir.iterdir():
@@ -53,6 +59,16 @@ def move_outputs(
         dst_deps.mkdir(parents=True, exist_ok=True)
         for p in src_deps_lib_dir.iterdir():
             if p.is_file() and p.suffix == ".so":
-                dst = dst_deps / p.name
-                debug(f"move {p} -> {dst}")
-                shutil.move(str(p), dst)
+                _install(p, dst_deps / p.name, keep)
+
+
+def _install(src: Path, dst: Path, keep: bool) -> None:
+    if not keep:
+        debug(f"move {src} -> {dst}")
+        shutil.move(str(src), dst)
+        return
+    debug(f"copy {src} -> {dst}")
+    # replace rather than overwrite, as a running server may have mapped dst
+    tmp = dst.with_name(dst.name + ".tmp")
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
@@ -13,13 +13,21 @@ TEMPLATE = {
     "rpc_client_factory.cpp.j2": "rpc_client_factory.cpp",
 }
 
+# the version of the plugin objects (plugin_api, generic_record, ...), which Tsurugi checks
+# before using a plugin; keep it the same as the version in pyproject.toml
+OBJECT_SCHEMA_VERSION = {"major": 0, "minor": 5, "patch": 0}
+
+# a unary RPC named "<function>" + BATCH_METHOD_SUFFIX, which takes and returns
+# the messages of "<function>" as their only repeated fields, serves batched calls of "<function>"
+BATCH_METHOD_SUFFIX = "_batch"
+
 SPECIAL_RECORDS = {
     "tsurugidb.udf.Decimal": {
         "special_record_kind": "decimal",
         "special_fetch_name": "decimal",
         "cpp_value_type": "decimal_value",
         "fields": [
-            {"name": "unscaled_value", "getter": "unscaled_value()"},
+            {"name": "unscaled_value", "getter": "unscaled_value()", "view": True},
             {"name": "exponent", "getter": "exponent()"},
         ],
     },
@@ -88,6 +96,16 @@ def _camelcase(s: str) -> str:
     return "".join(p.capitalize() for p in parts if p)
 
 
+def _flat_column_count(record: dict) -> int:
+    count = 0
+    for col in record["columns"]:
+        if col.get("nested_record") and not col.get("special_record_kind"):
+            count += _flat_column_count(col["nested_record"])
+        else:
+            count += 1
+    return count
+
+
 def _has_service(fd) -> bool:
     return len(fd.service) > 0
 
@@ -272,6 +290,41 @@ def split_fds_by_proto_with_service(fds: FileDescriptorSet) -> Dict[str, List[di
             "oneof_groups": oneof_groups,
         }
 
+    def repeated_field_name(wrapper_type: str, item_type: str) -> str | None:
+        wrapper = message_type_map.get(wrapper_type)
+        if wrapper is None or len(wrapper.field) != 1:
+            return None
+        field = wrapper.field[0]
+        if field.label != field.LABEL_REPEATED or field.type_name != item_type:
+            return None
+        return field.name
+
+    def find_batch_methods(svc) -> Dict[str, dict]:
+        methods = {m.name: m for m in svc.method}
+        out: Dict[str, dict] = {}
+        for m in svc.method:
+            if not m.name.endswith(BATCH_METHOD_SUFFIX):
+                continue
+            base = methods.get(m.name[: -len(BATCH_METHOD_SUFFIX)])
+            if base is None:
+                continue
+            if m.client_streaming or m.server_streaming:
+                continue
+            if base.client_streaming or base.server_streaming:
+                continue
+            input_field = repeated_field_name(m.input_type, base.input_type)
+            output_field = repeated_field_name(m.output_type, base.output_type)
+            if input_field is None or output_field is None:
+                continue
+            out[base.name] = {
+                "function_name": m.name,
+                "input_record_name": m.input_type.lstrip("."),
+                "output_record_name": m.output_type.lstrip("."),
+                "input_field": input_field,
+                "output_field": output_field,
+            }
+        return out
+
     service_counter = 0
     function_counter = 0
 
@@ -283,7 +336,12 @@ def split_fds_by_proto_with_service(fds: FileDescriptorSet) -> Dict[str, List[di
         services = []
         for svc in fd.service:
             functions = []
+            batch_methods = find_batch_methods(svc)
+            batch_method_names = {b["function_name"] for b in batch_methods.values()}
             for m in svc.method:
+                if m.name in batch_method_names:
+                    # not a UDF by itself, but the batched form of another function
+                    continue
                 kind = "unary"
                 if m.client_streaming and m.server_streaming:
                     kind = "bidirectional_streaming"
@@ -299,6 +357,7 @@ def split_fds_by_proto_with_service(fds: FileDescriptorSet) -> Dict[str, List[di
                         "function_kind": kind,
                         "input_record": resolve_record(m.input_type),
                         "output_record": resolve_record(m.output_type),
+                        "batch_method": batch_methods.get(m.name),
                     }
                 )
                 function_counter += 1
@@ -315,7 +374,7 @@ def split_fds_by_proto_with_service(fds: FileDescriptorSet) -> Dict[str, List[di
         pkg = {
             "package_name": pkg_name,
             "file_name": fd.name,
-            "version": {"major": 0, "minor": 4, "patch": 2},
+            "version": dict(OBJECT_SCHEMA_VERSION),
             "services": services,
         }
         out.setdefault(fd.name, []).append(pkg)
@@ -323,12 +382,26 @@ def split_fds_by_proto_with_service(fds: FileDescriptorSet) -> Dict[str, List[di
     return out
 
 
+def tpl_paths_for_rpc_protos(
+    *, fds: FileDescriptorSet, tpl_dir: Path
+) -> Dict[str, Dict[str, Path]]:
+    """Returns the files which render_tpl_for_rpc_protos() writes, without rendering them."""
+    return {
+        proto_file: {
+            out_name: tpl_dir / Path(proto_file).stem / out_name
+            for out_name in TEMPLATE.values()
+        }
+        for proto_file in split_fds_by_proto_with_service(fds)
+    }
+
+
 def render_tpl_for_rpc_protos(
     *,
     fds: FileDescriptorSet,
     templates_dir: Path,
     tpl_dir: Path,
     fetch_add_name=None,
+    arena: str = "streaming",
 ) -> Dict[str, Dict[str, Path]]:
     tpl_dir.mkdir(parents=True, exist_ok=True)
 
@@ -338,6 +411,7 @@ def render_tpl_for_rpc_protos(
         lstrip_blocks=True,
     )
     env.filters["camelcase"] = _camelcase
+    env.filters["flat_column_count"] = _flat_column_count
     env.globals["fetch_add_name"] = fetch_add_name or _default_fetch_add_name
 
     file_to_packages = split_fds_by_proto_with_service(fds)
@@ -359,6 +433,7 @@ def render_tpl_for_rpc_protos(
             rendered = template.render(
                 packages=packages,
                 proto_base_name=stem,
+                arena=arena,
             )
             gen.write_text(rendered)
             out[proto_file][out_name] = gen
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+from .log import debug
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+_DEPFILE_TOKEN = re.compile(r"(?:\\.|[^\s\\])+")
+
+
+def _key_path(path: Path | str) -> str:
+    return os.path.abspath(str(path))
+
+
+def digest_strings(*items: str) -> str:
+    h = hashlib.sha256()
+    for item in items:
+        h.update(item.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def digest_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def read_depfile(path: Path) -> list[Path]:
+    """Return the prerequisites listed in a make-style dependency file (-MMD -MF)."""
+    text = path.read_text(encoding="utf-8").replace("\\\n", " ")
+    _, sep, rest = text.partition(": ")
+    if not sep:
+        return []
+    deps: list[Path] = []
+    for token in _DEPFILE_TOKEN.findall(rest):
+        deps.append(Path(re.sub(r"\\(.)", r"\1", token)))
+    return deps
+
+
+class BuildManifest:
+    """Content hashes of the inputs of each build output, kept in the build dir.
+
+    An output is up to date when it still exists with the content written by
+    the recorded build, its key (the command line and the toolchain) is unchanged,
+    and every recorded input file still has the recorded content hash.
+
+    File hashes are cached by (mtime_ns, size), so unchanged files are not re-read
+    on the next build. All methods are thread safe.
+    """
+
+    def __init__(self, path: Path, data: dict | None = None) -> None:
+        self.path = path
+        data = data or {}
+        self._files: dict[str, list] = dict(data.get("files", {}))
+        self._outputs: dict[str, dict] = dict(data.get("outputs", {}))
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, build_dir: Path) -> "BuildManifest":
+        path = build_dir / MANIFEST_NAME
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            debug(f"ignoring build manifest of another version: {path}")
+            return cls(path)
+        return cls(path, data)
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                "version": MANIFEST_VERSION,
+                "files": self._files,
+                "outputs": self._outputs,
+            }
+            text = json.dumps(data, indent=1, sort_keys=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(self.path)
+
+    def file_digest(self, path: Path | str) -> str | None:
+        """Return the content hash of a file, or None if it does not exist."""
+        key = _key_path(path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._files.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        digest = digest_file(Path(key))
+        with self._lock:
+            self._files[key] = [st.st_mtime_ns, st.st_size, digest]
+        return digest
+
+    def is_up_to_date(self, output: Path, key: str) -> bool:
+        with self._lock:
+            entry = self._outputs.get(_key_path(output))
+        if entry is None or entry["key"] != key:
+            return False
+        if self.file_digest(output) != entry["digest"]:
+            return False
+        return all(self.file_digest(p) == d for p, d in entry["inputs"].items())
+
+    def record(
+        self,
+        output: Path,
+        key: str,
+        inputs: Iterable[Path],
+        *,
+        peak_rss: int | None = None,
+    ) -> None:
+        """Record an output built from inputs.
+
+        peak_rss is the peak memory of the step that built it, kept as a hint for
+        scheduling the next build. It is carried over from the previous entry if
+        not given, e.g. when the output came from the object cache.
+        """
+        digests: dict[str, str] = {}
+        for p in inputs:
+            d = self.file_digest(p)
+            if d is not None:
+                digests[_key_path(p)] = d
+        entry = {"key": key, "digest": self.file_digest(output), "inputs": digests}
+        with self._lock:
+            if peak_rss is None:
+                peak_rss = self._outputs.get(_key_path(output), {}).get("peak_rss")
+            if peak_rss:
+                entry["peak_rss"] = peak_rss
+            self._outputs[_key_path(output)] = entry
+
+    def peak_rss(self, output: Path) -> int | None:
+        """Return the peak memory recorded for the step that built output."""
+        with self._lock:
+            return self._outputs.get(_key_path(output), {}).get("peak_rss")
+
+    def forget(self, output: Path) -> None:
+        with self._lock:
+            self._outputs.pop(_key_path(output), None)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+from pathlib import Path
+
+from .log import debug
+from .manifest import digest_strings
+from .toolchain import toolchain_fingerprint
+
+CACHE_DIR_ENV = "TSURUGI_UDF_CACHE_DIR"
+DEFAULT_MAX_SIZE_MIB = 1024
+
+# options followed by a path, which do not change the object
+_PATH_OPTIONS = {"-o", "-MF", "-MT", "-MQ"}
+
+
+def default_cache_dir() -> Path:
+    if env := os.environ.get(CACHE_DIR_ENV):
+        return Path(env)
+    base = os.environ.get("XDG_CACHE_HOME") or (Path.home() / ".cache")
+    return Path(base) / "tsurugi-udf-builder"
+
+
+def _preprocess_cmd(cmd: list[str], obj: Path) -> list[str]:
+    out: list[str] = []
+    it = iter(cmd)
+    for arg in it:
+        if arg == "-o":
+            next(it, None)
+        elif arg == "-c":
+            out.append("-E")
+        else:
+            out.append(arg)
+    out.append("-P")
+    if "-MF" in cmd:
+        out += ["-MT", str(obj)]
+    return out
+
+
+def _key_args(cmd: list[str], src: Path) -> list[str]:
+    out: list[str] = []
+    it = iter(cmd)
+    for arg in it:
+        if arg in _PATH_OPTIONS:
+            next(it, None)
+        elif arg.startswith("-I") or arg == str(src):
+            continue
+        else:
+            out.append(arg)
+    return out
+
+
+class ObjectCache:
+    """A user-level cache of compiled objects, shared by all builder projects.
+
+    Like ccache in preprocessor mode, an object is keyed by the preprocessed source,
+    the compile flags other than paths, and the toolchain, so the runtime sources and
+    common imported protos compiled by one project are reused by the others.
+    The least recently used entries are evicted when the cache grows over max_size.
+    """
+
+    def __init__(self, root: Path, max_size: int) -> None:
+        self.root = root
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key_for(self, cmd: list[str], *, src: Path, obj: Path) -> str | None:
+        """Preprocess a compile command and return its cache key.
+
+        The preprocessor also writes the dependency file if cmd asks for one.
+        Returns None if preprocessing fails, so that the compile reports the error.
+        """
+        r = subprocess.run(_preprocess_cmd(cmd, obj), capture_output=True)
+        if r.returncode != 0:
+            return None
+        items = _key_args(cmd, src)
+        if any(a.startswith("-g") for a in items):
+            # debug info records the source and working directory
+            items += [os.getcwd(), str(src.resolve())]
+        h = hashlib.sha256(r.stdout)
+        return digest_strings(h.hexdigest(), *items, toolchain_fingerprint(cmd[0]))
+
+    def fetch(self, key: str, dst: Path, *, kind: str = "objects") -> bool:
+        entry = self._entry(key, kind)
+        try:
+            self._copy(entry, dst)
+            # the modification time orders the entries for eviction
+            os.utime(entry)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.hits += 1
+        debug(f"object cache hit: {dst.name} <- {entry}")
+        return True
+
+    def store(self, key: str, src: Path, *, kind: str = "objects") -> None:
+        entry = self._entry(key, kind)
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            self._copy(src, entry)
+        except OSError as e:
+            debug(f"object cache store failed: {entry}: {e}")
+
+    def evict(self) -> None:
+        entries: list[tuple[float, int, Path]] = []
+        total = 0
+        for p in self.root.rglob("*"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            if p.is_file():
+                entries.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+        if total <= self.max_size:
+            return
+        entries.sort()
+        removed = 0
+        for _, size, p in entries:
+            if total <= self.max_size:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        debug(f"object cache evicted {removed} entries: {self.root}")
+
+    def _entry(self, key: str, kind: str) -> Path:
+        return self.root / kind / key[:2] / key
+
+    @staticmethod
+    def _copy(src: Path, dst: Path) -> None:
+        # concurrent builds may read dst, so replace it rather than overwrite
+        tmp = dst.with_name(f"{dst.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, dst)
+        finally:
+            tmp.unlink(missing_ok=True)
@@ -14,6 +14,7 @@ class BuildPaths:
     LIB: Path
     INI: Path
     CMN: Path
+    UNITY: Path
 
     @classmethod
     def from_build_dir(cls, build_dir: Path) -> "BuildPaths":
@@ -26,4 +27,5 @@ class BuildPaths:
             LIB=build_dir / "lib",
             INI=build_dir / "ini",
             CMN=build_dir / "cmn",
+            UNITY=build_dir / "unity",
         )
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import math
+import os
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+
+from .log import debug
+
+MiB = 1024 * 1024
+
+# a compile of a small source is dominated by the parsed headers (protobuf, gRPC);
+# generated sources then grow with the template instantiations for each message and method
+COMPILE_BASE_MEMORY = 256 * MiB
+COMPILE_MEMORY_PER_SOURCE_BYTE = 1024
+# margin over the peak RSS recorded by the previous build
+HISTORY_MARGIN = 1.2
+# part of the available memory given to the build, the rest is left for the system
+MEMORY_BUDGET_RATIO = 0.9
+
+_CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+_local = threading.local()
+
+
+def _read(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def _read_int(path: Path) -> int | None:
+    text = _read(path)
+    if text is None:
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+
+def _cgroup_dirs() -> tuple[Path | None, dict[str, Path]]:
+    """Return the cgroup v2 dir, and the cgroup v1 dir of each controller, of this process."""
+    v2: Path | None = None
+    v1: dict[str, Path] = {}
+    for line in (_read(Path("/proc/self/cgroup")) or "").splitlines():
+        hierarchy, _, rest = line.partition(":")
+        controllers, _, rel = rest.partition(":")
+        rel = rel.lstrip("/")
+        if hierarchy == "0" and not controllers:
+            v2 = _CGROUP_ROOT / rel
+            if not v2.exists():
+                # inside a cgroup namespace, our cgroup is the root of the mount
+                v2 = _CGROUP_ROOT
+        else:
+            for c in controllers.split(","):
+                d = _CGROUP_ROOT / c / rel
+                v1[c] = d if d.exists() else _CGROUP_ROOT / c
+    return v2, v1
+
+
+def available_cpus() -> int:
+    """Return the number of CPUs this process may use, with the cgroup CPU quota applied."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+
+    v2, v1 = _cgroup_dirs()
+    quota: float | None = None
+    cpu_max = _read(v2 / "cpu.max") if v2 is not None else None
+    if cpu_max is not None:
+        fields = cpu_max.split()
+        if len(fields) == 2 and fields[0] != "max":
+            quota = int(fields[0]) / int(fields[1])
+    elif "cpu" in v1:
+        q = _read_int(v1["cpu"] / "cpu.cfs_quota_us")
+        period = _read_int(v1["cpu"] / "cpu.cfs_period_us")
+        if q is not None and q > 0 and period:
+            quota = q / period
+
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+def available_memory() -> int | None:
+    """Return the memory available to this process in bytes, or None if it is unknown.
+
+    This is the smaller of MemAvailable of the host, and the room left under the
+    memory limit of the cgroup.
+    """
+    candidates: list[int] = []
+    for line in (_read(Path("/proc/meminfo")) or "").splitlines():
+        if line.startswith("MemAvailable:"):
+            candidates.append(int(line.split()[1]) * 1024)
+            break
+
+    v2, v1 = _cgroup_dirs()
+    limit: int | None = None
+    usage: int | None = None
+    # on a hybrid hierarchy, the controllers may still be mounted as v1
+    if v2 is not None and (v2 / "memory.current").exists():
+        limit = _read_int(v2 / "memory.max")
+        usage = _read_int(v2 / "memory.current")
+    elif "memory" in v1:
+        limit = _read_int(v1["memory"] / "memory.limit_in_bytes")
+        usage = _read_int(v1["memory"] / "memory.usage_in_bytes")
+    # v1 reports "no limit" as a huge number rather than "max"
+    if limit is not None and limit < (1 << 60):
+        candidates.append(max(0, limit - (usage or 0)))
+
+    return min(candidates) if candidates else None
+
+
+def default_memory_budget() -> int | None:
+    memory = available_memory()
+    if memory is None:
+        return None
+    return int(memory * MEMORY_BUDGET_RATIO)
+
+
+def estimate_compile_memory(*sources: Path, peak_rss: int | None = None) -> int:
+    """Estimate the memory used to compile sources as one translation unit.
+
+    The peak RSS of its previous compile is used if known, and otherwise a guess
+    from the size of the sources.
+    """
+    if peak_rss:
+        return int(peak_rss * HISTORY_MARGIN)
+    size = 0
+    for src in sources:
+        try:
+            size += src.stat().st_size
+        except OSError:
+            pass
+    return COMPILE_BASE_MEMORY + size * COMPILE_MEMORY_PER_SOURCE_BYTE
+
+
+def run_measured(cmd: list[str]) -> tuple[subprocess.CompletedProcess, int]:
+    """Run a command like subprocess.run(text=True, capture_output=True).
+
+    Also returns its peak RSS in bytes, including the processes it started
+    (e.g. cc1plus under g++), and adds it to the peak RSS of the calling thread.
+    """
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        p = subprocess.Popen(cmd, stdout=out, stderr=err)
+        try:
+            _, status, usage = os.wait4(p.pid, 0)
+        except BaseException:
+            p.kill()
+            p.wait()
+            raise
+        p.returncode = os.waitstatus_to_exitcode(status)
+        out.seek(0)
+        err.seek(0)
+        r = subprocess.CompletedProcess(
+            cmd,
+            p.returncode,
+            out.read().decode(errors="replace"),
+            err.read().decode(errors="replace"),
+        )
+    # ru_maxrss is in KiB on Linux
+    peak_rss = usage.ru_maxrss * 1024
+    _local.peak_rss = max(getattr(_local, "peak_rss", 0), peak_rss)
+    debug(f"peak RSS {peak_rss // MiB} MiB: {cmd[0]} ... {cmd[-1]}")
+    return r, peak_rss
+
+
+def take_peak_rss() -> int:
+    """Return the largest peak RSS of the commands run by this thread, and reset it."""
+    peak_rss = getattr(_local, "peak_rss", 0)
+    _local.peak_rss = 0
+    return peak_rss
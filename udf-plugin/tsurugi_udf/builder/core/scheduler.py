@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .log import debug, info
+from .resources import MiB, available_cpus, take_peak_rss
+
+# number of tasks listed by peak memory in the build report
+REPORT_PEAK_RSS_TASKS = 5
+
+
+@dataclass(eq=False)
+class _Task:
+    name: str
+    fn: Callable[[], Any]
+    deps: tuple[str, ...]
+    memory: int = 0
+    waiting: int = 0
+    users: list["_Task"] = field(default_factory=list)
+    done: bool = False
+    result: Any = None
+    start: float = 0.0
+    end: float = 0.0
+    peak_rss: int = 0
+    held: bool = False
+
+
+class BuildScheduler:
+    """Runs the build steps as one task graph on a fixed number of workers.
+
+    A task starts as soon as all of its dependencies have finished, instead of
+    waiting for the whole previous phase, so independent steps of different phases
+    overlap. Tasks can be added while others are running, e.g. once code generation
+    has told which sources exist.
+
+    Tasks that are ready start in the order they became ready. Each task may
+    give an estimate of the memory it needs; with a memory budget, a task waits
+    until the estimates of the running tasks leave room for it, so that a few
+    large compiles do not run the machine out of memory. A task always starts
+    when nothing else is running, even if it is over the budget.
+
+    If a task fails, no more tasks are started, and wait() raises its exception
+    after the running tasks have finished.
+    """
+
+    def __init__(
+        self, jobs: int | None = None, memory_budget: int | None = None
+    ) -> None:
+        self.jobs = jobs or available_cpus()
+        self.memory_budget = memory_budget
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs)
+        self._cv = threading.Condition()
+        self._tasks: dict[str, _Task] = {}
+        self._ready: deque[_Task] = deque()
+        self._running = 0
+        self._memory_in_use = 0
+        self._error: BaseException | None = None
+        self._created = time.monotonic()
+
+    def close(self) -> None:
+        """Wait for the running tasks, and stop the workers."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        deps: Iterable[str] = (),
+        *,
+        memory: int = 0,
+    ) -> str:
+        """Add a task, which runs once all of deps (names of added tasks) have finished.
+
+        memory is the estimated peak memory of the task in bytes.
+        """
+        with self._cv:
+            if name in self._tasks:
+                raise ValueError(f"duplicate build task: {name}")
+            task = _Task(name=name, fn=fn, deps=tuple(deps), memory=memory)
+            for d in task.deps:
+                dep = self._tasks.get(d)
+                if dep is None:
+                    raise ValueError(f"build task {name} depends on unknown task: {d}")
+                if not dep.done:
+                    dep.users.append(task)
+                    task.waiting += 1
+            self._tasks[name] = task
+            if task.waiting == 0:
+                self._submit(task)
+        return name
+
+    def run(self, name: str, fn: Callable[[], Any], deps: Iterable[str] = ()) -> Any:
+        """Add a task, wait for it, and return its result."""
+        self.wait([self.add(name, fn, deps)])
+        return self.result(name)
+
+    def wait(self, names: Iterable[str] | None = None) -> None:
+        """Wait for the given tasks, or all tasks, to finish."""
+        with self._cv:
+            targets = [self._tasks[n] for n in names] if names is not None else None
+
+            def finished() -> bool:
+                if self._error is not None:
+                    return self._running == 0
+                tasks = targets if targets is not None else self._tasks.values()
+                return all(t.done for t in tasks)
+
+            self._cv.wait_for(finished)
+            if self._error is not None:
+                raise self._error
+
+    def result(self, name: str) -> Any:
+        return self._tasks[name].result
+
+    def critical_path(self) -> tuple[float, list[tuple[str, float]]]:
+        """Return the length of the longest chain of dependent tasks, and that chain."""
+        with self._cv:
+            length: dict[str, float] = {}
+            prev: dict[str, str | None] = {}
+            # tasks are added after their dependencies, so this is a topological order
+            for task in self._tasks.values():
+                if not task.done:
+                    continue
+                before = max(task.deps, key=lambda d: length.get(d, 0.0), default=None)
+                length[task.name] = (task.end - task.start) + (
+                    length.get(before, 0.0) if before is not None else 0.0
+                )
+                prev[task.name] = before
+            if not length:
+                return 0.0, []
+            last: str | None = max(length, key=length.__getitem__)
+            total = length[last]
+            path: list[tuple[str, float]] = []
+            while last is not None:
+                task = self._tasks[last]
+                path.append((last, task.end - task.start))
+                last = prev[last]
+            path.reverse()
+            return total, path
+
+    def report(self) -> None:
+        """Log the elapsed time, the busy time of the workers, the critical path,
+        and the tasks with the largest peak memory."""
+        elapsed = time.monotonic() - self._created
+        with self._cv:
+            done = [t for t in self._tasks.values() if t.done]
+        busy = sum(t.end - t.start for t in done)
+        total, path = self.critical_path()
+        limits = f"jobs={self.jobs}"
+        if self.memory_budget is not None:
+            limits += f", memory budget {self.memory_budget // MiB} MiB"
+        info(
+            f"build tasks: {len(done)} ({limits}), "
+            f"elapsed {elapsed:.2f}s, task time {busy:.2f}s, critical path {total:.2f}s"
+        )
+        for name, seconds in path:
+            info(f" - {name}: {seconds:.2f}s")
+
+        measured = sorted(
+            (t for t in done if t.peak_rss), key=lambda t: t.peak_rss, reverse=True
+        )
+        if not measured:
+            return
+        held = sum(t.held for t in done)
+        info(
+            f"peak RSS: {measured[0].peak_rss // MiB} MiB, "
+            f"tasks held back for memory: {held}"
+        )
+        for t in measured[:REPORT_PEAK_RSS_TASKS]:
+            info(
+                f" - {t.name}: {t.peak_rss // MiB} MiB "
+                f"(estimated {t.memory // MiB} MiB)"
+            )
+        for t in measured[REPORT_PEAK_RSS_TASKS:]:
+            debug(
+                f" - {t.name}: {t.peak_rss // MiB} MiB "
+                f"(estimated {t.memory // MiB} MiB)"
+            )
+
+    def _submit(self, task: _Task) -> None:
+        # called with the lock held
+        self._ready.append(task)
+        self._admit()
+
+    def _admit(self) -> None:
+        # called with the lock held
+        while self._ready and self._error is None and self._running < self.jobs:
+            task = self._ready[0]
+            if (
+                self.memory_budget is not None
+                and self._running > 0
+                and self._memory_in_use + task.memory > self.memory_budget
+            ):
+                # keep the order, so that a large task is not passed over forever
+                if not task.held:
+                    task.held = True
+                    debug(
+                        f"build task waits for memory: {task.name} "
+                        f"({task.memory // MiB} MiB, "
+                        f"{self._memory_in_use // MiB} MiB in use)"
+                    )
+                return
+            self._ready.popleft()
+            self._running += 1
+            self._memory_in_use += task.memory
+            self._pool.submit(self._run, task)
+
+    def _run(self, task: _Task) -> None:
+        task.start = time.monotonic()
+        take_peak_rss()
+        try:
+            result = task.fn()
+        except BaseException as e:  # SystemExit from a step stops the build as well
+            with self._cv:
+                task.end = time.monotonic()
+                task.peak_rss = take_peak_rss()
+                if self._error is None:
+                    self._error = e
+                self._finish(task)
+            debug(f"build task failed: {task.name}")
+            return
+        with self._cv:
+            task.end = time.monotonic()
+            task.peak_rss = take_peak_rss()
+            task.result = result
+            task.done = True
+            for user in task.users:
+                user.waiting -= 1
+                if user.waiting == 0:
+                    self._ready.append(user)
+            self._finish(task)
+
+    def _finish(self, task: _Task) -> None:
+        # called with the lock held
+        self._running -= 1
+        self._memory_in_use -= task.memory
+        self._admit()
+        self._cv.notify_all()
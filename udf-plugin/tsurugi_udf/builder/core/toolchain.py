@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import os
 import shlex
 import subprocess
@@ -27,6 +28,26 @@ def get_ldflags() -> list[str]:
     )
 
 
+@functools.lru_cache(maxsize=None)
+def toolchain_fingerprint(cxx: str) -> str:
+    """Return the versions of the compiler and the pkg-config packages.
+
+    They are part of the build manifest keys, so that upgrading the toolchain
+    rebuilds the outputs even if the command lines stay the same.
+    """
+    items = [_run_quiet([cxx, "--version"])]
+    items.append(_run_quiet(["pkg-config", "--modversion", *PKG_CONFIG_PACKAGES]))
+    return "\n".join(items)
+
+
+def _run_quiet(cmd: list[str]) -> str:
+    try:
+        r = subprocess.run(cmd, text=True, capture_output=True)
+    except FileNotFoundError:
+        return ""
+    return r.stdout.strip()
+
+
 def pkg_config_cflags() -> list[str]:
     return _pkg_config("--cflags")
 
@@ -36,6 +57,12 @@ def pkg_config_libs() -> list[str]:
 
 
 def _pkg_config(option: str) -> list[str]:
+    return list(_pkg_config_cached(option, os.environ.get("PKG_CONFIG_PATH", "")))
+
+
+# pkg-config takes a while for grpc++, and every build stage asks for the same flags
+@functools.lru_cache(maxsize=None)
+def _pkg_config_cached(option: str, search_path: str) -> tuple[str, ...]:
     try:
         r = subprocess.run(
             ["pkg-config", option, *PKG_CONFIG_PACKAGES],
@@ -44,15 +71,15 @@ def _pkg_config(option: str) -> list[str]:
             capture_output=True,
         )
         out = r.stdout.strip()
-        return shlex.split(out) if out else []
+        return tuple(shlex.split(out)) if out else ()
 
     except FileNotFoundError:
         logger.debug("pkg-config not found")
-        return []
+        return ()
 
     except subprocess.CalledProcessError as e:
         logger.debug("pkg-config failed: %s", e)
-        return []
+        return ()
 
 
 def dedup_keep_order(xs: list[str]) -> list[str]:
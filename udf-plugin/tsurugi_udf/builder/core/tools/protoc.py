@@ -31,6 +31,10 @@ def _get_protoc_version(protoc: str = "protoc") -> tuple[int, int, int]:
     return _parse_protoc_version(r.stdout)
 
 
+def version(protoc: str = "protoc") -> str:
+    return ".".join(map(str, _get_protoc_version(protoc)))
+
+
 def _proto3_optional_extra_args(protoc: str = "protoc") -> list[str]:
     try:
         major, minor, patch = _get_protoc_version(protoc)
@@ -20,9 +20,33 @@ def write_ini_files_for_rpc_libs(
     secure: bool = False,
     enabled: bool = True,
     udf_timeout: int | None = None,
+    async_workers: int | None = None,
+    stream_capacity: int | None = None,
+    channels: int | None = None,
+    batch_size: int | None = None,
+    batch_flush_latency: int | None = None,
+    arena_initial_block: int | None = None,
+    metrics_file: str | None = None,
+    metrics_interval: int | None = None,
 ) -> Dict[str, Path]:
     report = collect_rpc_so_report(fds)
 
+    # settings read by the plugin library itself, rather than by Tsurugi
+    rpc_client_entries = [
+        f"{key}={value}"
+        for key, value in (
+            ("async_workers", async_workers),
+            ("stream_capacity", stream_capacity),
+            ("channels", channels),
+            ("batch_size", batch_size),
+            ("batch_flush_latency", batch_flush_latency),
+            ("arena_initial_block", arena_initial_block),
+            ("metrics_file", metrics_file),
+            ("metrics_interval", metrics_interval),
+        )
+        if value is not None
+    ]
+
     ini_dir.mkdir(parents=True, exist_ok=True)
 
     out: Dict[str, Path] = {}
@@ -51,6 +75,16 @@ def write_ini_files_for_rpc_libs(
                     if grpc_server_endpoint
                     else []
                 ),
+                *(
+                    [
+                        "",
+                        "[rpc_client]",
+                        # e.g. metrics_file={lib}.metrics.json, so that libraries never share a file
+                        *(e.replace("{lib}", Path(so_file).stem) for e in rpc_client_entries),
+                    ]
+                    if rpc_client_entries
+                    else []
+                ),
                 "",
             ]
         )
@@ -0,0 +1,113 @@
+/*
+ * Copyright 2018-2026 Project Tsurugi.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+#pragma once
+
+#include <condition_variable>
+#include <cstddef>
+#include <cstdint>
+#include <deque>
+#include <functional>
+#include <list>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+namespace plugin::udf {
+
+/**
+ * @brief a snapshot of the async_executor counters.
+ */
+struct async_executor_stats {
+    /// @brief the number of worker threads.
+    std::size_t workers;
+    /// @brief the number of calls waiting for a free worker.
+    std::size_t queue_depth;
+    /// @brief the number of calls running on the workers.
+    std::size_t active_calls;
+    /// @brief the number of finished calls, where a call resumed after its stream was full counts once per run.
+    std::uint64_t completed_calls;
+};
+
+/**
+ * @brief a fixed size worker pool which runs asynchronous RPC calls.
+ * @details Calls submitted while all workers are busy wait in a FIFO queue.
+ *     Each plugin library owns one pool, which is shared by all of its asynchronous calls.
+ *     A task must not wait for another task of the same pool (e.g. block while a stream is full),
+ *     because that task may be queued behind it; such a task should return and be submitted again instead.
+ */
+class async_executor {
+public:
+
+    using task_type = std::function<void()>;
+
+    /// @brief the number of workers if it is not specified in the plugin configuration file.
+    static constexpr std::size_t default_workers = 16;
+
+    /**
+     * @brief creates a new pool and starts its workers.
+     * @param workers the number of worker threads, or 0 to use default_workers
+     */
+    explicit async_executor(std::size_t workers = default_workers);
+
+    /**
+     * @brief runs the queued calls and then stops the workers.
+     * @note This waits for the running calls, and the spawned tasks, to finish.
+     */
+    ~async_executor();
+
+    async_executor(async_executor const&) = delete;
+    async_executor& operator=(async_executor const&) = delete;
+    async_executor(async_executor&&) = delete;
+    async_executor& operator=(async_executor&&) = delete;
+
+    /**
+     * @brief submits a call to run on a worker.
+     * @param task the call, which should not throw
+     */
+    void submit(task_type task);
+
+    /**
+     * @brief runs a task on its own thread, instead of a worker.
+     * @details This is for a task which blocks until other calls or the caller make progress
+     *     (e.g. the response reader of a bidirectional streaming call),
+     *     so that it never holds a worker that those calls may be waiting for.
+     * @param task the task, which should not throw
+     */
+    void spawn(task_type task);
+
+    /**
+     * @brief returns the current counters.
+     * @return the counters
+     */
+    [[nodiscard]] async_executor_stats stats() const;
+
+private:
+
+    void run();
+
+    std::vector<std::thread> workers_{};
+    std::deque<task_type> queue_{};
+    std::size_t active_calls_{};
+    std::uint64_t completed_calls_{};
+    std::list<std::thread> spawned_{};
+    std::vector<std::thread::id> finished_spawned_{};
+    bool stopping_{false};
+
+    mutable std::mutex mutex_{};
+    std::condition_variable cv_{};
+};
+
+}  // namespace plugin::udf
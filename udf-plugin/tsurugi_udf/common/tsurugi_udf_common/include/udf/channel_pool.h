@@ -0,0 +1,112 @@
+/*
+ * Copyright 2018-2026 Project Tsurugi.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+#pragma once
+
+#include <atomic>
+#include <cstddef>
+#include <memory>
+#include <vector>
+
+#include <grpcpp/channel.h>
+
+#include "plugin_config.h"
+
+namespace plugin::udf {
+
+/**
+ * @brief a fixed set of channels to the same gRPC server, each on its own connection.
+ * @details Every channel after the first one uses its own subchannel pool and distinct channel arguments,
+ *     so that gRPC opens a separate HTTP/2 connection for it instead of sharing the first one.
+ *     Each call borrows the channel with the fewest calls in flight, and ties are broken in round-robin order.
+ */
+class channel_pool {
+public:
+
+    /// @brief the number of channels if it is not specified in the plugin configuration file.
+    static constexpr std::size_t default_channels = 1;
+
+    /**
+     * @brief a channel borrowed by a call.
+     * @details The channel is returned to the pool when this object is destroyed.
+     */
+    class lease {
+    public:
+
+        lease(lease const&) = delete;
+        lease& operator=(lease const&) = delete;
+        lease(lease&& other) noexcept;
+        lease& operator=(lease&& other) = delete;
+        ~lease();
+
+        /**
+         * @brief returns the index of the borrowed channel.
+         * @return the channel index, less than channel_pool::size()
+         */
+        [[nodiscard]] std::size_t index() const noexcept;
+
+    private:
+
+        friend class channel_pool;
+
+        lease(std::atomic<std::size_t>* in_flight, std::size_t index) noexcept;
+
+        std::atomic<std::size_t>* in_flight_;
+        std::size_t index_;
+    };
+
+    /**
+     * @brief creates a new pool.
+     * @param channel the channel which is given by Tsurugi, used as the first channel
+     * @param config the plugin configuration, which specifies the number of channels
+     *     (`[rpc_client] channels`) and how to connect the other channels (`[udf] endpoint` and `secure`)
+     * @note The pool has only the given channel unless the endpoint is specified and `secure` is `false`,
+     *     because otherwise the other channels may not connect in the same way as the given one.
+     */
+    channel_pool(std::shared_ptr<grpc::Channel> channel, plugin_config const& config);
+
+    channel_pool(channel_pool const&) = delete;
+    channel_pool& operator=(channel_pool const&) = delete;
+    channel_pool(channel_pool&&) = delete;
+    channel_pool& operator=(channel_pool&&) = delete;
+    ~channel_pool() = default;
+
+    /**
+     * @brief returns the number of channels.
+     * @return the number of channels
+     */
+    [[nodiscard]] std::size_t size() const noexcept;
+
+    /**
+     * @brief returns the channel at the given index.
+     * @param index the channel index
+     * @return the channel
+     */
+    [[nodiscard]] std::shared_ptr<grpc::Channel> const& channel(std::size_t index) const;
+
+    /**
+     * @brief borrows the least loaded channel.
+     * @return the borrowed channel
+     */
+    [[nodiscard]] lease acquire();
+
+private:
+
+    std::vector<std::shared_ptr<grpc::Channel>> channels_{};
+    std::unique_ptr<std::atomic<std::size_t>[]> in_flight_{};
+    std::atomic<std::size_t> next_{};
+};
+
+}  // namespace plugin::udf
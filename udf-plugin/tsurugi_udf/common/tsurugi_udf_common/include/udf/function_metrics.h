@@ -0,0 +1,287 @@
+/*
+ * Copyright 2018-2026 Project Tsurugi.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+#pragma once
+
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstddef>
+#include <cstdint>
+#include <filesystem>
+#include <memory>
+#include <mutex>
+#include <ostream>
+#include <thread>
+#include <vector>
+
+#include <grpcpp/support/status_code_enum.h>
+
+namespace plugin::udf {
+
+/// @brief the number of gRPC status codes, from OK to UNAUTHENTICATED.
+inline constexpr std::size_t metrics_status_codes = 17;
+
+/**
+ * @brief the number of latency histogram buckets.
+ * @details The bucket `i` counts the calls which took at most `2^i` microseconds, except the last one,
+ *     which counts all slower calls.
+ */
+inline constexpr std::size_t metrics_latency_buckets = 24;
+
+/**
+ * @brief a snapshot of the metrics of a UDF function.
+ * @details This is a plain struct, so that it can be passed across the plugin library boundary.
+ */
+struct function_metrics_snapshot {
+    /// @brief the function index.
+    std::size_t function_index;
+    /// @brief the number of calls.
+    std::uint64_t calls;
+    /// @brief the number of failed calls for each gRPC status code; the element for OK is always 0.
+    std::uint64_t errors[metrics_status_codes];
+    /// @brief the total time spent building the request messages, in nanoseconds.
+    std::uint64_t marshal_nanos;
+    /// @brief the total time spent in the RPCs, in nanoseconds.
+    std::uint64_t rpc_nanos;
+    /// @brief the total time spent reading the response messages into records, in nanoseconds.
+    std::uint64_t unmarshal_nanos;
+    /// @brief the number of result rows.
+    std::uint64_t rows;
+    /// @brief the total serialized size of the request messages.
+    std::uint64_t request_bytes;
+    /// @brief the total serialized size of the response messages.
+    std::uint64_t response_bytes;
+    /// @brief the number of calls in each latency bucket.
+    std::uint64_t latency[metrics_latency_buckets];
+};
+
+/**
+ * @brief measures the time of a call, and of each of its steps.
+ */
+class metrics_stopwatch {
+public:
+
+    using clock = std::chrono::steady_clock;
+
+    /**
+     * @brief returns the time since the last lap, or since this object was created.
+     * @return the elapsed time
+     */
+    std::chrono::nanoseconds lap() noexcept {
+        auto now = clock::now();
+        auto elapsed = now - last_;
+        last_ = now;
+        return elapsed;
+    }
+
+    /**
+     * @brief returns the time since this object was created.
+     * @return the elapsed time
+     */
+    [[nodiscard]] std::chrono::nanoseconds elapsed() const noexcept { return clock::now() - start_; }
+
+private:
+
+    clock::time_point start_{clock::now()};
+    clock::time_point last_{start_};
+};
+
+/**
+ * @brief the metrics of a UDF function.
+ * @details All counters are relaxed atomics, so that recording never blocks the calls.
+ *     A snapshot may be taken while a call is being recorded, so its counters can be slightly inconsistent.
+ */
+class function_metrics {
+public:
+
+    function_metrics() = default;
+    ~function_metrics() = default;
+
+    function_metrics(function_metrics const&) = delete;
+    function_metrics& operator=(function_metrics const&) = delete;
+    function_metrics(function_metrics&&) = delete;
+    function_metrics& operator=(function_metrics&&) = delete;
+
+    /**
+     * @brief records a finished call.
+     * @param status the status of the call
+     * @param latency the total time of the call
+     */
+    void add_call(grpc::StatusCode status, std::chrono::nanoseconds latency) noexcept;
+
+    /**
+     * @brief records the time spent building a request message.
+     * @param elapsed the elapsed time
+     */
+    void add_marshal(std::chrono::nanoseconds elapsed) noexcept { add(marshal_nanos_, elapsed.count()); }
+
+    /**
+     * @brief records the time spent in an RPC.
+     * @param elapsed the elapsed time
+     */
+    void add_rpc(std::chrono::nanoseconds elapsed) noexcept { add(rpc_nanos_, elapsed.count()); }
+
+    /**
+     * @brief records the time spent reading a response message.
+     * @param elapsed the elapsed time
+     */
+    void add_unmarshal(std::chrono::nanoseconds elapsed) noexcept { add(unmarshal_nanos_, elapsed.count()); }
+
+    /**
+     * @brief records result rows.
+     * @param count the number of rows
+     */
+    void add_rows(std::uint64_t count) noexcept { add(rows_, count); }
+
+    /**
+     * @brief records the size of a request message.
+     * @param bytes the serialized size
+     */
+    void add_request_bytes(std::uint64_t bytes) noexcept { add(request_bytes_, bytes); }
+
+    /**
+     * @brief records the size of a response message.
+     * @param bytes the serialized size
+     */
+    void add_response_bytes(std::uint64_t bytes) noexcept { add(response_bytes_, bytes); }
+
+    /**
+     * @brief returns the current counters.
+     * @param function_index the index of this function
+     * @return the counters
+     */
+    [[nodiscard]] function_metrics_snapshot snapshot(std::size_t function_index) const noexcept;
+
+private:
+
+    template<class T>
+    static void add(std::atomic<std::uint64_t>& counter, T value) noexcept {
+        counter.fetch_add(static_cast<std::uint64_t>(value), std::memory_order_relaxed);
+    }
+
+    std::atomic<std::uint64_t> calls_{};
+    std::atomic<std::uint64_t> errors_[metrics_status_codes]{};
+    std::atomic<std::uint64_t> marshal_nanos_{};
+    std::atomic<std::uint64_t> rpc_nanos_{};
+    std::atomic<std::uint64_t> unmarshal_nanos_{};
+    std::atomic<std::uint64_t> rows_{};
+    std::atomic<std::uint64_t> request_bytes_{};
+    std::atomic<std::uint64_t> response_bytes_{};
+    std::atomic<std::uint64_t> latency_[metrics_latency_buckets]{};
+};
+
+/**
+ * @brief the metrics of all functions in a plugin library, keyed by the function index.
+ */
+class metrics_registry {
+public:
+
+    /**
+     * @brief creates a new registry.
+     * @param functions the number of function indices, i.e. the largest function index plus one
+     */
+    explicit metrics_registry(std::size_t functions);
+
+    /**
+     * @brief returns the metrics of the given function.
+     * @param function_index the function index, less than size()
+     * @return the metrics
+     */
+    [[nodiscard]] function_metrics& at(std::size_t function_index) noexcept { return functions_[function_index]; }
+
+    /**
+     * @brief returns the number of function indices.
+     * @return the number of function indices
+     */
+    [[nodiscard]] std::size_t size() const noexcept { return size_; }
+
+    /**
+     * @brief copies the current counters of all functions.
+     * @param out the destination, or nullptr to query the number of functions
+     * @param capacity the number of elements available in the destination
+     * @return the number of functions, which may exceed the capacity
+     */
+    std::size_t snapshot(function_metrics_snapshot* out, std::size_t capacity) const noexcept;
+
+    /**
+     * @brief returns the current counters of all functions.
+     * @return the counters, ordered by the function index
+     */
+    [[nodiscard]] std::vector<function_metrics_snapshot> snapshot() const;
+
+private:
+
+    std::size_t size_;
+    std::unique_ptr<function_metrics[]> functions_;
+};
+
+/**
+ * @brief writes the given counters as JSON.
+ * @param out the output
+ * @param snapshots the counters
+ */
+void write_metrics_json(std::ostream& out, std::vector<function_metrics_snapshot> const& snapshots);
+
+/**
+ * @brief periodically writes the metrics of a plugin library to a JSON file.
+ * @details The file is replaced atomically, so that readers never see a partial file.
+ *     The file is also written when this object is destroyed.
+ */
+class metrics_dumper {
+public:
+
+    /// @brief the interval if it is not specified in the plugin configuration file.
+    static constexpr std::chrono::seconds default_interval{60};
+
+    /**
+     * @brief starts writing the metrics.
+     * @param registry the metrics to write, which must outlive this object
+     * @param path the output file, or an empty path to write nothing
+     * @param interval the interval between writes
+     */
+    metrics_dumper(metrics_registry const& registry, std::filesystem::path path, std::chrono::seconds interval);
+
+    /**
+     * @brief writes the metrics for the last time, and stops.
+     */
+    ~metrics_dumper();
+
+    metrics_dumper(metrics_dumper const&) = delete;
+    metrics_dumper& operator=(metrics_dumper const&) = delete;
+    metrics_dumper(metrics_dumper&&) = delete;
+    metrics_dumper& operator=(metrics_dumper&&) = delete;
+
+    /**
+     * @brief writes the metrics now.
+     * @return true if the file is written
+     * @return false if no file is configured, or it cannot be written
+     */
+    bool dump() const;
+
+private:
+
+    void run();
+
+    metrics_registry const& registry_;
+    std::filesystem::path path_;
+    std::chrono::seconds interval_;
+    std::thread thread_{};
+    bool stopping_{false};
+    std::mutex mutex_{};
+    std::condition_variable cv_{};
+};
+
+}  // namespace plugin::udf
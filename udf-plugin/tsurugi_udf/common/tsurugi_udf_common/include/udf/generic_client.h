@@ -15,14 +15,80 @@
  */
 #pragma once
 
+#include <chrono>
 #include <cstddef>
+#include <memory>
+#include <optional>
+#include <stdexcept>
 #include <utility>
+#include <vector>
 
 #include "generic_client_context.h"
 #include "generic_record.h"
 
 #include <grpcpp/client_context.h>
 namespace plugin::udf {
+
+/**
+ * @brief the limits of batched calls of a function.
+ * @see generic_client::call_batch()
+ */
+struct batch_settings {
+    /// @brief the maximum number of requests if it is not specified in the plugin configuration file.
+    static constexpr std::size_t default_max_size = 256;
+    /// @brief the flush latency if it is not specified in the plugin configuration file.
+    static constexpr std::chrono::milliseconds default_flush_latency{10};
+
+    /// @brief the maximum number of requests in one batch.
+    std::size_t max_size{default_max_size};
+    /// @brief the maximum time to hold a request before sending an incomplete batch.
+    std::chrono::milliseconds flush_latency{default_flush_latency};
+};
+
+/**
+ * @brief the request side of a client streaming or bidirectional streaming call.
+ */
+class generic_record_writer {
+public:
+
+    generic_record_writer() = default;
+    generic_record_writer(generic_record_writer const&) = delete;
+    generic_record_writer& operator=(generic_record_writer const&) = delete;
+    generic_record_writer(generic_record_writer&&) = delete;
+    generic_record_writer& operator=(generic_record_writer&&) = delete;
+    /**
+     * @brief finishes the requests, as writes_done() does.
+     */
+    virtual ~generic_record_writer() = default;
+
+    /**
+     * @brief sends a request.
+     * @details This blocks while the flow control of the call holds back the request.
+     *     As the results are buffered up to a limit, read them while sending requests,
+     *     otherwise the call may stop when the buffer is full.
+     * @param request the request
+     * @return true if the request is sent
+     * @return false if the call has already finished, and its status is reported through the results
+     * @throws std::runtime_error if the request does not match the function
+     */
+    virtual bool write(generic_record& request) = 0;
+    /**
+     * @brief tells the server that no more requests are sent.
+     * @details This does nothing if it has already been called.
+     */
+    virtual void writes_done() = 0;
+};
+
+/**
+ * @brief a running client streaming or bidirectional streaming call.
+ */
+struct generic_streaming_call {
+    /// @brief the request side of the call.
+    std::unique_ptr<generic_record_writer> writer{};
+    /// @brief the results of the call, which ends with an error record if the call fails.
+    std::unique_ptr<generic_record_stream> results{};
+};
+
 class generic_client {
 public:
 
@@ -45,5 +111,50 @@ public:
         function_index_type function_index,
         generic_record& request
     ) const = 0;
+
+    /**
+     * @brief starts a client streaming or bidirectional streaming call.
+     * @details Closing the results cancels the call.
+     *     A client streaming call returns its only result after writes_done().
+     * @param context the context of the call
+     * @param function_index the function
+     * @return the running call
+     * @throws std::logic_error if the client does not support streaming calls
+     */
+    [[nodiscard]] virtual generic_streaming_call call_streaming_async(
+        std::unique_ptr<plugin::udf::generic_client_context> /* context */,
+        function_index_type /* function_index */
+    ) const {
+        throw std::logic_error("streaming calls are not supported");
+    }
+
+    /**
+     * @brief returns the limits of batched calls of the given function.
+     * @param function_index the function
+     * @return the limits
+     * @return empty if the function does not support call_batch()
+     */
+    [[nodiscard]] virtual std::optional<batch_settings> batch(function_index_type /* function_index */) const {
+        return std::nullopt;
+    }
+    /**
+     * @brief calls the given function for multiple requests in one RPC.
+     * @details `responses[i]` receives the result of `requests[i]`.
+     *     If the RPC fails, all responses receive its error.
+     * @param context the context of the RPC
+     * @param function_index the function
+     * @param requests the requests, at most batch_settings::max_size
+     * @param responses the responses, the same number as the requests
+     * @throws std::logic_error if the function does not support batched calls
+     * @throws std::invalid_argument if the numbers of requests and responses differ
+     */
+    virtual void call_batch(
+        plugin::udf::generic_client_context& /* context */,
+        function_index_type /* function_index */,
+        std::vector<generic_record*> const& /* requests */,
+        std::vector<generic_record*> const& /* responses */
+    ) const {
+        throw std::logic_error("batched calls are not supported");
+    }
 };
 }  // namespace plugin::udf
\ No newline at end of file
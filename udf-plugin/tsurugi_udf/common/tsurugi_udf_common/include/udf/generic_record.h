@@ -17,12 +17,14 @@
 
 #include <chrono>
 #include <condition_variable>
+#include <cstddef>
 #include <cstdint>
 #include <memory>
 #include <mutex>
 #include <optional>
 #include <queue>
 #include <string>
+#include <string_view>
 
 #include "error_info.h"
 
@@ -37,6 +39,11 @@ struct decimal_value {
     std::int32_t exponent{};
 };
 
+struct decimal_view {
+    std::string_view unscaled_value{};
+    std::int32_t exponent{};
+};
+
 struct date_value {
     std::int32_t days{};
 };
@@ -90,6 +97,8 @@ enum class runtime_type_kind {
     clob_reference,
 };
 
+class generic_record_impl;
+
 // @see https://protobuf.dev/programming-guides/proto3/
 class generic_record_cursor {
 public:
@@ -120,6 +129,25 @@ public:
     [[nodiscard]] virtual bool has_next() = 0;
     [[nodiscard]] virtual runtime_type_kind current_kind() const = 0;
     [[nodiscard]] virtual bool current_is_null() const = 0;
+
+    // the virtual functions below are added in 0.5.0, after the ones above so that their slots are kept
+
+    /**
+     * @brief fetches a string value without copying it out of the record.
+     * @details The returned view is valid while both the record and this cursor are alive.
+     *     An implementation which cannot refer to the value in the record keeps a copy of it in the cursor.
+     */
+    [[nodiscard]] virtual std::optional<std::string_view> fetch_string_view() = 0;
+    /**
+     * @brief fetches a bytes value without copying it out of the record.
+     * @see fetch_string_view()
+     */
+    [[nodiscard]] virtual std::optional<std::string_view> fetch_bytes_view() = 0;
+    /**
+     * @brief fetches a decimal value without copying its unscaled value out of the record.
+     * @see fetch_string_view()
+     */
+    [[nodiscard]] virtual std::optional<decimal_view> fetch_decimal_view() = 0;
 };
 
 class generic_record {
@@ -187,6 +215,21 @@ public:
     [[nodiscard]] virtual std::optional<error_info> const& error() const noexcept = 0;
 
     [[nodiscard]] virtual std::unique_ptr<generic_record_cursor> cursor() const = 0;
+
+    // the virtual functions below are added in 0.5.0, after the ones above so that their slots are kept
+
+    /// @brief adds a string value without creating an intermediate std::string.
+    virtual void add_string_view(std::string_view value) { add_string(std::string{value}); }
+    /// @brief adds a bytes value without creating an intermediate bytes_value.
+    virtual void add_bytes_view(std::string_view value) { add_bytes(bytes_value{std::string{value}}); }
+    /**
+     * @brief replaces the contents of this record with those of a record taken out of a stream.
+     * @details generic_record_impl exchanges its buffers with the source.
+     *     The default implementation copies the values and the error through the add API;
+     *     the source does not keep the types of null values, so they are added with add_bool_null().
+     * @param source the record to take the contents from, which may be left with any contents
+     */
+    virtual void take_from(generic_record_impl& source);
 };
 
 class generic_record_stream {
@@ -204,6 +247,47 @@ public:
     [[nodiscard]] virtual status_type
     next(generic_record& record, std::optional<std::chrono::milliseconds> timeout) = 0;
     virtual void close() = 0;
+
+    // the virtual functions below are added in 0.5.0, after the ones above so that their slots are kept
+
+    /**
+     * @brief takes out the available records at once.
+     * @details This waits until at least one record is available, the stream ends, or the timeout expires,
+     *     and then takes out the records which are available without waiting further.
+     *     The default implementation calls next() for the first record, and try_next() for the rest.
+     * @param records the destination records
+     * @param size the number of the destination records, which is the maximum number of records to take
+     *     and must be positive
+     * @param taken the number of the taken records, which is set even if this returns an error
+     * @param timeout the maximum time to wait, or empty to wait indefinitely
+     * @return status_type::ok if one or more records are taken
+     * @return status_type::error if the last taken record has an error
+     * @return status_type::end_of_stream if the stream ended and no records remain
+     * @return status_type::not_ready if the timeout expired
+     */
+    [[nodiscard]] virtual status_type next_batch(
+        generic_record* const* records,
+        std::size_t size,
+        std::size_t& taken,
+        std::optional<std::chrono::milliseconds> timeout
+    ) {
+        taken = 0;
+        if(size == 0) { return status_type::ok; }
+        auto result = next(*records[0], timeout);
+        if(result != status_type::ok) {
+            if(result == status_type::error) { taken = 1; }
+            return result;
+        }
+        for(taken = 1; taken < size; ++taken) {
+            auto status = try_next(*records[taken]);
+            if(status == status_type::error) {
+                ++taken;
+                return status;
+            }
+            if(status != status_type::ok) { break; }
+        }
+        return status_type::ok;
+    }
 };
 
 }  // namespace plugin::udf
@@ -14,11 +14,14 @@
  * limitations under the License.
  */
 #pragma once
+#include <cstddef>
 #include <cstdint>
+#include <functional>
 #include <iosfwd>
 #include <memory>
 #include <optional>
 #include <string>
+#include <string_view>
 #include <type_traits>
 #include <variant>
 #include <vector>
@@ -27,6 +30,26 @@
 
 namespace plugin::udf {
 
+/**
+ * @brief a string value stored in the payload buffer of generic_record_impl.
+ */
+struct string_payload {
+    /// @brief the offset of the value in the payload buffer.
+    std::size_t offset;
+    /// @brief the size of the value in bytes.
+    std::size_t size;
+};
+
+/**
+ * @brief a bytes value stored in the payload buffer of generic_record_impl.
+ */
+struct bytes_payload {
+    /// @brief the offset of the value in the payload buffer.
+    std::size_t offset;
+    /// @brief the size of the value in bytes.
+    std::size_t size;
+};
+
 using value_type = std::variant<
     std::monostate,
     bool,
@@ -36,8 +59,8 @@ using value_type = std::variant<
     std::uint64_t,
     float,
     double,
-    std::string,
-    bytes_value,
+    string_payload,
+    bytes_payload,
     decimal_value,
     date_value,
     local_time_value,
@@ -46,9 +69,23 @@ using value_type = std::variant<
     blob_reference_value,
     clob_reference_value>;
 
+/**
+ * @brief the record implementation which exchanges values between the plugin and the RPC client.
+ * @details String and bytes values are appended to a single payload buffer,
+ *     instead of being allocated one by one.
+ *     reset() keeps the capacity of the value list and the payload buffer,
+ *     so that reusing a record (e.g. for each row of a stream) does not allocate once they are large enough.
+ */
 class generic_record_impl : public generic_record {
 public:
 
+    /**
+     * @brief reserves the storage for the given number of values.
+     * @param columns the number of values, e.g. the number of flattened columns of the record
+     * @param payload_bytes the total size of string and bytes values
+     */
+    void reserve(std::size_t columns, std::size_t payload_bytes = 0);
+
     void reset() override;
     void add_bool(bool value) override;
     void add_bool_null() override;
@@ -83,23 +120,41 @@ public:
     void add_clob_reference(clob_reference_value value) override;
     void add_clob_reference_null() override;
     [[nodiscard]] std::unique_ptr<generic_record_cursor> cursor() const override;
+    void add_string_view(std::string_view value) override;
+    void add_bytes_view(std::string_view value) override;
+    void take_from(generic_record_impl& source) override;
     [[nodiscard]] std::optional<error_info>& error() noexcept override;
     [[nodiscard]] std::optional<error_info> const& error() const noexcept override;
     void set_error(error_info const& status) override;
     void assign_from(generic_record_impl&& other) noexcept;
+    /**
+     * @brief exchanges the contents with another record.
+     * @details This keeps the allocated buffers of both records, so that they can be reused.
+     * @param other the record to exchange with
+     */
+    void swap(generic_record_impl& other) noexcept;
+    /**
+     * @brief adds the values and the error of this record to another record through its add API.
+     * @details Null values are added with add_bool_null(), because their types are not kept.
+     * @param target the record to add to
+     */
+    void copy_to(generic_record& target) const;
     [[nodiscard]] std::string debug_string() const;
     void dump(std::ostream& os) const;
 
 private:
 
+    std::size_t append_payload(std::string_view value);
+
     std::vector<value_type> values_;
+    std::string payload_;
     std::optional<error_info> err_;
 };
 
 class generic_record_cursor_impl : public generic_record_cursor {
 public:
 
-    explicit generic_record_cursor_impl(std::vector<value_type> const& values);
+    generic_record_cursor_impl(std::vector<value_type> const& values, std::string const& payload);
 
     [[nodiscard]] std::optional<bool> fetch_bool() override;
     [[nodiscard]] std::optional<std::int32_t> fetch_int4() override;
@@ -120,19 +175,120 @@ public:
     [[nodiscard]] bool has_next() override;
     [[nodiscard]] runtime_type_kind current_kind() const override;
     [[nodiscard]] bool current_is_null() const override;
+    [[nodiscard]] std::optional<std::string_view> fetch_string_view() override;
+    [[nodiscard]] std::optional<std::string_view> fetch_bytes_view() override;
+    [[nodiscard]] std::optional<decimal_view> fetch_decimal_view() override;
 
 private:
 
     std::vector<value_type> const& values_;
+    std::string const& payload_;
     std::size_t index_ = 0;
 };
 template<class>
 struct always_false : std::false_type {};
 
+class generic_record_stream_buffer;
+
+/**
+ * @brief the producer side of a generic_record_stream_impl.
+ * @details This shares the buffer with the stream, so that the producer (e.g. an RPC worker)
+ *     can keep writing safely even after the consumer has closed and destroyed the stream.
+ */
+class generic_record_stream_writer {
+public:
+
+    /**
+     * @brief the result of try_push().
+     */
+    enum class push_status {
+        /// @brief the record is added.
+        pushed,
+        /// @brief the buffer is full, and the record is kept.
+        full,
+        /// @brief the stream is already closed or ended, and the record is discarded.
+        closed,
+    };
+
+    generic_record_stream_writer() = default;
+    explicit generic_record_stream_writer(std::shared_ptr<generic_record_stream_buffer> buffer) noexcept;
+
+    /**
+     * @brief adds a record to the end of the stream.
+     * @details This blocks while the buffer is full, so it must not be called on a worker of async_executor.
+     * @param record the record to add, which is left empty and can be reused for the next record
+     * @return true if the record is added
+     * @return false if the stream is already closed or ended, and the record is discarded
+     */
+    bool push(generic_record_impl&& record);
+    /**
+     * @brief adds a record to the end of the stream.
+     * @details This blocks while the buffer is full, so it must not be called on a worker of async_executor.
+     * @param record the record to add
+     * @return true if the record is added
+     * @return false if the stream is already closed or ended, and the record is discarded
+     */
+    bool push(std::unique_ptr<generic_record_impl> record);
+    /**
+     * @brief adds a record to the end of the stream without blocking.
+     * @details If the buffer is full, `on_writable` is moved into the stream, and called once the consumer
+     *     takes a record out or closes the stream, so that the producer can try again from there
+     *     instead of waiting on a thread. It is called out of the lock of the stream.
+     * @param record the record to add, which is left empty if it is added
+     * @param on_writable the function which resumes the producer, which is left as is unless the buffer is full
+     * @return the result
+     */
+    [[nodiscard]] push_status try_push(generic_record_impl& record, std::function<void()>& on_writable);
+    /**
+     * @brief marks the end of the stream.
+     * @details This also removes the close handler.
+     */
+    void end_of_stream();
+    /**
+     * @brief adds the last record, and marks the end of the stream.
+     * @details This does not block: if the buffer is full, it grows by one slot for the record.
+     *     This also removes the close handler.
+     * @param last the last record (e.g. an error), which is discarded if the stream is already closed
+     */
+    void end_of_stream(generic_record_impl&& last);
+    /**
+     * @brief returns whether the consumer has closed the stream.
+     * @return true if the stream is closed
+     */
+    [[nodiscard]] bool closed() const;
+    /**
+     * @brief sets the function which is called once when the consumer closes the stream.
+     * @details The handler is called while the stream is locked, so it must not access the stream.
+     *     If the stream is already closed, the handler is called immediately.
+     * @param handler the handler (e.g. to cancel the RPC), or empty to remove the current one
+     */
+    void on_close(std::function<void()> handler);
+
+private:
+
+    std::shared_ptr<generic_record_stream_buffer> buffer_{};
+};
+
+/**
+ * @brief a bounded stream of records, which is filled by an RPC reader and drained by the consumer.
+ * @details Records are kept in a ring buffer of the fixed capacity.
+ *     If the buffer is full, push() blocks until the consumer takes records out,
+ *     and try_push() instead lets the producer park itself until then,
+ *     so that the RPC reader stops reading ahead of the consumer.
+ *     The buffer slots are reused, and records are exchanged with them instead of being allocated per row.
+ *     Closing or destroying the stream releases the blocked producer, and calls its close handler.
+ */
 class generic_record_stream_impl final : public generic_record_stream {
 public:
 
-    generic_record_stream_impl();
+    /// @brief the default number of records buffered in a stream.
+    static constexpr std::size_t default_capacity = 1024;
+
+    /**
+     * @brief creates a new stream.
+     * @param capacity the maximum number of buffered records, or 0 to use default_capacity
+     */
+    explicit generic_record_stream_impl(std::size_t capacity = default_capacity);
     ~generic_record_stream_impl() override;
 
     generic_record_stream_impl(const generic_record_stream_impl&) = delete;
@@ -141,24 +297,65 @@ public:
     generic_record_stream_impl(generic_record_stream_impl&& other) noexcept;
     generic_record_stream_impl& operator=(generic_record_stream_impl&& other) noexcept;
 
-    void push(std::unique_ptr<generic_record_impl> record);
+    /**
+     * @brief returns a writer to fill this stream.
+     * @return the writer, which can outlive this stream
+     */
+    [[nodiscard]] generic_record_stream_writer writer() const;
+    /**
+     * @brief adds a record to the end of the stream.
+     * @see generic_record_stream_writer::push()
+     */
+    bool push(generic_record_impl&& record);
+    /**
+     * @brief adds a record to the end of the stream.
+     * @see generic_record_stream_writer::push()
+     */
+    bool push(std::unique_ptr<generic_record_impl> record);
     void end_of_stream();
     void close() override;
 
     status_type try_next(generic_record& record) override;
     status_type next(generic_record& record, std::optional<std::chrono::milliseconds> timeout) override;
+    /**
+     * @brief takes out the available records at once, while the stream is locked once.
+     * @see generic_record_stream::next_batch()
+     */
+    status_type next_batch(
+        generic_record* const* records,
+        std::size_t size,
+        std::size_t& taken,
+        std::optional<std::chrono::milliseconds> timeout
+    ) override;
+    /**
+     * @brief takes out the buffered records at once.
+     * @details This waits until at least one record is available, the stream ends, or the timeout expires.
+     *     The contents of the elements of `records` are exchanged with the buffer slots,
+     *     so passing the same vector again avoids allocations.
+     *     A record with an error is always the last element.
+     * @param records the destination, which is resized to the number of the taken records
+     * @param max the maximum number of records to take, or 0 to take all buffered records
+     * @param timeout the maximum time to wait, or empty to wait indefinitely
+     * @return status_type::ok if one or more records are taken
+     * @return status_type::error if the last taken record has an error
+     * @return status_type::end_of_stream if the stream ended and no records remain
+     * @return status_type::not_ready if the timeout expired
+     */
+    status_type next_batch(
+        std::vector<std::unique_ptr<generic_record_impl>>& records,
+        std::size_t max,
+        std::optional<std::chrono::milliseconds> timeout
+    );
+    /**
+     * @brief returns the maximum number of buffered records.
+     * @return the capacity
+     */
+    [[nodiscard]] std::size_t capacity() const noexcept;
     friend std::ostream& operator<<(std::ostream& os, generic_record_impl const& record);
 
 private:
 
-    status_type extract_record_from_queue_unlocked(generic_record& record);
-
-    std::queue<std::unique_ptr<generic_record_impl>> queue_;
-    bool closed_{false};
-    bool eos_{false};
-
-    std::mutex mutex_;
-    std::condition_variable cv_;
+    std::shared_ptr<generic_record_stream_buffer> buffer_;
 };
 
 std::ostream& operator<<(std::ostream& os, generic_record_impl const& record);
@@ -20,6 +20,7 @@
 #include <vector>
 
 #include "enum_types.h"
+#include "function_metrics.h"
 #include "generic_record.h"
 #include "generic_record_impl.h"
 
@@ -152,6 +153,16 @@ public:
     plugin_api(plugin_api&&) = delete;
     plugin_api& operator=(plugin_api&&) = delete;
     [[nodiscard]] virtual std::vector<package_descriptor*> const& packages() const noexcept = 0;
+
+    // the virtual functions below are added in 0.5.0, after the ones above so that their slots are kept
+
+    /**
+     * @brief returns the metrics of the UDF functions in this plugin.
+     * @details Only plugins of version 0.5.0 or later have this function,
+     *     so the caller must check package_descriptor::version() of the packages first.
+     * @return a snapshot of the metrics, in the order of function_index
+     */
+    [[nodiscard]] virtual std::vector<function_metrics_snapshot> metrics() const = 0;
 };
 void print_columns(std::vector<column_descriptor*> const& cols, int indent);
 void print_plugin_info(std::shared_ptr<plugin_api> const& api);
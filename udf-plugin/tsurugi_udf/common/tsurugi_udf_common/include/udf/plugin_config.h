@@ -0,0 +1,95 @@
+/*
+ * Copyright 2018-2026 Project Tsurugi.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+#pragma once
+
+#include <cstddef>
+#include <filesystem>
+#include <functional>
+#include <map>
+#include <optional>
+#include <string>
+#include <string_view>
+
+namespace plugin::udf {
+
+/**
+ * @brief settings of the plugin read from its plugin configuration file (`.ini`).
+ * @details The plugin configuration file is placed next to the plugin library file,
+ *     and has the same name except for the extension.
+ *     Only the plugin side settings (e.g. `[rpc_client]` section) are read from this class.
+ */
+class plugin_config {
+public:
+
+    plugin_config() = default;
+
+    /**
+     * @brief loads the given configuration file.
+     * @param path the configuration file path
+     * @return the loaded settings
+     * @return empty settings if the file is not readable
+     */
+    [[nodiscard]] static plugin_config load(std::filesystem::path const& path);
+
+    /**
+     * @brief loads the configuration file paired with the shared library which contains the given address.
+     * @param address an address in the shared library, e.g. a function in the plugin library
+     * @return the loaded settings
+     * @return empty settings if the library or its configuration file is not found
+     */
+    [[nodiscard]] static plugin_config load_for_address(void const* address);
+
+    /**
+     * @brief returns the value of the given key.
+     * @param section the section name
+     * @param key the key name
+     * @return the value, without surrounding whitespaces
+     * @return empty if the key is not defined
+     */
+    [[nodiscard]] std::optional<std::string> get(std::string_view section, std::string_view key) const;
+
+    /**
+     * @brief returns the value of the given key as a positive integer.
+     * @param section the section name
+     * @param key the key name
+     * @return the value
+     * @return empty if the key is not defined, or the value is not a positive integer
+     */
+    [[nodiscard]] std::optional<std::size_t> get_positive(std::string_view section, std::string_view key) const;
+
+    /**
+     * @brief returns the value of the given key as a file path.
+     * @param section the section name
+     * @param key the key name
+     * @return the path, where a relative path is resolved against the directory of the configuration file
+     * @return empty if the key is not defined, or the value is empty
+     */
+    [[nodiscard]] std::optional<std::filesystem::path> get_path(std::string_view section, std::string_view key) const;
+
+    /**
+     * @brief returns the path of the loaded configuration file.
+     * @return the file path
+     * @return empty path if no file is loaded
+     */
+    [[nodiscard]] std::filesystem::path const& path() const noexcept;
+
+private:
+
+    std::filesystem::path path_{};
+    std::map<std::string, std::string, std::less<>> values_{};
+};
+
+}  // namespace plugin::udf
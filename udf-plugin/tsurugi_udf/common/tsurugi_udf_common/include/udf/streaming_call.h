@@ -0,0 +1,553 @@
+/*
+ * Copyright 2018-2026 Project Tsurugi.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+#pragma once
+
+#include <cstddef>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <optional>
+#include <string>
+#include <utility>
+
+#include <grpcpp/client_context.h>
+#include <grpcpp/support/sync_stream.h>
+
+#include "async_executor.h"
+#include "channel_pool.h"
+#include "error_info.h"
+#include "function_metrics.h"
+#include "generic_client.h"
+#include "generic_client_context.h"
+#include "generic_record_impl.h"
+
+namespace plugin::udf {
+
+/**
+ * @brief the request side of a call which has already failed.
+ */
+class failed_record_writer final : public generic_record_writer {
+public:
+
+    bool write(generic_record& /* request */) override { return false; }
+    void writes_done() override {}
+};
+
+/**
+ * @brief returns a streaming call which has already failed.
+ * @param code the error code
+ * @param message the error message
+ * @return the call, whose results contain only the error
+ */
+[[nodiscard]] inline generic_streaming_call make_failed_streaming_call(
+    error_info::error_code_type code,
+    std::string message
+) {
+    auto results = std::make_unique<generic_record_stream_impl>(1);
+    auto err = std::make_unique<generic_record_impl>();
+    err->set_error(error_info(code, std::move(message)));
+    results->push(std::move(err));
+    results->end_of_stream();
+    return generic_streaming_call{std::make_unique<failed_record_writer>(), std::move(results)};
+}
+
+/**
+ * @brief the response side of a server streaming call.
+ * @details The responses are read on the workers of the async_executor, and added to the results.
+ *     While the results are full, the call does not occupy a worker: it parks itself in the results,
+ *     which submit it to the executor again once the consumer takes records out or closes them.
+ *     So a slow consumer holds back only its own call, and never the other calls on the same pool.
+ * @tparam Response the response message type
+ */
+template<class Response>
+class server_streaming_reader final : public std::enable_shared_from_this<server_streaming_reader<Response>> {
+public:
+
+    /// @brief the function which applies the deadline, and starts the RPC with the request.
+    using start_type = std::function<std::unique_ptr<grpc::ClientReader<Response>>(generic_client_context&)>;
+    /// @brief the function which adds the values of a response message to a record.
+    using add_type = void (*)(Response const&, generic_record_impl&);
+
+    /**
+     * @brief submits a server streaming call to the executor.
+     * @param context the context of the call
+     * @param executor the worker pool which reads the responses
+     * @param start the function which starts the RPC
+     * @param add the response reader
+     * @param metrics the metrics of the function, which receives the RPC time and the status of the call
+     * @param stopwatch the stopwatch started with the call
+     * @param lease the channel of the call, which is returned when the call finishes
+     * @param results the results of the call
+     */
+    static void submit(
+        std::unique_ptr<generic_client_context> context,
+        async_executor& executor,
+        start_type start,
+        add_type add,
+        function_metrics& metrics,
+        metrics_stopwatch stopwatch,
+        channel_pool::lease lease,
+        generic_record_stream_writer results
+    ) {
+        std::shared_ptr<server_streaming_reader> reader{new server_streaming_reader(
+            std::move(context), executor, std::move(start), add, metrics, stopwatch, std::move(lease), std::move(results)
+        )};
+        executor.submit([reader] { reader->begin(); });
+    }
+
+    server_streaming_reader(server_streaming_reader const&) = delete;
+    server_streaming_reader& operator=(server_streaming_reader const&) = delete;
+    server_streaming_reader(server_streaming_reader&&) = delete;
+    server_streaming_reader& operator=(server_streaming_reader&&) = delete;
+    ~server_streaming_reader() = default;
+
+private:
+
+    server_streaming_reader(
+        std::unique_ptr<generic_client_context> context,
+        async_executor& executor,
+        start_type start,
+        add_type add,
+        function_metrics& metrics,
+        metrics_stopwatch stopwatch,
+        channel_pool::lease lease,
+        generic_record_stream_writer results
+    ) :
+        context_(std::move(context)),
+        executor_(&executor),
+        start_(std::move(start)),
+        add_(add),
+        metrics_(&metrics),
+        stopwatch_(stopwatch),
+        lease_(std::move(lease)),
+        results_(std::move(results)) {}
+
+    void begin() {
+        if(results_.closed()) {
+            results_.end_of_stream();
+            return;
+        }
+        // the time waiting for a free worker counts only in the latency
+        stopwatch_.lap();
+        auto& grpc_context = context_->grpc_context();
+        // cancel the call as soon as the consumer closes the results;
+        // end_of_stream() removes this handler before the context is released
+        results_.on_close([&grpc_context] { grpc_context.TryCancel(); });
+        try {
+            stream_ = start_(*context_);
+        } catch(std::exception const& e) {
+            fail(grpc::StatusCode::INTERNAL, e.what());
+            return;
+        } catch(...) {
+            fail(grpc::StatusCode::UNKNOWN, "Unknown error in async RPC handling");
+            return;
+        }
+        if(! stream_) {
+            fail(grpc::StatusCode::INTERNAL, "Failed to create server streaming reader");
+            return;
+        }
+        resume();
+    }
+
+    void resume() {
+        try {
+            while(true) {
+                if(pending_) {
+                    if(! resume_) {
+                        // kept until the results take it, so that it is not created for every row
+                        resume_ = [self = this->shared_from_this()] {
+                            self->executor_->submit([self] { self->resume(); });
+                        };
+                    }
+                    auto status = results_.try_push(record_, resume_);
+                    if(status == generic_record_stream_writer::push_status::full) {
+                        // parked until the consumer takes records out; the worker is free meanwhile
+                        return;
+                    }
+                    pending_ = false;
+                    if(status == generic_record_stream_writer::push_status::closed) { break; }
+                    // the time waiting for the consumer counts only in the latency
+                    stopwatch_.lap();
+                }
+                if(! stream_->Read(&response_)) { break; }
+                metrics_->add_rpc(stopwatch_.lap());
+                // the record is reused for every row, exchanging its storage with the results
+                add_(response_, record_);
+                stopwatch_.lap();
+                pending_ = true;
+            }
+            finish();
+        } catch(std::exception const& e) {
+            fail(grpc::StatusCode::INTERNAL, e.what());
+        } catch(...) {
+            fail(grpc::StatusCode::UNKNOWN, "Unknown error in async RPC handling");
+        }
+    }
+
+    void finish() {
+        resume_ = nullptr;
+        auto status = stream_->Finish();
+        metrics_->add_rpc(stopwatch_.lap());
+        // the call cancelled by closing the results is not an error
+        auto closed = results_.closed();
+        metrics_->add_call(closed ? grpc::StatusCode::OK : status.error_code(), stopwatch_.elapsed());
+        if(status.ok() || closed) {
+            results_.end_of_stream();
+        } else {
+            end_with_error(status.error_code(), status.error_message());
+        }
+        lease_.reset();
+    }
+
+    void fail(grpc::StatusCode code, std::string message) {
+        resume_ = nullptr;
+        if(stream_) {
+            // a failure while reading the responses leaves the call running
+            context_->grpc_context().TryCancel();
+            static_cast<void>(stream_->Finish());
+        }
+        metrics_->add_call(code, stopwatch_.elapsed());
+        end_with_error(code, std::move(message));
+        lease_.reset();
+    }
+
+    void end_with_error(error_info::error_code_type code, std::string message) {
+        generic_record_impl err{};
+        err.set_error(error_info(code, std::move(message)));
+        // never blocks, even if the results are full
+        results_.end_of_stream(std::move(err));
+    }
+
+    std::unique_ptr<generic_client_context> context_;
+    async_executor* executor_;
+    start_type start_;
+    add_type add_;
+    function_metrics* metrics_;
+    metrics_stopwatch stopwatch_;
+    std::optional<channel_pool::lease> lease_;
+    generic_record_stream_writer results_;
+    std::unique_ptr<grpc::ClientReader<Response>> stream_{};
+    // reused for every row
+    Response response_{};
+    generic_record_impl record_{};
+    // whether record_ holds a row which is not added to the results yet
+    bool pending_{false};
+    // submits resume() again, which refers to this object until it is cleared
+    std::function<void()> resume_{};
+};
+
+/**
+ * @brief the request side of a client streaming call.
+ * @details writes_done() waits for the response, adds it to the results, and records the status of the call.
+ * @tparam Request the request message type
+ * @tparam Response the response message type
+ */
+template<class Request, class Response>
+class client_streaming_writer final : public generic_record_writer {
+public:
+
+    /// @brief the function which builds a request message from a record.
+    using build_type = void (*)(generic_record&, Request&);
+    /// @brief the function which adds the values of a response message to a record.
+    using add_type = void (*)(Response const&, generic_record_impl&);
+
+    /**
+     * @brief starts a client streaming call.
+     * @param context the context of the call, whose deadline is already applied
+     * @param start the function which starts the RPC, e.g. the method of the stub
+     * @param build the request builder
+     * @param add the response reader
+     * @param metrics the metrics of the function, which receives the status of the call
+     * @param stopwatch the stopwatch started with the call
+     * @param lease the channel of the call, which is returned when the call finishes
+     * @return the running call
+     */
+    template<class Start>
+    [[nodiscard]] static generic_streaming_call start(
+        std::unique_ptr<generic_client_context> context,
+        Start&& start,
+        build_type build,
+        add_type add,
+        function_metrics& metrics,
+        metrics_stopwatch stopwatch,
+        channel_pool::lease lease
+    ) {
+        auto results = std::make_unique<generic_record_stream_impl>(1);
+        std::unique_ptr<client_streaming_writer> writer{new client_streaming_writer(
+            std::move(context), results->writer(), build, add, metrics, stopwatch, std::move(lease)
+        )};
+        auto& grpc_context = writer->context_->grpc_context();
+        writer->stream_ = start(&grpc_context, &writer->response_);
+        // writes_done() removes this handler before the context is released
+        writer->results_.on_close([&grpc_context] { grpc_context.TryCancel(); });
+        return generic_streaming_call{std::move(writer), std::move(results)};
+    }
+
+    ~client_streaming_writer() override { writes_done(); }
+
+    client_streaming_writer(client_streaming_writer const&) = delete;
+    client_streaming_writer& operator=(client_streaming_writer const&) = delete;
+    client_streaming_writer(client_streaming_writer&&) = delete;
+    client_streaming_writer& operator=(client_streaming_writer&&) = delete;
+
+    bool write(generic_record& request) override {
+        if(done_ || ! stream_) { return false; }
+        Request message{};
+        build_(request, message);
+        return stream_->Write(message);
+    }
+
+    void writes_done() override {
+        if(done_) { return; }
+        done_ = true;
+        if(! stream_) {
+            metrics_->add_call(grpc::StatusCode::INTERNAL, stopwatch_.elapsed());
+            push_error(grpc::StatusCode::INTERNAL, "Failed to create client streaming writer");
+            results_.end_of_stream();
+            return;
+        }
+        stream_->WritesDone();
+        auto status = stream_->Finish();
+        // the call cancelled by closing the results is not an error
+        metrics_->add_call(results_.closed() ? grpc::StatusCode::OK : status.error_code(), stopwatch_.elapsed());
+        if(status.ok()) {
+            generic_record_impl record{};
+            add_(response_, record);
+            results_.push(std::move(record));
+        } else {
+            push_error(status.error_code(), status.error_message());
+        }
+        results_.end_of_stream();
+        lease_.reset();
+    }
+
+private:
+
+    client_streaming_writer(
+        std::unique_ptr<generic_client_context> context,
+        generic_record_stream_writer results,
+        build_type build,
+        add_type add,
+        function_metrics& metrics,
+        metrics_stopwatch stopwatch,
+        channel_pool::lease lease
+    ) :
+        context_(std::move(context)),
+        results_(std::move(results)),
+        build_(build),
+        add_(add),
+        metrics_(&metrics),
+        stopwatch_(stopwatch),
+        lease_(std::move(lease)) {}
+
+    void push_error(error_info::error_code_type code, std::string message) {
+        if(results_.closed()) { return; }
+        auto err = std::make_unique<generic_record_impl>();
+        err->set_error(error_info(code, std::move(message)));
+        results_.push(std::move(err));
+    }
+
+    std::unique_ptr<generic_client_context> context_;
+    generic_record_stream_writer results_;
+    build_type build_;
+    add_type add_;
+    function_metrics* metrics_;
+    metrics_stopwatch stopwatch_;
+    std::optional<channel_pool::lease> lease_;
+    Response response_{};
+    std::unique_ptr<grpc::ClientWriter<Request>> stream_{};
+    bool done_{false};
+};
+
+/**
+ * @brief the request side of a bidirectional streaming call.
+ * @details The responses are read on a thread spawned by the async_executor, and added to the results.
+ *     The bounded results pause reading while they are full, so that the flow control of the call
+ *     holds back the server, and then the requests.
+ *     The reader does not use a worker of the executor, because it waits for the caller
+ *     both to take out the results and to write the requests.
+ *     The call finishes on whichever side ends last: the reader when the responses end,
+ *     or writes_done() in the caller thread, which also records the status of the call.
+ * @tparam Request the request message type
+ * @tparam Response the response message type
+ */
+template<class Request, class Response>
+class bidi_streaming_writer final : public generic_record_writer {
+public:
+
+    /// @brief the function which builds a request message from a record.
+    using build_type = void (*)(generic_record&, Request&);
+    /// @brief the function which adds the values of a response message to a record.
+    using add_type = void (*)(Response const&, generic_record_impl&);
+
+    /**
+     * @brief starts a bidirectional streaming call.
+     * @param context the context of the call, whose deadline is already applied
+     * @param capacity the maximum number of buffered results
+     * @param executor the executor which runs the response reader
+     * @param start the function which starts the RPC, e.g. the method of the stub
+     * @param build the request builder
+     * @param add the response reader
+     * @param metrics the metrics of the function, which receives the status of the call
+     * @param stopwatch the stopwatch started with the call
+     * @param lease the channel of the call, which is returned when the call finishes
+     * @return the running call
+     */
+    template<class Start>
+    [[nodiscard]] static generic_streaming_call start(
+        std::unique_ptr<generic_client_context> context,
+        std::size_t capacity,
+        async_executor& executor,
+        Start&& start,
+        build_type build,
+        add_type add,
+        function_metrics& metrics,
+        metrics_stopwatch stopwatch,
+        channel_pool::lease lease
+    ) {
+        auto state = std::make_shared<state_type>();
+        state->context = std::move(context);
+        state->metrics = &metrics;
+        state->stopwatch = stopwatch;
+        state->lease.emplace(std::move(lease));
+        auto& grpc_context = state->context->grpc_context();
+        state->stream = start(&grpc_context);
+        if(! state->stream) {
+            metrics.add_call(grpc::StatusCode::INTERNAL, stopwatch.elapsed());
+            return make_failed_streaming_call(
+                grpc::StatusCode::INTERNAL,
+                "Failed to create bidirectional streaming reader writer"
+            );
+        }
+        auto results = std::make_unique<generic_record_stream_impl>(capacity);
+        state->results = results->writer();
+        // finish() removes this handler before the state is released
+        state->results.on_close([&grpc_context] { grpc_context.TryCancel(); });
+        executor.spawn([state, add] { read_all(state, add); });
+        return generic_streaming_call{
+            std::unique_ptr<generic_record_writer>{new bidi_streaming_writer(std::move(state), build)},
+            std::move(results),
+        };
+    }
+
+    ~bidi_streaming_writer() override { writes_done(); }
+
+    bidi_streaming_writer(bidi_streaming_writer const&) = delete;
+    bidi_streaming_writer& operator=(bidi_streaming_writer const&) = delete;
+    bidi_streaming_writer(bidi_streaming_writer&&) = delete;
+    bidi_streaming_writer& operator=(bidi_streaming_writer&&) = delete;
+
+    bool write(generic_record& request) override {
+        if(done_) { return false; }
+        Request message{};
+        build_(request, message);
+        return state_->stream->Write(message);
+    }
+
+    void writes_done() override {
+        if(done_) { return; }
+        done_ = true;
+        state_->stream->WritesDone();
+        bool reads_done{};
+        {
+            std::lock_guard lk(state_->mutex);
+            state_->writes_done = true;
+            reads_done = state_->reads_done;
+        }
+        // the responses have already ended, so Finish() returns without waiting
+        if(reads_done) { finish(*state_); }
+    }
+
+private:
+
+    struct state_type {
+        std::unique_ptr<generic_client_context> context{};
+        function_metrics* metrics{};
+        metrics_stopwatch stopwatch{};
+        std::optional<channel_pool::lease> lease{};
+        std::unique_ptr<grpc::ClientReaderWriter<Request, Response>> stream{};
+        generic_record_stream_writer results{};
+        // the error while reading the responses, which is set before reads_done
+        std::optional<error_info> error{};
+        std::mutex mutex{};
+        bool reads_done{false};
+        bool writes_done{false};
+    };
+
+    bidi_streaming_writer(std::shared_ptr<state_type> state, build_type build) :
+        state_(std::move(state)),
+        build_(build) {}
+
+    static void read_all(std::shared_ptr<state_type> const& state, add_type add) {
+        try {
+            Response response{};
+            // reused for every row; push() blocks while the results are full, which pauses Read()
+            generic_record_impl record{};
+            while(state->stream->Read(&response)) {
+                add(response, record);
+                if(! state->results.push(std::move(record))) {
+                    // closed by the consumer, which has cancelled the call
+                    break;
+                }
+            }
+        } catch(std::exception const& e) {
+            fail(*state, grpc::StatusCode::INTERNAL, e.what());
+        } catch(...) {
+            fail(*state, grpc::StatusCode::UNKNOWN, "Unknown error in async RPC handling");
+        }
+        bool writes_done{};
+        {
+            std::lock_guard lk(state->mutex);
+            state->reads_done = true;
+            writes_done = state->writes_done;
+        }
+        // otherwise writes_done() finishes the call, because Finish() must not run concurrently with Write()
+        if(writes_done) { finish(*state); }
+    }
+
+    static void fail(state_type& state, error_info::error_code_type code, std::string message) {
+        // reported instead of the status of the cancelled call
+        state.error.emplace(code, std::move(message));
+        state.context->grpc_context().TryCancel();
+    }
+
+    static void finish(state_type& state) {
+        auto status = state.stream->Finish();
+        // the call cancelled by closing the results is not an error
+        auto closed = state.results.closed();
+        auto code = state.error ? state.error->code() : status.error_code();
+        state.metrics->add_call(closed ? grpc::StatusCode::OK : code, state.stopwatch.elapsed());
+        if(state.error && ! closed) {
+            generic_record_impl err{};
+            err.set_error(*state.error);
+            state.results.end_of_stream(std::move(err));
+        } else if(status.ok() || closed) {
+            state.results.end_of_stream();
+        } else {
+            generic_record_impl err{};
+            err.set_error(error_info(status.error_code(), status.error_message()));
+            // never blocks, because this may run in the caller thread, which also takes out the results
+            state.results.end_of_stream(std::move(err));
+        }
+        state.lease.reset();
+    }
+
+    std::shared_ptr<state_type> state_;
+    build_type build_;
+    bool done_{false};
+};
+
+}  // namespace plugin::udf
@@ -0,0 +1,109 @@
+/*
+ * Copyright 2018-2026 Project Tsurugi.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+#include "async_executor.h"
+
+#include <algorithm>
+#include <list>
+#include <mutex>
+#include <thread>
+#include <utility>
+
+namespace plugin::udf {
+
+async_executor::async_executor(std::size_t workers) {
+    if(workers == 0) { workers = default_workers; }
+    workers_.reserve(workers);
+    for(std::size_t i = 0; i < workers; ++i) {
+        workers_.emplace_back([this] { run(); });
+    }
+}
+
+async_executor::~async_executor() {
+    {
+        std::lock_guard lk(mutex_);
+        stopping_ = true;
+    }
+    cv_.notify_all();
+    for(auto& worker: workers_) {
+        if(worker.joinable()) { worker.join(); }
+    }
+    std::list<std::thread> spawned{};
+    {
+        std::lock_guard lk(mutex_);
+        spawned.swap(spawned_);
+    }
+    for(auto& thread: spawned) { thread.join(); }
+}
+
+void async_executor::submit(task_type task) {
+    {
+        std::lock_guard lk(mutex_);
+        queue_.push_back(std::move(task));
+    }
+    cv_.notify_one();
+}
+
+void async_executor::spawn(task_type task) {
+    std::list<std::thread> finished{};
+    {
+        std::lock_guard lk(mutex_);
+        // join the threads of the finished tasks here, instead of detaching them,
+        // so that no thread outlives the plugin library which runs it
+        for(auto id: finished_spawned_) {
+            auto it = std::find_if(spawned_.begin(), spawned_.end(), [&](auto& t) { return t.get_id() == id; });
+            if(it != spawned_.end()) { finished.splice(finished.end(), spawned_, it); }
+        }
+        finished_spawned_.clear();
+        spawned_.emplace_back([this, task = std::move(task)] {
+            try {
+                task();
+            } catch(...) {
+                // tasks report their errors to their streams
+            }
+            std::lock_guard lk(mutex_);
+            finished_spawned_.emplace_back(std::this_thread::get_id());
+        });
+    }
+    for(auto& thread: finished) { thread.join(); }
+}
+
+async_executor_stats async_executor::stats() const {
+    std::lock_guard lk(mutex_);
+    return async_executor_stats{workers_.size(), queue_.size(), active_calls_, completed_calls_};
+}
+
+void async_executor::run() {
+    std::unique_lock lk(mutex_);
+    while(true) {
+        cv_.wait(lk, [&] { return ! queue_.empty() || stopping_; });
+        // queued calls still run on stopping, because their streams wait for the end of stream
+        if(queue_.empty()) { return; }
+        auto task = std::move(queue_.front());
+        queue_.pop_front();
+        ++active_calls_;
+        lk.unlock();
+        try {
+            task();
+        } catch(...) {
+            // tasks report their errors to their streams
+        }
+        lk.lock();
+        --active_calls_;
+        ++completed_calls_;
+    }
+}
+
+}  // namespace plugin::udf
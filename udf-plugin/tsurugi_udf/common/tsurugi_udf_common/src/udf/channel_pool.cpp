@@ -0,0 +1,90 @@
+/*
+ * Copyright 2018-2026 Project Tsurugi.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+#include "channel_pool.h"
+
+#include <optional>
+#include <string>
+#include <utility>
+
+#include <grpcpp/create_channel.h>
+#include <grpcpp/security/credentials.h>
+#include <grpcpp/support/channel_arguments.h>
+
+namespace plugin::udf {
+
+channel_pool::lease::lease(std::atomic<std::size_t>* in_flight, std::size_t index) noexcept :
+    in_flight_(in_flight),
+    index_(index) {}
+
+channel_pool::lease::lease(lease&& other) noexcept :
+    in_flight_(std::exchange(other.in_flight_, nullptr)),
+    index_(other.index_) {}
+
+channel_pool::lease::~lease() {
+    if(in_flight_ != nullptr) { in_flight_->fetch_sub(1, std::memory_order_relaxed); }
+}
+
+std::size_t channel_pool::lease::index() const noexcept { return index_; }
+
+channel_pool::channel_pool(std::shared_ptr<grpc::Channel> channel, plugin_config const& config) {
+    auto size = config.get_positive("rpc_client", "channels").value_or(default_channels);
+    auto endpoint = config.get("udf", "endpoint");
+    // The given channel does not expose how Tsurugi created it, so the other channels can only be
+    // created from the plugin configuration. They match the given channel only if Tsurugi took the
+    // endpoint from the same file, and did not need any credentials options for it:
+    // a secure channel may use root certificates configured in Tsurugi, and an endpoint or `secure`
+    // missing here is taken from tsurugi.ini. Otherwise, the calls use only the given channel.
+    if(! endpoint || endpoint->empty() || config.get("udf", "secure") != std::optional<std::string>{"false"}) {
+        size = 1;
+    }
+
+    channels_.reserve(size);
+    channels_.emplace_back(std::move(channel));
+    if(size > 1) {
+        auto credentials = grpc::InsecureChannelCredentials();
+        for(std::size_t i = 1; i < size; ++i) {
+            grpc::ChannelArguments args{};
+            // a channel with its own subchannel pool never shares a connection with the other channels
+            args.SetInt(GRPC_ARG_USE_LOCAL_SUBCHANNEL_POOL, 1);
+            args.SetInt("tsurugi_udf.channel_index", static_cast<int>(i));
+            channels_.emplace_back(grpc::CreateCustomChannel(*endpoint, credentials, args));
+        }
+    }
+    in_flight_ = std::make_unique<std::atomic<std::size_t>[]>(channels_.size());
+}
+
+std::size_t channel_pool::size() const noexcept { return channels_.size(); }
+
+std::shared_ptr<grpc::Channel> const& channel_pool::channel(std::size_t index) const { return channels_.at(index); }
+
+channel_pool::lease channel_pool::acquire() {
+    auto size = channels_.size();
+    auto start = next_.fetch_add(1, std::memory_order_relaxed) % size;
+    auto best = start;
+    auto best_load = in_flight_[start].load(std::memory_order_relaxed);
+    for(std::size_t i = 1; i < size && best_load > 0; ++i) {
+        auto index = (start + i) % size;
+        auto load = in_flight_[index].load(std::memory_order_relaxed);
+        if(load < best_load) {
+            best = index;
+            best_load = load;
+        }
+    }
+    in_flight_[best].fetch_add(1, std::memory_order_relaxed);
+    return lease{&in_flight_[best], best};
+}
+
+}  // namespace plugin::udf
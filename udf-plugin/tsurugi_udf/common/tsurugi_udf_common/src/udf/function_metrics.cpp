@@ -0,0 +1,167 @@
+/*
+ * Copyright 2018-2026 Project Tsurugi.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+#include "function_metrics.h"
+
+#include <algorithm>
+#include <fstream>
+#include <string>
+#include <system_error>
+#include <utility>
+
+#include "error_info.h"
+
+namespace plugin::udf {
+
+namespace {
+
+std::size_t latency_bucket(std::chrono::nanoseconds latency) noexcept {
+    auto micros = static_cast<std::uint64_t>(std::max<std::int64_t>(
+        std::chrono::duration_cast<std::chrono::microseconds>(latency).count(), 0));
+    std::size_t bucket = 0;
+    // the smallest bucket whose upper bound 2^bucket is not less than micros
+    while(bucket + 1 < metrics_latency_buckets && (std::uint64_t{1} << bucket) < micros) { ++bucket; }
+    return bucket;
+}
+
+std::uint64_t load(std::atomic<std::uint64_t> const& counter) noexcept {
+    return counter.load(std::memory_order_relaxed);
+}
+
+}  // namespace
+
+void function_metrics::add_call(grpc::StatusCode status, std::chrono::nanoseconds latency) noexcept {
+    add(calls_, 1);
+    auto code = static_cast<std::size_t>(status);
+    if(code != 0) { add(errors_[std::min(code, metrics_status_codes - 1)], 1); }
+    add(latency_[latency_bucket(latency)], 1);
+}
+
+function_metrics_snapshot function_metrics::snapshot(std::size_t function_index) const noexcept {
+    function_metrics_snapshot result{};
+    result.function_index = function_index;
+    result.calls = load(calls_);
+    for(std::size_t i = 0; i < metrics_status_codes; ++i) { result.errors[i] = load(errors_[i]); }
+    result.marshal_nanos = load(marshal_nanos_);
+    result.rpc_nanos = load(rpc_nanos_);
+    result.unmarshal_nanos = load(unmarshal_nanos_);
+    result.rows = load(rows_);
+    result.request_bytes = load(request_bytes_);
+    result.response_bytes = load(response_bytes_);
+    for(std::size_t i = 0; i < metrics_latency_buckets; ++i) { result.latency[i] = load(latency_[i]); }
+    return result;
+}
+
+metrics_registry::metrics_registry(std::size_t functions) :
+    size_(functions),
+    functions_(std::make_unique<function_metrics[]>(functions)) {}
+
+std::size_t metrics_registry::snapshot(function_metrics_snapshot* out, std::size_t capacity) const noexcept {
+    if(out != nullptr) {
+        for(std::size_t i = 0; i < std::min(size_, capacity); ++i) { out[i] = functions_[i].snapshot(i); }
+    }
+    return size_;
+}
+
+std::vector<function_metrics_snapshot> metrics_registry::snapshot() const {
+    std::vector<function_metrics_snapshot> result(size_);
+    snapshot(result.data(), result.size());
+    return result;
+}
+
+void write_metrics_json(std::ostream& out, std::vector<function_metrics_snapshot> const& snapshots) {
+    out << "{\"functions\":[";
+    bool first_function = true;
+    for(auto const& s: snapshots) {
+        // functions which have not been called, including the indices of the other libraries;
+        // a call in progress has its requests or rows recorded before its status
+        if(s.calls == 0 && s.marshal_nanos == 0 && s.rpc_nanos == 0 && s.rows == 0) { continue; }
+        if(! first_function) { out << ','; }
+        first_function = false;
+        out << "{\"function_index\":" << s.function_index << ",\"calls\":" << s.calls << ",\"errors\":{";
+        bool first_error = true;
+        for(std::size_t i = 1; i < metrics_status_codes; ++i) {
+            if(s.errors[i] == 0) { continue; }
+            if(! first_error) { out << ','; }
+            first_error = false;
+            out << '"' << to_string_view(static_cast<grpc::StatusCode>(i)) << "\":" << s.errors[i];
+        }
+        out << "},\"marshal_nanos\":" << s.marshal_nanos << ",\"rpc_nanos\":" << s.rpc_nanos
+            << ",\"unmarshal_nanos\":" << s.unmarshal_nanos << ",\"rows\":" << s.rows
+            << ",\"request_bytes\":" << s.request_bytes << ",\"response_bytes\":" << s.response_bytes
+            << ",\"latency_histogram\":[";
+        for(std::size_t i = 0; i < metrics_latency_buckets; ++i) {
+            if(i != 0) { out << ','; }
+            out << "{\"le_micros\":";
+            if(i + 1 < metrics_latency_buckets) {
+                out << (std::uint64_t{1} << i);
+            } else {
+                out << "null";
+            }
+            out << ",\"count\":" << s.latency[i] << '}';
+        }
+        out << "]}";
+    }
+    out << "]}\n";
+}
+
+metrics_dumper::metrics_dumper(
+    metrics_registry const& registry,
+    std::filesystem::path path,
+    std::chrono::seconds interval
+) :
+    registry_(registry),
+    path_(std::move(path)),
+    interval_(interval) {
+    if(path_.empty()) { return; }
+    thread_ = std::thread([this] { run(); });
+}
+
+metrics_dumper::~metrics_dumper() {
+    if(! thread_.joinable()) { return; }
+    {
+        std::lock_guard lk(mutex_);
+        stopping_ = true;
+    }
+    cv_.notify_all();
+    thread_.join();
+    dump();
+}
+
+bool metrics_dumper::dump() const {
+    if(path_.empty()) { return false; }
+    auto temporary = path_;
+    temporary += ".tmp";
+    {
+        std::ofstream out(temporary, std::ios::trunc);
+        if(! out) { return false; }
+        write_metrics_json(out, registry_.snapshot());
+        if(! out.flush()) { return false; }
+    }
+    std::error_code ec{};
+    std::filesystem::rename(temporary, path_, ec);
+    return ! ec;
+}
+
+void metrics_dumper::run() {
+    std::unique_lock lk(mutex_);
+    while(! cv_.wait_for(lk, interval_, [&] { return stopping_; })) {
+        lk.unlock();
+        dump();
+        lk.lock();
+    }
+}
+
+}  // namespace plugin::udf
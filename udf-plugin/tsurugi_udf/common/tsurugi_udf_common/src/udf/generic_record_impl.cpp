@@ -17,13 +17,17 @@
 #include "generic_record_impl.h"
 
 #include <chrono>
+#include <condition_variable>
+#include <cstddef>
+#include <functional>
 #include <iostream>
 #include <memory>
+#include <mutex>
 #include <optional>
-#include <queue>
 #include <sstream>
 #include <stdexcept>
 #include <string>
+#include <string_view>
 #include <type_traits>
 #include <utility>
 #include <variant>
@@ -33,9 +37,9 @@
 
 namespace {
 
-std::string value_type_to_string(plugin::udf::value_type const& v) {
+std::string value_type_to_string(plugin::udf::value_type const& v, std::string const& payload) {
     return std::visit(
-        [](auto const& x) -> std::string {
+        [&payload](auto const& x) -> std::string {
             using T = std::decay_t<decltype(x)>;
 
             if constexpr(std::is_same_v<T, std::monostate>) {
@@ -58,10 +62,10 @@ std::string value_type_to_string(plugin::udf::value_type const& v) {
                 std::ostringstream os;
                 os << "float8(" << x << ")";
                 return os.str();
-            } else if constexpr(std::is_same_v<T, std::string>) {
-                return "string(\"" + x + "\")";
-            } else if constexpr(std::is_same_v<T, plugin::udf::bytes_value>) {
-                return "bytes(size=" + std::to_string(x.value.size()) + ")";
+            } else if constexpr(std::is_same_v<T, plugin::udf::string_payload>) {
+                return "string(\"" + payload.substr(x.offset, x.size) + "\")";
+            } else if constexpr(std::is_same_v<T, plugin::udf::bytes_payload>) {
+                return "bytes(size=" + std::to_string(x.size) + ")";
             } else if constexpr(std::is_same_v<T, plugin::udf::decimal_value>) {
                 return "decimal(size=" + std::to_string(x.unscaled_value.size()) +
                     ",exp=" + std::to_string(x.exponent) + ")";
@@ -98,8 +102,8 @@ plugin::udf::runtime_type_kind to_runtime_type_kind(plugin::udf::value_type cons
     if(std::holds_alternative<std::uint64_t>(v)) return plugin::udf::runtime_type_kind::uint8;
     if(std::holds_alternative<float>(v)) return plugin::udf::runtime_type_kind::float4;
     if(std::holds_alternative<double>(v)) return plugin::udf::runtime_type_kind::float8;
-    if(std::holds_alternative<std::string>(v)) return plugin::udf::runtime_type_kind::string;
-    if(std::holds_alternative<plugin::udf::bytes_value>(v)) return plugin::udf::runtime_type_kind::bytes;
+    if(std::holds_alternative<plugin::udf::string_payload>(v)) return plugin::udf::runtime_type_kind::string;
+    if(std::holds_alternative<plugin::udf::bytes_payload>(v)) return plugin::udf::runtime_type_kind::bytes;
     if(std::holds_alternative<plugin::udf::decimal_value>(v)) return plugin::udf::runtime_type_kind::decimal;
     if(std::holds_alternative<plugin::udf::date_value>(v)) return plugin::udf::runtime_type_kind::date;
     if(std::holds_alternative<plugin::udf::local_time_value>(v)) return plugin::udf::runtime_type_kind::local_time;
@@ -119,11 +123,24 @@ namespace plugin::udf {
 std::optional<error_info>& generic_record_impl::error() noexcept { return err_; }
 std::optional<error_info> const& generic_record_impl::error() const noexcept { return err_; }
 
+void generic_record_impl::reserve(std::size_t columns, std::size_t payload_bytes) {
+    values_.reserve(columns);
+    payload_.reserve(payload_bytes);
+}
+
 void generic_record_impl::reset() {
+    // clear() keeps the capacity, so that the next row reuses the storage
     values_.clear();
+    payload_.clear();
     err_ = std::nullopt;
 }
 
+std::size_t generic_record_impl::append_payload(std::string_view value) {
+    auto offset = payload_.size();
+    payload_.append(value);
+    return offset;
+}
+
 void generic_record_impl::set_error(error_info const& status) {
     err_ = error_info(status.code(), std::string(status.message()));
 }
@@ -149,11 +166,19 @@ void generic_record_impl::add_float_null() { values_.emplace_back(std::monostate
 void generic_record_impl::add_double(double v) { values_.emplace_back(v); }
 void generic_record_impl::add_double_null() { values_.emplace_back(std::monostate{}); }
 
-void generic_record_impl::add_string(std::string v) { values_.emplace_back(std::move(v)); }
+void generic_record_impl::add_string(std::string v) { add_string_view(v); }
 void generic_record_impl::add_string_null() { values_.emplace_back(std::monostate{}); }
+void generic_record_impl::add_string_view(std::string_view v) {
+    auto offset = append_payload(v);
+    values_.emplace_back(string_payload{offset, v.size()});
+}
 
-void generic_record_impl::add_bytes(bytes_value v) { values_.emplace_back(std::move(v)); }
+void generic_record_impl::add_bytes(bytes_value v) { add_bytes_view(v.value); }
 void generic_record_impl::add_bytes_null() { values_.emplace_back(std::monostate{}); }
+void generic_record_impl::add_bytes_view(std::string_view v) {
+    auto offset = append_payload(v);
+    values_.emplace_back(bytes_payload{offset, v.size()});
+}
 
 void generic_record_impl::add_decimal(decimal_value v) { values_.emplace_back(std::move(v)); }
 void generic_record_impl::add_decimal_null() { values_.emplace_back(std::monostate{}); }
@@ -177,7 +202,7 @@ void generic_record_impl::add_clob_reference(clob_reference_value v) { values_.e
 void generic_record_impl::add_clob_reference_null() { values_.emplace_back(std::monostate{}); }
 
 std::unique_ptr<generic_record_cursor> generic_record_impl::cursor() const {
-    return std::make_unique<generic_record_cursor_impl>(values_);
+    return std::make_unique<generic_record_cursor_impl>(values_, payload_);
 }
 
 std::string generic_record_impl::debug_string() const {
@@ -186,7 +211,7 @@ std::string generic_record_impl::debug_string() const {
 
     for(std::size_t i = 0; i < values_.size(); ++i) {
         if(i != 0) { os << ", "; }
-        os << "#" << i << "=" << value_type_to_string(values_[i]);
+        os << "#" << i << "=" << value_type_to_string(values_[i], payload_);
     }
 
     os << "]";
@@ -205,7 +230,12 @@ void generic_record_impl::dump(std::ostream& os) const { os << debug_string(); }
 
 std::ostream& operator<<(std::ostream& os, generic_record_impl const& record) { return os << record.debug_string(); }
 
-generic_record_cursor_impl::generic_record_cursor_impl(std::vector<value_type> const& values) : values_(values) {}
+generic_record_cursor_impl::generic_record_cursor_impl(
+    std::vector<value_type> const& values,
+    std::string const& payload
+) :
+    values_(values),
+    payload_(payload) {}
 
 bool generic_record_cursor_impl::has_next() { return index_ < values_.size(); }
 
@@ -226,6 +256,14 @@ std::optional<T> fetch_and_advance(ValueVector const& values, std::size_t& index
     return value;
 }
 
+template<typename T, typename ValueVector>
+T const* fetch_pointer_and_advance(ValueVector const& values, std::size_t& index) {
+    if(index >= values.size()) { return nullptr; }
+    auto const* value = std::get_if<T>(&values[index]);
+    ++index;
+    return value;
+}
+
 }  // anonymous namespace
 
 std::optional<bool> generic_record_cursor_impl::fetch_bool() { return fetch_and_advance<bool>(values_, index_); }
@@ -244,10 +282,14 @@ std::optional<std::uint64_t> generic_record_cursor_impl::fetch_uint8() {
 std::optional<float> generic_record_cursor_impl::fetch_float() { return fetch_and_advance<float>(values_, index_); }
 std::optional<double> generic_record_cursor_impl::fetch_double() { return fetch_and_advance<double>(values_, index_); }
 std::optional<std::string> generic_record_cursor_impl::fetch_string() {
-    return fetch_and_advance<std::string>(values_, index_);
+    auto p = fetch_and_advance<string_payload>(values_, index_);
+    if(! p) { return std::nullopt; }
+    return payload_.substr(p->offset, p->size);
 }
 std::optional<bytes_value> generic_record_cursor_impl::fetch_bytes() {
-    return fetch_and_advance<bytes_value>(values_, index_);
+    auto p = fetch_and_advance<bytes_payload>(values_, index_);
+    if(! p) { return std::nullopt; }
+    return bytes_value{payload_.substr(p->offset, p->size)};
 }
 std::optional<decimal_value> generic_record_cursor_impl::fetch_decimal() {
     return fetch_and_advance<decimal_value>(values_, index_);
@@ -271,6 +313,22 @@ std::optional<clob_reference_value> generic_record_cursor_impl::fetch_clob_refer
     return fetch_and_advance<clob_reference_value>(values_, index_);
 }
 
+std::optional<std::string_view> generic_record_cursor_impl::fetch_string_view() {
+    auto const* p = fetch_pointer_and_advance<string_payload>(values_, index_);
+    if(! p) { return std::nullopt; }
+    return std::string_view{payload_}.substr(p->offset, p->size);
+}
+std::optional<std::string_view> generic_record_cursor_impl::fetch_bytes_view() {
+    auto const* p = fetch_pointer_and_advance<bytes_payload>(values_, index_);
+    if(! p) { return std::nullopt; }
+    return std::string_view{payload_}.substr(p->offset, p->size);
+}
+std::optional<decimal_view> generic_record_cursor_impl::fetch_decimal_view() {
+    auto const* p = fetch_pointer_and_advance<decimal_value>(values_, index_);
+    if(! p) { return std::nullopt; }
+    return decimal_view{p->unscaled_value, p->exponent};
+}
+
 plugin::udf::runtime_type_kind generic_record_cursor_impl::current_kind() const {
     if(index_ >= values_.size()) { throw std::out_of_range("generic_record_cursor: no current value"); }
     return to_runtime_type_kind(values_[index_]);
@@ -281,103 +339,444 @@ bool generic_record_cursor_impl::current_is_null() const {
     return std::holds_alternative<std::monostate>(values_[index_]);
 }
 
-generic_record_stream_impl::generic_record_stream_impl() = default;
-generic_record_stream_impl::~generic_record_stream_impl() { close(); }
-
-generic_record_stream_impl::generic_record_stream_impl(generic_record_stream_impl&& other) noexcept {
-    {
-        std::lock_guard lk(other.mutex_);
-        queue_ = std::move(other.queue_);
-        closed_ = other.closed_;
-        eos_ = other.eos_;
-        other.closed_ = true;
-        other.eos_ = true;
-    }
-    other.cv_.notify_all();
-}
-
-generic_record_stream_impl& generic_record_stream_impl::operator=(generic_record_stream_impl&& other) noexcept {
-    if(this == &other) { return *this; }
-    {
-        std::scoped_lock lk(mutex_, other.mutex_);
-        queue_ = std::move(other.queue_);
-        closed_ = other.closed_;
-        eos_ = other.eos_;
-        other.closed_ = true;
-        other.eos_ = true;
-    }
-    other.cv_.notify_all();
-    return *this;
-}
-
 void generic_record_impl::assign_from(generic_record_impl&& other) noexcept {
     values_ = std::move(other.values_);
+    payload_ = std::move(other.payload_);
     err_ = std::move(other.err_);
     other.reset();
 }
 
-void generic_record_stream_impl::push(std::unique_ptr<generic_record_impl> record) {
-    {
-        std::lock_guard lk(mutex_);
-        if(closed_ || eos_) { return; }
-        queue_.push(std::move(record));
+void generic_record_impl::swap(generic_record_impl& other) noexcept {
+    values_.swap(other.values_);
+    payload_.swap(other.payload_);
+    err_.swap(other.err_);
+}
+
+void generic_record_impl::take_from(generic_record_impl& source) {
+    reset();
+    swap(source);
+}
+
+void generic_record_impl::copy_to(generic_record& target) const {
+    for(auto const& v: values_) {
+        std::visit(
+            [this, &target](auto const& x) {
+                using T = std::decay_t<decltype(x)>;
+
+                if constexpr(std::is_same_v<T, std::monostate>) {
+                    target.add_bool_null();
+                } else if constexpr(std::is_same_v<T, bool>) {
+                    target.add_bool(x);
+                } else if constexpr(std::is_same_v<T, std::int32_t>) {
+                    target.add_int4(x);
+                } else if constexpr(std::is_same_v<T, std::int64_t>) {
+                    target.add_int8(x);
+                } else if constexpr(std::is_same_v<T, std::uint32_t>) {
+                    target.add_uint4(x);
+                } else if constexpr(std::is_same_v<T, std::uint64_t>) {
+                    target.add_uint8(x);
+                } else if constexpr(std::is_same_v<T, float>) {
+                    target.add_float(x);
+                } else if constexpr(std::is_same_v<T, double>) {
+                    target.add_double(x);
+                } else if constexpr(std::is_same_v<T, string_payload>) {
+                    target.add_string_view(std::string_view{payload_}.substr(x.offset, x.size));
+                } else if constexpr(std::is_same_v<T, bytes_payload>) {
+                    target.add_bytes_view(std::string_view{payload_}.substr(x.offset, x.size));
+                } else if constexpr(std::is_same_v<T, decimal_value>) {
+                    target.add_decimal(x);
+                } else if constexpr(std::is_same_v<T, date_value>) {
+                    target.add_date(x);
+                } else if constexpr(std::is_same_v<T, local_time_value>) {
+                    target.add_local_time(x);
+                } else if constexpr(std::is_same_v<T, local_datetime_value>) {
+                    target.add_local_datetime(x);
+                } else if constexpr(std::is_same_v<T, offset_datetime_value>) {
+                    target.add_offset_datetime(x);
+                } else if constexpr(std::is_same_v<T, blob_reference_value>) {
+                    target.add_blob_reference(x);
+                } else if constexpr(std::is_same_v<T, clob_reference_value>) {
+                    target.add_clob_reference(x);
+                } else {
+                    static_assert(always_false<T>::value, "unsupported value_type");
+                }
+            },
+            v
+        );
     }
-    cv_.notify_one();
+    if(err_) { target.set_error(*err_); }
 }
 
-void generic_record_stream_impl::end_of_stream() {
-    {
+void generic_record::take_from(generic_record_impl& source) {
+    // a record of another implementation cannot exchange the buffers with the source
+    reset();
+    source.copy_to(*this);
+}
+
+class generic_record_stream_buffer {
+public:
+
+    using status_type = generic_record_stream::status_type;
+    using push_status = generic_record_stream_writer::push_status;
+
+    explicit generic_record_stream_buffer(std::size_t capacity) : ring_(capacity) {}
+
+    bool push(generic_record_impl& record) {
+        bool was_empty{};
+        {
+            std::unique_lock lk(mutex_);
+            writable_cv_.wait(lk, [&] { return size_ < ring_.size() || closed_ || eos_; });
+            if(closed_ || eos_) {
+                record.reset();
+                return false;
+            }
+            auto& slot = ring_[(head_ + size_) % ring_.size()];
+            slot.swap(record);
+            record.reset();
+            was_empty = size_ == 0;
+            ++size_;
+        }
+        // the consumer waits only if the buffer was empty
+        if(was_empty) { readable_cv_.notify_all(); }
+        return true;
+    }
+
+    push_status try_push(generic_record_impl& record, std::function<void()>& on_writable) {
+        bool was_empty{};
+        {
+            std::lock_guard lk(mutex_);
+            if(closed_ || eos_) {
+                record.reset();
+                return push_status::closed;
+            }
+            if(size_ == ring_.size()) {
+                // registered under the lock, so that a consumer cannot take records out in between
+                writable_handler_ = std::move(on_writable);
+                return push_status::full;
+            }
+            auto& slot = ring_[(head_ + size_) % ring_.size()];
+            slot.swap(record);
+            record.reset();
+            was_empty = size_ == 0;
+            ++size_;
+        }
+        if(was_empty) { readable_cv_.notify_all(); }
+        return push_status::pushed;
+    }
+
+    void end_of_stream(generic_record_impl* last) {
+        {
+            std::lock_guard lk(mutex_);
+            if(last != nullptr && ! closed_ && ! eos_) {
+                if(size_ == ring_.size()) {
+                    // grow by one slot rather than wait, so that the producer never blocks here;
+                    // records are exchanged, because they cannot be moved
+                    std::vector<generic_record_impl> grown(ring_.size() + 1);
+                    for(std::size_t i = 0; i < size_; ++i) { grown[i].swap(ring_[(head_ + i) % ring_.size()]); }
+                    ring_.swap(grown);
+                    head_ = 0;
+                }
+                ring_[(head_ + size_) % ring_.size()].swap(*last);
+                ++size_;
+            }
+            eos_ = true;
+            close_handler_ = nullptr;
+            writable_handler_ = nullptr;
+        }
+        readable_cv_.notify_all();
+        writable_cv_.notify_all();
+    }
+
+    void close() {
+        std::function<void()> writable_handler{};
+        {
+            std::lock_guard lk(mutex_);
+            closed_ = true;
+            eos_ = true;
+            for(std::size_t i = 0; i < size_; ++i) { ring_[(head_ + i) % ring_.size()].reset(); }
+            head_ = 0;
+            size_ = 0;
+            if(close_handler_) {
+                // called under the lock, so that the producer can safely remove it before it finishes
+                auto handler = std::move(close_handler_);
+                close_handler_ = nullptr;
+                handler();
+            }
+            writable_handler = std::move(writable_handler_);
+            writable_handler_ = nullptr;
+        }
+        readable_cv_.notify_all();
+        writable_cv_.notify_all();
+        // resumes the parked producer, which then sees the stream closed
+        if(writable_handler) { writable_handler(); }
+    }
+
+    [[nodiscard]] bool closed() const {
         std::lock_guard lk(mutex_);
-        eos_ = true;
+        return closed_;
     }
-    cv_.notify_all();
-}
 
-void generic_record_stream_impl::close() {
-    {
+    void on_close(std::function<void()> handler) {
         std::lock_guard lk(mutex_);
-        closed_ = true;
-        eos_ = true;
-        std::queue<std::unique_ptr<generic_record_impl>> empty;
-        queue_.swap(empty);
+        if(closed_ && handler) {
+            handler();
+            return;
+        }
+        close_handler_ = std::move(handler);
     }
-    cv_.notify_all();
-}
 
-generic_record_stream::status_type generic_record_stream_impl::extract_record_from_queue_unlocked(generic_record& record
-) {
-    if(queue_.empty()) { return status_type::end_of_stream; }
+    [[nodiscard]] std::size_t capacity() const noexcept { return ring_.size(); }
+
+    status_type try_next(generic_record& record) {
+        status_type result{};
+        std::function<void()> writable_handler{};
+        {
+            std::lock_guard lk(mutex_);
+            if(size_ == 0) { return eos_ ? status_type::end_of_stream : status_type::not_ready; }
+            result = extract_unlocked(record);
+            writable_handler = take_writable_handler_unlocked();
+        }
+        notify_writable(writable_handler);
+        return result;
+    }
 
-    auto rec = std::move(queue_.front());
-    queue_.pop();
+    status_type next(generic_record& record, std::optional<std::chrono::milliseconds> timeout) {
+        status_type result{};
+        std::function<void()> writable_handler{};
+        {
+            std::unique_lock lk(mutex_);
+            if(! wait_readable_unlocked(lk, timeout)) { return status_type::not_ready; }
+            if(size_ == 0) { return status_type::end_of_stream; }
+            result = extract_unlocked(record);
+            writable_handler = take_writable_handler_unlocked();
+        }
+        notify_writable(writable_handler);
+        return result;
+    }
 
-    if(auto* impl = dynamic_cast<generic_record_impl*>(&record)) {
-        impl->assign_from(std::move(*rec));
-        return impl->error() ? status_type::error : status_type::ok;
+    status_type next_batch(
+        std::vector<std::unique_ptr<generic_record_impl>>& records,
+        std::size_t max,
+        std::optional<std::chrono::milliseconds> timeout
+    ) {
+        auto result = status_type::ok;
+        std::function<void()> writable_handler{};
+        {
+            std::unique_lock lk(mutex_);
+            if(! wait_readable_unlocked(lk, timeout)) {
+                release_unlocked(records, 0);
+                return status_type::not_ready;
+            }
+            if(size_ == 0) {
+                release_unlocked(records, 0);
+                return status_type::end_of_stream;
+            }
+            auto count = (max == 0 || max > size_) ? size_ : max;
+            while(records.size() < count) {
+                if(spare_records_.empty()) {
+                    records.emplace_back(std::make_unique<generic_record_impl>());
+                } else {
+                    records.emplace_back(std::move(spare_records_.back()));
+                    spare_records_.pop_back();
+                }
+            }
+            std::size_t taken = 0;
+            while(taken < count) {
+                auto& out = records[taken];
+                if(! out) { out = std::make_unique<generic_record_impl>(); }
+                out->reset();
+                out->swap(ring_[head_]);
+                head_ = (head_ + 1) % ring_.size();
+                --size_;
+                ++taken;
+                if(out->error()) {
+                    result = status_type::error;
+                    break;
+                }
+            }
+            release_unlocked(records, taken);
+            writable_handler = take_writable_handler_unlocked();
+        }
+        notify_writable(writable_handler);
+        return result;
     }
-    return status_type::error;
+
+    status_type next_batch(
+        generic_record* const* records,
+        std::size_t size,
+        std::size_t& taken,
+        std::optional<std::chrono::milliseconds> timeout
+    ) {
+        taken = 0;
+        auto result = status_type::ok;
+        std::function<void()> writable_handler{};
+        {
+            std::unique_lock lk(mutex_);
+            if(! wait_readable_unlocked(lk, timeout)) { return status_type::not_ready; }
+            if(size_ == 0) { return status_type::end_of_stream; }
+            auto count = size > size_ ? size_ : size;
+            while(taken < count) {
+                result = extract_unlocked(*records[taken]);
+                ++taken;
+                if(result == status_type::error) { break; }
+            }
+            writable_handler = take_writable_handler_unlocked();
+        }
+        notify_writable(writable_handler);
+        return result;
+    }
+
+private:
+
+    std::function<void()> take_writable_handler_unlocked() {
+        std::function<void()> handler{};
+        handler.swap(writable_handler_);
+        return handler;
+    }
+
+    void notify_writable(std::function<void()>& writable_handler) {
+        writable_cv_.notify_one();
+        // called out of the lock, because it may push records right away
+        if(writable_handler) { writable_handler(); }
+    }
+
+    void release_unlocked(std::vector<std::unique_ptr<generic_record_impl>>& records, std::size_t size) {
+        // keep the surplus records for the next call, instead of destroying them
+        while(records.size() > size) {
+            if(records.back()) { spare_records_.emplace_back(std::move(records.back())); }
+            records.pop_back();
+        }
+    }
+
+    status_type extract_unlocked(generic_record& record) {
+        auto& slot = ring_[head_];
+        // generic_record_impl exchanges the buffers, and the other records copy the values
+        record.take_from(slot);
+        slot.reset();
+        head_ = (head_ + 1) % ring_.size();
+        --size_;
+        return record.error() ? status_type::error : status_type::ok;
+    }
+
+    bool wait_readable_unlocked(std::unique_lock<std::mutex>& lk, std::optional<std::chrono::milliseconds> timeout) {
+        auto pred = [&] { return size_ != 0 || eos_ || closed_; };
+        if(timeout) { return readable_cv_.wait_for(lk, *timeout, pred); }
+        readable_cv_.wait(lk, pred);
+        return true;
+    }
+
+    std::vector<generic_record_impl> ring_;
+    std::vector<std::unique_ptr<generic_record_impl>> spare_records_{};
+    std::size_t head_{0};
+    std::size_t size_{0};
+    bool closed_{false};
+    bool eos_{false};
+    std::function<void()> close_handler_{};
+    std::function<void()> writable_handler_{};
+
+    mutable std::mutex mutex_;
+    std::condition_variable readable_cv_;
+    std::condition_variable writable_cv_;
+};
+
+generic_record_stream_writer::generic_record_stream_writer(std::shared_ptr<generic_record_stream_buffer> buffer
+) noexcept :
+    buffer_(std::move(buffer)) {}
+
+bool generic_record_stream_writer::push(generic_record_impl&& record) {
+    if(! buffer_) { return false; }
+    return buffer_->push(record);
+}
+
+bool generic_record_stream_writer::push(std::unique_ptr<generic_record_impl> record) {
+    if(! record) { return false; }
+    return push(std::move(*record));
+}
+
+generic_record_stream_writer::push_status
+generic_record_stream_writer::try_push(generic_record_impl& record, std::function<void()>& on_writable) {
+    if(! buffer_) { return push_status::closed; }
+    return buffer_->try_push(record, on_writable);
+}
+
+void generic_record_stream_writer::end_of_stream() {
+    if(buffer_) { buffer_->end_of_stream(nullptr); }
+}
+
+void generic_record_stream_writer::end_of_stream(generic_record_impl&& last) {
+    if(buffer_) { buffer_->end_of_stream(&last); }
+    last.reset();
+}
+
+bool generic_record_stream_writer::closed() const { return ! buffer_ || buffer_->closed(); }
+
+void generic_record_stream_writer::on_close(std::function<void()> handler) {
+    if(buffer_) { buffer_->on_close(std::move(handler)); }
+}
+
+generic_record_stream_impl::generic_record_stream_impl(std::size_t capacity) :
+    buffer_(std::make_shared<generic_record_stream_buffer>(capacity == 0 ? default_capacity : capacity)) {}
+
+generic_record_stream_impl::~generic_record_stream_impl() { close(); }
+
+generic_record_stream_impl::generic_record_stream_impl(generic_record_stream_impl&& other) noexcept :
+    buffer_(std::move(other.buffer_)) {}
+
+generic_record_stream_impl& generic_record_stream_impl::operator=(generic_record_stream_impl&& other) noexcept {
+    if(this == &other) { return *this; }
+    close();
+    buffer_ = std::move(other.buffer_);
+    return *this;
 }
 
+generic_record_stream_writer generic_record_stream_impl::writer() const { return generic_record_stream_writer{buffer_}; }
+
+bool generic_record_stream_impl::push(generic_record_impl&& record) { return writer().push(std::move(record)); }
+
+bool generic_record_stream_impl::push(std::unique_ptr<generic_record_impl> record) {
+    return writer().push(std::move(record));
+}
+
+void generic_record_stream_impl::end_of_stream() { writer().end_of_stream(); }
+
+void generic_record_stream_impl::close() {
+    if(buffer_) { buffer_->close(); }
+}
+
+std::size_t generic_record_stream_impl::capacity() const noexcept { return buffer_ ? buffer_->capacity() : 0; }
+
 generic_record_stream::status_type generic_record_stream_impl::try_next(generic_record& record) {
-    std::lock_guard lk(mutex_);
-    if(! queue_.empty()) { return extract_record_from_queue_unlocked(record); }
-    if(eos_) { return status_type::end_of_stream; }
-    return status_type::not_ready;
+    if(! buffer_) { return status_type::end_of_stream; }
+    return buffer_->try_next(record);
 }
 
 generic_record_stream::status_type
 generic_record_stream_impl::next(generic_record& record, std::optional<std::chrono::milliseconds> timeout) {
-    std::unique_lock lk(mutex_);
-    auto pred = [&] { return ! queue_.empty() || eos_ || closed_; };
+    if(! buffer_) { return status_type::end_of_stream; }
+    return buffer_->next(record, timeout);
+}
 
-    if(timeout) {
-        if(! cv_.wait_for(lk, *timeout, pred)) { return status_type::not_ready; }
-    } else {
-        cv_.wait(lk, pred);
-    }
+generic_record_stream::status_type generic_record_stream_impl::next_batch(
+    generic_record* const* records,
+    std::size_t size,
+    std::size_t& taken,
+    std::optional<std::chrono::milliseconds> timeout
+) {
+    taken = 0;
+    if(! buffer_) { return status_type::end_of_stream; }
+    return buffer_->next_batch(records, size, taken, timeout);
+}
 
-    if(! queue_.empty()) { return extract_record_from_queue_unlocked(record); }
-    return status_type::end_of_stream;
+generic_record_stream::status_type generic_record_stream_impl::next_batch(
+    std::vector<std::unique_ptr<generic_record_impl>>& records,
+    std::size_t max,
+    std::optional<std::chrono::milliseconds> timeout
+) {
+    if(! buffer_) {
+        records.clear();
+        return status_type::end_of_stream;
+    }
+    return buffer_->next_batch(records, max, timeout);
 }
 
 }  // namespace plugin::udf
@@ -0,0 +1,102 @@
+/*
+ * Copyright 2018-2026 Project Tsurugi.
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *     http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+#include "plugin_config.h"
+
+#include <dlfcn.h>
+#include <charconv>
+#include <fstream>
+#include <string>
+#include <string_view>
+#include <system_error>
+
+namespace plugin::udf {
+
+namespace {
+
+std::string_view trim(std::string_view s) noexcept {
+    constexpr std::string_view spaces = " \t\r\n";
+    auto begin = s.find_first_not_of(spaces);
+    if(begin == std::string_view::npos) { return {}; }
+    auto end = s.find_last_not_of(spaces);
+    return s.substr(begin, end - begin + 1);
+}
+
+std::string make_key(std::string_view section, std::string_view key) {
+    std::string result{section};
+    result += '.';
+    result += key;
+    return result;
+}
+
+}  // namespace
+
+plugin_config plugin_config::load(std::filesystem::path const& path) {
+    plugin_config result{};
+    std::ifstream in(path);
+    if(! in) { return result; }
+    result.path_ = path;
+
+    std::string section{};
+    std::string line{};
+    while(std::getline(in, line)) {
+        auto text = trim(line);
+        if(text.empty() || text.front() == '#' || text.front() == ';') { continue; }
+        if(text.front() == '[') {
+            if(auto close = text.find(']'); close != std::string_view::npos) {
+                section = std::string{trim(text.substr(1, close - 1))};
+            }
+            continue;
+        }
+        auto eq = text.find('=');
+        if(eq == std::string_view::npos) { continue; }
+        result.values_[make_key(section, trim(text.substr(0, eq)))] = std::string{trim(text.substr(eq + 1))};
+    }
+    return result;
+}
+
+plugin_config plugin_config::load_for_address(void const* address) {
+    Dl_info info{};
+    if(dladdr(address, &info) == 0 || info.dli_fname == nullptr) { return {}; }
+    std::filesystem::path path{info.dli_fname};
+    return load(path.replace_extension(".ini"));
+}
+
+std::optional<std::string> plugin_config::get(std::string_view section, std::string_view key) const {
+    if(auto it = values_.find(make_key(section, key)); it != values_.end()) { return it->second; }
+    return std::nullopt;
+}
+
+std::optional<std::size_t> plugin_config::get_positive(std::string_view section, std::string_view key) const {
+    auto value = get(section, key);
+    if(! value) { return std::nullopt; }
+    std::size_t result{};
+    auto const* end = value->data() + value->size();
+    auto [ptr, ec] = std::from_chars(value->data(), end, result);
+    if(ec != std::errc{} || ptr != end || result == 0) { return std::nullopt; }
+    return result;
+}
+
+std::optional<std::filesystem::path> plugin_config::get_path(std::string_view section, std::string_view key) const {
+    auto value = get(section, key);
+    if(! value || value->empty()) { return std::nullopt; }
+    std::filesystem::path result{*value};
+    if(result.is_relative()) { return path_.parent_path() / result; }
+    return result;
+}
+
+std::filesystem::path const& plugin_config::path() const noexcept { return path_; }
+
+}  // namespace plugin::udf
@@ -34,11 +34,17 @@ def main(argv=None) -> int:
         default=2,
         help="JSON indent (default: 2)",
     )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Include the per-function metrics written by the plugin "
+        "to the metrics_file of its .ini",
+    )
 
     args = parser.parse_args(argv)
 
     try:
-        packages = load_plugins(Path(args.path))
+        packages = load_plugins(Path(args.path), with_metrics=args.metrics)
     except PluginLoadError as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
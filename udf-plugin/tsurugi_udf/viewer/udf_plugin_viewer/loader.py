@@ -11,8 +11,10 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import configparser
+import json
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, List, Union
 
 from . import _udf_plugin
 
@@ -49,7 +51,36 @@ def _collect_so_files(path: Path) -> List[Path]:
     raise PluginLoadError(f"Path is neither file nor directory: {path}")
 
 
-def load_plugins(path: Union[str, Path]) -> list:
+def load_metrics(so: Path) -> Dict[int, dict]:
+    """
+    Load the metrics written by a UDF plugin.
+
+    The metrics file is given by `metrics_file` in the `[rpc_client]` section
+    of the `.ini` paired with the plugin, and is written by the plugin
+    while it runs in Tsurugi.
+
+    :param so: Path to a `.so` file.
+    :return: Metrics of each function, keyed by the function index.
+             Empty if the plugin has no metrics file, or it is not written yet.
+    :raises PluginLoadError: if the metrics file is not valid JSON.
+    """
+    ini = so.with_suffix(".ini")
+    config = configparser.ConfigParser(interpolation=None)
+    config.read(ini, encoding="utf-8")
+    metrics_file = config.get("rpc_client", "metrics_file", fallback="")
+    if not metrics_file:
+        return {}
+    metrics_path = ini.parent / metrics_file
+    if not metrics_path.is_file():
+        return {}
+    try:
+        data = json.loads(metrics_path.read_text(encoding="utf-8"))
+    except ValueError as exc:
+        raise PluginLoadError(f"Invalid metrics file '{metrics_path}': {exc}") from exc
+    return {m["function_index"]: m for m in data.get("functions", [])}
+
+
+def load_plugins(path: Union[str, Path], with_metrics: bool = False) -> list:
     """
     Load UDF plugin shared libraries and return package descriptors.
 
@@ -58,6 +89,8 @@ def load_plugins(path: Union[str, Path]) -> list:
     describing the loaded plugins.
 
     :param path: Path to a `.so` file or a directory containing `.so` files.
+    :param with_metrics: If true, add the `metrics` of each function
+                         (see :func:`load_metrics`), or None if it has no metrics.
     :return: List of package dictionaries.
     :raises PluginLoadError: Raised in the following cases:
         - The path does not exist.
@@ -75,5 +108,11 @@ def load_plugins(path: Union[str, Path]) -> list:
             packages = _udf_plugin.load_plugin(str(so))
         except Exception as exc:
             raise PluginLoadError(f"Failed to load plugin '{so}': {exc}") from exc
+        if with_metrics:
+            metrics = load_metrics(so)
+            for package in packages:
+                for service in package["services"]:
+                    for function in service["functions"]:
+                        function["metrics"] = metrics.get(function["function_index"])
         all_packages.extend(packages)
     return all_packages